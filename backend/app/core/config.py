@@ -264,6 +264,7 @@ class Settings(BaseSettings):
     QUEUE_VISIBILITY_TIMEOUT: int = Field(default=300)  # 5分钟
     QUEUE_MAX_RETRIES: int = Field(default=3)
     WORKER_HEARTBEAT_INTERVAL: int = Field(default=30)  # 30秒
+    WORKER_CONCURRENCY: int = Field(default=1)  # 单个Worker同时执行的任务数
 
 
     # 队列轮询/清理间隔（秒）
@@ -370,6 +371,8 @@ class Settings(BaseSettings):
     TUSHARE_ENABLED: bool = Field(default=True, description="启用Tushare数据源")
     TUSHARE_TIER: str = Field(default="standard", description="Tushare积分等级 (free/basic/standard/premium/vip)")
     TUSHARE_RATE_LIMIT_SAFETY_MARGIN: float = Field(default=0.8, ge=0.1, le=1.0, description="速率限制安全边际")
+    # 多个 Worker 进程共用一个数据源配额（令牌桶保存在 Redis 中）
+    RATE_LIMIT_SHARED_ENABLED: bool = Field(default=False, description="数据源速率限制通过Redis在所有进程间共享配额")
 
     # Tushare统一数据同步配置
     TUSHARE_UNIFIED_ENABLED: bool = Field(default=True)
@@ -379,6 +382,9 @@ class Settings(BaseSettings):
     TUSHARE_QUOTES_SYNC_CRON: str = Field(default="*/5 9-15 * * 1-5")  # 交易时间每5分钟
     TUSHARE_HISTORICAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_HISTORICAL_SYNC_CRON: str = Field(default="0 16 * * 1-5")  # 工作日16点
+    TUSHARE_HISTORICAL_SYNC_MODE: str = Field(default="by_date", description="全市场日线增量同步模式 (by_date/per_symbol)")
+    TUSHARE_BY_DATE_MAX_GAP_DAYS: int = Field(default=30, ge=1, le=250, description="按交易日同步时允许的最大缺口交易日数，超过则逐只同步")
+    TUSHARE_SYNC_FETCH_CONCURRENCY: int = Field(default=4, ge=1, le=32, description="逐只同步历史数据时同时在途的拉取请求数（仍受速率限制器约束）")
     TUSHARE_FINANCIAL_SYNC_ENABLED: bool = Field(default=True)
     TUSHARE_FINANCIAL_SYNC_CRON: str = Field(default="0 3 * * 0")  # 周日凌晨3点
     TUSHARE_STATUS_CHECK_ENABLED: bool = Field(default=True)
@@ -406,6 +412,16 @@ class Settings(BaseSettings):
     AKSHARE_INIT_HISTORICAL_DAYS: int = Field(default=365, ge=1, le=3650, description="初始化历史数据天数")
     AKSHARE_INIT_BATCH_SIZE: int = Field(default=100, ge=10, le=1000, description="初始化批处理大小")
     AKSHARE_INIT_AUTO_START: bool = Field(default=False, description="应用启动时自动检查并初始化数据")
+    AKSHARE_SYNC_FETCH_CONCURRENCY: int = Field(default=3, ge=1, le=16, description="历史数据同步时同时在途的拉取请求数")
+
+    # ==================== 历史数据流水线同步配置 ====================
+
+    # 拉取与写入之间按批合并：每次写入最多合并的股票数
+    SYNC_PIPELINE_SAVE_BATCH_SIZE: int = Field(default=20, ge=1, le=200, description="流水线同步每次批量写入合并的股票数")
+    # 历史数据分块 bulk_write 的并行数（1 为串行）
+    HISTORICAL_BULK_WRITE_CONCURRENCY: int = Field(default=1, ge=1, le=16, description="历史数据批量写入时并行执行的bulk_write数")
+    # 分桶布局：同时按 股票+数据源+周期+年份 写入 stock_daily_quotes_buckets（列式存储，多年K线读取更快）
+    HISTORICAL_BUCKET_LAYOUT_ENABLED: bool = Field(default=False, description="历史数据同时写入按年分桶的列式集合，并优先从中读取")
 
     # ==================== 分析师数据获取配置 ====================
 
@@ -1,97 +1,210 @@
 """
 速率限制器
 用于控制API调用频率，避免超过数据源的限流限制
+
+令牌桶算法：每次调用先在锁内“预约”令牌（令牌不足时记为欠额并算出需要等待的时间），
+再在锁外等待，多个等待者按预约顺序错开而不是排队串行。
+启用共享预算时，令牌桶状态保存在 Redis 中（Lua 脚本原子预约），
+同一主机或集群内的所有 Worker 进程共同分摊一个数据源配额。
 """
 import asyncio
+import math
+import threading
 import time
 import logging
 from collections import deque
-from typing import Optional
+from typing import Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Redis 共享令牌桶的键前缀
+RATE_LIMIT_KEY_PREFIX = "rate_limit:"
+
+# 原子预约令牌：按 Redis 服务器时间补充令牌后扣除 cost，不足部分记为欠额，返回需要等待的毫秒数
+# KEYS[1]=令牌桶键  ARGV: 每毫秒生成令牌数, 桶容量, 本次消耗, 键过期时间(ms)
+_RESERVE_SCRIPT = """
+if redis.replicate_commands then redis.replicate_commands() end
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - cost
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens))
+redis.call('HSET', KEYS[1], 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[4]))
+if tokens >= 0 then
+  return 0
+end
+return math.ceil(-tokens / rate)
+"""
+
 
 class RateLimiter:
     """
-    滑动窗口速率限制器
-    
-    使用滑动窗口算法精确控制API调用频率
+    令牌桶速率限制器
+
+    - 速率：time_window 秒内 max_calls 次（按 cost 计）
+    - 突发：桶容量 burst，空闲后最多可立即放行 burst 次
+    - 预约制：锁只保护令牌计算，等待在锁外进行
+    - 共享预算：传入 redis 客户端后，令牌桶保存在 Redis 中由所有进程共享；
+      Redis 不可用时自动回退到进程内令牌桶
     """
-    
-    def __init__(self, max_calls: int, time_window: float, name: str = "RateLimiter"):
+
+    def __init__(
+        self,
+        max_calls: int,
+        time_window: float,
+        name: str = "RateLimiter",
+        burst: Optional[float] = None,
+        redis: Any = None,
+        redis_key: Optional[str] = None
+    ):
         """
         初始化速率限制器
-        
+
         Args:
             max_calls: 时间窗口内最大调用次数
             time_window: 时间窗口大小（秒）
             name: 限制器名称（用于日志）
+            burst: 突发容量（默认约1秒的配额，至少为1）。任意 time_window 内的调用量不超过 max_calls + burst
+            redis: 可选的 redis.asyncio 客户端（或返回客户端的无参函数），用于多进程共享预算
+            redis_key: 共享令牌桶的 Redis 键（默认 rate_limit:<name>）
         """
         self.max_calls = max_calls
         self.time_window = time_window
         self.name = name
-        self.calls = deque()  # 存储调用时间戳
-        self.lock = asyncio.Lock()  # 确保线程安全
-        
+        self.rate = max_calls / time_window  # 每秒生成的令牌数
+        self.burst = float(burst) if burst is not None else float(max(1, math.ceil(self.rate)))
+        self.lock = threading.Lock()  # 只保护令牌计算，不跨越等待
+
+        # 进程内令牌桶
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+        # 共享预算（Redis）
+        self._redis = redis
+        self.redis_key = redis_key or f"{RATE_LIMIT_KEY_PREFIX}{name}"
+        self._redis_failed_at: Optional[float] = None
+
+        # 最近一个时间窗口内的放行记录（仅用于统计 current_calls）
+        self.calls = deque()
+
         # 统计信息
         self.total_calls = 0
+        self.total_cost = 0.0
         self.total_waits = 0
         self.total_wait_time = 0.0
-        
-        logger.info(f"🔧 {self.name} 初始化: {max_calls}次/{time_window}秒")
-    
-    async def acquire(self):
+
+        logger.info(
+            f"🔧 {self.name} 初始化: {max_calls}次/{time_window}秒, 突发容量 {self.burst:g}"
+            f"{', 共享预算: ' + self.redis_key if redis is not None else ''}"
+        )
+
+    @property
+    def shared(self) -> bool:
+        """是否启用了 Redis 共享预算"""
+        return self._redis is not None
+
+    async def acquire(self, cost: float = 1):
         """
         获取调用许可
         如果超过速率限制，会等待直到可以调用
+
+        Args:
+            cost: 本次调用消耗的令牌数（不同接口的配额权重不同时使用）
         """
-        async with self.lock:
-            now = time.time()
-            
-            # 移除时间窗口外的旧调用记录
-            while self.calls and self.calls[0] <= now - self.time_window:
-                self.calls.popleft()
-            
-            # 如果当前窗口内调用次数已达上限，需要等待
-            if len(self.calls) >= self.max_calls:
-                # 计算需要等待的时间
-                oldest_call = self.calls[0]
-                wait_time = oldest_call + self.time_window - now + 0.01  # 加一点缓冲
-                
-                if wait_time > 0:
-                    self.total_waits += 1
-                    self.total_wait_time += wait_time
-                    
-                    logger.debug(f"⏳ {self.name} 达到速率限制，等待 {wait_time:.2f}秒")
-                    await asyncio.sleep(wait_time)
-                    
-                    # 重新获取当前时间
-                    now = time.time()
-                    
-                    # 再次清理旧记录
-                    while self.calls and self.calls[0] <= now - self.time_window:
-                        self.calls.popleft()
-            
-            # 记录本次调用
+        wait_time = await self._reserve(cost)
+
+        if wait_time > 0:
+            self.total_waits += 1
+            self.total_wait_time += wait_time
+            logger.debug(f"⏳ {self.name} 达到速率限制，等待 {wait_time:.2f}秒")
+            await asyncio.sleep(wait_time)
+
+        # 记录本次调用
+        now = time.monotonic()
+        with self.lock:
             self.calls.append(now)
+            self._trim_calls(now)
             self.total_calls += 1
-    
+            self.total_cost += cost
+
+    async def _reserve(self, cost: float) -> float:
+        """预约令牌，返回需要等待的秒数"""
+        client = self._get_redis()
+        if client is not None:
+            try:
+                wait_ms = await client.eval(
+                    _RESERVE_SCRIPT, 1, self.redis_key,
+                    self.rate / 1000, self.burst, cost,
+                    int(max(self.time_window, self.burst / self.rate) * 2000)
+                )
+                self._redis_failed_at = None
+                return int(wait_ms) / 1000
+            except Exception as e:
+                if self._redis_failed_at is None:
+                    logger.warning(f"⚠️ {self.name} Redis共享预算不可用，回退到进程内限流: {e}")
+                self._redis_failed_at = time.monotonic()
+        return self._reserve_local(cost)
+
+    def _reserve_local(self, cost: float) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - cost
+            self._updated = now
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _get_redis(self):
+        """获取共享预算使用的 Redis 客户端（失败后 time_window 内不再尝试）"""
+        if self._redis is None:
+            return None
+        if self._redis_failed_at is not None and time.monotonic() - self._redis_failed_at < self.time_window:
+            return None
+        if callable(self._redis) and not hasattr(self._redis, "eval"):
+            try:
+                return self._redis()
+            except Exception as e:
+                if self._redis_failed_at is None:
+                    logger.warning(f"⚠️ {self.name} 获取Redis客户端失败，回退到进程内限流: {e}")
+                self._redis_failed_at = time.monotonic()
+                return None
+        return self._redis
+
+    def _trim_calls(self, now: float):
+        while self.calls and self.calls[0] <= now - self.time_window:
+            self.calls.popleft()
+
     def get_stats(self) -> dict:
         """获取统计信息"""
+        with self.lock:
+            self._trim_calls(time.monotonic())
+            current_calls = len(self.calls)
         return {
             "name": self.name,
             "max_calls": self.max_calls,
             "time_window": self.time_window,
-            "current_calls": len(self.calls),
+            "burst": self.burst,
+            "shared": self.shared,
+            "current_calls": current_calls,
             "total_calls": self.total_calls,
+            "total_cost": self.total_cost,
             "total_waits": self.total_waits,
             "total_wait_time": self.total_wait_time,
             "avg_wait_time": self.total_wait_time / self.total_waits if self.total_waits > 0 else 0
         }
-    
+
     def reset_stats(self):
         """重置统计信息"""
         self.total_calls = 0
+        self.total_cost = 0.0
         self.total_waits = 0
         self.total_wait_time = 0.0
         logger.info(f"🔄 {self.name} 统计信息已重置")
@@ -113,13 +226,14 @@ class TushareRateLimiter(RateLimiter):
         "vip": {"max_calls": 800, "time_window": 60},       # VIP用户: 800次/分钟
     }
     
-    def __init__(self, tier: str = "standard", safety_margin: float = 0.8):
+    def __init__(self, tier: str = "standard", safety_margin: float = 0.8, **kwargs):
         """
         初始化Tushare速率限制器
         
         Args:
             tier: 积分等级 (free/basic/standard/premium/vip)
             safety_margin: 安全边际（0-1），实际限制为理论限制的百分比
+            **kwargs: 传给 RateLimiter（burst、redis、redis_key）
         """
         if tier not in self.TIER_LIMITS:
             logger.warning(f"⚠️ 未知的Tushare积分等级: {tier}，使用默认值 'standard'")
@@ -134,7 +248,8 @@ class TushareRateLimiter(RateLimiter):
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name=f"TushareRateLimiter({tier})"
+            name=f"TushareRateLimiter({tier})",
+            **{"redis_key": f"{RATE_LIMIT_KEY_PREFIX}tushare", **kwargs}
         )
         
         self.tier = tier
@@ -151,18 +266,20 @@ class AKShareRateLimiter(RateLimiter):
     AKShare没有明确的限流规则，使用保守的限流策略
     """
     
-    def __init__(self, max_calls: int = 60, time_window: float = 60):
+    def __init__(self, max_calls: int = 60, time_window: float = 60, **kwargs):
         """
         初始化AKShare速率限制器
         
         Args:
             max_calls: 时间窗口内最大调用次数（默认60次/分钟）
             time_window: 时间窗口大小（秒）
+            **kwargs: 传给 RateLimiter（burst、redis、redis_key）
         """
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="AKShareRateLimiter"
+            name="AKShareRateLimiter",
+            **{"redis_key": f"{RATE_LIMIT_KEY_PREFIX}akshare", **kwargs}
         )
 
 
@@ -173,18 +290,20 @@ class BaoStockRateLimiter(RateLimiter):
     BaoStock没有明确的限流规则，使用保守的限流策略
     """
     
-    def __init__(self, max_calls: int = 100, time_window: float = 60):
+    def __init__(self, max_calls: int = 100, time_window: float = 60, **kwargs):
         """
         初始化BaoStock速率限制器
         
         Args:
             max_calls: 时间窗口内最大调用次数（默认100次/分钟）
             time_window: 时间窗口大小（秒）
+            **kwargs: 传给 RateLimiter（burst、redis、redis_key）
         """
         super().__init__(
             max_calls=max_calls,
             time_window=time_window,
-            name="BaoStockRateLimiter"
+            name="BaoStockRateLimiter",
+            **{"redis_key": f"{RATE_LIMIT_KEY_PREFIX}baostock", **kwargs}
         )
 
 
@@ -194,11 +313,25 @@ _akshare_limiter: Optional[AKShareRateLimiter] = None
 _baostock_limiter: Optional[BaoStockRateLimiter] = None
 
 
+def _shared_budget_kwargs() -> dict:
+    """RATE_LIMIT_SHARED_ENABLED 开启时，让全局限制器通过 Redis 共享配额"""
+    try:
+        from app.core.config import settings
+        if not getattr(settings, "RATE_LIMIT_SHARED_ENABLED", False):
+            return {}
+        from app.core.redis_client import get_redis
+    except Exception as e:
+        logger.warning(f"⚠️ 读取共享限流配置失败，使用进程内限流: {e}")
+        return {}
+    # Redis 在应用启动后才初始化，这里传入获取函数，首次调用时再取客户端
+    return {"redis": get_redis}
+
+
 def get_tushare_rate_limiter(tier: str = "standard", safety_margin: float = 0.8) -> TushareRateLimiter:
     """获取Tushare速率限制器（单例）"""
     global _tushare_limiter
     if _tushare_limiter is None:
-        _tushare_limiter = TushareRateLimiter(tier=tier, safety_margin=safety_margin)
+        _tushare_limiter = TushareRateLimiter(tier=tier, safety_margin=safety_margin, **_shared_budget_kwargs())
     return _tushare_limiter
 
 
@@ -206,7 +339,7 @@ def get_akshare_rate_limiter() -> AKShareRateLimiter:
     """获取AKShare速率限制器（单例）"""
     global _akshare_limiter
     if _akshare_limiter is None:
-        _akshare_limiter = AKShareRateLimiter()
+        _akshare_limiter = AKShareRateLimiter(**_shared_budget_kwargs())
     return _akshare_limiter
 
 
@@ -214,7 +347,7 @@ def get_baostock_rate_limiter() -> BaoStockRateLimiter:
     """获取BaoStock速率限制器（单例）"""
     global _baostock_limiter
     if _baostock_limiter is None:
-        _baostock_limiter = BaoStockRateLimiter()
+        _baostock_limiter = BaoStockRateLimiter(**_shared_budget_kwargs())
     return _baostock_limiter
 
 
@@ -0,0 +1,64 @@
+"""
+启动期后台任务
+
+lifespan 中只保留服务可用所必需的步骤（配置校验、数据库连接、配置桥接、调度器），
+配置摘要打印、休市补数等非关键初始化登记到 DeferredStartup，在启动完成后于后台依次执行，
+不再阻塞服务开始接收请求。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("app.startup")
+
+
+class DeferredStartup:
+    """在后台依次执行的启动任务，单个任务失败不影响其他任务"""
+
+    def __init__(self):
+        self._jobs: List[Tuple[str, Callable[[], Awaitable[Any]]]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, func: Callable[[], Awaitable[Any]]):
+        """登记任务，func 为无参协程函数"""
+        self._jobs.append((name, func))
+        self.results[name] = {"status": "pending"}
+
+    def start(self) -> Optional[asyncio.Task]:
+        """在当前事件循环中启动后台执行"""
+        if self._jobs and self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def _run(self):
+        started = time.perf_counter()
+        for name, func in self._jobs:
+            job_started = time.perf_counter()
+            self.results[name] = {"status": "running"}
+            try:
+                await func()
+                status = {"status": "done"}
+            except asyncio.CancelledError:
+                self.results[name] = {"status": "cancelled"}
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ 后台启动任务 {name} 失败（已忽略）: {e}")
+                status = {"status": "failed", "error": str(e)}
+            status["seconds"] = round(time.perf_counter() - job_started, 3)
+            self.results[name] = status
+        summary = ", ".join(f"{name} {r.get('seconds', 0):.2f}s" for name, r in self.results.items())
+        logger.info(f"✅ 后台启动任务完成（{time.perf_counter() - started:.2f}s）: {summary}")
+
+    async def cancel(self):
+        """关闭时取消尚未完成的任务"""
+        task = self._task
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
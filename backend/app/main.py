@@ -27,6 +27,7 @@ from pathlib import Path
 from app.core.config import settings
 from app.core.database import init_db, close_db
 from app.core.logging_config import setup_logging
+from app.core.startup_tasks import DeferredStartup
 from app.routers import auth_db as auth, analysis, screening, queue, sse, health, favorites, config, reports, database, operation_logs, tags, tushare_init, akshare_init, baostock_init, historical_data, multi_period_sync, financial_data, news_data, social_media, internal_messages, usage_statistics, model_capabilities, cache, logs
 from app.routers import sync as sync_router, multi_source_sync
 from app.routers import stocks as stocks_router
@@ -252,19 +253,23 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logging.getLogger("webapi").warning(f"Failed to apply dynamic settings: {e}")
 
+    # 非关键的启动工作（配置摘要需查询数据库、补数需请求行情接口）放到启动完成后在后台执行
+    deferred_startup = DeferredStartup()
+    app.state.deferred_startup = deferred_startup
+
     # 显示配置摘要
-    await _print_config_summary(logger)
+    deferred_startup.add("config_summary", lambda: _print_config_summary(logger))
 
     logger.info("TradingAgents FastAPI backend started")
 
     # 启动期：若需要在休市时补充上一交易日收盘快照
     if settings.QUOTES_BACKFILL_ON_STARTUP:
-        try:
+        async def backfill_last_close_snapshot():
             qi = QuotesIngestionService()
             await qi.ensure_indexes()
             await qi.backfill_last_close_snapshot_if_needed()
-        except Exception as e:
-            logger.warning(f"Startup backfill failed (ignored): {e}")
+
+        deferred_startup.add("quotes_backfill", backfill_last_close_snapshot)
 
     # 启动每日定时任务：可配置
     scheduler: AsyncIOScheduler | None = None
@@ -576,10 +581,13 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ 调度器启动失败: {e}", exc_info=True)
         raise  # 抛出异常，阻止应用启动
 
+    deferred_startup.start()
+
     try:
         yield
     finally:
         # 关闭时清理
+        await deferred_startup.cancel()
         if scheduler:
             try:
                 scheduler.shutdown(wait=False)
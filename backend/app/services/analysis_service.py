@@ -4,11 +4,12 @@
 """
 
 import asyncio
+import threading
 import uuid
-import json
 import logging
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Callable
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable
 from pathlib import Path
 import sys
 
@@ -20,7 +21,13 @@ sys.path.insert(0, str(project_root))
 from tradingagents.utils.logging_init import init_logging
 init_logging()
 
-from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.cancellation import GraphCancelledError
+from tradingagents.graph.engine_pool import get_graph_engine_pool
+
+if TYPE_CHECKING:
+    # 分析引擎依赖全部智能体与 LLM SDK，运行时由引擎池按需导入
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.services.simple_analysis_service import create_analysis_config, get_provider_by_model_name
 from app.models.analysis import (
@@ -52,7 +59,6 @@ class AnalysisService:
         self.queue_service = QueueService(redis_client)
         # 初始化使用统计服务
         self.usage_service = UsageStatisticsService()
-        self._trading_graph_cache = {}
         # 进度跟踪器缓存
         self._progress_trackers: Dict[str, RedisProgressTracker] = {}
 
@@ -79,22 +85,28 @@ class AnalysisService:
             logger.warning(f"⚠️ 生成新的用户ID: {new_object_id}")
             return PyObjectId(new_object_id)
     
-    def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
-        """获取或创建TradingAgents图实例（带缓存）- 与单股分析保持一致"""
-        config_key = json.dumps(config, sort_keys=True)
-
-        if config_key not in self._trading_graph_cache:
-            # 直接使用完整配置，不再合并DEFAULT_CONFIG（因为create_analysis_config已经处理了）
-            # 这与单股分析服务和web目录的方式一致
-            self._trading_graph_cache[config_key] = TradingAgentsGraph(
-                selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
-                debug=config.get("debug", False),
-                config=config
-            )
+    def _get_trading_graph(self, config: Dict[str, Any]) -> "TradingAgentsGraph":
+        """获取TradingAgents图实例 - 与单股分析共享进程内引擎池"""
+        trading_graph, _ = get_graph_engine_pool().acquire(config)
+        return trading_graph
 
-            logger.info(f"创建新的TradingAgents实例: {config.get('llm_provider', 'default')}")
+    def _run_trading_graph(
+        self,
+        config: Dict[str, Any],
+        symbol: str,
+        analysis_date: str,
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        """在线程池中执行 propagate
 
-        return self._trading_graph_cache[config_key]
+        同一配置的实例在并发任务间共享：运行状态保存在每次 propagate 的
+        GraphRunContext 中，实例本身构建后只读。cancel_event 被设置后，
+        propagate 在下一个节点开始前抛出 GraphCancelledError。
+        """
+        trading_graph, engine_metrics = get_graph_engine_pool().acquire(config)
+        return trading_graph.propagate(
+            symbol, analysis_date, engine_metrics=engine_metrics, cancel_event=cancel_event
+        )
 
     def _execute_analysis_sync_with_progress(self, task: AnalysisTask, progress_tracker: RedisProgressTracker) -> AnalysisResult:
         """同步执行分析任务（在线程池中运行，带进度跟踪）"""
@@ -609,9 +621,16 @@ class AnalysisService:
     async def execute_analysis_task(
         self, 
         task: AnalysisTask,
-        progress_callback: Optional[Callable[[int, str], None]] = None
+        progress_callback: Optional[Callable[[int, str], None]] = None,
+        executor: Optional[Executor] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> AnalysisResult:
-        """执行单个分析任务"""
+        """执行单个分析任务
+
+        分析在 executor（默认使用事件循环的线程池）中执行，不阻塞事件循环，
+        Worker 可以同时执行多个任务并按时发送心跳。设置 cancel_event 后分析线程
+        在节点之间停止，本方法在线程退出后抛出 GraphCancelledError。
+        """
         try:
             logger.info(f"开始执行分析任务: {task.task_id} - {task.symbol}")
             
@@ -666,12 +685,6 @@ class AnalysisService:
                 deep_model_config=deep_model_config     # 传递模型配置
             )
             
-            if progress_callback:
-                progress_callback(30, "创建分析图...")
-            
-            # 获取TradingAgents实例
-            trading_graph = self._get_trading_graph(config)
-            
             if progress_callback:
                 progress_callback(50, "执行股票分析...")
             
@@ -679,8 +692,11 @@ class AnalysisService:
             start_time = datetime.utcnow()
             analysis_date = task.parameters.analysis_date or datetime.now().strftime("%Y-%m-%d")
             
-            # 调用现有的分析方法
-            _, decision = trading_graph.propagate(task.symbol, analysis_date)
+            # 在线程池中调用现有的分析方法（同一配置的TradingAgents实例在线程间共享）
+            loop = asyncio.get_running_loop()
+            _, decision = await loop.run_in_executor(
+                executor, self._run_trading_graph, config, task.symbol, analysis_date, cancel_event
+            )
             
             execution_time = (datetime.utcnow() - start_time).total_seconds()
             
@@ -720,6 +736,11 @@ class AnalysisService:
             logger.info(f"分析任务完成: {task.task_id} - 耗时{execution_time:.2f}秒")
 
             return result
+
+        except GraphCancelledError:
+            # 任务状态已由取消流程更新，这里不再标记为失败
+            logger.info(f"🛑 分析任务已取消: {task.task_id}")
+            raise
             
         except Exception as e:
             logger.error(f"执行分析任务失败: {task.task_id} - {e}")
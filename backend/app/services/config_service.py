@@ -21,6 +21,15 @@ from app.models.config import (
 logger = logging.getLogger(__name__)
 
 
+def _invalidate_data_source_snapshot():
+    """数据源配置 / 优先级变更后，使本进程的数据源配置快照立即失效（其他进程按版本号轮询感知）"""
+    try:
+        from tradingagents.dataflows.source_config_snapshot import invalidate_source_config_snapshot
+        invalidate_source_config_snapshot()
+    except Exception as e:
+        logger.debug(f"数据源配置快照失效通知失败: {e}")
+
+
 class ConfigService:
     """配置管理服务类"""
 
@@ -197,6 +206,7 @@ class ConfigService:
                 return False
 
             await groupings_collection.insert_one(grouping.model_dump())
+            _invalidate_data_source_snapshot()
             return True
         except Exception as e:
             print(f"❌ 添加数据源到分类失败: {e}")
@@ -212,6 +222,7 @@ class ConfigService:
                 "data_source_name": data_source_name,
                 "market_category_id": category_id
             })
+            _invalidate_data_source_snapshot()
             return result.deleted_count > 0
         except Exception as e:
             print(f"❌ 从分类中移除数据源失败: {e}")
@@ -280,6 +291,7 @@ class ConfigService:
                     else:
                         logger.warning(f"⚠️ [优先级同步] 未找到匹配的数据源配置: {data_source_name}")
 
+            _invalidate_data_source_snapshot()
             return result.modified_count > 0
         except Exception as e:
             logger.error(f"❌ 更新数据源分组关系失败: {e}")
@@ -352,6 +364,7 @@ class ConfigService:
             else:
                 print(f"⚠️ [优先级同步] 未找到激活的系统配置")
 
+            _invalidate_data_source_snapshot()
             return True
         except Exception as e:
             print(f"❌ 更新分类数据源排序失败: {e}")
@@ -484,6 +497,7 @@ class ConfigService:
                 "enable_monitoring": True,
                 # Worker/Queue intervals
                 "worker_heartbeat_interval_seconds": 30,
+                "worker_concurrency": 1,
                 "queue_poll_interval_seconds": 1.0,
                 "queue_cleanup_interval_seconds": 60.0,
                 # SSE intervals
@@ -552,6 +566,7 @@ class ConfigService:
 
             insert_result = await config_collection.insert_one(config_dict)
             print(f"📝 新配置ID: {insert_result.inserted_id}")
+            _invalidate_data_source_snapshot()
 
             # 验证保存结果
             saved_config = await config_collection.find_one({"_id": insert_result.inserted_id})
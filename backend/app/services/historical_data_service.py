@@ -6,15 +6,111 @@
 import asyncio
 import logging
 from datetime import datetime, date
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from app.core.config import settings
 from app.core.database import get_database
+from tradingagents.dataflows.cache.kline_buckets import (
+    BACKFILL_COLLECTION,
+    BUCKET_COLLECTION,
+    VALUE_COLUMNS as _BUCKET_VALUE_COLUMNS,
+    backfill_key,
+    backfill_keys,
+    bucket_key,
+    build_buckets,
+    bucket_query,
+    buckets_to_columns,
+    buckets_to_frame,
+    pick_source,
+    select_buckets,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# 可选字段：文档字段名 -> (列名, 备选列名)
+_OPTIONAL_FIELDS = {
+    "turnover_rate": ("turnover_rate", "turn"),
+    "volume_ratio": ("volume_ratio", None),
+    "pe": ("pe", None),
+    "pb": ("pb", None),
+    "ps": ("ps", None),
+    "adjustflag": ("adjustflag", "adj_factor"),
+    "tradestatus": ("tradestatus", None),
+    "isST": ("isST", None),
+}
+
+
+def _is_numeric(values: np.ndarray) -> bool:
+    return values.dtype.kind in "biuf"
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """逐元素 bool(value)（NaN 为真，与 Python 语义一致）"""
+    if _is_numeric(values):
+        return values != 0
+    if values.dtype.kind in "mM":
+        return values.view(np.int64) != 0
+    result = np.empty(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        try:
+            result[i] = bool(value)
+        except Exception:
+            result[i] = False
+    return result
+
+
+def _coalesce(data: pd.DataFrame, name: str, fallback: Optional[str] = None):
+    """
+    按列模拟逐行的 row.get(name)（fallback 为 None 时）或 row.get(name) or row.get(fallback)
+
+    Returns:
+        (值数组, 值为 None 的掩码)；两列都不存在时返回 None
+    """
+    first = data[name].to_numpy() if name in data.columns else None
+    second = data[fallback].to_numpy() if fallback and fallback in data.columns else None
+    if first is None and second is None:
+        return None
+
+    n = len(data)
+    if fallback is None:
+        values = first
+    elif first is None:
+        values = second
+    else:
+        truthy = _truthy(first)
+        if truthy.all() or (second is None and _is_numeric(first)):
+            # 备选列不存在：首列为假（如 0）时结果为 None，数值列先用 NaN 占位，由掩码标记
+            values = first if truthy.all() else np.where(truthy, first, np.nan)
+            none_mask = np.zeros(n, dtype=bool) if truthy.all() else ~truthy
+            return values, none_mask
+        if second is not None and _is_numeric(first) and _is_numeric(second):
+            values = np.where(truthy, first, second)
+        else:
+            other = second if second is not None else np.full(n, None, dtype=object)
+            values = np.where(truthy, first.astype(object), other.astype(object))
+
+    if _is_numeric(values):
+        return values, np.zeros(n, dtype=bool)
+    return values, np.fromiter((v is None for v in values), dtype=bool, count=n)
+
+
+def _float_list(values: np.ndarray, none_mask: np.ndarray, safe_float) -> List[Optional[float]]:
+    """整列转换为 Optional[float] 列表（与 _safe_float 逐元素转换结果一致）"""
+    if _is_numeric(values):
+        floats = values.astype(np.float64)
+        result = floats.tolist()
+        invalid = np.isnan(floats) | none_mask
+        if invalid.any():
+            for i in np.flatnonzero(invalid):
+                result[i] = None
+        return result
+    return [None if is_none else safe_float(v) for v, is_none in zip(values, none_mask)]
+
+
 class HistoricalDataService:
     """统一历史数据管理服务"""
     
@@ -22,12 +118,20 @@ class HistoricalDataService:
         """初始化服务"""
         self.db = None
         self.collection = None
+        self.bucket_collection = None
+        self.backfill_collection = None
+        # 分桶布局：同时写入按年分桶的列式集合，读取时优先使用
+        self.bucket_layout_enabled = bool(getattr(settings, "HISTORICAL_BUCKET_LAYOUT_ENABLED", False))
+        # 批量写入时同时执行的 bulk_write 数（各分块的 upsert 键互不重叠，可并行）
+        self.bulk_write_concurrency = max(1, int(getattr(settings, "HISTORICAL_BULK_WRITE_CONCURRENCY", 1)))
         
     async def initialize(self):
         """初始化数据库连接"""
         try:
             self.db = get_database()
             self.collection = self.db.stock_daily_quotes
+            self.bucket_collection = self.db[BUCKET_COLLECTION]
+            self.backfill_collection = self.db[BACKFILL_COLLECTION]
 
             # 🔥 确保索引存在（提升查询和 upsert 性能）
             await self._ensure_indexes()
@@ -62,6 +166,19 @@ class HistoricalDataService:
                 ("trade_date", -1)
             ], name="symbol_date_index", background=True)
 
+            # 5. 分桶集合：按股票+周期+数据源+年份范围查询（_id 即桶键，用于 upsert）
+            if self.bucket_layout_enabled:
+                await self.bucket_collection.create_index([
+                    ("symbol", 1),
+                    ("period", 1),
+                    ("data_source", 1),
+                    ("year", 1)
+                ], name="symbol_period_source_year_index", background=True)
+                await self.backfill_collection.create_index([
+                    ("symbol", 1),
+                    ("period", 1)
+                ], name="symbol_period_index", background=True)
+
             logger.info("✅ 历史数据索引检查完成")
         except Exception as e:
             # 索引创建失败不应该阻止服务启动
@@ -103,86 +220,27 @@ class HistoricalDataService:
 
             # ⏱️ 性能监控：单位转换
             convert_start = datetime.now()
-            # 🔥 在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）
-            if data_source == "tushare":
-                # 成交额：千元 -> 元
-                if 'amount' in data.columns:
-                    data['amount'] = data['amount'] * 1000
-                elif 'turnover' in data.columns:
-                    data['turnover'] = data['turnover'] * 1000
-
-                # 成交量：手 -> 股
-                if 'volume' in data.columns:
-                    data['volume'] = data['volume'] * 100
-                elif 'vol' in data.columns:
-                    data['vol'] = data['vol'] * 100
-
-            # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
-            if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
-                # 使用 shift(1) 将 close 列向下移动一行，得到前一天的收盘价
-                data['pre_close'] = data['close'].shift(1)
-                logger.debug(f"✅ {symbol} 添加 pre_close 字段（从前一天的 close 获取）")
-
+            self._prepare_frame(symbol, data, data_source, market)
             convert_duration = (datetime.now() - convert_start).total_seconds()
 
             # ⏱️ 性能监控：构建操作列表
             prepare_start = datetime.now()
-            # 准备批量操作
-            operations = []
-            saved_count = 0
-            batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
-
-            for date_index, row in data.iterrows():
-                try:
-                    # 标准化数据（传递日期索引）
-                    doc = self._standardize_record(symbol, row, data_source, market, period, date_index)
-
-                    # 创建upsert操作
-                    filter_doc = {
-                        "symbol": doc["symbol"],
-                        "trade_date": doc["trade_date"],
-                        "data_source": doc["data_source"],
-                        "period": doc["period"]
-                    }
-
-                    from pymongo import ReplaceOne
-                    operations.append(ReplaceOne(
-                        filter=filter_doc,
-                        replacement=doc,
-                        upsert=True
-                    ))
-
-                    # 批量执行（每200条）
-                    if len(operations) >= batch_size:
-                        batch_write_start = datetime.now()
-                        batch_saved = await self._execute_bulk_write_with_retry(symbol, operations)
-                        batch_write_duration = (datetime.now() - batch_write_start).total_seconds()
-                        logger.debug(f"   批量写入 {len(operations)} 条，耗时 {batch_write_duration:.2f}秒")
-                        saved_count += batch_saved
-                        operations = []
-
-                except Exception as e:
-                    # 获取日期信息用于错误日志
-                    date_str = str(date_index) if hasattr(date_index, '__str__') else 'unknown'
-                    logger.error(f"❌ 处理记录失败 {symbol} {date_str}: {e}")
-                    continue
-
+            docs = self._standardize_frame(symbol, data, data_source, market, period)
+            operations = self._replace_operations(docs)
             prepare_duration = (datetime.now() - prepare_start).total_seconds()
 
-            # ⏱️ 性能监控：最后一批写入
+            # ⏱️ 性能监控：批量写入
             final_write_start = datetime.now()
-            # 执行剩余操作
-            if operations:
-                saved_count += await self._execute_bulk_write_with_retry(
-                    symbol, operations
-                )
+            batch_size = 200  # 进一步减小批量大小，避免超时（从500改为200）
+            saved_count = sum(await self._write_chunks(symbol, operations, batch_size))
+            await self._save_buckets(symbol, docs)
             final_write_duration = (datetime.now() - final_write_start).total_seconds()
 
             total_duration = (datetime.now() - total_start).total_seconds()
             logger.info(
                 f"✅ {symbol} 历史数据保存完成: {saved_count}条记录，"
                 f"总耗时 {total_duration:.2f}秒 "
-                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.2f}秒, 最后写入: {final_write_duration:.2f}秒)"
+                f"(转换: {convert_duration:.3f}秒, 准备: {prepare_duration:.2f}秒, 写入: {final_write_duration:.2f}秒)"
             )
             return saved_count
             
@@ -190,6 +248,330 @@ class HistoricalDataService:
             logger.error(f"❌ 保存历史数据失败 {symbol}: {e}")
             return 0
 
+    async def save_historical_batch(
+        self,
+        frames: List[Tuple[str, pd.DataFrame]],
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        batch_size: int = 1000
+    ) -> Dict[str, int]:
+        """
+        批量保存多只股票的历史数据（流水线同步的写入阶段使用）
+
+        各股票的数据按 save_historical_data 的规则标准化后合并，
+        每 batch_size 条执行一次 bulk_write，减少数据库往返。
+
+        Args:
+            frames: [(股票代码, 历史数据DataFrame)]
+            data_source: 数据源
+            market: 市场类型
+            period: 数据周期
+            batch_size: 每次 bulk_write 的操作数
+
+        Returns:
+            {股票代码: 保存的记录数}（写入失败的批次中的股票计为0）
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        saved: Dict[str, int] = {}
+        docs: List[Dict[str, Any]] = []
+        owners: List[str] = []  # 每个操作所属的股票
+
+        for symbol, data in frames:
+            saved.setdefault(symbol, 0)
+            if data is None or data.empty:
+                continue
+            self._prepare_frame(symbol, data, data_source, market)
+            symbol_docs = self._standardize_frame(symbol, data, data_source, market, period)
+            docs.extend(symbol_docs)
+            owners.extend([symbol] * len(symbol_docs))
+
+        label = f"{data_source}:{len(frames)}只股票批量"
+        written = await self._write_chunks(label, self._replace_operations(docs), batch_size)
+        for chunk_index, chunk_written in enumerate(written):
+            if not chunk_written:
+                continue  # 写入失败的分块中的股票不计数
+            for symbol in owners[chunk_index * batch_size:(chunk_index + 1) * batch_size]:
+                saved[symbol] += 1
+        await self._save_buckets(label, docs)
+
+        logger.info(f"💾 批量保存 {len(frames)} 只股票历史数据: {sum(saved.values())}条记录 (数据源: {data_source})")
+        return saved
+
+    async def save_cross_section_data(
+        self,
+        data: pd.DataFrame,
+        data_source: str,
+        market: str = "CN",
+        period: str = "daily",
+        batch_size: int = 2000
+    ) -> int:
+        """
+        保存多只股票的历史数据（按交易日横截面同步使用）
+
+        Args:
+            data: 历史数据DataFrame，需包含 code 列（股票代码）和 trade_date 列
+            data_source: 数据源
+            market: 市场类型
+            period: 数据周期
+            batch_size: 每次 bulk_write 的操作数（跨股票合并成大批量）
+
+        Returns:
+            保存的记录数量
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        if data is None or data.empty:
+            return 0
+
+        data = data.copy()
+        self._convert_units(data, data_source)
+
+        docs = self._standardize_frame(
+            data['code'].astype(str).tolist(), data, data_source, market, period
+        )
+        label = f"{data_source}:{len(data)}条横截面"
+        saved_count = sum(await self._write_chunks(label, self._replace_operations(docs), batch_size))
+        await self._save_buckets(label, docs)
+        return saved_count
+
+    def _prepare_frame(self, symbol: str, data: pd.DataFrame, data_source: str, market: str) -> None:
+        """保存前的 DataFrame 预处理：单位转换、港股/美股补 pre_close"""
+        self._convert_units(data, data_source)
+
+        # 🔥 港股/美股数据：添加 pre_close 字段（从前一天的 close 获取）
+        if market in ["HK", "US"] and 'pre_close' not in data.columns and 'close' in data.columns:
+            # 使用 shift(1) 将 close 列向下移动一行，得到前一天的收盘价
+            data['pre_close'] = data['close'].shift(1)
+            logger.debug(f"✅ {symbol} 添加 pre_close 字段（从前一天的 close 获取）")
+
+    def _build_operations(
+        self,
+        symbol: Union[str, List[str]],
+        data: pd.DataFrame,
+        data_source: str,
+        market: str,
+        period: str
+    ) -> List:
+        """把历史数据转换为 upsert 操作列表（symbol 可为逐行的股票代码列表）"""
+        return self._replace_operations(self._standardize_frame(symbol, data, data_source, market, period))
+
+    @staticmethod
+    def _replace_operations(docs: List[Dict[str, Any]]) -> List:
+        """标准化后的文档 -> 按 股票+日期+数据源+周期 upsert 的操作列表"""
+        from pymongo import ReplaceOne
+
+        return [
+            ReplaceOne(
+                filter={
+                    "symbol": doc["symbol"],
+                    "trade_date": doc["trade_date"],
+                    "data_source": doc["data_source"],
+                    "period": doc["period"]
+                },
+                replacement=doc,
+                upsert=True
+            )
+            for doc in docs
+        ]
+
+    def _standardize_frame(
+        self,
+        symbol: Union[str, List[str]],
+        data: pd.DataFrame,
+        data_source: str,
+        market: str,
+        period: str = "daily"
+    ) -> List[Dict[str, Any]]:
+        """
+        向量化标准化：按列完成日期格式化、字段回退和数值转换，再一次性生成文档
+
+        结果与逐行调用 _standardize_record 一致（created_at/updated_at 整批共用同一时间）。
+        """
+        n = len(data)
+        if n == 0:
+            return []
+
+        symbols = [symbol] * n if isinstance(symbol, str) else list(symbol)
+        full_symbols = {code: self._get_full_symbol(code, market) for code in set(symbols)}
+
+        # 日期：优先列（date 或 trade_date），其次日期类型的索引，否则当前日期
+        trade_dates: List[Optional[str]] = [None] * n
+        skip = np.zeros(n, dtype=bool)
+        date_values = _coalesce(data, 'date', 'trade_date')
+        missing = np.ones(n, dtype=bool)
+        if date_values is not None:
+            values, none_mask = date_values
+            missing = none_mask
+            if values.dtype.kind == "M":
+                formatted = pd.DatetimeIndex(values).strftime('%Y-%m-%d')
+                skip |= pd.isna(values) & ~none_mask  # NaT 无法格式化，逐行实现中同样会跳过
+                trade_dates = [None if s else d for d, s in zip(formatted.tolist(), skip)]
+            else:
+                for i in np.flatnonzero(~none_mask):
+                    try:
+                        trade_dates[i] = self._format_date(values[i])
+                    except Exception as e:
+                        logger.error(f"❌ 处理记录失败 {symbols[i]} {data.index[i]}: {e}")
+                        skip[i] = True
+        if missing.any():
+            index = data.index
+            if isinstance(index, pd.DatetimeIndex):
+                index_dates = index.strftime('%Y-%m-%d').tolist()
+                is_date = ~index.isna()
+            else:
+                index_dates = [
+                    self._format_date(v) if isinstance(v, (date, datetime, pd.Timestamp)) else None
+                    for v in index
+                ]
+                is_date = np.array([d is not None for d in index_dates], dtype=bool)
+            today = self._format_date(None)
+            for i in np.flatnonzero(missing):
+                trade_dates[i] = index_dates[i] if is_date[i] else today
+
+        def float_column(name: str, fallback: Optional[str] = None) -> List[Optional[float]]:
+            column = _coalesce(data, name, fallback)
+            if column is None:
+                return [None] * n
+            return _float_list(column[0], column[1], self._safe_float)
+
+        opens = float_column('open')
+        highs = float_column('high')
+        lows = float_column('low')
+        closes = float_column('close')
+        pre_closes = float_column('pre_close', 'preclose')
+        volumes = float_column('volume', 'vol')
+        amounts = float_column('amount', 'turnover')
+        changes = float_column('change')
+        pct_chgs = float_column('pct_chg', 'change_percent')
+
+        optional = []
+        for key, (name, fallback) in _OPTIONAL_FIELDS.items():
+            column = _coalesce(data, name, fallback)
+            if column is not None:
+                values, none_mask = column
+                # 值为 None 时不写入该字段；NaN 等无法转换的值写入 None
+                optional.append((key, _float_list(values, none_mask, self._safe_float), (~none_mask).tolist()))
+
+        now = datetime.utcnow()
+        docs = []
+        for i in range(n):
+            if skip[i]:
+                continue
+            code = symbols[i]
+            close = closes[i]
+            pre_close = pre_closes[i]
+            doc = {
+                "symbol": code,
+                "code": code,  # 添加 code 字段，与 symbol 保持一致（向后兼容）
+                "full_symbol": full_symbols[code],
+                "market": market,
+                "trade_date": trade_dates[i],
+                "period": period,
+                "data_source": data_source,
+                "created_at": now,
+                "updated_at": now,
+                "version": 1,
+                "open": opens[i],
+                "high": highs[i],
+                "low": lows[i],
+                "close": close,
+                "pre_close": pre_close,
+                "volume": volumes[i],
+                "amount": amounts[i],
+            }
+            # 计算涨跌数据
+            if close and pre_close:
+                change = round(close - pre_close, 4)
+                doc["change"] = change
+                doc["pct_chg"] = round((change / pre_close) * 100, 4)
+            else:
+                doc["change"] = changes[i]
+                doc["pct_chg"] = pct_chgs[i]
+            for key, values, present in optional:
+                if present[i]:
+                    doc[key] = values[i]
+            docs.append(doc)
+        return docs
+
+    async def _write_chunks(self, label: str, operations: List, batch_size: int) -> List[int]:
+        """按 batch_size 分块执行 bulk_write（bulk_write_concurrency > 1 时并行），返回各分块写入数"""
+        chunks = [operations[i:i + batch_size] for i in range(0, len(operations), batch_size)]
+        if self.bulk_write_concurrency <= 1 or len(chunks) <= 1:
+            return [await self._execute_bulk_write_with_retry(label, chunk) for chunk in chunks]
+
+        semaphore = asyncio.Semaphore(self.bulk_write_concurrency)
+
+        async def write(chunk):
+            async with semaphore:
+                return await self._execute_bulk_write_with_retry(label, chunk)
+
+        return list(await asyncio.gather(*[write(chunk) for chunk in chunks]))
+
+    async def _save_buckets(self, label: str, docs: List[Dict[str, Any]]) -> int:
+        """
+        把刚写入的K线合并进分桶集合（仅启用分桶布局时）
+
+        一次 $in 查询取出涉及的桶，合并后整桶替换；失败只记录警告并删除回填标记
+        （读取退回逐条布局），逐条布局已写入成功，可通过 rebuild_buckets 重建。
+
+        Returns:
+            写入的桶数量
+        """
+        if not self.bucket_layout_enabled or not docs:
+            return 0
+        return await self._merge_buckets(label, docs)
+
+    async def _merge_buckets(self, label: str, docs: List[Dict[str, Any]]) -> int:
+        """读取涉及的桶、合并新K线后整桶替换，返回写入的桶数量"""
+        try:
+            return await self._write_buckets(label, docs)
+        except Exception as e:
+            logger.warning(f"⚠️ {label} 更新K线分桶失败（逐条数据已保存）: {e}")
+            # 分桶已不完整：删除回填标记，读取退回逐条布局，直到重新回填
+            if self.backfill_collection is not None:
+                try:
+                    await self.backfill_collection.delete_many({"_id": {"$in": backfill_keys(docs)}})
+                except Exception as clear_error:
+                    logger.warning(f"⚠️ {label} 删除分桶回填标记失败: {clear_error}")
+            return 0
+
+    async def _write_buckets(self, label: str, docs: List[Dict[str, Any]]) -> int:
+        from pymongo import ReplaceOne
+
+        keys = sorted({
+            bucket_key(d["symbol"], d["data_source"], d["period"], d["trade_date"][:4]) for d in docs
+        })
+        existing = {
+            bucket["_id"]: bucket
+            async for bucket in self.bucket_collection.find({"_id": {"$in": keys}})
+        }
+        buckets = build_buckets(docs, existing)
+        operations = [ReplaceOne({"_id": b["_id"]}, b, upsert=True) for b in buckets]
+        for i in range(0, len(operations), 500):
+            await self.bucket_collection.bulk_write(operations[i:i + 500], ordered=False)
+        logger.debug(f"📦 {label} 更新 {len(buckets)} 个K线分桶")
+        return len(buckets)
+
+    @staticmethod
+    def _convert_units(data: pd.DataFrame, data_source: str) -> None:
+        """在 DataFrame 层面做单位转换（向量化操作，比逐行快得多）"""
+        if data_source == "tushare":
+            # 成交额：千元 -> 元
+            if 'amount' in data.columns:
+                data['amount'] = data['amount'] * 1000
+            elif 'turnover' in data.columns:
+                data['turnover'] = data['turnover'] * 1000
+
+            # 成交量：手 -> 股
+            if 'volume' in data.columns:
+                data['volume'] = data['volume'] * 100
+            elif 'vol' in data.columns:
+                data['vol'] = data['vol'] * 100
+
     async def _execute_bulk_write_with_retry(
         self,
         symbol: str,
@@ -254,7 +636,7 @@ class HistoricalDataService:
         period: str = "daily",
         date_index = None
     ) -> Dict[str, Any]:
-        """标准化单条记录"""
+        """标准化单条记录（逐行版本；批量保存走向量化的 _standardize_frame）"""
         now = datetime.utcnow()
 
         # 获取日期 - 优先从列中获取，如果索引是日期类型才使用索引
@@ -398,22 +780,8 @@ class HistoricalDataService:
         
         try:
             # 构建查询条件
-            query = {"symbol": symbol}
-            
-            if start_date or end_date:
-                date_filter = {}
-                if start_date:
-                    date_filter["$gte"] = start_date
-                if end_date:
-                    date_filter["$lte"] = end_date
-                query["trade_date"] = date_filter
-            
-            if data_source:
-                query["data_source"] = data_source
+            query = self._row_query(symbol, start_date, end_date, data_source, period)
 
-            if period:
-                query["period"] = period
-            
             # 执行查询
             cursor = self.collection.find(query).sort("trade_date", -1)
             
@@ -429,6 +797,233 @@ class HistoricalDataService:
             logger.error(f"❌ 查询历史数据失败 {symbol}: {e}")
             return []
     
+    async def get_historical_frame(
+        self,
+        symbol: str,
+        start_date: str = None,
+        end_date: str = None,
+        data_source: str = None,
+        period: str = "daily",
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        按列读取历史K线，返回按日期升序的 DataFrame
+
+        启用分桶布局且所选数据源已完成回填时每年只解码一个文档；否则退回逐条布局
+        （只投影需要的列）。未指定数据源时按 tushare > akshare > baostock 选择一个。
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            data_source: 数据源
+            period: 数据周期
+            columns: 需要的数值列（默认全部）
+
+        Returns:
+            DataFrame（trade_date 为 YYYY-MM-DD 字符串），无数据时为空
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        try:
+            buckets = await self._find_buckets(symbol, start_date, end_date, data_source, period)
+            if buckets:
+                return buckets_to_frame(buckets, start_date, end_date, columns)
+
+            query = self._row_query(symbol, start_date, end_date, data_source, period)
+            projection = {"_id": 0}
+            if columns:
+                projection = {"_id": 0, "trade_date": 1, "data_source": 1, **{col: 1 for col in columns}}
+            rows = await self.collection.find(query, projection).sort("trade_date", 1).to_list(length=None)
+            if not rows:
+                return pd.DataFrame()
+            frame = pd.DataFrame(rows)
+            if data_source is None and frame["data_source"].nunique() > 1:
+                source = pick_source([{"data_source": s} for s in frame["data_source"].unique()])
+                frame = frame[frame["data_source"] == source].reset_index(drop=True)
+            return frame
+
+        except Exception as e:
+            logger.error(f"❌ 按列查询历史数据失败 {symbol}: {e}")
+            return pd.DataFrame()
+
+    async def get_historical_columns(
+        self,
+        symbol: str,
+        start_date: str = None,
+        end_date: str = None,
+        data_source: str = None,
+        period: str = "daily",
+        columns: Optional[List[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        按列读取历史K线，返回 {"trade_date": datetime64[D] 数组, 列名: float64 数组}
+
+        适合指标计算等只需要数组的场景；分桶命中时不构造逐行对象。
+        """
+        if self.collection is None:
+            await self.initialize()
+
+        buckets = await self._find_buckets(symbol, start_date, end_date, data_source, period)
+        if buckets:
+            return buckets_to_columns(buckets, start_date, end_date, columns)
+
+        frame = await self.get_historical_frame(symbol, start_date, end_date, data_source, period, columns)
+        wanted = list(columns) if columns else [c for c in frame.columns if c in _BUCKET_VALUE_COLUMNS]
+        if frame.empty:
+            return {"trade_date": np.array([], dtype="datetime64[D]"),
+                    **{col: np.array([], dtype=np.float64) for col in wanted}}
+        result = {"trade_date": pd.to_datetime(frame["trade_date"]).values.astype("datetime64[D]")}
+        for col in wanted:
+            values = frame[col] if col in frame.columns else pd.Series(np.nan, index=frame.index)
+            result[col] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+        return result
+
+    async def _find_buckets(
+        self,
+        symbol: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        data_source: Optional[str],
+        period: str
+    ) -> List[Dict[str, Any]]:
+        """
+        查询覆盖日期范围的分桶，多个数据源时按优先级只保留一个
+
+        未启用分桶布局、或所选数据源的分桶尚未由 rebuild_buckets 完整回填时返回空列表
+        （双写只包含启用后同步的K线，直接使用会丢失更早的历史）。
+        """
+        if not self.bucket_layout_enabled or self.bucket_collection is None or self.backfill_collection is None:
+            return []
+        try:
+            query = bucket_query(symbol, period, data_source, start_date, end_date)
+            buckets = await self.bucket_collection.find(query).to_list(length=None)
+            if not buckets:
+                return []
+            markers = await self.backfill_collection.find(
+                {"symbol": symbol, "period": period}, {"_id": 1}
+            ).to_list(length=None)
+        except Exception as e:
+            logger.warning(f"⚠️ 查询K线分桶失败 {symbol}，改用逐条数据: {e}")
+            return []
+        return select_buckets(buckets, [m["_id"] for m in markers])
+
+    @staticmethod
+    def _row_query(
+        symbol: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        data_source: Optional[str],
+        period: Optional[str]
+    ) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"symbol": symbol}
+        if start_date or end_date:
+            date_filter = {}
+            if start_date:
+                date_filter["$gte"] = start_date
+            if end_date:
+                date_filter["$lte"] = end_date
+            query["trade_date"] = date_filter
+        if data_source:
+            query["data_source"] = data_source
+        if period:
+            query["period"] = period
+        return query
+
+    async def rebuild_buckets(
+        self,
+        symbols: Optional[List[str]] = None,
+        data_source: Optional[str] = None,
+        period: Optional[str] = None,
+        symbols_per_batch: int = 50
+    ) -> Dict[str, int]:
+        """
+        从逐条布局重建分桶（启用分桶布局前回填已有数据，或分桶写入失败后修复）
+
+        每批重建成功后为涉及的 (股票, 数据源, 周期) 写入回填标记，读取方此后才使用分桶。
+
+        Args:
+            symbols: 需要重建的股票（默认全部）
+            data_source: 只重建指定数据源
+            period: 只重建指定周期
+            symbols_per_batch: 每批读取的股票数
+
+        Returns:
+            {"symbols": 处理的股票数, "rows": 读取的K线数, "buckets": 写入的桶数}
+        """
+        if self.collection is None:
+            await self.initialize()
+        if self.bucket_collection is None:
+            self.bucket_collection = self.db[BUCKET_COLLECTION]
+        if self.backfill_collection is None:
+            self.backfill_collection = self.db[BACKFILL_COLLECTION]
+        if not self.bucket_layout_enabled:
+            logger.warning("⚠️ 未启用 HISTORICAL_BUCKET_LAYOUT_ENABLED：之后的同步不会写入分桶，"
+                           "启用后请重新回填，否则分桶会缺少这段时间的K线")
+
+        base_query: Dict[str, Any] = {}
+        if data_source:
+            base_query["data_source"] = data_source
+        if period:
+            base_query["period"] = period
+        if symbols is None:
+            symbols = sorted(await self.collection.distinct("symbol", base_query))
+
+        stats = {"symbols": 0, "rows": 0, "buckets": 0}
+        for i in range(0, len(symbols), symbols_per_batch):
+            batch = list(symbols[i:i + symbols_per_batch])
+            query = {**base_query, "symbol": {"$in": batch}}
+            docs = await self.collection.find(query, {"_id": 0}).to_list(length=None)
+            # 重建以逐条数据为准：先删除回填标记和旧桶，不做合并
+            await self.backfill_collection.delete_many(query)
+            await self.bucket_collection.delete_many(query)
+            try:
+                stats["buckets"] += await self._write_buckets(f"重建分桶 {batch[0]}..", docs)
+                await self._mark_backfilled(docs)
+            except Exception as e:
+                logger.warning(f"⚠️ 重建分桶失败 {batch[0]}..: {e}")
+            stats["symbols"] += len(batch)
+            stats["rows"] += len(docs)
+            logger.info(f"📦 分桶重建进度: {stats['symbols']}/{len(symbols)} 只股票, {stats['buckets']} 个桶")
+        return stats
+
+    async def _mark_backfilled(self, docs: List[Dict[str, Any]]):
+        """为已从逐条布局完整回填的 (股票, 数据源, 周期) 写入标记"""
+        from pymongo import ReplaceOne
+
+        now = datetime.utcnow()
+        markers = {}
+        for d in docs:
+            key = backfill_key(d["symbol"], d["data_source"], d["period"])
+            markers.setdefault(key, {
+                "_id": key, "symbol": d["symbol"], "data_source": d["data_source"], "period": d["period"],
+                "backfilled_at": now,
+            })
+        operations = [ReplaceOne({"_id": key}, marker, upsert=True) for key, marker in markers.items()]
+        if operations:
+            await self.backfill_collection.bulk_write(operations, ordered=False)
+
+    async def get_layout_statistics(self) -> Dict[str, Any]:
+        """逐条布局与分桶布局的存储对比（collStats：文档数、数据大小、存储大小、索引大小）"""
+        if self.collection is None:
+            await self.initialize()
+
+        result = {}
+        for name in (self.collection.name, BUCKET_COLLECTION):
+            try:
+                stats = await self.db.command("collStats", name)
+                result[name] = {
+                    "count": stats.get("count", 0),
+                    "size": stats.get("size", 0),
+                    "storage_size": stats.get("storageSize", 0),
+                    "total_index_size": stats.get("totalIndexSize", 0),
+                    "nindexes": stats.get("nindexes", 0),
+                }
+            except Exception as e:
+                logger.warning(f"⚠️ 获取集合统计失败 {name}: {e}")
+        return result
+
     async def get_latest_date(self, symbol: str, data_source: str) -> Optional[str]:
         """获取最新数据日期"""
         if self.collection is None:
@@ -448,6 +1043,31 @@ class HistoricalDataService:
             logger.error(f"❌ 获取最新日期失败 {symbol}: {e}")
             return None
     
+    async def get_latest_dates(
+        self,
+        data_source: str,
+        period: str = "daily",
+        symbols: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """一次聚合查询获取每只股票的最新数据日期（symbol -> YYYY-MM-DD）"""
+        if self.collection is None:
+            await self.initialize()
+
+        match: Dict[str, Any] = {"data_source": data_source, "period": period}
+        if symbols is not None:
+            match["symbol"] = {"$in": list(symbols)}
+
+        try:
+            cursor = self.collection.aggregate([
+                {"$match": match},
+                {"$group": {"_id": "$symbol", "latest": {"$max": "$trade_date"}}}
+            ], allowDiskUse=True)
+            return {doc["_id"]: doc["latest"] async for doc in cursor if doc.get("latest")}
+
+        except Exception as e:
+            logger.error(f"❌ 批量获取最新日期失败: {e}")
+            return {}
+
     async def get_data_statistics(self) -> Dict[str, Any]:
         """获取数据统计信息"""
         if self.collection is None:
@@ -147,7 +147,8 @@ class NewsDataService:
         self,
         news_data: Union[Dict[str, Any], List[Dict[str, Any]]],
         data_source: str,
-        market: str = "CN"
+        market: str = "CN",
+        failed_indexes: Optional[List[int]] = None
     ) -> int:
         """
         保存新闻数据
@@ -156,6 +157,7 @@ class NewsDataService:
             news_data: 新闻数据（单条或多条）
             data_source: 数据源标识
             market: 市场标识
+            failed_indexes: 传入列表时，追加保存失败的新闻在输入中的位置
 
         Returns:
             保存的记录数量
@@ -222,6 +224,10 @@ class NewsDataService:
                 error_code = error.get('code', 'N/A')
                 self.logger.warning(f"   错误 {i}: [Code {error_code}] {error_msg}")
 
+            if failed_indexes is not None and write_errors:
+                # 有序批量写入在第一个错误处停止，之后的操作都未执行
+                failed_indexes.extend(range(min(error.get('index', 0) for error in write_errors), len(operations)))
+
             # 计算成功保存的数量
             success_count = len(operations) - error_count
             if success_count > 0:
@@ -231,6 +237,8 @@ class NewsDataService:
             
         except Exception as e:
             self.logger.error(f"❌ 保存新闻数据失败: {e}")
+            if failed_indexes is not None:
+                failed_indexes.extend(range(len(news_data) if isinstance(news_data, list) else 1))
             return 0
     
     def _standardize_news_data(
@@ -14,6 +14,8 @@ from .keys import (
     USER_PROCESSING_PREFIX,
     GLOBAL_CONCURRENT_KEY,
     VISIBILITY_TIMEOUT_PREFIX,
+    VISIBILITY_DEADLINES,
+    INFLIGHT_PREFIX,
     DEFAULT_USER_CONCURRENT_LIMIT,
     GLOBAL_CONCURRENT_LIMIT,
     VISIBILITY_TIMEOUT_SECONDS,
@@ -26,5 +28,7 @@ from .helpers import (
     unmark_task_processing,
     set_visibility_timeout,
     clear_visibility_timeout,
+    extend_visibility_timeout,
+    claim_task,
 )
 
@@ -3,7 +3,7 @@
 """
 from __future__ import annotations
 import time
-from typing import Dict
+from typing import Any, Dict, Iterable, Optional, Tuple
 from redis.asyncio import Redis
 
 from .keys import (
@@ -12,6 +12,7 @@ from .keys import (
     SET_PROCESSING,
     USER_PROCESSING_PREFIX,
     VISIBILITY_TIMEOUT_PREFIX,
+    VISIBILITY_DEADLINES,
 )
 
 
@@ -43,19 +44,86 @@ async def unmark_task_processing(r: Redis, task_id: str, user_id: str) -> None:
 
 
 async def set_visibility_timeout(r: Redis, task_id: str, worker_id: str, visibility_timeout: int) -> None:
-    """设置可见性超时"""
-    timeout_key = VISIBILITY_TIMEOUT_PREFIX + task_id
-    timeout_data: Dict[str, str] = {
-        "task_id": task_id,
-        "worker_id": worker_id,
-        "timeout_at": str(int(time.time()) + visibility_timeout),
-    }
-    await r.hset(timeout_key, mapping=timeout_data)
-    await r.expire(timeout_key, visibility_timeout)
+    """设置可见性超时（记录到超时有序集合，由清理循环按分数扫描）"""
+    await r.zadd(VISIBILITY_DEADLINES, {task_id: int(time.time()) + visibility_timeout})
+
+
+async def extend_visibility_timeout(r: Redis, task_ids: Iterable[str], visibility_timeout: int) -> None:
+    """延长仍在执行的任务的可见性超时（只更新已存在的成员）"""
+    deadline = int(time.time()) + visibility_timeout
+    mapping = {task_id: deadline for task_id in task_ids}
+    if mapping:
+        await r.zadd(VISIBILITY_DEADLINES, mapping, xx=True)
 
 
 async def clear_visibility_timeout(r: Redis, task_id: str) -> None:
     """清除可见性超时"""
-    timeout_key = VISIBILITY_TIMEOUT_PREFIX + task_id
-    await r.delete(timeout_key)
+    await r.zrem(VISIBILITY_DEADLINES, task_id)
+    await r.delete(VISIBILITY_TIMEOUT_PREFIX + task_id)
+
+
+# 认领脚本：把阻塞出队移入 Worker 在途列表的任务原子地转为“处理中”。
+# 并发检查、处理中标记、可见性超时登记和读取任务详情在一次调用内完成。
+# KEYS: 在途列表, 就绪队列, 处理中集合, 超时有序集合
+# ARGV: task_id, worker_id, now, visibility_timeout, user_limit, global_limit,
+#       TASK_PREFIX, USER_PROCESSING_PREFIX
+_CLAIM_SCRIPT = """
+local task_id = ARGV[1]
+local task_key = ARGV[7] .. task_id
+if redis.call('LREM', KEYS[1], 1, task_id) == 0 then
+  -- 已被清理循环放回就绪队列
+  return {'skipped'}
+end
+
+local status = redis.call('HGET', task_key, 'status')
+if not status then
+  return {'missing'}
+end
+if status ~= 'queued' then
+  return {'skipped'}
+end
+
+if redis.call('SCARD', KEYS[3]) >= tonumber(ARGV[6]) then
+  redis.call('RPUSH', KEYS[2], task_id)
+  return {'global_limit'}
+end
+
+local user_key = ARGV[8] .. (redis.call('HGET', task_key, 'user') or '')
+if redis.call('SCARD', user_key) >= tonumber(ARGV[5]) then
+  redis.call('LPUSH', KEYS[2], task_id)
+  return {'user_limit'}
+end
+
+redis.call('SADD', user_key, task_id)
+redis.call('SADD', KEYS[3], task_id)
+redis.call('ZADD', KEYS[4], tonumber(ARGV[3]) + tonumber(ARGV[4]), task_id)
+redis.call('HSET', task_key, 'status', 'processing', 'worker_id', ARGV[2], 'started_at', ARGV[3])
+return {'claimed', redis.call('HGETALL', task_key)}
+"""
+
+
+async def claim_task(
+    r: Redis,
+    task_id: str,
+    inflight_key: str,
+    worker_id: str,
+    visibility_timeout: int,
+    user_limit: int,
+    global_limit: int,
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """认领在途任务，返回 (结果, 任务哈希)
 
+    结果为 claimed / user_limit / global_limit（任务已放回就绪队列）/
+    missing / skipped（任务已删除或不再是 queued 状态，直接丢弃）。
+    """
+    script = r.register_script(_CLAIM_SCRIPT)
+    reply = await script(
+        keys=[inflight_key, READY_LIST, SET_PROCESSING, VISIBILITY_DEADLINES],
+        args=[task_id, worker_id, int(time.time()), visibility_timeout, user_limit, global_limit,
+              TASK_PREFIX, USER_PROCESSING_PREFIX],
+    )
+    outcome = reply[0]
+    if outcome != "claimed":
+        return outcome, None
+    flat = reply[1]
+    return outcome, dict(zip(flat[::2], flat[1::2]))
@@ -15,7 +15,9 @@ BATCH_TASKS_PREFIX = "qa:batch_tasks:"
 # 并发控制相关
 USER_PROCESSING_PREFIX = "qa:user_processing:"
 GLOBAL_CONCURRENT_KEY = "qa:global_concurrent"
-VISIBILITY_TIMEOUT_PREFIX = "qa:visibility:"
+VISIBILITY_TIMEOUT_PREFIX = "qa:visibility:"  # 旧版按任务的超时哈希（仅兼容清理）
+VISIBILITY_DEADLINES = "qa:visibility_deadlines"  # ZSET: task_id -> 超时时间戳
+INFLIGHT_PREFIX = "qa:inflight:"  # 每个Worker的在途列表（阻塞出队后、认领前）
 
 # 配置常量 - 性能优化后的并发限制
 DEFAULT_USER_CONCURRENT_LIMIT = 10  # 每用户最多10个并发任务
@@ -12,8 +12,10 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError
 
 from app.core.database import get_redis_client
+from app.core.redis_client import RedisKeys
 
 from app.services.queue import (
     READY_LIST,
@@ -25,7 +27,8 @@ from app.services.queue import (
     BATCH_TASKS_PREFIX,
     USER_PROCESSING_PREFIX,
     GLOBAL_CONCURRENT_KEY,
-    VISIBILITY_TIMEOUT_PREFIX,
+    VISIBILITY_DEADLINES,
+    INFLIGHT_PREFIX,
     DEFAULT_USER_CONCURRENT_LIMIT,
     GLOBAL_CONCURRENT_LIMIT,
     VISIBILITY_TIMEOUT_SECONDS,
@@ -35,6 +38,8 @@ from app.services.queue import (
     unmark_task_processing,
     set_visibility_timeout,
     clear_visibility_timeout,
+    extend_visibility_timeout,
+    claim_task,
 )
 
 logger = logging.getLogger(__name__)
@@ -50,6 +55,8 @@ class QueueService:
         self.user_concurrent_limit = DEFAULT_USER_CONCURRENT_LIMIT
         self.global_concurrent_limit = GLOBAL_CONCURRENT_LIMIT
         self.visibility_timeout = VISIBILITY_TIMEOUT_SECONDS
+        # Redis < 6.2 不支持 BLMOVE/LMOVE，首次失败后改用 BRPOPLPUSH/RPOPLPUSH
+        self._lmove_supported = True
 
     async def enqueue_task(
         self,
@@ -97,49 +104,55 @@ class QueueService:
         logger.info(f"任务已入队: {task_id}")
         return task_id
 
-    async def dequeue_task(self, worker_id: str) -> Optional[Dict[str, Any]]:
-        """从FIFO队列中取出任务"""
+    async def dequeue_task(self, worker_id: str, block_timeout: float = 0) -> Optional[Dict[str, Any]]:
+        """从FIFO队列中取出任务
+
+        任务先原子地移入该 Worker 的在途列表（block_timeout > 0 时阻塞等待新任务），
+        再由 Lua 脚本一次性完成并发检查、处理中标记、可见性超时登记并返回任务详情。
+        Worker 在两步之间崩溃时，任务留在在途列表中，由清理循环放回队列。
+        """
         try:
-            # 从FIFO队列获取任务
-            task_id = await self.r.rpop(READY_LIST)
+            inflight_key = INFLIGHT_PREFIX + worker_id
+            task_id = await self._move_to_inflight(inflight_key, block_timeout)
             if not task_id:
                 return None
 
-            # 获取任务详情
-            task_data = await self.get_task(task_id)
-            if not task_data:
-                logger.warning(f"任务数据不存在: {task_id}")
-                return None
-
-            user_id = task_data.get("user")
+            outcome, task_data = await claim_task(
+                self.r, task_id, inflight_key, worker_id, self.visibility_timeout,
+                self.user_concurrent_limit, self.global_concurrent_limit,
+            )
 
-            # 再次检查并发限制（防止竞态条件）
-            if not await self._check_user_concurrent_limit(user_id):
-                # 如果超过限制，将任务放回队列
-                await self.r.lpush(READY_LIST, task_id)
-                logger.warning(f"用户 {user_id} 并发限制，任务重新入队: {task_id}")
+            if outcome == "user_limit":
+                logger.warning(f"用户并发限制，任务重新入队: {task_id}")
+                return None
+            if outcome == "global_limit":
+                logger.debug(f"全局并发已满，任务放回队列: {task_id}")
+                return None
+            if outcome != "claimed":
+                logger.warning(f"任务数据不存在或已不在排队状态: {task_id} ({outcome})")
                 return None
-
-            # 标记任务为处理中
-            await self._mark_task_processing(task_id, user_id, worker_id)
-
-            # 设置可见性超时
-            await self._set_visibility_timeout(task_id, worker_id)
-
-            # 更新任务状态
-            await self.r.hset(TASK_PREFIX + task_id, mapping={
-                "status": "processing",
-                "worker_id": worker_id,
-                "started_at": str(int(time.time()))
-            })
 
             logger.info(f"任务已出队: {task_id} -> Worker: {worker_id}")
-            return task_data
+            return self._parse_task(task_data)
 
         except Exception as e:
             logger.error(f"出队失败: {e}")
             return None
 
+    async def _move_to_inflight(self, inflight_key: str, block_timeout: float) -> Optional[str]:
+        """把最早的就绪任务移入在途列表"""
+        if self._lmove_supported:
+            try:
+                if block_timeout > 0:
+                    return await self.r.blmove(READY_LIST, inflight_key, block_timeout, "RIGHT", "LEFT")
+                return await self.r.lmove(READY_LIST, inflight_key, "RIGHT", "LEFT")
+            except ResponseError:
+                logger.info("Redis 不支持 LMOVE/BLMOVE，改用 RPOPLPUSH/BRPOPLPUSH")
+                self._lmove_supported = False
+        if block_timeout > 0:
+            return await self.r.brpoplpush(READY_LIST, inflight_key, max(1, int(block_timeout)))
+        return await self.r.rpoplpush(READY_LIST, inflight_key)
+
     async def ack_task(self, task_id: str, success: bool = True) -> bool:
         """确认任务完成"""
         try:
@@ -196,6 +209,10 @@ class QueueService:
         data = await self.r.hgetall(key)
         if not data:
             return None
+        return self._parse_task(data)
+
+    @staticmethod
+    def _parse_task(data: Dict[str, Any]) -> Dict[str, Any]:
         # parse fields
         if "params" in data:
             try:
@@ -259,6 +276,10 @@ class QueueService:
         """清除可见性超时"""
         await clear_visibility_timeout(self.r, task_id)
 
+    async def extend_visibility_timeout(self, task_ids: List[str]):
+        """延长执行中任务的可见性超时（Worker 心跳时调用，避免长任务被重复投递）"""
+        await extend_visibility_timeout(self.r, task_ids, self.visibility_timeout)
+
     async def get_user_queue_status(self, user_id: str) -> Dict[str, int]:
         """获取用户队列状态"""
         user_processing_key = USER_PROCESSING_PREFIX + user_id
@@ -271,22 +292,10 @@ class QueueService:
         }
 
     async def cleanup_expired_tasks(self):
-        """清理过期任务（可见性超时）"""
+        """清理过期任务（可见性超时）和已下线 Worker 的在途任务"""
         try:
-            # 获取所有可见性超时键
-            timeout_keys = await self.r.keys(VISIBILITY_TIMEOUT_PREFIX + "*")
-
             current_time = int(time.time())
-            expired_tasks = []
-
-            for timeout_key in timeout_keys:
-                timeout_data = await self.r.hgetall(timeout_key)
-                if timeout_data:
-                    timeout_at = int(timeout_data.get("timeout_at", 0))
-                    if current_time > timeout_at:
-                        task_id = timeout_data.get("task_id")
-                        if task_id:
-                            expired_tasks.append(task_id)
+            expired_tasks = await self.r.zrangebyscore(VISIBILITY_DEADLINES, "-inf", current_time)
 
             # 处理过期任务
             for task_id in expired_tasks:
@@ -295,12 +304,30 @@ class QueueService:
             if expired_tasks:
                 logger.warning(f"处理了 {len(expired_tasks)} 个过期任务")
 
+            await self._recover_orphaned_inflight()
+
         except Exception as e:
             logger.error(f"清理过期任务失败: {e}")
 
+    async def _recover_orphaned_inflight(self):
+        """把心跳已消失的 Worker 在途列表中的任务放回就绪队列"""
+        async for inflight_key in self.r.scan_iter(match=INFLIGHT_PREFIX + "*"):
+            worker_id = inflight_key[len(INFLIGHT_PREFIX):]
+            if await self.r.exists(RedisKeys.WORKER_HEARTBEAT.format(worker_id=worker_id)):
+                continue
+            recovered = 0
+            while await self.r.rpoplpush(inflight_key, READY_LIST):
+                recovered += 1
+            if recovered:
+                logger.warning(f"Worker {worker_id} 已下线，{recovered} 个在途任务重新入队")
+
     async def _handle_expired_task(self, task_id: str):
         """处理过期任务"""
         try:
+            # 从超时集合中移除成功的一方负责重新入队，避免多个 Worker 重复处理
+            if not await self.r.zrem(VISIBILITY_DEADLINES, task_id):
+                return
+
             task_data = await self.get_task(task_id)
             if not task_data:
                 return
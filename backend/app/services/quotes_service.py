@@ -2,6 +2,8 @@
 QuotesService: 提供A股批量实时快照获取（AKShare东方财富 spot 接口），带内存TTL缓存。
 - 不使用通达信（TDX）作为兜底数据源。
 - 仅用于筛选返回前对 items 进行行情富集。
+- 全市场快照按列存储（numpy 数组 + 代码→行号索引），批量查询只访问请求的代码。
+- 快照过期后先返回旧快照，同时在后台刷新（stale-while-revalidate）。
 """
 from __future__ import annotations
 
@@ -10,6 +12,9 @@ import time
 import logging
 from typing import Dict, List, Optional
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,31 +36,121 @@ def _safe_float(v) -> Optional[float]:
         return None
 
 
+def _to_float_array(col: pd.Series) -> np.ndarray:
+    """向量化版 _safe_float：无法解析的值为 NaN"""
+    if pd.api.types.is_numeric_dtype(col):
+        return col.to_numpy(dtype=float, na_value=np.nan)
+    s = col.astype(str).str.strip().str.replace(",", "", regex=False)
+    s = s.where(~s.str.endswith("%"), s.str[:-1])
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def _normalize_codes(col: pd.Series) -> pd.Series:
+    """标准化股票代码：纯数字代码移除前导0后补齐到6位，其余直接补齐到6位"""
+    s = col.astype(str).str.strip()
+    digits = s.str.isdigit()
+    stripped = s.str.lstrip("0").replace("", "0")
+    return s.where(~digits, stripped).str.zfill(6)
+
+
+class SpotSnapshot:
+    """列式全市场快照：每个字段一个 float 数组，按代码→行号索引 O(1) 定位"""
+
+    def __init__(self, codes: List[str], columns: Dict[str, np.ndarray], ts: float) -> None:
+        self.columns = columns
+        self.ts = ts
+        # 重复代码以最后一行为准（与逐行写入字典的行为一致）
+        self._index: Dict[str, int] = dict(zip(codes, range(len(codes))))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._index
+
+    def get(self, code: str) -> Optional[Dict[str, Optional[float]]]:
+        row = self._index.get(code)
+        if row is None:
+            return None
+        quote = {}
+        for field, values in self.columns.items():
+            v = values[row]
+            quote[field] = None if v != v else float(v)
+        return quote
+
+    def lookup(self, codes: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
+        result = {}
+        for code in codes:
+            quote = self.get(code)
+            if quote is not None:
+                result[code] = quote
+        return result
+
+    @classmethod
+    def from_spot_frame(cls, df: pd.DataFrame, ts: Optional[float] = None) -> Optional["SpotSnapshot"]:
+        """从 AKShare spot DataFrame 构建快照（兼容常见列名），缺少必要列时返回 None"""
+        code_col = next((c for c in ["代码", "代码code", "symbol", "股票代码"] if c in df.columns), None)
+        price_col = next((c for c in ["最新价", "现价", "最新价(元)", "price", "最新"] if c in df.columns), None)
+        pct_col = next((c for c in ["涨跌幅", "涨跌幅(%)", "涨幅", "pct_chg"] if c in df.columns), None)
+        amount_col = next((c for c in ["成交额", "成交额(元)", "amount", "成交额(万元)"] if c in df.columns), None)
+
+        if not code_col or not price_col:
+            logger.error(f"AKShare spot 缺少必要列: code={code_col}, price={price_col}")
+            return None
+
+        valid = df[code_col].notna() & (df[code_col].astype(str).str.strip() != "")
+        df = df.loc[valid]
+        missing = np.full(len(df), np.nan)
+        # 若成交额单位为万元，不强转，保持原样由前端展示单位
+        columns = {
+            "close": _to_float_array(df[price_col]),
+            "pct_chg": _to_float_array(df[pct_col]) if pct_col else missing,
+            "amount": _to_float_array(df[amount_col]) if amount_col else missing,
+        }
+        return cls(_normalize_codes(df[code_col]).tolist(), columns, time.time() if ts is None else ts)
+
+
 class QuotesService:
     def __init__(self, ttl_seconds: int = 30) -> None:
         self._ttl = ttl_seconds
-        self._cache_ts: float = 0.0
-        self._cache: Dict[str, Dict[str, Optional[float]]] = {}
+        self._snapshot: Optional[SpotSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
         self._lock = asyncio.Lock()
 
     async def get_quotes(self, codes: List[str]) -> Dict[str, Dict[str, Optional[float]]]:
         """获取一批股票的近实时快照（最新价、涨跌幅、成交额）。
-        - 优先使用缓存；缓存超时或为空则刷新一次全市场快照。
+        - 优先使用缓存；缓存过期时返回旧快照并在后台刷新，没有快照时等待首次拉取。
         - 返回仅包含请求的 codes。
         """
         codes = [c.strip() for c in codes if c]
-        now = time.time()
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self._refresh()
+        elif (time.time() - snapshot.ts) >= self._ttl:
+            await self._start_refresh()
+        return snapshot.lookup(codes) if snapshot else {}
+
+    async def _start_refresh(self) -> asyncio.Task:
+        """启动后台刷新；已有刷新在进行时复用（同一时刻只拉取一次全市场快照）"""
         async with self._lock:
-            if self._cache and (now - self._cache_ts) < self._ttl:
-                return {c: q for c, q in self._cache.items() if c in codes and q}
-            # 刷新缓存（阻塞IO放到线程）
-            data = await asyncio.to_thread(self._fetch_spot_akshare)
-            self._cache = data
-            self._cache_ts = time.time()
-            return {c: q for c, q in self._cache.items() if c in codes and q}
-
-    def _fetch_spot_akshare(self) -> Dict[str, Dict[str, Optional[float]]]:
-        """通过 AKShare 东方财富全市场快照接口拉取行情，并标准化为字典。
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._do_refresh())
+            return self._refresh_task
+
+    async def _refresh(self) -> Optional[SpotSnapshot]:
+        return await asyncio.shield(await self._start_refresh())
+
+    async def _do_refresh(self) -> Optional[SpotSnapshot]:
+        # 阻塞IO放到线程
+        snapshot = await asyncio.to_thread(self._fetch_spot_akshare)
+        if snapshot is not None and len(snapshot):
+            self._snapshot = snapshot
+        elif self._snapshot is not None:
+            logger.warning("AKShare spot 刷新失败，继续使用旧快照")
+        return self._snapshot
+
+    def _fetch_spot_akshare(self) -> Optional[SpotSnapshot]:
+        """通过 AKShare 东方财富全市场快照接口拉取行情，并构建列式快照。
         预期列（常见）：代码、名称、最新价、涨跌幅、成交额。
         不同版本可能有差异，做多列名兼容。
         """
@@ -64,40 +159,14 @@ class QuotesService:
             df = ak.stock_zh_a_spot_em()
             if df is None or getattr(df, "empty", True):
                 logger.warning("AKShare spot 返回空数据")
-                return {}
-            # 兼容常见列名
-            code_col = next((c for c in ["代码", "代码code", "symbol", "股票代码"] if c in df.columns), None)
-            price_col = next((c for c in ["最新价", "现价", "最新价(元)", "price", "最新"] if c in df.columns), None)
-            pct_col = next((c for c in ["涨跌幅", "涨跌幅(%)", "涨幅", "pct_chg"] if c in df.columns), None)
-            amount_col = next((c for c in ["成交额", "成交额(元)", "amount", "成交额(万元)"] if c in df.columns), None)
-
-            if not code_col or not price_col:
-                logger.error(f"AKShare spot 缺少必要列: code={code_col}, price={price_col}")
-                return {}
-
-            result: Dict[str, Dict[str, Optional[float]]] = {}
-            for _, row in df.iterrows():  # type: ignore
-                code_raw = row.get(code_col)
-                if not code_raw:
-                    continue
-                # 标准化股票代码：移除前导0，然后补齐到6位
-                code_str = str(code_raw).strip()
-                # 如果是纯数字，移除前导0后补齐到6位
-                if code_str.isdigit():
-                    code_clean = code_str.lstrip('0') or '0'  # 移除前导0，如果全是0则保留一个0
-                    code = code_clean.zfill(6)  # 补齐到6位
-                else:
-                    code = code_str.zfill(6)
-                close = _safe_float(row.get(price_col))
-                pct = _safe_float(row.get(pct_col)) if pct_col else None
-                amt = _safe_float(row.get(amount_col)) if amount_col else None
-                # 若成交额单位为万元，统一转换为元（部分接口是万元，这里不强转，保持原样由前端展示单位）
-                result[code] = {"close": close, "pct_chg": pct, "amount": amt}
-            logger.info(f"AKShare spot 拉取完成: {len(result)} 条")
-            return result
+                return None
+            snapshot = SpotSnapshot.from_spot_frame(df)
+            if snapshot is not None:
+                logger.info(f"AKShare spot 拉取完成: {len(snapshot)} 条")
+            return snapshot
         except Exception as e:
             logger.error(f"获取AKShare实时快照失败: {e}")
-            return {}
+            return None
 
 
 _quotes_service: Optional[QuotesService] = None
@@ -4,7 +4,7 @@ Extracted from ScreeningService to separate concerns while keeping API unchanged
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Iterable
+from typing import Any, Dict, List, Mapping, Optional, Iterable
 import pandas as pd
 import numpy as np
 
@@ -157,6 +157,102 @@ def evaluate_conditions(
     return False
 
 
+def evaluate_conditions_mask(
+    latest: Mapping[str, np.ndarray],
+    previous: Mapping[str, np.ndarray],
+    node: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    allowed_ops: Iterable[str],
+    size: int,
+) -> np.ndarray:
+    """Vectorized counterpart of evaluate_conditions for a whole universe.
+
+    latest/previous map a field to a 1-D array holding every symbol's last and
+    second-to-last bar. Returns a boolean mask with the same per-symbol result
+    evaluate_conditions would produce.
+    """
+    if not node:
+        return np.ones(size, dtype=bool)
+    # group 节点
+    if node.get("op") == "group" or "children" in node:
+        logic = (node.get("logic") or "AND").upper()
+        children = node.get("children", [])
+        if logic not in {"AND", "OR"}:
+            logic = "AND"
+        masks = [
+            evaluate_conditions_mask(latest, previous, c, allowed_fields, allowed_ops, size)
+            for c in children
+        ]
+        if not masks:
+            return np.ones(size, dtype=bool) if logic == "AND" else np.zeros(size, dtype=bool)
+        return np.logical_and.reduce(masks) if logic == "AND" else np.logical_or.reduce(masks)
+
+    none = np.zeros(size, dtype=bool)
+    allowed_fields = set(allowed_fields)
+
+    # 叶子：字段比较
+    field = node.get("field")
+    op = node.get("op")
+    if field not in allowed_fields or op not in set(allowed_ops):
+        return none
+
+    # 需要最近两行（交叉）
+    if op in {"cross_up", "cross_down"}:
+        right_field = node.get("right_field")
+        if right_field not in allowed_fields:
+            return none
+        a0, a1 = latest.get(field), previous.get(field)
+        b0, b1 = latest.get(right_field), previous.get(right_field)
+        if any(x is None for x in (a0, a1, b0, b1)):
+            return none
+        ok = ~(np.isnan(a0) | np.isnan(a1) | np.isnan(b0) | np.isnan(b1))
+        if op == "cross_up":
+            return ok & (a1 <= b1) & (a0 > b0)
+        return ok & (a1 >= b1) & (a0 < b0)
+
+    # 普通比较：最近一行
+    left = latest.get(field)
+    if left is None:
+        return none
+    ok = ~np.isnan(left)
+
+    if node.get("right_field"):
+        rf = node.get("right_field")
+        if rf not in allowed_fields:
+            return none
+        right = latest.get(rf)
+        if right is None:
+            return none
+    else:
+        right = node.get("value")
+
+    with np.errstate(invalid="ignore"):
+        try:
+            if op == "between":
+                lo_hi = right if isinstance(right, (list, tuple)) else (None, None)
+                lo, hi = lo_hi if isinstance(lo_hi, (list, tuple)) and len(lo_hi) == 2 else (None, None)
+                if lo is None or hi is None:
+                    return none
+                return ok & (float(lo) <= left) & (left <= float(hi))
+            if not isinstance(right, np.ndarray):
+                right = float(right)
+            if op == ">":
+                return ok & (left > right)
+            if op == "<":
+                return ok & (left < right)
+            if op == ">=":
+                return ok & (left >= right)
+            if op == "<=":
+                return ok & (left <= right)
+            if op == "==":
+                return ok & (left == right)
+            if op == "!=":
+                return ok & (left != right)
+        except Exception:
+            return none
+    return none
+
+
 def safe_float(v: Any) -> Optional[float]:
     try:
         if v is None or (isinstance(v, float) and np.isnan(v)):
@@ -0,0 +1,253 @@
+"""
+Columnar multi-symbol screening engine.
+
+The per-symbol path in ScreeningService fetches and evaluates one code at a time,
+which limits screens to a small sample. This module holds the whole universe as a
+(symbols x bars) panel, computes indicators column-wise for every symbol at once,
+and evaluates the condition DSL into boolean masks.
+
+Layout: every symbol's bars are right-aligned (last bar in the last column) and
+padded with NaN in front. Rolling windows and EMAs skip the leading padding, so
+each row produces the same values as running the indicator functions in
+`tradingagents.tools.analysis.indicators` on that symbol's own DataFrame.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# 面板中的原始行情列（DB 中 volume 统一映射为 vol）
+PRICE_COLUMNS = ("open", "high", "low", "close", "vol", "amount")
+
+# 同一 (symbol, trade_date) 存在多个数据源时的默认优先级
+DEFAULT_SOURCE_PRIORITY = ("tushare", "akshare", "baostock")
+
+
+@dataclass
+class ScreeningPanel:
+    """右对齐的多股票行情面板，每个字段是一个 (N, T) 的 float64 矩阵"""
+
+    codes: np.ndarray
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.codes)
+
+    @property
+    def length(self) -> int:
+        close = self.columns.get("close")
+        return 0 if close is None else close.shape[1]
+
+    def latest(self, name: str) -> Optional[np.ndarray]:
+        arr = self.columns.get(name)
+        return None if arr is None or arr.shape[1] < 1 else arr[:, -1]
+
+    def previous(self, name: str) -> Optional[np.ndarray]:
+        arr = self.columns.get(name)
+        return None if arr is None or arr.shape[1] < 2 else arr[:, -2]
+
+    def latest_columns(self) -> Dict[str, np.ndarray]:
+        return {k: v[:, -1] for k, v in self.columns.items() if v.shape[1] >= 1}
+
+    def previous_columns(self) -> Dict[str, np.ndarray]:
+        return {k: v[:, -2] for k, v in self.columns.items() if v.shape[1] >= 2}
+
+
+def build_panel(
+    df: pd.DataFrame,
+    max_bars: Optional[int] = None,
+    source_priority: Iterable[str] = DEFAULT_SOURCE_PRIORITY,
+) -> ScreeningPanel:
+    """
+    把长表 K 线（每行一根 bar）转换为右对齐面板
+
+    Args:
+        df: 至少包含 symbol, trade_date 及行情列；可选 data_source 列
+        max_bars: 每只股票最多保留的最近 bar 数
+        source_priority: 多数据源重复时保留的优先顺序
+    """
+    if df is None or df.empty:
+        return ScreeningPanel(codes=np.array([], dtype=object))
+
+    data = df.rename(columns={"volume": "vol", "Volume": "vol"})
+    data = data.assign(symbol=data["symbol"].astype(str), trade_date=data["trade_date"].astype(str))
+
+    # 多数据源去重：按优先级保留一条
+    if "data_source" in data.columns:
+        rank = {s: i for i, s in enumerate(source_priority)}
+        data = data.assign(_rank=data["data_source"].map(rank).fillna(len(rank)))
+        data = data.sort_values(["symbol", "trade_date", "_rank"], kind="mergesort")
+        data = data.drop_duplicates(["symbol", "trade_date"], keep="first")
+    else:
+        data = data.sort_values(["symbol", "trade_date"], kind="mergesort")
+        data = data.drop_duplicates(["symbol", "trade_date"], keep="last")
+
+    # 每只股票内从最后一根 bar 往前编号，用于右对齐
+    pos_from_end = data.groupby("symbol", sort=False).cumcount(ascending=False).to_numpy()
+    if max_bars:
+        keep = pos_from_end < int(max_bars)
+        data = data[keep]
+        pos_from_end = pos_from_end[keep]
+
+    codes, row_idx = np.unique(data["symbol"].to_numpy(), return_inverse=True)
+    length = int(pos_from_end.max()) + 1 if len(pos_from_end) else 0
+    col_idx = length - 1 - pos_from_end
+
+    columns: Dict[str, np.ndarray] = {}
+    for name in PRICE_COLUMNS:
+        matrix = np.full((len(codes), length), np.nan)
+        if name in data.columns:
+            matrix[row_idx, col_idx] = pd.to_numeric(data[name], errors="coerce").to_numpy(dtype=float)
+        columns[name] = matrix
+
+    # 有效 bar 掩码（区分前置填充与数据本身的缺失值）
+    valid = np.zeros((len(codes), length), dtype=bool)
+    valid[row_idx, col_idx] = True
+    columns["_valid"] = valid
+
+    return ScreeningPanel(codes=codes.astype(object), columns=columns)
+
+
+# --- 面板指标（与 tradingagents.tools.analysis.indicators 公式一致，按列批量计算） ---
+
+def _frame(matrix: np.ndarray) -> pd.DataFrame:
+    """(N, T) -> (T, N)，让 pandas 的 rolling/ewm 沿时间轴对每只股票并行计算"""
+    return pd.DataFrame(matrix.T)
+
+
+def _matrix(frame: pd.DataFrame) -> np.ndarray:
+    return frame.to_numpy(dtype=float).T
+
+
+def panel_ma(close: np.ndarray, n: int) -> np.ndarray:
+    return _matrix(_frame(close).rolling(window=int(n), min_periods=1).mean())
+
+
+def panel_ema(close: np.ndarray, n: int) -> np.ndarray:
+    return _matrix(_frame(close).ewm(span=int(n), adjust=False).mean())
+
+
+def panel_macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    dif = panel_ema(close, fast) - panel_ema(close, slow)
+    dea = _matrix(_frame(dif).ewm(span=int(signal), adjust=False).mean())
+    return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+
+def panel_rsi(close: np.ndarray, valid: np.ndarray, n: int = 14) -> np.ndarray:
+    """Wilder RSI（indicators.rsi 的 'ema' 方法）"""
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    # 与单股票版本一致：首根 bar 的 delta 为 NaN，计为 0；前置填充保持 NaN
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[~valid] = np.nan
+    loss[~valid] = np.nan
+    avg_gain = _frame(gain).ewm(alpha=1 / float(n), adjust=False).mean()
+    avg_loss = _frame(loss).ewm(alpha=1 / float(n), adjust=False).mean()
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    return _matrix(100 - (100 / (1 + rs)))
+
+
+def panel_boll(close: np.ndarray, n: int = 20, k: float = 2.0) -> Dict[str, np.ndarray]:
+    roll = _frame(close).rolling(window=int(n), min_periods=1)
+    mid = roll.mean()
+    std = roll.std()
+    return {
+        "boll_mid": _matrix(mid),
+        "boll_upper": _matrix(mid + k * std),
+        "boll_lower": _matrix(mid - k * std),
+    }
+
+
+def panel_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    prev_close = np.roll(close, 1, axis=1)
+    prev_close[:, 0] = np.nan
+    tr = np.fmax(np.fmax(np.abs(high - low), np.abs(high - prev_close)), np.abs(low - prev_close))
+    return _matrix(_frame(tr).rolling(window=int(n), min_periods=int(n)).mean())
+
+
+def panel_kdj(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 9, m1: int = 3, m2: int = 3
+) -> Dict[str, np.ndarray]:
+    lowest_low = _matrix(_frame(low).rolling(window=int(n), min_periods=int(n)).min())
+    highest_high = _matrix(_frame(high).rolling(window=int(n), min_periods=int(n)).max())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = (close - lowest_low) / (highest_high - lowest_low) * 100
+    rsv[~np.isfinite(rsv)] = np.nan
+
+    # 递推只沿时间轴循环，每一步同时更新所有股票
+    alpha_k = 1 / float(m1)
+    alpha_d = 1 / float(m2)
+    k = np.full(close.shape, np.nan)
+    d = np.full(close.shape, np.nan)
+    last_k = np.full(close.shape[0], 50.0)
+    last_d = np.full(close.shape[0], 50.0)
+    for t in range(close.shape[1]):
+        rv = rsv[:, t]
+        ok = ~np.isnan(rv)
+        curr_k = (1 - alpha_k) * last_k + alpha_k * rv
+        curr_d = (1 - alpha_d) * last_d + alpha_d * curr_k
+        k[ok, t] = curr_k[ok]
+        d[ok, t] = curr_d[ok]
+        last_k = np.where(ok, curr_k, last_k)
+        last_d = np.where(ok, curr_d, last_d)
+    return {"kdj_k": k, "kdj_d": d, "kdj_j": 3 * k - 2 * d}
+
+
+def compute_panel_indicators(panel: ScreeningPanel, need_tech: bool = True) -> ScreeningPanel:
+    """在面板上计算 pct_chg 及（按需）全部固定参数技术指标，原地写入并返回面板"""
+    cols = panel.columns
+    close = cols["close"]
+
+    prev_close = np.roll(close, 1, axis=1)
+    if close.shape[1]:
+        prev_close[:, 0] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cols["pct_chg"] = (close / prev_close - 1) * 100.0
+
+    if not need_tech:
+        return panel
+
+    for n in (5, 10, 20, 60):
+        cols[f"ma{n}"] = panel_ma(close, n)
+    cols["ema12"] = panel_ema(close, 12)
+    cols["ema26"] = panel_ema(close, 26)
+    cols.update(panel_macd(close))
+    cols["rsi14"] = panel_rsi(close, cols["_valid"], 14)
+    cols.update(panel_boll(close, 20, 2.0))
+    cols["atr14"] = panel_atr(cols["high"], cols["low"], close, 14)
+    cols.update(panel_kdj(cols["high"], cols["low"], close, 9, 3, 3))
+    return panel
+
+
+def load_daily_panel(
+    db,
+    start_date: str,
+    end_date: str,
+    codes: Optional[List[str]] = None,
+    source_priority: Iterable[str] = DEFAULT_SOURCE_PRIORITY,
+    batch_size: int = 50000,
+) -> ScreeningPanel:
+    """
+    从 stock_daily_quotes 一次性读取全市场日线并构建面板（同步 pymongo 数据库）
+
+    一个区间查询替代逐只股票的数据源调用；codes 为空时读取区间内的全部股票。
+    """
+    query: Dict[str, Any] = {
+        "period": "daily",
+        "trade_date": {"$gte": start_date, "$lte": end_date},
+    }
+    if codes:
+        query["symbol"] = {"$in": [str(c).zfill(6) for c in codes]}
+
+    projection = {"_id": 0, "symbol": 1, "trade_date": 1, "data_source": 1,
+                  "open": 1, "high": 1, "low": 1, "close": 1, "volume": 1, "amount": 1}
+    cursor = db.stock_daily_quotes.find(query, projection).batch_size(batch_size)
+    df = pd.DataFrame(list(cursor))
+    if df.empty:
+        return ScreeningPanel(codes=np.array([], dtype=object))
+    return build_panel(df, source_priority=source_priority)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import time
 
 import pandas as pd
 import numpy as np
@@ -17,9 +18,11 @@ from tradingagents.dataflows.providers.china.fundamentals_snapshot import get_cn
 from app.services.screening.eval_utils import (
     collect_fields_from_conditions as _collect_fields_from_conditions_util,
     evaluate_conditions as _evaluate_conditions_util,
+    evaluate_conditions_mask as _evaluate_conditions_mask_util,
     evaluate_fund_conditions as _evaluate_fund_conditions_util,
     safe_float as _safe_float_util,
 )
+from app.services.screening.panel_engine import compute_panel_indicators, load_daily_panel
 
 # --- DSL 约束 ---
 ALLOWED_FIELDS = {
@@ -54,6 +57,9 @@ FUND_FIELDS = {"pe", "pb", "roe", "market_cap"}
 
 ALLOWED_OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
 
+# 逐只股票经数据源获取时的样本上限（仅在本地日线面板不可用时使用）
+PER_SYMBOL_LIMIT = 120
+
 
 @dataclass
 class ScreeningParams:
@@ -76,16 +82,12 @@ class ScreeningService:
     # --- 公共入口 ---
     def run(self, conditions: Dict[str, Any], params: ScreeningParams) -> Dict[str, Any]:
         symbols = self._get_universe()
-        # 为控制时长，先限制样本规模（后续用批量/缓存优化）
-        symbols = symbols[:120]
 
         end_date = datetime.now()
         start_date = end_date - timedelta(days=220)
         end_s = end_date.strftime("%Y-%m-%d")
         start_s = start_date.strftime("%Y-%m-%d")
 
-        results: List[Dict[str, Any]] = []
-
         # 解析条件中涉及的字段，决定是否需要技术指标/行情
         needed_fields = self._collect_fields_from_conditions(conditions)
         order_fields = {o.get("field") for o in (params.order_by or []) if o.get("field")}
@@ -94,6 +96,99 @@ class ScreeningService:
         need_base = any(f in BASE_FIELDS for f in all_needed) or need_tech
         need_fund = any(f in FUND_FIELDS for f in all_needed)
 
+        results: Optional[List[Dict[str, Any]]] = None
+        if need_base:
+            # 优先使用本地日线面板一次性评估全市场（无样本数量限制）
+            results = self._run_vectorized(symbols, conditions, start_s, end_s, need_tech)
+        if results is None:
+            # 逐只股票经数据源获取，为控制时长限制样本规模
+            results = self._run_per_symbol(
+                symbols[:PER_SYMBOL_LIMIT], conditions, start_s, end_s, need_base, need_tech, need_fund
+            )
+
+        total = len(results)
+        # 排序
+        if params.order_by:
+            for order in reversed(params.order_by):  # 后者优先级低
+                f = order.get("field")
+                d = order.get("direction", "desc").lower()
+                if f in ALLOWED_FIELDS:
+                    results.sort(key=lambda x: (x.get(f) is None, x.get(f)), reverse=(d == "desc"))
+
+        # 分页
+        start = params.offset or 0
+        end = start + (params.limit or 50)
+        page_items = results[start:end]
+
+        return {
+            "total": total,
+            "items": page_items,
+        }
+
+    def _run_vectorized(
+        self,
+        symbols: List[str],
+        conditions: Dict[str, Any],
+        start_s: str,
+        end_s: str,
+        need_tech: bool,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """在全市场日线面板上批量计算指标并以布尔掩码评估条件；本地无数据时返回 None"""
+        try:
+            from app.core.database import get_mongo_db_sync
+
+            t0 = time.time()
+            panel = load_daily_panel(get_mongo_db_sync(), start_s, end_s, codes=symbols)
+            if panel.size == 0:
+                logger.info("📊 本地日线为空，回退到逐只股票筛选")
+                return None
+            t1 = time.time()
+
+            compute_panel_indicators(panel, need_tech=need_tech)
+            mask = _evaluate_conditions_mask_util(
+                panel.latest_columns(),
+                panel.previous_columns(),
+                conditions,
+                ALLOWED_FIELDS,
+                ALLOWED_OPS,
+                panel.size,
+            )
+            t2 = time.time()
+            logger.info(
+                f"📊 向量化筛选: {panel.size} 只股票 × {panel.length} 根K线, 命中 {int(mask.sum())}, "
+                f"加载 {t1 - t0:.2f}s, 计算 {t2 - t1:.2f}s"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 向量化筛选失败，回退到逐只股票筛选: {e}")
+            return None
+
+        latest = panel.latest_columns()
+        fields = ["close", "pct_chg", "amount"]
+        if need_tech:
+            fields += ["ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist"]
+
+        results: List[Dict[str, Any]] = []
+        for i in np.flatnonzero(mask):
+            item = {"code": panel.codes[i]}
+            for f in fields:
+                item[f] = self._safe_float(latest[f][i])
+            if not need_tech:
+                item.update({f: None for f in ("ma20", "rsi14", "kdj_k", "kdj_d", "kdj_j", "dif", "dea", "macd_hist")})
+            results.append(item)
+        return results
+
+    def _run_per_symbol(
+        self,
+        symbols: List[str],
+        conditions: Dict[str, Any],
+        start_s: str,
+        end_s: str,
+        need_base: bool,
+        need_tech: bool,
+        need_fund: bool,
+    ) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+
         for code in symbols:
             try:
                 dfc = None
@@ -120,6 +215,7 @@ class ScreeningService:
                             IndicatorSpec("ma", {"n": 5}),
                             IndicatorSpec("ma", {"n": 10}),
                             IndicatorSpec("ma", {"n": 20}),
+                            IndicatorSpec("ma", {"n": 60}),
                             IndicatorSpec("ema", {"n": 12}),
                             IndicatorSpec("ema", {"n": 26}),
                             IndicatorSpec("macd"),
@@ -166,24 +262,8 @@ class ScreeningService:
             except Exception:
                 continue
 
-        total = len(results)
-        # 排序
-        if params.order_by:
-            for order in reversed(params.order_by):  # 后者优先级低
-                f = order.get("field")
-                d = order.get("direction", "desc").lower()
-                if f in ALLOWED_FIELDS:
-                    results.sort(key=lambda x: (x.get(f) is None, x.get(f)), reverse=(d == "desc"))
-
-        # 分页
-        start = params.offset or 0
-        end = start + (params.limit or 50)
-        page_items = results[start:end]
+        return results
 
-        return {
-            "total": total,
-            "items": page_items,
-        }
     def _evaluate_fund_conditions(self, snap: Dict[str, Any], node: Dict[str, Any]) -> bool:
         """Delegate fundamental condition evaluation to utils to keep service slim."""
         return _evaluate_fund_conditions_util(snap, node, FUND_FIELDS)
@@ -206,9 +286,9 @@ class ScreeningService:
     def _get_universe(self) -> List[str]:
         """获取A股代码集合：从 MongoDB stock_basic_info 集合获取所有A股股票代码"""
         try:
-            from app.core.database import get_mongo_db
+            from app.core.database import get_mongo_db_sync
 
-            db = get_mongo_db()
+            db = get_mongo_db_sync()
             collection = db.stock_basic_info
 
             # 查询所有A股股票代码（兼容不同的数据结构）
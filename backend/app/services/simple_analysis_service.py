@@ -7,7 +7,7 @@ import asyncio
 import uuid
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple
 from pathlib import Path
 import sys
 
@@ -19,7 +19,12 @@ sys.path.insert(0, str(project_root))
 from tradingagents.utils.logging_init import init_logging
 init_logging()
 
-from tradingagents.graph.trading_graph import TradingAgentsGraph
+from tradingagents.graph.engine_pool import get_graph_engine_pool
+
+if TYPE_CHECKING:
+    # 分析引擎依赖全部智能体与 LLM SDK，运行时由引擎池按需导入
+    from tradingagents.graph.trading_graph import TradingAgentsGraph
+
 from tradingagents.default_config import DEFAULT_CONFIG
 from app.models.analysis import (
     AnalysisTask, AnalysisStatus, SingleAnalysisRequest, AnalysisParameters
@@ -592,7 +597,6 @@ class SimpleAnalysisService:
     """简化的股票分析服务类"""
 
     def __init__(self):
-        self._trading_graph_cache = {}
         self.memory_manager = get_memory_state_manager()
 
         # 进度跟踪器缓存
@@ -699,28 +703,22 @@ class SimpleAnalysisService:
             logger.warning(f"⚠️ 生成新的用户ID: {new_object_id}")
             return PyObjectId(new_object_id)
 
-    def _get_trading_graph(self, config: Dict[str, Any]) -> TradingAgentsGraph:
-        """获取或创建TradingAgents实例
+    def _get_trading_graph(self, config: Dict[str, Any]) -> Tuple["TradingAgentsGraph", Dict[str, Any]]:
+        """获取TradingAgents实例
 
-        ⚠️ 注意：为了避免并发执行时的数据混淆，每次都创建新实例
-        虽然这会增加一些初始化开销，但可以确保线程安全
+        TradingAgentsGraph 构建后只读，每次运行的状态（ticker、curr_state、task_id）
+        保存在 propagate 创建的 GraphRunContext 中，因此同一配置的实例从进程内
+        引擎池中共享，并发任务之间不会串数据。
 
-        TradingAgentsGraph 实例包含可变状态（self.ticker, self.curr_state等），
-        如果多个线程共享同一个实例，会导致数据混淆。
+        Returns:
+            (实例, 引擎信息)，引擎信息（构建耗时、池命中率）随 propagate 写入 performance_metrics
         """
-        # 🔧 [并发安全] 每次都创建新实例，避免多线程共享状态
-        # 不再使用缓存，因为 TradingAgentsGraph 有可变的实例变量
-        logger.info(f"🔧 创建新的TradingAgents实例（并发安全模式）...")
-
-        trading_graph = TradingAgentsGraph(
-            selected_analysts=config.get("selected_analysts", ["market", "fundamentals"]),
-            debug=config.get("debug", False),
-            config=config
+        trading_graph, engine_metrics = get_graph_engine_pool().acquire(config)
+        logger.info(
+            f"✅ TradingAgents实例就绪（实例ID: {id(trading_graph)}，"
+            f"{'复用' if engine_metrics['pool_hit'] else '新建'}）"
         )
-
-        logger.info(f"✅ TradingAgents实例创建成功（实例ID: {id(trading_graph)}）")
-
-        return trading_graph
+        return trading_graph, engine_metrics
 
     async def create_analysis_task(
         self,
@@ -1250,7 +1248,7 @@ class SimpleAnalysisService:
 
             # 初始化分析引擎 - 对应步骤4 "🚀 启动引擎" (8-10%)
             update_progress_sync(9, "🚀 初始化AI分析引擎", "engine_initialization")
-            trading_graph = self._get_trading_graph(config)
+            trading_graph, engine_metrics = self._get_trading_graph(config)
 
             # 🔍 验证TradingGraph实例中的配置
             logger.info(f"🔍 [引擎验证] TradingGraph配置中的快速模型: {trading_graph.config.get('quick_think_llm')}")
@@ -1497,7 +1495,8 @@ class SimpleAnalysisService:
                 request.stock_code,
                 analysis_date,
                 progress_callback=graph_progress_callback,
-                task_id=task_id
+                task_id=task_id,
+                engine_metrics=engine_metrics
             )
 
             logger.info(f"✅ trading_graph.propagate 执行完成")
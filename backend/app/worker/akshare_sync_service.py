@@ -7,9 +7,12 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
+from app.core.config import settings
 from app.core.database import get_mongo_db
+from app.core.rate_limiter import get_akshare_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
 from app.services.news_data_service import get_news_data_service
+from app.worker.sync_pipeline import PipelinedSyncEngine
 from tradingagents.dataflows.providers.china.akshare import AKShareProvider
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,11 @@ class AKShareSyncService:
         self.db = None
         self.batch_size = 100
         self.rate_limit_delay = 0.2  # AKShare建议的延迟
+        # 历史数据流水线同步：同时在途的拉取请求数、每次批量写入合并的股票数
+        self.fetch_concurrency = int(getattr(settings, "AKSHARE_SYNC_FETCH_CONCURRENCY", 3))
+        self.save_batch_size = int(getattr(settings, "SYNC_PIPELINE_SAVE_BATCH_SIZE", 20))
+        # 并发拉取历史数据时由速率限制器控制总请求速率
+        self.rate_limiter = get_akshare_rate_limiter()
     
     async def initialize(self):
         """初始化同步服务"""
@@ -590,27 +598,57 @@ class AKShareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
-            # 4. 批量处理
-            for i in range(0, len(symbols), self.batch_size):
-                batch = symbols[i:i + self.batch_size]
-                batch_stats = await self._process_historical_batch(
-                    batch, start_date, end_date, period, incremental
+            # 4. 流水线处理：并发拉取与批量写入重叠执行
+            async def fetch(symbol: str):
+                # 确定该股票的起始日期
+                symbol_start_date = start_date
+                if not symbol_start_date:
+                    if incremental:
+                        # 增量同步：获取该股票的最后日期
+                        symbol_start_date = await self._get_last_sync_date(symbol)
+                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
+                    else:
+                        # 全量同步：最近1年
+                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+                return await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
+
+            async def save_batch(frames):
+                # 保存到统一历史数据集合
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                return await self.historical_service.save_historical_batch(
+                    frames, data_source="akshare", market="CN", period=period
                 )
 
-                # 更新统计
-                stats["success_count"] += batch_stats["success_count"]
-                stats["error_count"] += batch_stats["error_count"]
-                stats["total_records"] += batch_stats["total_records"]
-                stats["errors"].extend(batch_stats["errors"])
-
+            async def on_progress(done: int, total: int, symbol: str):
                 # 进度日志
-                progress = min(i + self.batch_size, len(symbols))
-                logger.info(f"📈 历史数据同步进度: {progress}/{len(symbols)} "
-                           f"(成功: {stats['success_count']}, 记录: {stats['total_records']})")
-
-                # API限流
-                if i + self.batch_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
+                if done % self.batch_size == 0 or done == total:
+                    logger.info(f"📈 历史数据同步进度: {done}/{total} "
+                               f"(成功: {pipeline.stats['success_count']}, 记录: {pipeline.stats['total_records']})")
+
+            pipeline = PipelinedSyncEngine(
+                fetch=fetch,
+                save_batch=save_batch,
+                concurrency=self.fetch_concurrency,
+                save_batch_size=self.save_batch_size,
+                acquire=self.rate_limiter.acquire,
+                on_progress=on_progress,
+                name=f"akshare_{period}",
+            )
+            result = await pipeline.run(symbols)
+
+            # 更新统计（空数据按错误计入，与逐只同步时一致）
+            stats["success_count"] = result["success_count"]
+            stats["error_count"] = result["error_count"] + result["empty_count"]
+            stats["total_records"] = result["total_records"]
+            stats["errors"].extend(
+                {"code": e["code"], "error": e["error"], "context": f"sync_historical_data:{e['context']}"}
+                for e in result["errors"]
+            )
+            stats["errors"].extend(
+                {"code": code, "error": "历史数据为空", "context": "sync_historical_data"}
+                for code in result["empty_symbols"]
+            )
 
             # 4. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -629,72 +667,6 @@ class AKShareSyncService:
             stats["errors"].append({"error": str(e), "context": "sync_historical_data"})
             return stats
 
-    async def _process_historical_batch(
-        self,
-        batch: List[str],
-        start_date: str,
-        end_date: str,
-        period: str = "daily",
-        incremental: bool = False
-    ) -> Dict[str, Any]:
-        """处理历史数据批次"""
-        batch_stats = {
-            "success_count": 0,
-            "error_count": 0,
-            "total_records": 0,
-            "errors": []
-        }
-
-        for symbol in batch:
-            try:
-                # 确定该股票的起始日期
-                symbol_start_date = start_date
-                if not symbol_start_date:
-                    if incremental:
-                        # 增量同步：获取该股票的最后日期
-                        symbol_start_date = await self._get_last_sync_date(symbol)
-                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
-                    else:
-                        # 全量同步：最近1年
-                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-
-                # 获取历史数据
-                hist_data = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period)
-
-                if hist_data is not None and not hist_data.empty:
-                    # 保存到统一历史数据集合
-                    if self.historical_service is None:
-                        self.historical_service = await get_historical_data_service()
-
-                    saved_count = await self.historical_service.save_historical_data(
-                        symbol=symbol,
-                        data=hist_data,
-                        data_source="akshare",
-                        market="CN",
-                        period=period
-                    )
-
-                    batch_stats["success_count"] += 1
-                    batch_stats["total_records"] += saved_count
-                    logger.debug(f"✅ {symbol}历史数据同步成功: {saved_count}条记录")
-                else:
-                    batch_stats["error_count"] += 1
-                    batch_stats["errors"].append({
-                        "code": symbol,
-                        "error": "历史数据为空",
-                        "context": "_process_historical_batch"
-                    })
-
-            except Exception as e:
-                batch_stats["error_count"] += 1
-                batch_stats["errors"].append({
-                    "code": symbol,
-                    "error": str(e),
-                    "context": "_process_historical_batch"
-                })
-
-        return batch_stats
-
     async def _get_last_sync_date(self, symbol: str = None) -> str:
         """
         获取最后同步日期
@@ -7,11 +7,13 @@ import asyncio
 import logging
 import signal
 import sys
+import threading
 import uuid
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent.parent
@@ -25,6 +27,7 @@ from app.core.config import settings
 from app.models.analysis import AnalysisTask, AnalysisParameters
 from app.services.config_provider import provider as config_provider
 from app.services.queue import DEFAULT_USER_CONCURRENT_LIMIT, GLOBAL_CONCURRENT_LIMIT, VISIBILITY_TIMEOUT_SECONDS
+from tradingagents.graph.cancellation import GraphCancelledError
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +40,14 @@ class AnalysisWorker:
         self.queue_service = None
         self.running = False
         self.current_task = None
+        # 正在执行的任务：task_id -> asyncio.Task
+        self.active_tasks: Dict[str, asyncio.Task] = {}
+        # 执行中任务的取消信号：task_id -> threading.Event（分析线程在节点之间检查）
+        self.cancel_events: Dict[str, threading.Event] = {}
+        self.executor: Optional[ThreadPoolExecutor] = None
 
         # 配置参数（可由系统设置覆盖）
+        self.concurrency = max(1, int(getattr(settings, 'WORKER_CONCURRENCY', 1)))
         self.heartbeat_interval = int(getattr(settings, 'WORKER_HEARTBEAT_INTERVAL', 30))
         self.max_retries = int(getattr(settings, 'QUEUE_MAX_RETRIES', 3))
         self.poll_interval = float(getattr(settings, 'QUEUE_POLL_INTERVAL_SECONDS', 1))  # 队列轮询间隔（秒）
@@ -82,8 +91,14 @@ class AnalysisWorker:
                 self.heartbeat_interval = int(effective_settings.get("worker_heartbeat_interval_seconds", self.heartbeat_interval))
                 self.poll_interval = float(effective_settings.get("queue_poll_interval_seconds", self.poll_interval))
                 self.cleanup_interval = float(effective_settings.get("queue_cleanup_interval_seconds", self.cleanup_interval))
+                self.concurrency = max(1, int(effective_settings.get("worker_concurrency", self.concurrency)))
             except Exception:
                 pass
+
+            # 分析在线程池中执行，线程数与并发槽位一致
+            self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"{self.worker_id}-analysis")
+            logger.info(f"⚙️ Worker并发数: {self.concurrency}")
+
             # 启动心跳任务
             heartbeat_task = asyncio.create_task(self._heartbeat_loop())
 
@@ -110,26 +125,81 @@ class AnalysisWorker:
             await self._cleanup()
 
     async def _work_loop(self):
-        """主工作循环"""
+        """主工作循环：空闲槽位上拉取任务并发执行"""
         logger.info(f"✅ Worker {self.worker_id} 开始工作")
 
         while self.running:
             try:
-                # 从队列获取任务
-                task_data = await self.queue_service.dequeue_task(self.worker_id)
+                await self._cancel_revoked_tasks()
+
+                if len(self.active_tasks) >= self.concurrency:
+                    # 槽位已满，等待任一任务结束
+                    await asyncio.wait(
+                        list(self.active_tasks.values()),
+                        timeout=self.poll_interval,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    continue
+
+                # 从队列获取任务（阻塞等待至多一个轮询间隔）
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                task_data = await self.queue_service.dequeue_task(self.worker_id, block_timeout=self.poll_interval)
 
                 if task_data:
-                    await self._process_task(task_data)
+                    self._start_task(task_data)
                 else:
-                    # 没有任务，短暂休眠
-                    await asyncio.sleep(self.poll_interval)
+                    # 因并发限制未取到任务时会立即返回，补足轮询间隔避免空转
+                    await asyncio.sleep(max(0.0, self.poll_interval - (loop.time() - started)))
 
             except Exception as e:
                 logger.error(f"工作循环异常: {e}")
                 await asyncio.sleep(5)  # 异常后等待5秒再继续
 
+        # 等待正在执行的任务结束
+        if self.active_tasks:
+            logger.info(f"⏳ 等待 {len(self.active_tasks)} 个执行中的任务结束...")
+            await asyncio.gather(*self.active_tasks.values(), return_exceptions=True)
+
         logger.info(f"🔄 Worker {self.worker_id} 工作循环结束")
 
+    def _start_task(self, task_data: Dict[str, Any]):
+        """在空闲槽位上启动任务"""
+        task_id = task_data.get("id")
+        self.cancel_events[task_id] = threading.Event()
+        runner = asyncio.create_task(self._process_task(task_data))
+        self.active_tasks[task_id] = runner
+        self.current_task = task_id
+        runner.add_done_callback(lambda _: self._on_task_done(task_id))
+
+    def _on_task_done(self, task_id: str):
+        self.active_tasks.pop(task_id, None)
+        self.cancel_events.pop(task_id, None)
+        current = self.current_task_ids()
+        self.current_task = current[-1] if current else None
+
+    def current_task_ids(self) -> List[str]:
+        return list(self.active_tasks.keys())
+
+    async def _cancel_revoked_tasks(self):
+        """通知已在队列中被标记为 cancelled 的执行中任务停止
+
+        只设置取消信号：分析线程在当前节点完成后停止，任务在线程退出后才结束，
+        不会在线程仍在调用 LLM/数据接口时被当作已取消。
+        """
+        for task_id, runner in list(self.active_tasks.items()):
+            cancel_event = self.cancel_events.get(task_id)
+            if runner.done() or cancel_event is None or cancel_event.is_set():
+                continue
+            try:
+                task_data = await self.queue_service.get_task(task_id)
+            except Exception as e:
+                logger.debug(f"查询任务状态失败: {task_id} - {e}")
+                continue
+            if task_data and task_data.get("status") == "cancelled":
+                logger.info(f"🛑 任务已被取消，等待分析线程停止: {task_id}")
+                cancel_event.set()
+
     async def _process_task(self, task_data: Dict[str, Any]):
         """处理单个任务"""
         task_id = task_data.get("id")
@@ -138,8 +208,8 @@ class AnalysisWorker:
 
         logger.info(f"📊 开始处理任务: {task_id} - {stock_code}")
 
-        self.current_task = task_id
         success = False
+        cancelled = False
 
         try:
             # 构建分析任务对象
@@ -153,6 +223,7 @@ class AnalysisWorker:
             task = AnalysisTask(
                 task_id=task_id,
                 user_id=user_id,
+                symbol=stock_code,
                 stock_code=stock_code,
                 batch_id=task_data.get("batch_id"),
                 parameters=parameters
@@ -161,28 +232,42 @@ class AnalysisWorker:
             # 执行分析
             result = await get_analysis_service().execute_analysis_task(
                 task,
-                progress_callback=self._progress_callback
+                progress_callback=lambda progress, message: self._progress_callback(task_id, progress, message),
+                executor=self.executor,
+                cancel_event=self.cancel_events.get(task_id)
             )
 
             success = True
             logger.info(f"✅ 任务完成: {task_id} - 耗时: {result.execution_time:.2f}秒")
 
+        except GraphCancelledError:
+            # 分析线程已在节点之间停止
+            cancelled = True
+            logger.info(f"🛑 任务已取消: {task_id}")
+
+        except asyncio.CancelledError:
+            # 协程被外部取消：通知分析线程在下一个节点前停止，其结果会被丢弃
+            cancel_event = self.cancel_events.get(task_id)
+            if cancel_event is not None:
+                cancel_event.set()
+            cancelled = True
+            logger.info(f"🛑 任务已取消: {task_id}")
+
         except Exception as e:
             logger.error(f"❌ 任务执行失败: {task_id} - {e}")
             logger.error(traceback.format_exc())
 
         finally:
-            # 确认任务完成
-            try:
-                await self.queue_service.ack_task(task_id, success)
-            except Exception as e:
-                logger.error(f"确认任务失败: {task_id} - {e}")
-
-            self.current_task = None
-
-    def _progress_callback(self, progress: int, message: str):
+            # 确认任务完成（已取消的任务由取消流程负责清理，不再覆盖其状态）
+            if not cancelled:
+                try:
+                    await self.queue_service.ack_task(task_id, success)
+                except Exception as e:
+                    logger.error(f"确认任务失败: {task_id} - {e}")
+
+    def _progress_callback(self, task_id: str, progress: int, message: str):
         """进度回调函数"""
-        logger.debug(f"任务进度 {self.current_task}: {progress}% - {message}")
+        logger.debug(f"任务进度 {task_id}: {progress}% - {message}")
 
     async def _heartbeat_loop(self):
         """心跳循环"""
@@ -206,12 +291,18 @@ class AnalysisWorker:
                 "worker_id": self.worker_id,
                 "timestamp": datetime.utcnow().isoformat(),
                 "current_task": self.current_task,
+                "current_tasks": self.current_task_ids(),
+                "concurrency": self.concurrency,
                 "status": "active" if self.running else "stopping"
             }
 
             heartbeat_key = f"worker:{self.worker_id}:heartbeat"
             await redis_service.set_json(heartbeat_key, heartbeat_data, ttl=self.heartbeat_interval * 2)
 
+            # 执行中的任务续期可见性超时，避免长任务被当作超时重新投递
+            if self.active_tasks and self.queue_service:
+                await self.queue_service.extend_visibility_timeout(self.current_task_ids())
+
         except Exception as e:
             logger.error(f"发送心跳失败: {e}")
 
@@ -231,6 +322,9 @@ class AnalysisWorker:
         """清理资源"""
         logger.info(f"🧹 清理Worker资源: {self.worker_id}")
 
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
         try:
             # 清理心跳记录
             from app.core.redis_client import get_redis_service
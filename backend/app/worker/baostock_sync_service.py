@@ -11,7 +11,9 @@ from dataclasses import dataclass
 
 from app.core.config import get_settings
 from app.core.database import get_database
+from app.core.rate_limiter import get_baostock_rate_limiter
 from app.services.historical_data_service import get_historical_data_service
+from app.worker.sync_pipeline import PipelinedSyncEngine
 from tradingagents.dataflows.providers.china.baostock import BaoStockProvider
 
 logger = logging.getLogger(__name__)
@@ -45,6 +47,8 @@ class BaoStockSyncService:
             self.provider = BaoStockProvider()
             self.historical_service = None  # 延迟初始化
             self.db = None  # 🔥 延迟初始化，在 initialize() 中设置
+            # 历史数据拉取经过速率限制器
+            self.rate_limiter = get_baostock_rate_limiter()
 
             logger.info("✅ BaoStock同步服务初始化成功")
         except Exception as e:
@@ -387,44 +391,11 @@ class BaoStockSyncService:
 
             logger.info(f"📊 开始同步{len(stock_codes)}只股票的历史数据...")
 
-            # 批量处理
-            for i in range(0, len(stock_codes), batch_size):
-                batch = stock_codes[i:i + batch_size]
-                batch_stats = await self._sync_historical_batch(batch, days, end_date, period, use_incremental)
-                
-                stats.historical_records += batch_stats.historical_records
-                stats.errors.extend(batch_stats.errors)
-                
-                logger.info(f"📊 批次进度: {i + len(batch)}/{len(stock_codes)}, "
-                          f"记录: {batch_stats.historical_records}, "
-                          f"错误: {len(batch_stats.errors)}")
-                
-                # 避免API限制
-                await asyncio.sleep(0.5)
-            
-            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录")
-            return stats
-            
-        except Exception as e:
-            logger.error(f"❌ BaoStock历史数据同步失败: {e}")
-            stats.errors.append(str(e))
-            return stats
-    
-    async def _sync_historical_batch(
-        self,
-        code_batch: List[str],
-        days: int,
-        end_date: str,
-        period: str = "daily",
-        incremental: bool = False
-    ) -> BaoStockSyncStats:
-        """同步历史数据批次"""
-        stats = BaoStockSyncStats()
-
-        for code in code_batch:
-            try:
+            # 流水线处理：拉取与批量写入重叠执行
+            # BaoStock 使用全局单连接（每次请求 login/logout），拉取只能串行
+            async def fetch(code: str):
                 # 确定该股票的起始日期
-                if incremental:
+                if use_incremental:
                     # 增量同步：获取该股票的最后日期
                     start_date = await self._get_last_sync_date(code)
                     logger.debug(f"📅 {code}: 从 {start_date} 开始同步")
@@ -434,62 +405,74 @@ class BaoStockSyncService:
                 else:
                     # 固定天数同步
                     start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
-
-                hist_data = await self.provider.get_historical_data(code, start_date, end_date, period)
-
-                if hist_data is not None and not hist_data.empty:
-                    # 更新数据库
-                    records_count = await self._update_historical_data(code, hist_data, period)
-                    stats.historical_records += records_count
-                else:
-                    stats.errors.append(f"获取{code}历史数据失败")
-
-            except Exception as e:
-                stats.errors.append(f"处理{code}历史数据失败: {e}")
-
-        return stats
-
-    async def _update_historical_data(self, code: str, hist_data, period: str = "daily") -> int:
-        """更新历史数据到数据库"""
-        try:
-            if hist_data is None or hist_data.empty:
-                logger.warning(f"⚠️ {code} 历史数据为空，跳过保存")
-                return 0
-
-            # 初始化历史数据服务
-            if self.historical_service is None:
-                self.historical_service = await get_historical_data_service()
-
-            # 保存到统一历史数据集合
-            saved_count = await self.historical_service.save_historical_data(
-                symbol=code,
-                data=hist_data,
-                data_source="baostock",
-                market="CN",
-                period=period
+                return await self.provider.get_historical_data(code, start_date, end_date, period)
+
+            async def on_progress(done: int, total: int, code: str):
+                if done % batch_size == 0 or done == total:
+                    logger.info(f"📊 批次进度: {done}/{total}, "
+                              f"记录: {pipeline.stats['total_records']}, "
+                              f"错误: {pipeline.stats['error_count'] + pipeline.stats['empty_count']}")
+
+            pipeline = PipelinedSyncEngine(
+                fetch=fetch,
+                save_batch=lambda frames: self._save_historical_batch(frames, period),
+                concurrency=1,
+                save_batch_size=batch_size,
+                acquire=self.rate_limiter.acquire,
+                on_progress=on_progress,
+                name=f"baostock_{period}",
             )
+            result = await pipeline.run(stock_codes)
 
-            # 同时更新market_quotes集合的元信息（保持兼容性）
-            if self.db is not None:
-                collection = self.db.market_quotes
-                latest_record = hist_data.iloc[-1] if not hist_data.empty else None
+            stats.historical_records += result["total_records"]
+            stats.errors.extend(f"处理{e['code']}历史数据失败: {e['error']}" for e in result["errors"])
+            stats.errors.extend(f"获取{code}历史数据失败" for code in result["empty_symbols"])
 
-                await collection.update_one(
+            logger.info(f"✅ BaoStock历史数据同步完成: {stats.historical_records}条记录")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"❌ BaoStock历史数据同步失败: {e}")
+            stats.errors.append(str(e))
+            return stats
+    
+    async def _save_historical_batch(self, frames, period: str = "daily") -> Dict[str, int]:
+        """批量保存多只股票的历史数据到数据库，返回每只股票的保存条数"""
+        # 初始化历史数据服务
+        if self.historical_service is None:
+            self.historical_service = await get_historical_data_service()
+
+        # 保存到统一历史数据集合
+        saved = await self.historical_service.save_historical_batch(
+            frames, data_source="baostock", market="CN", period=period
+        )
+
+        # 同时更新market_quotes集合的元信息（保持兼容性）
+        if self.db is not None:
+            from pymongo import UpdateOne
+
+            now = datetime.now()
+            operations = [
+                UpdateOne(
                     {"code": code},
                     {"$set": {
-                        "historical_data_updated": datetime.now(),
-                        "latest_historical_date": latest_record.get('date') if latest_record is not None else None,
-                        "historical_records_count": saved_count
+                        "historical_data_updated": now,
+                        "latest_historical_date": hist_data.iloc[-1].get('date'),
+                        "historical_records_count": saved.get(code, 0)
                     }},
                     upsert=True
                 )
+                for code, hist_data in frames
+                if hist_data is not None and not hist_data.empty
+            ]
+            if operations:
+                try:
+                    await self.db.market_quotes.bulk_write(operations, ordered=False)
+                except Exception as e:
+                    logger.error(f"❌ 更新历史数据元信息失败: {e}")
 
-            return saved_count
+        return saved
 
-        except Exception as e:
-            logger.error(f"❌ 更新历史数据到数据库失败: {e}")
-            return 0
-    
     async def _get_last_sync_date(self, symbol: str = None) -> str:
         """
         获取最后同步日期
@@ -12,9 +12,13 @@ from app.services.news_data_service import get_news_data_service
 from tradingagents.dataflows.providers.china.tushare import get_tushare_provider
 from tradingagents.dataflows.providers.china.akshare import get_akshare_provider
 from tradingagents.dataflows.news.realtime_news import RealtimeNewsAggregator
+from tradingagents.dataflows.news.near_dedup import filter_near_duplicates, get_news_dedup_index
 
 logger = logging.getLogger(__name__)
 
+# 入库去重使用独立的近似去重索引（不与分析时的 RealtimeNewsAggregator 共享）
+NEAR_DEDUP_NAMESPACE = "news_sync"
+
 
 @dataclass
 class NewsSyncStats:
@@ -160,13 +164,11 @@ class NewsDataSyncService:
                 stats.total_processed = len(all_news)
                 
                 # 去重处理
-                unique_news = self._deduplicate_news(all_news)
+                unique_news = self._deduplicate_news(all_news, symbol)
                 stats.duplicate_skipped = len(all_news) - len(unique_news)
                 
                 # 批量保存
-                saved_count = await news_service.save_news_data(
-                    unique_news, "multi_source", "CN"
-                )
+                saved_count = await self._save_unique_news(news_service, unique_news, "multi_source", symbol)
                 stats.successful_saves = saved_count
                 stats.failed_saves = len(unique_news) - saved_count
                 
@@ -416,8 +418,8 @@ class NewsDataSyncService:
         
         return keywords[:10]  # 最多返回10个关键词
     
-    def _deduplicate_news(self, news_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重新闻"""
+    def _deduplicate_news(self, news_list: List[Dict[str, Any]], symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """去重新闻：标题+URL 精确去重，再按 MinHash 近似去重"""
         seen = set()
         unique_news = []
         
@@ -427,8 +429,38 @@ class NewsDataSyncService:
             if key not in seen:
                 seen.add(key)
                 unique_news.append(news)
-        
-        return unique_news
+
+        # 近似去重（同步任务独立的索引，簇代表都是已入库的文章）：
+        # 之前已入库文章的转载稿不再重复入库
+        return filter_near_duplicates(
+            unique_news, symbol,
+            get_title=lambda news: news.get("title", ""),
+            get_content=lambda news: news.get("content", ""),
+            get_key=self._news_key,
+            drop_known=True,
+            namespace=NEAR_DEDUP_NAMESPACE,
+        )
+
+    @staticmethod
+    def _news_key(news: Dict[str, Any]) -> str:
+        return news.get("url") or (news.get("title") or "").lower().strip()
+
+    async def _save_unique_news(
+        self,
+        news_service,
+        unique_news: List[Dict[str, Any]],
+        data_source: str,
+        symbol: Optional[str] = None
+    ) -> int:
+        """保存去重后的新闻；保存失败的文章从近似去重索引中移除，之后的转载稿仍可入库"""
+        failed: List[int] = []
+        saved_count = await news_service.save_news_data(unique_news, data_source, "CN", failed_indexes=failed)
+        if failed:
+            removed = get_news_dedup_index(symbol, NEAR_DEDUP_NAMESPACE).discard(
+                self._news_key(unique_news[i]) for i in set(failed) if i < len(unique_news)
+            )
+            self.logger.warning(f"⚠️ {len(set(failed))}条新闻保存失败，已从近似去重索引移除 {removed} 条")
+        return saved_count
     
     async def sync_market_news(
         self,
@@ -489,9 +521,7 @@ class NewsDataSyncService:
                 stats.duplicate_skipped = len(all_news) - len(unique_news)
                 
                 # 批量保存
-                saved_count = await news_service.save_news_data(
-                    unique_news, "market_news", "CN"
-                )
+                saved_count = await self._save_unique_news(news_service, unique_news, "market_news")
                 stats.successful_saves = saved_count
                 stats.failed_saves = len(unique_news) - saved_count
                 
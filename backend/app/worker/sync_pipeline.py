@@ -0,0 +1,199 @@
+"""
+流水线式历史数据同步引擎
+
+各数据源同步服务原先逐只股票“拉取 → 保存”串行执行，网络和数据库从不同时忙碌。
+本模块把两步拆成两个阶段：
+
+- 拉取阶段：N 个并发拉取协程，每次请求前经过速率限制器（acquire 回调）
+- 保存阶段：单个写入协程，把已拉取的多只股票合并成一次批量写入
+- 两阶段之间使用有界队列：写入跟不上时拉取协程阻塞在 put 上（背压），内存占用有上限
+
+停止信号在派发每只股票前检查，收到后不再派发新股票，已在途的拉取照常保存后退出。
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 拉取函数：symbol -> DataFrame（None/空表示无数据）
+FetchFunc = Callable[[str], Awaitable[Optional[pd.DataFrame]]]
+# 批量保存函数：[(symbol, DataFrame)] -> {symbol: 保存条数}
+SaveBatchFunc = Callable[[List[Tuple[str, pd.DataFrame]]], Awaitable[Dict[str, int]]]
+# 进度回调：(已完成数, 总数, 最近完成的股票代码)
+ProgressFunc = Callable[[int, int, str], Awaitable[None]]
+
+_DONE = object()
+
+
+class PipelinedSyncEngine:
+    """拉取/保存流水线：有界并发拉取 + 批量写入 + 背压"""
+
+    def __init__(
+        self,
+        fetch: FetchFunc,
+        save_batch: SaveBatchFunc,
+        concurrency: int = 4,
+        save_batch_size: int = 20,
+        queue_size: Optional[int] = None,
+        acquire: Optional[Callable[[], Awaitable[Any]]] = None,
+        should_stop: Optional[Callable[[], Awaitable[bool]]] = None,
+        on_progress: Optional[ProgressFunc] = None,
+        name: str = "sync",
+    ):
+        """
+        Args:
+            fetch: 拉取单只股票数据
+            save_batch: 批量保存多只股票数据，返回每只股票的保存条数
+            concurrency: 同时在途的拉取请求数
+            save_batch_size: 每次写入最多合并的股票数
+            queue_size: 拉取与保存之间的队列容量（默认 2 * save_batch_size）
+            acquire: 每次拉取前调用（速率限制器的 acquire）
+            should_stop: 派发每只股票前调用，返回 True 时停止派发
+            on_progress: 每只股票处理完成（保存或失败）后调用
+            name: 日志名称
+        """
+        self.fetch = fetch
+        self.save_batch = save_batch
+        self.concurrency = max(1, int(concurrency))
+        self.save_batch_size = max(1, int(save_batch_size))
+        self.queue_size = queue_size or 2 * self.save_batch_size
+        self.acquire = acquire
+        self.should_stop = should_stop
+        self.on_progress = on_progress
+        self.name = name
+        # 当前（或最近一次）运行的统计信息，进度回调中可读取
+        self.stats: Dict[str, Any] = {}
+
+    async def run(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        """
+        同步一组股票
+
+        Returns:
+            统计信息：success_count、error_count、empty_count、total_records、
+            errors（[{code, error, error_type, context}]）、empty_symbols、stopped、
+            fetch_seconds（拉取累计耗时）、save_seconds（写入累计耗时）、save_batches、duration
+        """
+        symbols = list(symbols)
+        stats: Dict[str, Any] = {
+            "total": len(symbols),
+            "success_count": 0,
+            "error_count": 0,
+            "empty_count": 0,
+            "total_records": 0,
+            "errors": [],
+            "empty_symbols": [],
+            "stopped": False,
+            "fetch_seconds": 0.0,
+            "save_seconds": 0.0,
+            "save_batches": 0,
+        }
+        self.stats = stats
+        started = time.perf_counter()
+        pending = iter(symbols)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        done = 0
+
+        async def next_symbol() -> Optional[str]:
+            # 任一拉取协程观察到停止信号后，其余协程也不再派发
+            if stats["stopped"]:
+                return None
+            if self.should_stop is not None and await self.should_stop():
+                if not stats["stopped"]:
+                    logger.warning(f"⚠️ [{self.name}] 收到停止信号，不再派发新股票")
+                stats["stopped"] = True
+                return None
+            return next(pending, None)
+
+        async def fetcher():
+            while True:
+                symbol = await next_symbol()
+                if symbol is None:
+                    return
+                fetch_start = time.perf_counter()
+                try:
+                    if self.acquire is not None:
+                        await self.acquire()
+                    data = await self.fetch(symbol)
+                    item = (symbol, data, None)
+                except Exception as e:
+                    item = (symbol, None, e)
+                stats["fetch_seconds"] += time.perf_counter() - fetch_start
+                # 队列满时在此等待（背压）
+                await results.put(item)
+
+        async def report(symbol: str):
+            nonlocal done
+            done += 1
+            if self.on_progress is not None:
+                try:
+                    await self.on_progress(done, len(symbols), symbol)
+                except Exception as e:
+                    logger.warning(f"⚠️ [{self.name}] 进度回调失败: {e}")
+
+        async def flush(batch: List[Tuple[str, pd.DataFrame]]):
+            save_start = time.perf_counter()
+            try:
+                saved = await self.save_batch(batch)
+                error = None
+            except Exception as e:
+                saved, error = {}, e
+            stats["save_seconds"] += time.perf_counter() - save_start
+            stats["save_batches"] += 1
+            for symbol, _ in batch:
+                if error is not None:
+                    self._record_error(stats, symbol, error, "save")
+                else:
+                    stats["success_count"] += 1
+                    stats["total_records"] += int(saved.get(symbol, 0) or 0)
+                await report(symbol)
+
+        async def writer():
+            batch: List[Tuple[str, pd.DataFrame]] = []
+            while True:
+                item = await results.get()
+                if item is _DONE:
+                    break
+                symbol, data, error = item
+                if error is not None:
+                    self._record_error(stats, symbol, error, "fetch")
+                    await report(symbol)
+                elif data is None or data.empty:
+                    stats["empty_count"] += 1
+                    stats["empty_symbols"].append(symbol)
+                    await report(symbol)
+                else:
+                    batch.append((symbol, data))
+                # 批次已满或暂无更多已拉取的数据时写入：写入慢时批次自然变大，快时延迟更低
+                if batch and (len(batch) >= self.save_batch_size or results.empty()):
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+
+        writer_task = asyncio.create_task(writer())
+        fetchers = [asyncio.create_task(fetcher()) for _ in range(min(self.concurrency, len(symbols)) or 1)]
+        try:
+            await asyncio.gather(*fetchers)
+            await results.put(_DONE)
+            await writer_task
+        except BaseException:
+            for task in (*fetchers, writer_task):
+                task.cancel()
+            raise
+
+        stats["duration"] = time.perf_counter() - started
+        return stats
+
+    @staticmethod
+    def _record_error(stats: Dict[str, Any], symbol: str, error: Exception, stage: str):
+        stats["error_count"] += 1
+        stats["errors"].append({
+            "code": symbol,
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "context": stage,
+        })
@@ -7,13 +7,16 @@ from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional
 import logging
 
-from tradingagents.dataflows.providers.china.tushare import TushareProvider
+import pandas as pd
+
+from tradingagents.dataflows.providers.china.tushare import TushareProvider, apply_qfq_cross_section
 from app.services.stock_data_service import get_stock_data_service
 from app.services.historical_data_service import get_historical_data_service
 from app.services.news_data_service import get_news_data_service
 from app.core.database import get_mongo_db
 from app.core.config import settings
 from app.core.rate_limiter import get_tushare_rate_limiter
+from app.worker.sync_pipeline import PipelinedSyncEngine
 from app.utils.timezone import now_tz
 
 logger = logging.getLogger(__name__)
@@ -51,6 +54,14 @@ class TushareSyncService:
         self.rate_limit_delay = 0.1  # API调用间隔(秒) - 已弃用，使用rate_limiter
         self.max_retries = 3  # 最大重试次数
 
+        # 历史数据增量同步模式：by_date 按交易日横截面拉取全市场，per_symbol 逐只股票拉取
+        self.historical_sync_mode = str(getattr(settings, "TUSHARE_HISTORICAL_SYNC_MODE", "by_date")).lower()
+        # 横截面模式下缺口超过该交易日数的股票（新股、长期未同步）仍逐只同步
+        self.by_date_max_gap_days = int(getattr(settings, "TUSHARE_BY_DATE_MAX_GAP_DAYS", 30))
+        # 逐只同步历史数据的流水线参数：同时在途的拉取请求数、每次批量写入合并的股票数
+        self.fetch_concurrency = int(getattr(settings, "TUSHARE_SYNC_FETCH_CONCURRENCY", 4))
+        self.save_batch_size = int(getattr(settings, "SYNC_PIPELINE_SAVE_BATCH_SIZE", 20))
+
         # 速率限制器（从环境变量读取配置）
         tushare_tier = getattr(settings, "TUSHARE_TIER", "standard")  # free/basic/standard/premium/vip
         safety_margin = float(getattr(settings, "TUSHARE_RATE_LIMIT_SAFETY_MARGIN", "0.8"))
@@ -565,6 +576,11 @@ class TushareSyncService:
         Returns:
             同步结果统计
         """
+        # 全市场日线增量同步：按交易日横截面拉取
+        if (symbols is None and incremental and not all_history and not start_date
+                and period == "daily" and self.historical_sync_mode == "by_date"):
+            return await self.sync_historical_data_by_date(end_date=end_date, job_id=job_id)
+
         period_name = {"daily": "日线", "weekly": "周线", "monthly": "月线"}.get(period, period)
         logger.info(f"🔄 开始同步{period_name}历史数据...")
 
@@ -573,6 +589,7 @@ class TushareSyncService:
             "success_count": 0,
             "error_count": 0,
             "total_records": 0,
+            "api_calls": 0,
             "start_time": datetime.utcnow(),
             "errors": []
         }
@@ -580,31 +597,7 @@ class TushareSyncService:
         try:
             # 1. 获取股票列表（排除退市股票）
             if symbols is None:
-                # 查询所有A股股票（兼容不同的数据结构），排除退市股票
-                # 优先使用 market_info.market，降级到 category 字段
-                cursor = self.db.stock_basic_info.find(
-                    {
-                        "$and": [
-                            {
-                                "$or": [
-                                    {"market_info.market": "CN"},  # 新数据结构
-                                    {"category": "stock_cn"},      # 旧数据结构
-                                    {"market": {"$in": ["主板", "创业板", "科创板", "北交所"]}}  # 按市场类型
-                                ]
-                            },
-                            # 排除退市股票
-                            {
-                                "$or": [
-                                    {"status": {"$ne": "D"}},  # status 不是 D（退市）
-                                    {"status": {"$exists": False}}  # 或者 status 字段不存在
-                                ]
-                            }
-                        ]
-                    },
-                    {"code": 1}
-                )
-                symbols = [doc["code"] async for doc in cursor]
-                logger.info(f"📋 从 stock_basic_info 获取到 {len(symbols)} 只股票（已排除退市股票）")
+                symbols = await self._get_active_symbols()
 
             stats["total_processed"] = len(symbols)
 
@@ -624,108 +617,77 @@ class TushareSyncService:
 
             logger.info(f"📊 历史数据同步: 结束日期={end_date}, 股票数量={len(symbols)}, 模式={'增量' if incremental else '全量'}")
 
-            # 4. 批量处理
-            for i, symbol in enumerate(symbols):
-                # 记录单个股票开始时间
-                stock_start_time = datetime.now()
-
-                try:
-                    # 检查是否需要退出
-                    if job_id and await self._should_stop(job_id):
-                        logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
-                        stats["stopped"] = True
-                        break
-
-                    # 速率限制
-                    await self.rate_limiter.acquire()
-
-                    # 确定该股票的起始日期
-                    symbol_start_date = start_date
-                    if not symbol_start_date:
-                        if all_history:
-                            symbol_start_date = "1990-01-01"
-                        elif incremental:
-                            # 增量同步：获取该股票的最后日期
-                            symbol_start_date = await self._get_last_sync_date(symbol)
-                            logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
-                        else:
-                            symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-
-                    # 记录请求参数
-                    logger.debug(
-                        f"🔍 {symbol}: 请求{period_name}数据 "
-                        f"start={symbol_start_date}, end={end_date}, period={period}"
-                    )
-
-                    # ⏱️ 性能监控：API 调用
-                    api_start = datetime.now()
-                    df = await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period=period)
-                    api_duration = (datetime.now() - api_start).total_seconds()
-
-                    if df is not None and not df.empty:
-                        # ⏱️ 性能监控：数据保存
-                        save_start = datetime.now()
-                        records_saved = await self._save_historical_data(symbol, df, period=period)
-                        save_duration = (datetime.now() - save_start).total_seconds()
-
-                        stats["success_count"] += 1
-                        stats["total_records"] += records_saved
-
-                        # 计算单个股票耗时
-                        stock_duration = (datetime.now() - stock_start_time).total_seconds()
-                        logger.info(
-                            f"✅ {symbol}: 保存 {records_saved} 条{period_name}记录，"
-                            f"总耗时 {stock_duration:.2f}秒 "
-                            f"(API: {api_duration:.2f}秒, 保存: {save_duration:.2f}秒)"
-                        )
+            # 4. 流水线处理：并发拉取（受速率限制器约束）与批量写入重叠执行
+            async def fetch(symbol: str):
+                symbol_start_date = start_date
+                if not symbol_start_date:
+                    if all_history:
+                        symbol_start_date = "1990-01-01"
+                    elif incremental:
+                        # 增量同步：获取该股票的最后日期
+                        symbol_start_date = await self._get_last_sync_date(symbol)
+                        logger.debug(f"📅 {symbol}: 从 {symbol_start_date} 开始同步")
                     else:
-                        stock_duration = (datetime.now() - stock_start_time).total_seconds()
-                        logger.warning(
-                            f"⚠️ {symbol}: 无{period_name}数据 "
-                            f"(start={symbol_start_date}, end={end_date})，耗时 {stock_duration:.2f}秒"
-                        )
-
-                    # 每个股票都更新进度
-                    progress_percent = int(((i + 1) / len(symbols)) * 100)
-
-                    # 更新任务进度
-                    if job_id:
-                        await self._update_progress(
-                            job_id,
-                            progress_percent,
-                            f"正在同步 {symbol} ({i + 1}/{len(symbols)})"
-                        )
-
-                    # 每50个股票输出一次详细日志
-                    if (i + 1) % 50 == 0 or (i + 1) == len(symbols):
-                        logger.info(f"📈 {period_name}数据同步进度: {i + 1}/{len(symbols)} ({progress_percent}%) "
-                                   f"(成功: {stats['success_count']}, 记录: {stats['total_records']})")
+                        symbol_start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
 
-                        # 输出速率限制器统计
-                        limiter_stats = self.rate_limiter.get_stats()
-                        logger.info(f"   速率限制: {limiter_stats['current_calls']}/{limiter_stats['max_calls']}次, "
-                                   f"等待次数: {limiter_stats['total_waits']}, "
-                                   f"总等待时间: {limiter_stats['total_wait_time']:.1f}秒")
+                logger.debug(
+                    f"🔍 {symbol}: 请求{period_name}数据 "
+                    f"start={symbol_start_date}, end={end_date}, period={period}"
+                )
+                stats["api_calls"] += 1
+                return await self.provider.get_historical_data(symbol, symbol_start_date, end_date, period=period)
+
+            async def save_batch(frames):
+                if self.historical_service is None:
+                    self.historical_service = await get_historical_data_service()
+                return await self.historical_service.save_historical_batch(
+                    frames, data_source="tushare", market="CN", period=period
+                )
 
-                except Exception as e:
-                    import traceback
-                    error_details = traceback.format_exc()
-                    stats["error_count"] += 1
-                    stats["errors"].append({
-                        "code": symbol,
-                        "error": str(e),
-                        "error_type": type(e).__name__,
-                        "context": f"sync_historical_data_{period}",
-                        "traceback": error_details
-                    })
-                    logger.error(
-                        f"❌ {symbol} {period_name}数据同步失败\n"
-                        f"   参数: start={symbol_start_date if 'symbol_start_date' in locals() else 'N/A'}, "
-                        f"end={end_date}, period={period}\n"
-                        f"   错误类型: {type(e).__name__}\n"
-                        f"   错误信息: {str(e)}\n"
-                        f"   堆栈跟踪:\n{error_details}"
-                    )
+            async def on_progress(done: int, total: int, symbol: str):
+                progress_percent = int(done / total * 100)
+
+                # 更新任务进度
+                if job_id:
+                    await self._update_progress(job_id, progress_percent, f"正在同步 {symbol} ({done}/{total})")
+
+                # 每50个股票输出一次详细日志
+                if done % 50 == 0 or done == total:
+                    logger.info(f"📈 {period_name}数据同步进度: {done}/{total} ({progress_percent}%) "
+                               f"(成功: {pipeline.stats['success_count']}, 记录: {pipeline.stats['total_records']})")
+
+                    # 输出速率限制器统计
+                    limiter_stats = self.rate_limiter.get_stats()
+                    logger.info(f"   速率限制: {limiter_stats['current_calls']}/{limiter_stats['max_calls']}次, "
+                               f"等待次数: {limiter_stats['total_waits']}, "
+                               f"总等待时间: {limiter_stats['total_wait_time']:.1f}秒")
+
+            pipeline = PipelinedSyncEngine(
+                fetch=fetch,
+                save_batch=save_batch,
+                concurrency=self.fetch_concurrency,
+                save_batch_size=self.save_batch_size,
+                acquire=self.rate_limiter.acquire,
+                should_stop=(lambda: self._should_stop(job_id)) if job_id else None,
+                on_progress=on_progress,
+                name=f"tushare_{period}",
+            )
+            result = await pipeline.run(symbols)
+
+            stats["success_count"] = result["success_count"]
+            stats["error_count"] = result["error_count"]
+            stats["total_records"] = result["total_records"]
+            for error in result["errors"]:
+                error["context"] = f"sync_historical_data_{period}:{error['context']}"
+                logger.error(f"❌ {error['code']} {period_name}数据同步失败: {error['error_type']}: {error['error']}")
+            stats["errors"].extend(result["errors"])
+            if result["empty_symbols"]:
+                logger.warning(f"⚠️ {len(result['empty_symbols'])} 只股票无{period_name}数据 (end={end_date})")
+            if result["stopped"]:
+                logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，已退出")
+                stats["stopped"] = True
+            logger.info(f"⏱️ 拉取累计 {result['fetch_seconds']:.1f}秒, 写入累计 {result['save_seconds']:.1f}秒 "
+                       f"({result['save_batches']} 批), 实际耗时 {result['duration']:.1f}秒")
 
             # 4. 完成统计
             stats["end_time"] = datetime.utcnow()
@@ -756,26 +718,189 @@ class TushareSyncService:
             })
             return stats
 
-    async def _save_historical_data(self, symbol: str, df, period: str = "daily") -> int:
-        """保存历史数据到数据库"""
+    async def sync_historical_data_by_date(self, end_date: str = None, job_id: str = None) -> Dict[str, Any]:
+        """
+        按交易日横截面增量同步全市场日线
+
+        一次聚合查询得到每只股票的最后同步日期，对缺失的每个交易日调用一次
+        daily(trade_date=...) 拉取全市场数据，并用当日与区间末日的复权因子换算为前复权价格
+        （与逐只股票 pro_bar(adj='qfq') 的结果一致），再跨股票合并成大批量写入。
+        缺口超过 by_date_max_gap_days 个交易日的股票（新股、长期未同步）仍逐只同步。
+
+        Returns:
+            同步结果统计（额外包含 api_calls、api_calls_saved、symbols_per_second）
+        """
+        logger.info("🔄 开始按交易日横截面同步日线历史数据...")
+
+        stats = {
+            "mode": "by_date",
+            "total_processed": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "total_records": 0,
+            "trade_dates": 0,
+            "api_calls": 0,
+            "start_time": datetime.utcnow(),
+            "errors": []
+        }
+
         try:
             if self.historical_service is None:
                 self.historical_service = await get_historical_data_service()
 
-            # 使用统一历史数据服务保存（指定周期）
-            saved_count = await self.historical_service.save_historical_data(
-                symbol=symbol,
-                data=df,
-                data_source="tushare",
-                market="CN",
-                period=period
+            # 1. 股票列表和交易日历
+            symbols = await self._get_active_symbols()
+            stats["total_processed"] = len(symbols)
+
+            if not end_date:
+                end_date = datetime.now().strftime('%Y-%m-%d')
+            lookback_start = (datetime.strptime(end_date, '%Y-%m-%d')
+                              - timedelta(days=self.by_date_max_gap_days * 2 + 15)).strftime('%Y-%m-%d')
+            await self.rate_limiter.acquire()
+            stats["api_calls"] += 1
+            calendar = await self.provider.get_trade_dates(lookback_start, end_date)
+            if not calendar:
+                raise RuntimeError(f"无法获取交易日历: {lookback_start}~{end_date}")
+
+            # 2. 一次聚合得到全市场最后同步日期，划分横截面股票和逐只同步股票
+            latest_dates = await self.historical_service.get_latest_dates("tushare", period="daily")
+            gap_floor = calendar[max(0, len(calendar) - self.by_date_max_gap_days - 1)]
+            pending: Dict[str, str] = {}
+            per_symbol: List[str] = []
+            for symbol in symbols:
+                last = latest_dates.get(symbol)
+                if last is None or last < gap_floor:
+                    per_symbol.append(symbol)
+                elif last < calendar[-1]:
+                    pending[symbol] = last
+
+            missing_dates = [d for d in calendar if any(last < d for last in pending.values())] if pending else []
+            stats["trade_dates"] = len(missing_dates)
+            logger.info(
+                f"📊 横截面同步: 股票 {len(symbols)} 只，待补 {len(pending)} 只 / {len(missing_dates)} 个交易日，"
+                f"已最新 {len(symbols) - len(pending) - len(per_symbol)} 只，逐只同步 {len(per_symbol)} 只"
             )
 
-            return saved_count
+            # 3. 从最近的交易日往前拉取：最近一日的复权因子作为前复权基准
+            anchor_factors: Optional[pd.Series] = None
+            synced_symbols = set()
+            for i, trade_date in enumerate(reversed(missing_dates)):
+                if job_id and await self._should_stop(job_id):
+                    logger.warning(f"⚠️ 任务 {job_id} 收到停止信号，正在退出...")
+                    stats["stopped"] = True
+                    break
+
+                try:
+                    await self.rate_limiter.acquire()
+                    stats["api_calls"] += 1
+                    daily = await self.provider.get_daily_by_trade_date(trade_date)
+                    await self.rate_limiter.acquire()
+                    stats["api_calls"] += 1
+                    factors = await self.provider.get_adj_factors_by_trade_date(trade_date)
+
+                    if factors is not None:
+                        anchor_factors = factors if anchor_factors is None else anchor_factors.combine_first(factors)
+                    if daily is None or daily.empty:
+                        logger.warning(f"⚠️ {trade_date}: 无全市场日线数据")
+                        continue
+
+                    if factors is not None:
+                        daily = apply_qfq_cross_section(daily, factors, anchor_factors)
+                    daily = daily.rename(columns={'vol': 'volume'})
+                    daily['code'] = daily['ts_code'].str.split('.').str[0]
+                    daily = daily[daily['code'].map(lambda c, day=trade_date: c in pending and pending[c] < day)]
+
+                    records = await self.historical_service.save_cross_section_data(
+                        daily, data_source="tushare", market="CN", period="daily"
+                    )
+                    stats["total_records"] += records
+                    synced_symbols.update(daily['code'])
+                    logger.info(f"✅ {trade_date}: 保存 {records} 条日线记录（{len(daily)} 只股票）")
+
+                except Exception as e:
+                    stats["error_count"] += 1
+                    stats["errors"].append({
+                        "trade_date": trade_date,
+                        "error": str(e),
+                        "error_type": type(e).__name__,
+                        "context": "sync_historical_data_by_date",
+                    })
+                    logger.error(f"❌ {trade_date} 横截面日线同步失败: {e}")
+
+                if job_id:
+                    await self._update_progress(
+                        job_id,
+                        int((i + 1) / max(len(missing_dates), 1) * (80 if per_symbol else 100)),
+                        f"正在同步交易日 {trade_date} ({i + 1}/{len(missing_dates)})"
+                    )
+
+            stats["success_count"] = len(synced_symbols)
+            by_date_calls = stats["api_calls"]
+
+            # 4. 缺口过大的股票逐只同步
+            if per_symbol and not stats.get("stopped"):
+                fallback = await self.sync_historical_data(
+                    symbols=per_symbol, incremental=True, period="daily", job_id=job_id
+                )
+                stats["success_count"] += fallback.get("success_count", 0)
+                stats["error_count"] += fallback.get("error_count", 0)
+                stats["total_records"] += fallback.get("total_records", 0)
+                stats["errors"].extend(fallback.get("errors", []))
+                stats["api_calls"] += fallback.get("api_calls", 0)
+
+            # 5. 完成统计：逐只同步时每只股票一次 pro_bar(qfq)，即 daily + adj_factor 两次调用
+            stats["end_time"] = datetime.utcnow()
+            stats["duration"] = (stats["end_time"] - stats["start_time"]).total_seconds()
+            stats["api_calls_saved"] = max(0, 2 * (len(symbols) - len(per_symbol)) - by_date_calls)
+            stats["symbols_per_second"] = round(len(symbols) / stats["duration"], 2) if stats["duration"] > 0 else None
+
+            logger.info(
+                f"✅ 横截面日线同步完成: 股票 {len(symbols)} 只，记录 {stats['total_records']} 条，"
+                f"API调用 {stats['api_calls']} 次（节省 {stats['api_calls_saved']} 次），"
+                f"{stats['symbols_per_second']} 只/秒，耗时 {stats['duration']:.2f} 秒"
+            )
+            return stats
 
         except Exception as e:
-            logger.error(f"❌ 保存{period}数据失败 {symbol}: {e}")
-            return 0
+            import traceback
+            error_details = traceback.format_exc()
+            logger.error(f"❌ 横截面日线同步失败: {e}\n{error_details}")
+            stats["errors"].append({
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "context": "sync_historical_data_by_date",
+                "traceback": error_details
+            })
+            return stats
+
+    async def _get_active_symbols(self) -> List[str]:
+        """获取需要同步的A股代码列表（排除退市股票）"""
+        # 查询所有A股股票（兼容不同的数据结构），排除退市股票
+        # 优先使用 market_info.market，降级到 category 字段
+        cursor = self.db.stock_basic_info.find(
+            {
+                "$and": [
+                    {
+                        "$or": [
+                            {"market_info.market": "CN"},  # 新数据结构
+                            {"category": "stock_cn"},      # 旧数据结构
+                            {"market": {"$in": ["主板", "创业板", "科创板", "北交所"]}}  # 按市场类型
+                        ]
+                    },
+                    # 排除退市股票
+                    {
+                        "$or": [
+                            {"status": {"$ne": "D"}},  # status 不是 D（退市）
+                            {"status": {"$exists": False}}  # 或者 status 字段不存在
+                        ]
+                    }
+                ]
+            },
+            {"code": 1}
+        )
+        symbols = [doc["code"] async for doc in cursor]
+        logger.info(f"📋 从 stock_basic_info 获取到 {len(symbols)} 只股票（已排除退市股票）")
+        return symbols
 
     async def _get_last_sync_date(self, symbol: str = None) -> str:
         """
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+数据库缓存编解码基准测试
+
+对比 DatabaseCacheManager 旧 JSON 格式与 Arrow IPC（zstd/lz4）负载的
+编码/解码耗时和每条缓存的字节数。旧格式按实际存储方式计算：
+to_json(records) 后再包一层 json.dumps（Redis），读取时 json.loads + read_json。
+
+用法:
+    python scripts/benchmark_db_cache_codecs.py [--bars 1250] [--rounds 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from tradingagents.dataflows.cache.codecs import decode_payload, encode_payload, get_codec  # noqa: E402
+
+
+def make_kline(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = np.round(10 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars))), 2)
+    return pd.DataFrame({
+        "date": pd.bdate_range("2020-01-01", periods=n_bars),
+        "code": ["000001"] * n_bars,
+        "open": np.round(close * (1 + rng.normal(0, 0.01, n_bars)), 2),
+        "high": np.round(close * 1.02, 2),
+        "low": np.round(close * 0.98, 2),
+        "close": close,
+        "volume": rng.integers(100_000, 10_000_000, n_bars),
+        "amount": np.round(rng.uniform(1e6, 1e9, n_bars), 2),
+        "pct_chg": np.round(rng.normal(0, 2, n_bars), 2),
+    })
+
+
+def bench(codec_name: str, df: pd.DataFrame, rounds: int):
+    codec = get_codec(codec_name)
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        payload, data_format = encode_payload(df, codec)
+        if codec_name == "json":
+            payload = json.dumps({"data": payload, "data_format": data_format}, ensure_ascii=False)
+    encode_ms = (time.perf_counter() - t0) / rounds * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        if codec_name == "json":
+            wrapper = json.loads(payload)
+            decode_payload(wrapper["data"], wrapper["data_format"])
+        else:
+            decode_payload(payload)
+    decode_ms = (time.perf_counter() - t0) / rounds * 1000
+
+    size = len(payload.encode("utf-8")) if isinstance(payload, str) else len(payload)
+    return encode_ms, decode_ms, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, default=1250, help="K线根数（默认约5年日线）")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    df = make_kline(args.bars)
+    print(f"数据: {args.bars} 根K线 × {len(df.columns)} 列")
+    print(f"{'codec':<12}{'encode(ms)':>12}{'decode(ms)':>12}{'bytes':>12}")
+    for name in ("json", "arrow-zstd", "arrow-lz4"):
+        if get_codec(name).name != name:
+            print(f"{name:<12}{'不可用':>12}")
+            continue
+        encode_ms, decode_ms, size = bench(name, df, args.rounds)
+        print(f"{name:<12}{encode_ms:>12.2f}{decode_ms:>12.2f}{size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+TradingAgentsGraph 引擎池基准测试
+
+对比 N 个同配置分析任务获取引擎的开销：
+- 旧方式：每个任务新建 TradingAgentsGraph（LLM 客户端、五个记忆集合、工具节点、编译图）
+- 新方式：GraphEnginePool.acquire，同一配置只构建一次，后续任务共享
+
+只测量引擎准备阶段，不调用 LLM（使用占位 API Key，构建过程不发起网络请求）。
+
+用法:
+    python scripts/benchmark_graph_engine_pool.py [--tasks 10] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("EMBEDDING_CACHE_PERSIST", "false")
+
+from tradingagents.default_config import DEFAULT_CONFIG  # noqa: E402
+from tradingagents.graph.engine_pool import GraphEnginePool  # noqa: E402
+from tradingagents.graph.trading_graph import TradingAgentsGraph  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    config = dict(
+        DEFAULT_CONFIG, llm_provider="openai", backend_url="https://api.openai.com/v1",
+        deep_think_llm="gpt-4o", quick_think_llm="gpt-4o-mini", memory_enabled=True,
+        selected_analysts=["market", "fundamentals"],
+    )
+
+    def build_new(_):
+        return TradingAgentsGraph(selected_analysts=config["selected_analysts"], config=config)
+
+    pool = GraphEnginePool(max_size=4)
+
+    def acquire(_):
+        return pool.acquire(config)[0]
+
+    print(f"{args.tasks} 个同配置任务，{args.threads} 个线程并发获取引擎")
+    print(f"{'方式':<10} | {'总耗时':>8} | {'构建次数':>6}")
+    for label, fn in (("每任务新建", build_new), ("引擎池", acquire)):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as executor:
+            engines = list(executor.map(fn, range(args.tasks)))
+        seconds = time.perf_counter() - started
+        print(f"{label:<8} | {seconds:>7.2f}s | {len({id(e) for e in engines}):>6}")
+    print(f"引擎池命中率: {pool.snapshot()['pool_hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
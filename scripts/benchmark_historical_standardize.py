@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+历史数据标准化基准测试
+
+对比 save_historical_data 写库前的两种标准化方式（不连接数据库）：
+- 旧方式：iterrows() 逐行调用 _standardize_record（每行 _format_date/_safe_float）
+- 新方式：_standardize_frame 按列完成日期格式化和数值转换，再一次性生成文档
+
+两者都包含构建 ReplaceOne 操作的开销；旧方式超过 --legacy-max-rows 行时按 10k 行耗时线性估算。
+
+用法:
+    python scripts/benchmark_historical_standardize.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from pymongo import ReplaceOne  # noqa: E402
+
+from app.services.historical_data_service import HistoricalDataService  # noqa: E402
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    """Tushare 日线格式（全历史回填的数据量；100万行超出日历范围，日期按小时递增后取日期部分）"""
+    rng = np.random.default_rng(0)
+    close = 10 + rng.random(rows).cumsum() * 0.01
+    unit = "D" if rows <= 50_000 else "h"
+    dates = pd.Timestamp("1900-01-01") + pd.to_timedelta(np.arange(rows), unit=unit)
+    return pd.DataFrame({
+        "ts_code": "000001.SZ",
+        "trade_date": dates.strftime("%Y%m%d"),
+        "open": close * 0.99, "high": close * 1.01, "low": close * 0.98, "close": close,
+        "pre_close": np.r_[close[0], close[:-1]],
+        "change": rng.normal(size=rows), "pct_chg": rng.normal(size=rows),
+        "vol": rng.random(rows) * 1e5, "amount": rng.random(rows) * 1e6,
+    })
+
+
+def legacy(svc, data):
+    ops = []
+    for date_index, row in data.iterrows():
+        doc = svc._standardize_record("000001", row, "tushare", "CN", "daily", date_index)
+        ops.append(ReplaceOne(
+            {"symbol": doc["symbol"], "trade_date": doc["trade_date"],
+             "data_source": doc["data_source"], "period": doc["period"]},
+            doc, upsert=True,
+        ))
+    return ops
+
+
+def vectorized(svc, data):
+    return svc._build_operations("000001", data, "tushare", "CN", "daily")
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    svc = HistoricalDataService()
+    legacy_per_row = None
+    print(f"{'行数':>10} | {'旧方式(秒)':>12} | {'新方式(秒)':>10} | {'加速比':>6} | 新方式 行/秒")
+    for rows in args.rows:
+        data = make_frame(rows)
+        if rows <= args.legacy_max_rows:
+            legacy_seconds, legacy_ops = timed(legacy, svc, data)
+            legacy_per_row = legacy_seconds / rows
+            estimated = ""
+        else:
+            legacy_seconds, legacy_ops = (legacy_per_row or 0) * rows, None
+            estimated = "≈"
+        new_seconds, new_ops = timed(vectorized, svc, data)
+        assert len(new_ops) == rows and (legacy_ops is None or len(legacy_ops) == rows)
+        print(f"{rows:>10,} | {estimated:>1}{legacy_seconds:>11.2f} | {new_seconds:>10.2f} | "
+              f"{legacy_seconds / new_seconds:>5.1f}x | {rows / new_seconds:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
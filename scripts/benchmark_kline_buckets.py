@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+K线分桶布局基准测试
+
+对比两种存储布局读取一只股票多年日线的开销：
+- 逐条布局：stock_daily_quotes，每根K线一个文档，读取后 pd.DataFrame(list_of_dicts)
+- 分桶布局：stock_daily_quotes_buckets，每年一个文档，列以二进制数组存储，np.frombuffer 解码
+
+离线部分（默认）：用 bson 编码/解码模拟驱动的网络负载和解码开销，并估算索引条目数。
+在线部分（--mongo-uri）：写入临时数据库，建立与服务相同的索引，报告 collStats 和查询耗时，结束后删除。
+
+用法:
+    python scripts/benchmark_kline_buckets.py [--years 10] [--symbols 50] [--mongo-uri mongodb://localhost:27017]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import bson  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from tradingagents.dataflows.cache.kline_buckets import BUCKET_COLLECTION, build_buckets, buckets_to_frame  # noqa: E402
+
+# 逐条布局在服务中的索引：唯一键、symbol、trade_date、symbol+trade_date（另有 _id）
+ROW_INDEXES = 5
+# 分桶布局：_id（桶键）+ symbol/period/data_source/year
+BUCKET_INDEXES = 2
+
+
+def make_docs(symbol: str, years: int, seed: int):
+    """与 HistoricalDataService 标准化后字段一致的逐条文档"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2024-12-31", periods=years * 244).strftime("%Y-%m-%d")
+    close = 10 + rng.normal(size=len(dates)).cumsum() * 0.1
+    docs = []
+    for i, d in enumerate(dates):
+        c = float(close[i])
+        docs.append({
+            "symbol": symbol, "code": symbol, "full_symbol": f"{symbol}.SZ", "market": "CN",
+            "trade_date": d, "period": "daily", "data_source": "tushare",
+            "created_at": pd.Timestamp("2025-01-01").to_pydatetime(),
+            "updated_at": pd.Timestamp("2025-01-01").to_pydatetime(), "version": 1,
+            "open": c * 0.99, "high": c * 1.01, "low": c * 0.98, "close": c, "pre_close": c,
+            "volume": float(rng.integers(1e5, 1e7)), "amount": float(rng.random() * 1e8),
+            "change": float(rng.normal()), "pct_chg": float(rng.normal()),
+        })
+    return docs
+
+
+def best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def offline(args):
+    docs = make_docs("000001", args.years, 0)
+    buckets = build_buckets(docs)
+    row_bytes = [bson.encode(d) for d in docs]
+    bucket_bytes = [bson.encode(b) for b in buckets]
+    row_payload, bucket_payload = b"".join(row_bytes), b"".join(bucket_bytes)
+
+    row_seconds, row_frame = best_of(lambda: pd.DataFrame(bson.decode_all(row_payload)))
+    bucket_seconds, bucket_frame = best_of(lambda: buckets_to_frame(bson.decode_all(bucket_payload)))
+    assert row_frame["trade_date"].tolist() == bucket_frame["trade_date"].tolist()
+    assert np.allclose(row_frame["close"], bucket_frame["close"])
+
+    print(f"单只股票 {args.years} 年日线（{len(docs)} 根K线）")
+    print(f"{'布局':<6} | {'文档数':>6} | {'BSON 大小':>10} | {'解码+建表':>10}")
+    print(f"{'逐条':<6} | {len(row_bytes):>6} | {len(row_payload) / 1024:>8.0f}KB | {row_seconds * 1000:>8.1f}ms")
+    print(f"{'分桶':<6} | {len(bucket_bytes):>6} | {len(bucket_payload) / 1024:>8.0f}KB | {bucket_seconds * 1000:>8.1f}ms")
+    print(f"读取加速 {row_seconds / bucket_seconds:.1f}x，网络负载 {len(row_payload) / len(bucket_payload):.1f}x 更小")
+
+    rows_total = len(docs) * args.symbols
+    buckets_total = len(buckets) * args.symbols
+    print(f"\n{args.symbols} 只股票的索引条目数：逐条 {rows_total * ROW_INDEXES:,}（{ROW_INDEXES} 个索引 × {rows_total:,} 文档），"
+          f"分桶 {buckets_total * BUCKET_INDEXES:,}（{BUCKET_INDEXES} 个索引 × {buckets_total:,} 文档）")
+
+
+def online(args):
+    from pymongo import MongoClient
+
+    client = MongoClient(args.mongo_uri)
+    db = client[args.database]
+    rows, bucket_coll = db["stock_daily_quotes"], db[BUCKET_COLLECTION]
+    try:
+        rows.create_index([("symbol", 1), ("trade_date", 1), ("data_source", 1), ("period", 1)], unique=True)
+        rows.create_index([("symbol", 1)])
+        rows.create_index([("trade_date", -1)])
+        rows.create_index([("symbol", 1), ("trade_date", -1)])
+        bucket_coll.create_index([("symbol", 1), ("period", 1), ("data_source", 1), ("year", 1)])
+
+        for i in range(args.symbols):
+            docs = make_docs(f"{i:06d}", args.years, i)
+            rows.insert_many(docs)
+            bucket_coll.insert_many(build_buckets(docs))
+
+        for name in ("stock_daily_quotes", BUCKET_COLLECTION):
+            stats = db.command("collStats", name)
+            print(f"📊 {name}: 文档 {stats['count']:,}, 数据 {stats['size'] / 2**20:.1f}MB, "
+                  f"存储 {stats['storageSize'] / 2**20:.1f}MB, 索引 {stats['totalIndexSize'] / 2**20:.1f}MB")
+
+        query = {"symbol": "000001", "period": "daily", "data_source": "tushare"}
+        row_seconds, _ = best_of(lambda: pd.DataFrame(list(rows.find(
+            {**query, "trade_date": {"$gte": "2015-01-01"}}, {"_id": 0}).sort("trade_date", 1))))
+        bucket_seconds, _ = best_of(lambda: buckets_to_frame(list(bucket_coll.find(
+            {**query, "year": {"$gte": 2015}}))))
+        print(f"查询 000001 全部日线：逐条 {row_seconds * 1000:.1f}ms，分桶 {bucket_seconds * 1000:.1f}ms，"
+              f"加速 {row_seconds / bucket_seconds:.1f}x")
+    finally:
+        client.drop_database(args.database)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--symbols", type=int, default=50, help="索引估算与在线测试写入的股票数")
+    parser.add_argument("--mongo-uri", default=None, help="提供时在该 MongoDB 的临时数据库中实测")
+    parser.add_argument("--database", default="benchmark_kline_buckets")
+    args = parser.parse_args()
+
+    offline(args)
+    if args.mongo_uri:
+        print()
+        online(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+FinancialSituationMemory embedding 缓存与批量请求基准测试
+
+模拟一次完整分析中五个记忆实例（bull/bear/trader/judge/risk）的调用：
+- 查询阶段：每个实例对当前情况调用一次 get_memories
+- 反思阶段：每个实例写入同一情况（add_situations）
+- 初始化阶段：一次写入 N 条历史情况
+
+embedding 服务用固定延迟模拟（单次请求 --latency 秒 + 每条文本 --per-text 秒），
+对比逐条请求、无共享缓存（旧实现）与批量 + 共享缓存（新实现）的请求数与耗时。
+
+用法:
+    python scripts/benchmark_memory_embeddings.py [--situations 50] [--latency 0.15]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("EMBEDDING_CACHE_PERSIST", "false")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from tradingagents.agents.utils.memory import FinancialSituationMemory  # noqa: E402
+
+MEMORIES = ["bull_memory", "bear_memory", "trader_memory", "invest_judge_memory", "risk_manager_memory"]
+
+
+class SimulatedEmbeddings:
+    def __init__(self, latency: float, per_text: float):
+        self.latency = latency
+        self.per_text = per_text
+        self.requests = 0
+
+    def create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.requests += 1
+        time.sleep(self.latency + self.per_text * len(texts))
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=[float(hash(t) % 997), float(len(t)), 1.0]) for i, t in enumerate(texts)
+        ])
+
+
+def run(service, situations, current, per_text_calls: bool):
+    memories = []
+    for name in MEMORIES:
+        memory = FinancialSituationMemory(f"{name}_{uuid.uuid4().hex[:8]}",
+                                          {"llm_provider": "openai", "backend_url": "http://embedding.local/v1"})
+        memory.client = SimpleNamespace(embeddings=service)
+        if per_text_calls:
+            # 旧实现：逐条请求、实例间不共享
+            memory.get_embeddings = lambda texts, m=memory: [m._embed_single(t) for t in texts]
+        memories.append(memory)
+
+    started = time.perf_counter()
+    memories[0].add_situations(situations)
+    for memory in memories:
+        memory.get_memories(current, n_matches=2)
+    for memory in memories:
+        memory.add_situations([(current, "reflection")])
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--situations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.15, help="单次请求固定延迟（秒）")
+    parser.add_argument("--per-text", type=float, default=0.002, help="每条文本的额外延迟（秒）")
+    args = parser.parse_args()
+
+    situations = [(f"历史市场情况 {i}：利率、通胀与行业轮动描述", f"建议 {i}") for i in range(args.situations)]
+    current = "当前市场：科技板块波动加大，机构减仓，利率上行压制成长股估值"
+
+    print(f"{len(MEMORIES)} 个记忆实例，初始化写入 {args.situations} 条情况，查询 + 反思各 {len(MEMORIES)} 次")
+    print(f"{'方式':<14} | {'请求数':>6} | {'耗时':>8}")
+    for label, per_text_calls in (("逐条、不共享", True), ("批量 + 共享缓存", False)):
+        service = SimulatedEmbeddings(args.latency, args.per_text)
+        seconds = run(service, situations, current, per_text_calls)
+        print(f"{label:<12} | {service.requests:>6} | {seconds:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
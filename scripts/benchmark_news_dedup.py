@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+新闻近似去重基准测试
+
+构造 10 万篇合成中文财经新闻（约 4 万个原始报道 + 转载稿：加来源前缀、改标点、替换个别字、
+正文附加来源说明），逐篇加入 NearDuplicateIndex，统计：
+
+- 吞吐与单篇耗时：按索引规模分段统计，LSH 只比较同桶候选，单篇耗时不随索引规模线性增长
+- 候选数：每篇平均需要精确比较的已有文章数
+- 准确性：以合成数据的真实簇为准，统计近似去重与标题精确去重的查准率/查全率
+- 对照：暴力比较（新文章与全部已有签名比较）在不同索引规模下的单篇耗时
+
+用法:
+    python scripts/benchmark_news_dedup.py [--articles 100000] [--stories 40000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from tradingagents.dataflows.news.near_dedup import NearDuplicateIndex  # noqa: E402
+
+PREFIXES = ["【财联社】", "【证券时报】", "快讯：", "重磅！", "【上海证券报】"]
+PUNCT = ["，", "：", " ", "！", "、"]
+
+
+def make_corpus(articles: int, stories: int, seed: int = 0):
+    """返回打乱顺序的 [(key, title, content, story_id)]，同一报道中最先出现的一篇视为原稿"""
+    rng = np.random.default_rng(seed)
+    chars = np.array([chr(c) for c in range(0x4E00, 0x4E00 + 3000)])
+
+    def text(n):
+        return "".join(rng.choice(chars, n))
+
+    originals = [(text(int(rng.integers(12, 24))), text(int(rng.integers(120, 300)))) for _ in range(stories)]
+    corpus = [(f"s{i}-0", title, content, i) for i, (title, content) in enumerate(originals)]
+
+    for n in range(articles - stories):
+        story = int(rng.integers(0, stories))
+        title, content = originals[story]
+        title = list(title)
+        for _ in range(2):  # 替换两个字
+            title[int(rng.integers(0, len(title)))] = str(rng.choice(chars))
+        title.insert(int(rng.integers(1, len(title))), str(rng.choice(PUNCT)))
+        title = str(rng.choice(PREFIXES)) + "".join(title)
+        content = content + "（来源：" + str(rng.choice(PREFIXES)).strip("【】：！") + "）"
+        corpus.append((f"s{story}-{n + 1}", title, content, story))
+
+    order = rng.permutation(len(corpus))
+    return [corpus[i] for i in order]
+
+
+def run_lsh(corpus, segments):
+    index = NearDuplicateIndex(max_items=len(corpus) + 1, ttl_seconds=None)
+    seen_stories, decisions, timings = set(), [], []
+    segment_start, segment_size = time.perf_counter(), len(corpus) // segments
+    started = segment_start
+    for pos, (key, title, content, story) in enumerate(corpus):
+        _, is_new = index.assign(key, title, content)
+        decisions.append((not is_new, story in seen_stories))
+        seen_stories.add(story)
+        if (pos + 1) % segment_size == 0:
+            now = time.perf_counter()
+            timings.append((pos + 1, (now - segment_start) / segment_size))
+            segment_start = now
+    return time.perf_counter() - started, decisions, timings, index
+
+
+def run_exact(corpus):
+    seen_titles, seen_stories, decisions = set(), set(), []
+    for _, title, _, story in corpus:
+        key = title.lower().strip()
+        decisions.append((key in seen_titles, story in seen_stories))
+        seen_titles.add(key)
+        seen_stories.add(story)
+    return decisions
+
+
+def precision_recall(decisions):
+    tp = sum(1 for predicted, actual in decisions if predicted and actual)
+    fp = sum(1 for predicted, actual in decisions if predicted and not actual)
+    fn = sum(1 for predicted, actual in decisions if not predicted and actual)
+    precision = f"{tp / (tp + fp):.3f}" if tp + fp else "—"  # 没有判定为重复的文章时无查准率
+    return precision, f"{tp / max(tp + fn, 1):.3f}"
+
+
+def brute_force_per_query(index, sizes, queries=200):
+    """新文章与全部已有签名逐一比较（numpy 向量化）的单篇耗时"""
+    signatures = np.stack([item[0] for item in index._items.values()])
+    results = []
+    for size in sizes:
+        matrix = signatures[:size]
+        probes = signatures[-queries:]
+        started = time.perf_counter()
+        for probe in probes:
+            (matrix == probe).mean(axis=1).max()
+        results.append((size, (time.perf_counter() - started) / queries))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=100_000)
+    parser.add_argument("--stories", type=int, default=40_000)
+    parser.add_argument("--segments", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.articles, args.stories)
+    print(f"语料: {len(corpus):,} 篇，{args.stories:,} 个原始报道，{len(corpus) - args.stories:,} 篇转载稿")
+
+    elapsed, decisions, timings, index = run_lsh(corpus, args.segments)
+    print(f"\nMinHash LSH: 总耗时 {elapsed:.1f}秒，{len(corpus) / elapsed:,.0f} 篇/秒，"
+          f"平均候选 {index.stats['candidates'] / index.stats['queries']:.2f} 篇/次")
+    for size, seconds in timings:
+        print(f"  索引规模 ≤{size:>7,}: 单篇 {seconds * 1e6:7.0f}μs")
+
+    p, r = precision_recall(decisions)
+    ep, er = precision_recall(run_exact(corpus))
+    print(f"\n{'方法':<14} | {'查准率':>6} | {'查全率':>6}")
+    print(f"{'MinHash LSH':<14} | {p:>6} | {r:>6}")
+    print(f"{'标题精确去重':<12} | {ep:>6} | {er:>6}")
+
+    sizes = [size for size in (1_000, 10_000, 100_000) if size <= len(index)]
+    print("\n对照：暴力比较全部已有签名")
+    for size, seconds in brute_force_per_query(index, sizes):
+        print(f"  索引规模 {size:>7,}: 单篇比较 {seconds * 1e6:7.0f}μs（不含签名计算）")
+
+
+if __name__ == "__main__":
+    main()
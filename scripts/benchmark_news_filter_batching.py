@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+增强新闻过滤器批量语义评分基准测试
+
+对比三种方式对同一批新闻计算语义相似度评分的耗时：
+- 逐条：每篇新闻单独 encode，再与每个公司向量逐一求余弦（原实现）
+- 批量（冷）：一次 encode 整批新闻，矩阵乘法求余弦
+- 批量（热）：重复运行，文章向量全部命中内容哈希缓存，不再调用模型
+
+默认使用 sentence-transformers 的 paraphrase-multilingual-MiniLM-L12-v2（需已安装并能下载模型）；
+未安装时退回到纯 numpy 的字符哈希编码器，只能反映调度与相似度计算本身的开销。
+
+用法:
+    python scripts/benchmark_news_filter_batching.py [--articles 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("EMBEDDING_CACHE_PERSIST", "false")
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter  # noqa: E402
+
+
+class HashingEncoder:
+    """字符哈希词袋编码器（无模型依赖时的替代）"""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, **kwargs):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            np.add.at(vectors[row], codes % self.dim, 1.0)
+        return vectors
+
+
+def make_news(articles: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    chars = np.array([chr(c) for c in range(0x4E00, 0x4E00 + 3000)])
+    rows = []
+    for i in range(articles):
+        subject = "招商银行" if i % 3 == 0 else "".join(rng.choice(chars, 4))
+        rows.append({
+            "新闻标题": f"{subject}{''.join(rng.choice(chars, 16))}",
+            "新闻内容": f"{subject}{''.join(rng.choice(chars, 300))}",
+        })
+    return pd.DataFrame(rows)
+
+
+def load_filter():
+    news_filter = EnhancedNewsFilter("600036", "招商银行", use_semantic=True)
+    if news_filter.sentence_model is not None:
+        return news_filter, EnhancedNewsFilter.SEMANTIC_MODEL_NAME
+    news_filter.sentence_model = HashingEncoder()
+    news_filter.company_embedding = news_filter._encode_texts(["招商银行", "招商银行股票", "600036"])
+    news_filter.use_semantic = True
+    return news_filter, "字符哈希编码器（未安装 sentence-transformers）"
+
+
+def per_article(news_filter, news):
+    """原实现：逐条编码、逐个公司向量求余弦"""
+    scores = []
+    for title, content in zip(news["新闻标题"], news["新闻内容"]):
+        vector = news_filter.sentence_model.encode([f"{title} {content[:200]}"])[0]
+        best = max(
+            np.dot(vector, company) / (np.linalg.norm(vector) * np.linalg.norm(company))
+            for company in news_filter.company_embedding
+        )
+        scores.append(max(0, min(100, best * 100)))
+    return np.array(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=500)
+    args = parser.parse_args()
+
+    news_filter, model = load_filter()
+    news = make_news(args.articles)
+    titles, contents = news["新闻标题"].tolist(), news["新闻内容"].tolist()
+    print(f"模型: {model}，新闻 {len(news)} 篇")
+
+    started = time.perf_counter()
+    expected = per_article(news_filter, news)
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cold = news_filter.calculate_semantic_similarity_batch(titles, contents)
+    cold_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    warm = news_filter.calculate_semantic_similarity_batch(titles, contents)
+    warm_seconds = time.perf_counter() - started
+
+    assert np.allclose(expected, cold, atol=1e-3) and np.allclose(cold, warm)
+    print(f"{'方式':<8} | {'总耗时':>9} | {'单篇':>9}")
+    for name, seconds in (("逐条", loop_seconds), ("批量(冷)", cold_seconds), ("批量(热)", warm_seconds)):
+        print(f"{name:<8} | {seconds * 1000:>7.1f}ms | {seconds / len(news) * 1e6:>7.0f}μs")
+    print(f"批量加速 {loop_seconds / cold_seconds:.1f}x，缓存命中后 {loop_seconds / warm_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+队列出队基准测试
+
+对比两种出队方式：
+- 旧方式：RPOP → HGETALL → 并发检查 → 多次 SADD/HSET/EXPIRE（Worker 取不到任务时 sleep 轮询）
+- 新方式：LMOVE/BLMOVE 移入在途列表 → Lua 脚本一次完成认领
+
+输出每个任务的 Redis 往返次数、单次出队耗时；指定 --redis-url 时另外测量
+“入队 → Worker 取到任务”的延迟（fakeredis 不支持真正的阻塞命令，跳过该项）。
+
+用法:
+    python scripts/benchmark_queue_dequeue.py [--tasks 500] [--redis-url redis://localhost:6379/15]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from app.services.queue import (  # noqa: E402
+    READY_LIST,
+    TASK_PREFIX,
+    VISIBILITY_TIMEOUT_PREFIX,
+    mark_task_processing,
+)
+from app.services.queue_service import QueueService  # noqa: E402
+
+
+async def legacy_dequeue(qs: QueueService, worker_id: str, block_timeout: float = 0):
+    """改造前的出队流程（用于对比）"""
+    if not await qs._check_global_concurrent_limit():
+        return None
+    task_id = await qs.r.rpop(READY_LIST)
+    if not task_id:
+        return None
+    task = await qs.get_task(task_id)
+    if not await qs._check_user_concurrent_limit(task["user"]):
+        await qs.r.lpush(READY_LIST, task_id)
+        return None
+    await mark_task_processing(qs.r, task_id, task["user"])
+    timeout_key = VISIBILITY_TIMEOUT_PREFIX + task_id
+    await qs.r.hset(timeout_key, mapping={
+        "task_id": task_id, "worker_id": worker_id,
+        "timeout_at": str(int(time.time()) + qs.visibility_timeout),
+    })
+    await qs.r.expire(timeout_key, qs.visibility_timeout)
+    await qs.r.hset(TASK_PREFIX + task_id, mapping={
+        "status": "processing", "worker_id": worker_id, "started_at": str(int(time.time())),
+    })
+    return task
+
+
+async def new_dequeue(qs: QueueService, worker_id: str, block_timeout: float = 0):
+    return await qs.dequeue_task(worker_id, block_timeout=block_timeout)
+
+
+def count_commands(r) -> Counter:
+    counter: Counter = Counter()
+    original = r.execute_command
+
+    async def counted(*args, **kwargs):
+        counter[str(args[0]).upper()] += 1
+        return await original(*args, **kwargs)
+
+    r.execute_command = counted
+    return counter
+
+
+async def make_service(redis_url):
+    if redis_url:
+        from redis.asyncio import Redis
+        r = Redis.from_url(redis_url, decode_responses=True)
+    else:
+        import fakeredis
+        r = fakeredis.FakeAsyncRedis(decode_responses=True)
+    await r.flushdb()
+    qs = QueueService(r)
+    qs.user_concurrent_limit = qs.global_concurrent_limit = 10 ** 9
+    return qs
+
+
+async def bench_drain(name, dequeue, n_tasks, redis_url):
+    qs = await make_service(redis_url)
+    for i in range(n_tasks):
+        await qs.enqueue_task(f"u{i % 20}", f"{i:06d}", {"research_depth": "标准"})
+
+    counter = count_commands(qs.r)
+    timings = []
+    while True:
+        started = time.perf_counter()
+        task = await dequeue(qs, "bench")
+        if task is None:
+            break
+        timings.append(time.perf_counter() - started)
+
+    ops = sum(counter.values()) / max(len(timings), 1)
+    print(f"{name:<10} 出队 {len(timings)} 个任务 | Redis 往返/任务 {ops:5.2f} | "
+          f"单次出队 均值 {statistics.mean(timings) * 1e6:7.1f}µs  p99 {sorted(timings)[int(len(timings) * 0.99) - 1] * 1e6:7.1f}µs")
+    print(f"{'':<10} 命令分布: {dict(counter.most_common())}")
+
+
+async def bench_latency(name, dequeue, n_tasks, poll_interval, redis_url, blocking):
+    """Worker 按各自方式循环取任务，测量入队到取到任务的延迟"""
+    qs = await make_service(redis_url)
+    enqueued_at = {}
+    latencies = []
+
+    async def worker():
+        while len(latencies) < n_tasks:
+            task = await dequeue(qs, "bench", block_timeout=poll_interval if blocking else 0)
+            if task:
+                latencies.append(time.perf_counter() - enqueued_at[task["id"]])
+                await qs.ack_task(task["id"])
+            elif not blocking:
+                await asyncio.sleep(poll_interval)
+
+    consumer = asyncio.create_task(worker())
+    for i in range(n_tasks):
+        await asyncio.sleep(poll_interval * 0.37)
+        task_id = await qs.enqueue_task("u1", f"{i:06d}", {})
+        enqueued_at[task_id] = time.perf_counter()
+    await consumer
+
+    print(f"{name:<10} 入队→取到任务延迟 均值 {statistics.mean(latencies) * 1e3:7.1f}ms  "
+          f"p50 {statistics.median(latencies) * 1e3:7.1f}ms  max {max(latencies) * 1e3:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--latency-tasks", type=int, default=30)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--redis-url", default=None, help="真实 Redis 地址（会清空所选 DB），默认使用 fakeredis")
+    args = parser.parse_args()
+
+    print(f"后端: {args.redis_url or 'fakeredis'}")
+    await bench_drain("旧方式", legacy_dequeue, args.tasks, args.redis_url)
+    await bench_drain("新方式", new_dequeue, args.tasks, args.redis_url)
+
+    if not args.redis_url:
+        print("未指定 --redis-url，跳过阻塞出队延迟测试（fakeredis 不支持阻塞命令）")
+        return
+    await bench_latency("旧方式", legacy_dequeue, args.latency_tasks, args.poll_interval, args.redis_url, blocking=False)
+    await bench_latency("新方式", new_dequeue, args.latency_tasks, args.poll_interval, args.redis_url, blocking=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
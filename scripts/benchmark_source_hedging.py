@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+数据源对冲请求基准测试
+
+模拟带长尾延迟的主数据源（多数请求很快，少数请求卡到超时）和一个稳定的备用数据源，
+对比 SourceHedger 关闭（按优先级依次降级）与开启（超过 p95 并行请求备用数据源）时的延迟分布。
+
+用法:
+    python scripts/benchmark_source_hedging.py [--requests 200] [--tail-ratio 0.04] [--tail-seconds 2]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from tradingagents.dataflows.source_hedging import SourceHedger  # noqa: E402
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tail-ratio", type=float, default=0.04, help="主数据源卡顿的请求比例")
+    parser.add_argument("--tail-seconds", type=float, default=2.0, help="卡顿请求的耗时")
+    parser.add_argument("--error-ratio", type=float, default=0.03, help="主数据源返回无效结果的比例")
+    args = parser.parse_args()
+
+    def fetch(source):
+        if source == "primary":
+            roll = random.random()
+            if roll < args.tail_ratio:
+                time.sleep(args.tail_seconds)
+            else:
+                time.sleep(random.uniform(0.02, 0.06))
+            return "❌ 无数据" if random.random() < args.error_ratio else "primary data"
+        time.sleep(random.uniform(0.08, 0.12))
+        return "backup data"
+
+    def is_valid(value):
+        return "❌" not in value
+
+    print(f"{args.requests} 次请求，主数据源 {args.tail_ratio:.0%} 卡顿 {args.tail_seconds}s，"
+          f"{args.error_ratio:.0%} 无效结果；备用数据源 80-120ms")
+    print(f"{'模式':<8} | {'p50':>7} | {'p95':>7} | {'p99':>7} | {'最大':>7} | {'对冲次数':>6}")
+    for label, enabled in (("依次降级", False), ("对冲请求", True)):
+        random.seed(42)
+        hedger = SourceHedger(enabled=enabled, min_delay=0.05, max_delay=1.0, default_delay=0.2)
+        latencies = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            hedger.fetch("stock_data", ["primary", "backup"], fetch, is_valid)
+            latencies.append(time.perf_counter() - started)
+        hedged = hedger.stats("stock_data", "primary").hedged
+        print(f"{label:<6} | {percentile(latencies, 0.5) * 1000:>5.0f}ms | {percentile(latencies, 0.95) * 1000:>5.0f}ms | "
+              f"{percentile(latencies, 0.99) * 1000:>5.0f}ms | {max(latencies) * 1000:>5.0f}ms | {hedged:>6}")
+
+
+if __name__ == "__main__":
+    main()
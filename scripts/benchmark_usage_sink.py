@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Token 使用记录写入基准测试
+
+在已有 N 条历史记录的前提下，对比记录一次 LLM 调用的开销：
+- 旧方式：读入整个 usage.json，追加一条，裁剪后以 indent=2 整体重写（每条 O(历史记录数)）
+- 新方式：ConfigManager.add_usage_record 写入缓冲，按批追加到 SQLite
+
+并对比 get_usage_statistics（成本告警每次调用都会执行）的耗时。
+
+用法:
+    python scripts/benchmark_usage_sink.py [--history 10000] [--calls 200]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+os.environ.pop("USE_MONGODB_STORAGE", None)
+
+from tradingagents.config.config_manager import ConfigManager  # noqa: E402
+from tradingagents.config.usage_models import UsageRecord  # noqa: E402
+
+
+def make_record(i: int) -> UsageRecord:
+    return UsageRecord(
+        timestamp=datetime.now().astimezone().isoformat(), provider="dashscope", model_name="qwen-plus",
+        input_tokens=1200 + i % 50, output_tokens=400, cost=0.0032, session_id=f"session_{i % 20}",
+    )
+
+
+def legacy_add(path: str, record: UsageRecord, max_records: int):
+    with open(path, "r", encoding="utf-8") as f:
+        records = [UsageRecord(**item) for item in json.load(f)]
+    records.append(record)
+    records = records[-max_records:]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([asdict(r) for r in records], f, ensure_ascii=False, indent=2)
+
+
+def legacy_statistics(path: str) -> float:
+    with open(path, "r", encoding="utf-8") as f:
+        records = [UsageRecord(**item) for item in json.load(f)]
+    return sum(r.cost for r in records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    max_records = args.history + args.calls
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history = [asdict(make_record(i)) for i in range(args.history)]
+        legacy_path = os.path.join(temp_dir, "legacy_usage.json")
+        with open(legacy_path, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+
+        started = time.perf_counter()
+        for i in range(args.calls):
+            legacy_add(legacy_path, make_record(i), max_records)
+        legacy_seconds = (time.perf_counter() - started) / args.calls
+
+        started = time.perf_counter()
+        for _ in range(20):
+            legacy_statistics(legacy_path)
+        legacy_stats_seconds = (time.perf_counter() - started) / 20
+
+        with open(os.path.join(temp_dir, "usage.json"), "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False)
+        manager = ConfigManager(temp_dir)
+        settings = manager.load_settings()
+        settings["max_usage_records"] = max_records
+        manager.save_settings(settings)
+        manager.usage_sink  # 导入历史记录，不计入写入耗时
+
+        started = time.perf_counter()
+        for i in range(args.calls):
+            manager.add_usage_record("dashscope", "qwen-plus", 1200, 400, f"session_{i % 20}")
+        manager.flush_usage_records()
+        sink_seconds = (time.perf_counter() - started) / args.calls
+
+        started = time.perf_counter()
+        for _ in range(20):
+            stats = manager.get_usage_statistics(1)
+        sink_stats_seconds = (time.perf_counter() - started) / 20
+        assert stats["total_requests"] == args.history + args.calls
+        manager.usage_sink.close()
+
+    print(f"历史记录 {args.history:,} 条，记录 {args.calls} 次调用")
+    print(f"{'方式':<10} | {'单次写入':>10} | {'统计查询':>10}")
+    print(f"{'JSON 重写':<8} | {legacy_seconds * 1000:>8.2f}ms | {legacy_stats_seconds * 1000:>8.2f}ms")
+    print(f"{'缓冲+SQLite':<8} | {sink_seconds * 1000:>8.2f}ms | {sink_stats_seconds * 1000:>8.2f}ms")
+    print(f"写入加速 {legacy_seconds / sink_seconds:.0f}x，统计加速 {legacy_stats_seconds / sink_stats_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+历史K线迁移工具：stock_daily_quotes -> stock_daily_quotes_buckets
+
+按 股票+数据源+周期+年份 把逐条K线重建为列式分桶（重建以逐条数据为准），
+完成后输出两种布局的存储对比。启用 HISTORICAL_BUCKET_LAYOUT_ENABLED 后执行一次，
+之后的同步会同时写入两种布局。每只股票回填完成后写入回填标记，读取方此后才使用分桶；
+分桶写入失败会删除标记，重新执行本工具即可恢复。
+
+用法:
+    python scripts/migrate_daily_quotes_to_buckets.py [--symbols 000001 600000] [--data-source tushare] [--period daily]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from app.core.database import close_database, init_database  # noqa: E402
+from app.services.historical_data_service import HistoricalDataService  # noqa: E402
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f}MB"
+
+
+async def run(args) -> int:
+    await init_database()
+    try:
+        svc = HistoricalDataService()
+        await svc.initialize()
+        stats = await svc.rebuild_buckets(
+            symbols=args.symbols,
+            data_source=args.data_source,
+            period=args.period,
+            symbols_per_batch=args.symbols_per_batch,
+        )
+        print(f"✅ 已重建: {stats['symbols']} 只股票, {stats['rows']} 条K线 -> {stats['buckets']} 个桶")
+
+        for name, info in (await svc.get_layout_statistics()).items():
+            print(f"📊 {name}: 文档 {info['count']}, 数据 {_mb(info['size'])}, "
+                  f"存储 {_mb(info['storage_size'])}, 索引 {info['nindexes']} 个 {_mb(info['total_index_size'])}")
+        return 0
+    finally:
+        await close_database()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", nargs="+", default=None, help="只迁移指定股票，默认全部")
+    parser.add_argument("--data-source", default=None, help="只迁移指定数据源")
+    parser.add_argument("--period", default=None, help="只迁移指定周期（daily/weekly/monthly）")
+    parser.add_argument("--symbols-per-batch", type=int, default=50)
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
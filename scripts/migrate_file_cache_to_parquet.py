@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+文件缓存迁移工具：CSV -> Parquet
+
+把 StockDataCache 中已有的 CSV 股票数据缓存转换为 Parquet 列式格式，
+并更新对应的元数据和索引（缓存时间保持不变）。
+
+用法:
+    python scripts/migrate_file_cache_to_parquet.py [--cache-dir DIR] [--keep-csv] [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from tradingagents.dataflows.cache.file_cache import PARQUET_AVAILABLE, StockDataCache  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cache-dir", default=None, help="缓存目录，默认 tradingagents/dataflows/cache/data_cache")
+    parser.add_argument("--keep-csv", action="store_true", help="迁移后保留原 CSV 文件")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待迁移的缓存，不写入")
+    args = parser.parse_args()
+
+    if not PARQUET_AVAILABLE:
+        print("❌ 未安装 pyarrow，请先执行: pip install pyarrow")
+        return 1
+
+    cache = StockDataCache(cache_dir=args.cache_dir)
+    stats = cache.migrate_csv_to_parquet(delete_csv=not args.keep_csv, dry_run=args.dry_run)
+
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}待迁移 CSV 缓存: {stats['scanned']}")
+    print(f"{prefix}已迁移: {stats['migrated']}, 失败: {stats['failed']}, "
+          f"节省磁盘: {stats['saved_bytes'] / (1024 * 1024):.2f}MB")
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
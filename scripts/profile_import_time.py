@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+导入耗时分析与回归检查
+
+在独立子进程中以 python -X importtime 导入目标模块，报告：
+- 目标模块的总导入耗时
+- 累计耗时 / 自身耗时最高的模块
+- 延迟导入守卫：导入目标模块后不应被加载的重量级依赖（chromadb、yfinance、各数据源 SDK 等）
+
+--check 时，守卫被破坏或总耗时超过 --budget-ms 则以非零状态退出，可用于 CI。
+
+用法:
+    python scripts/profile_import_time.py                       # 默认目标
+    python scripts/profile_import_time.py tradingagents.agents --top 30
+    python scripts/profile_import_time.py --check --budget-ms 3000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 目标模块 -> 导入后不应出现在 sys.modules 中的模块
+LAZY_GUARDS: Dict[str, List[str]] = {
+    "tradingagents.agents": ["chromadb", "yfinance", "stockstats", "tradingagents.dataflows.interface"],
+    "tradingagents.agents.utils.memory": ["chromadb", "dashscope", "openai", "tradingagents.agents.utils.agent_utils"],
+    "tradingagents.dataflows": ["yfinance", "stockstats", "akshare", "tushare", "baostock",
+                                "tradingagents.dataflows.interface"],
+    "tradingagents.dataflows.providers": ["akshare", "tushare", "baostock", "yfinance"],
+    "tradingagents.graph.engine_pool": ["langchain_openai", "tradingagents.graph.trading_graph",
+                                        "tradingagents.dataflows.interface"],
+    "app.worker.analysis_worker": ["chromadb", "langchain_openai", "tradingagents.graph.trading_graph"],
+}
+
+DEFAULT_TARGETS = list(LAZY_GUARDS)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def profile(module: str) -> Tuple[List[Tuple[str, int, int, int]], List[str], str]:
+    """
+    在子进程中导入模块
+
+    Returns:
+        ([(模块, 自身微秒, 累计微秒, 嵌套深度)], 守卫中被加载的模块, 错误输出)
+    """
+    guards = LAZY_GUARDS.get(module, [])
+    code = (
+        "import sys\n"
+        f"import {module}\n"
+        f"print('\\n'.join(m for m in {guards!r} if m in sys.modules))\n"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, os.path.join(ROOT, "backend"), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows, errors = [], []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+        elif not line.startswith("import time:"):
+            errors.append(line)
+    if proc.returncode != 0:
+        return rows, [], "\n".join(errors[-10:])
+    loaded = [m for m in proc.stdout.splitlines() if m in guards]
+    return rows, loaded, ""
+
+
+def report(module: str, top: int, budget_ms: float) -> bool:
+    rows, loaded, error = profile(module)
+    print("=" * 80)
+    if error:
+        print(f"❌ {module} 导入失败:\n{error}")
+        return False
+
+    # importtime 先输出子模块再输出父模块：目标行之前、深度更大的连续行即目标的导入树
+    index = next((i for i, row in enumerate(rows) if row[0] == module), len(rows) - 1)
+    depth = rows[index][3]
+    start = index
+    while start > 0 and rows[start - 1][3] > depth:
+        start -= 1
+    subtree = rows[start:index]
+    total_ms = rows[index][2] / 1000
+    ok = True
+    status = "✅"
+    if budget_ms and total_ms > budget_ms:
+        status, ok = "❌", False
+    print(f"{status} {module}: {total_ms:.0f}ms（新导入 {len(subtree)} 个模块）"
+          + (f"，预算 {budget_ms:.0f}ms" if budget_ms else ""))
+
+    # 只看直接依赖的累计耗时，避免同一链路重复出现
+    direct = sorted((r for r in subtree if r[3] == depth + 1), key=lambda r: r[2], reverse=True)[:top]
+    print("  累计耗时最高的直接依赖:")
+    for name, _, cumulative, _ in direct:
+        print(f"    {cumulative / 1000:>8.1f}ms  {name}")
+    slowest = sorted(subtree + [rows[index]], key=lambda r: r[1], reverse=True)[:top]
+    print("  自身耗时最高的模块:")
+    for name, self_us, _, _ in slowest:
+        print(f"    {self_us / 1000:>8.1f}ms  {name}")
+
+    if loaded:
+        ok = False
+        print(f"  ❌ 延迟导入被破坏，以下模块不应在导入时加载: {', '.join(loaded)}")
+    elif module in LAZY_GUARDS:
+        print(f"  ✅ 延迟导入守卫通过（{len(LAZY_GUARDS[module])} 项）")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=DEFAULT_TARGETS, help="要分析的模块，默认分析所有守卫目标")
+    parser.add_argument("--top", type=int, default=10, help="每项列出的模块数")
+    parser.add_argument("--budget-ms", type=float, default=0, help="单个目标的导入耗时上限（毫秒），0 表示不限制")
+    parser.add_argument("--check", action="store_true", help="守卫被破坏或超出预算时以非零状态退出")
+    args = parser.parse_args()
+
+    results = [report(module, args.top, args.budget_ms) for module in args.modules]
+    print("=" * 80)
+    if args.check and not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
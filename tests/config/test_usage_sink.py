@@ -0,0 +1,139 @@
+import json
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from tradingagents.config.config_manager import ConfigManager
+from tradingagents.config.usage_models import PricingConfig, UsageRecord
+from tradingagents.config.usage_sink import SQLiteUsageStore, UsageRecordSink
+
+
+class FakeMongoStorage:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def is_connected(self):
+        return True
+
+    def save_usage_records(self, records):
+        if self.fail:
+            return False
+        self.batches.append(list(records))
+        return True
+
+    def get_usage_statistics(self, days):
+        return {"total_requests": sum(len(b) for b in self.batches)}
+
+    def get_provider_statistics(self, days):
+        stats = {}
+        for record in (r for batch in self.batches for r in batch):
+            item = stats.setdefault(record.provider, {"cost": 0, "input_tokens": 0, "output_tokens": 0, "requests": 0})
+            item["cost"] += record.cost
+            item["input_tokens"] += record.input_tokens
+            item["output_tokens"] += record.output_tokens
+            item["requests"] += 1
+        return stats
+
+    def get_session_cost(self, session_id):
+        return sum(r.cost for batch in self.batches for r in batch if r.session_id == session_id)
+
+
+def _record(provider="dashscope", cost=0.5, session="s1", when=None):
+    return UsageRecord(
+        timestamp=(when or datetime.now().astimezone()).isoformat(), provider=provider, model_name="m",
+        input_tokens=100, output_tokens=50, cost=cost, session_id=session,
+    )
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.delenv("USE_MONGODB_STORAGE", raising=False)
+    monkeypatch.setenv("USAGE_FLUSH_BATCH_SIZE", "3")
+    monkeypatch.setenv("USAGE_FLUSH_INTERVAL_SECONDS", "3600")
+    cm = ConfigManager(str(tmp_path))
+    yield cm
+    cm.usage_sink.close()
+
+
+def test_records_are_buffered_and_statistics_include_pending(manager):
+    manager.save_pricing([PricingConfig("dashscope", "qwen-turbo", 0.002, 0.006)])
+    for session in ("a", "a", "b", "a"):
+        manager.add_usage_record("dashscope", "qwen-turbo", 1000, 500, session)
+
+    store = manager.usage_sink.store
+    # 前三条达到批量大小一次写入，第四条仍在缓冲
+    assert store.count() == 3 and len(manager.usage_sink.pending()) == 1
+    assert not manager.usage_file.exists()
+
+    stats = manager.get_usage_statistics(1)
+    assert stats["total_requests"] == 4 and stats["provider_stats"]["dashscope"]["requests"] == 4
+    assert stats["total_cost"] == pytest.approx(4 * 0.005)
+    assert manager.get_session_cost("a") == pytest.approx(3 * 0.005)
+
+    assert len(manager.load_usage_records()) == 4 and store.count() == 4
+
+
+def test_statistics_window_and_trimming(manager):
+    settings = manager.load_settings()
+    settings["max_usage_records"] = 3
+    manager.save_settings(settings)
+
+    old = datetime.now().astimezone() - timedelta(days=10)
+    sink = manager.usage_sink
+    for record in [_record(when=old), _record(provider="openai"), _record(), _record(cost=1.0)]:
+        sink.add(record)
+    sink.flush()
+
+    assert [r.cost for r in manager.load_usage_records()] == [0.5, 0.5, 1.0]
+    stats = manager.get_usage_statistics(30)
+    assert stats["total_requests"] == 3
+    assert stats["provider_stats"]["openai"]["requests"] == 1
+    assert manager.get_usage_statistics(1)["total_cost"] == pytest.approx(2.0)
+
+
+def test_pricing_index_reloads_only_when_file_changes(manager, monkeypatch):
+    manager.save_pricing([PricingConfig("p", "m", 1.0, 2.0, "USD")])
+    assert manager.calculate_cost("p", "m", 1000, 1000) == (3.0, "USD")
+
+    loads = []
+    original = manager.load_pricing
+    monkeypatch.setattr(manager, "load_pricing", lambda: loads.append(1) or original())
+    for _ in range(5):
+        manager.calculate_cost("p", "m", 1000, 0)
+    assert loads == []
+
+    manager.save_pricing([PricingConfig("p", "m", 4.0, 2.0, "USD")])
+    assert manager.calculate_cost("p", "m", 1000, 0) == (4.0, "USD")
+    assert loads == [1]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / "usage.json"
+    legacy.write_text(json.dumps([asdict(_record()), asdict(_record(cost=2.0))]), encoding="utf-8")
+
+    store = SQLiteUsageStore(tmp_path / "usage.sqlite3", legacy_json=legacy)
+    assert store.count() == 2
+    store.close()
+
+    store = SQLiteUsageStore(tmp_path / "usage.sqlite3", legacy_json=legacy)
+    assert store.count() == 2 and legacy.exists()
+    store.close()
+
+
+def test_mongodb_batches_and_fallback(tmp_path):
+    store = SQLiteUsageStore(tmp_path / "usage.sqlite3")
+    mongo = FakeMongoStorage()
+    sink = UsageRecordSink(store, mongodb_storage=mongo, batch_size=2, flush_interval=3600)
+
+    for record in [_record(session="x"), _record(session="x"), _record(session="y")]:
+        sink.add(record)
+    assert [len(b) for b in mongo.batches] == [2] and store.count() == 0
+    assert sink.usage_statistics(1)["total_requests"] == 3
+    assert sink.session_cost("x") == pytest.approx(1.0)
+
+    mongo.fail = True
+    sink.flush()
+    assert store.count() == 1
+    store.close()
@@ -0,0 +1,118 @@
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache import codecs
+from tradingagents.dataflows.cache.db_cache import DatabaseCacheManager
+
+pytestmark = pytest.mark.skipif(not codecs.ARROW_AVAILABLE, reason="pyarrow 未安装")
+
+
+def _kline(n=300):
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "date": pd.bdate_range("2024-01-01", periods=n),
+        "code": ["000001"] * n,
+        "close": rng.uniform(9, 11, n),
+        "volume": rng.integers(1_000, 100_000, n),
+    })
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+    def get(self, key):
+        return self.store.get(key)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+
+    def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+
+class FakeDB:
+    def __init__(self):
+        self.stock_data = FakeCollection()
+
+
+def _manager(codec_name):
+    manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+    manager.codec = codecs.get_codec(codec_name)
+    manager.redis_client = FakeRedis()
+    manager.mongodb_db = FakeDB()
+    return manager
+
+
+@pytest.mark.parametrize("codec_name", ["arrow-zstd", "arrow-lz4"])
+def test_binary_codec_roundtrip(codec_name):
+    codec = codecs.get_codec(codec_name)
+    df = _kline()
+
+    payload, data_format = codecs.encode_payload(df, codec)
+    assert data_format == codecs.BINARY_FORMAT and payload[:3] == codecs.MAGIC
+    pd.testing.assert_frame_equal(codecs.decode_payload(payload), df)
+
+    text = "技术分析报告 " * 100
+    payload, _ = codecs.encode_payload(text, codec)
+    assert codecs.decode_payload(payload) == text
+
+
+def test_manager_reads_binary_from_redis_and_mongo():
+    manager = _manager("arrow-zstd")
+    df = _kline()
+    key = manager.save_stock_data("000001", df, "2024-01-01", "2024-12-31", "tushare")
+
+    assert manager.redis_client.store[key][:3] == codecs.MAGIC
+    pd.testing.assert_frame_equal(manager.load_stock_data(key), df)
+
+    # Redis 过期后从 MongoDB 读取并回填
+    manager.redis_client.store.clear()
+    pd.testing.assert_frame_equal(manager.load_stock_data(key), df)
+    assert manager.redis_client.store[key][:3] == codecs.MAGIC
+
+
+def test_manager_reads_legacy_json_entries():
+    manager = _manager("arrow-zstd")
+    df = _kline(20)
+    legacy = {
+        "_id": "stock:000001:legacy",
+        "symbol": "000001",
+        "data_source": "tushare",
+        "data": df.to_json(orient="records", date_format="iso"),
+        "data_format": "dataframe_json",
+        "created_at": datetime.now(),
+    }
+    manager.mongodb_db.stock_data.docs[legacy["_id"]] = legacy
+    manager.redis_client.store[legacy["_id"]] = json.dumps({
+        "data": legacy["data"], "data_format": "dataframe_json", "symbol": "000001",
+        "data_source": "tushare", "created_at": legacy["created_at"].isoformat(),
+    }).encode("utf-8")
+
+    from_redis = manager.load_stock_data(legacy["_id"])
+    manager.redis_client.store.clear()
+    from_mongo = manager.load_stock_data(legacy["_id"])
+
+    expected = pd.read_json(io.StringIO(legacy["data"]), orient="records")
+    pd.testing.assert_frame_equal(from_redis, expected)
+    pd.testing.assert_frame_equal(from_mongo, expected)
+
+
+def test_unknown_version_is_rejected():
+    payload, _ = codecs.encode_payload("x", codecs.get_codec("arrow-zstd"))
+    bumped = payload[:3] + bytes([codecs.FORMAT_VERSION + 1]) + payload[4:]
+    with pytest.raises(ValueError):
+        codecs.decode_payload(bumped)
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tradingagents.dataflows.cache.cache_index import INDEX_FILENAME
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+
+def _frame():
+    return pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+
+
+def test_partial_match_requires_covering_date_range(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    year_key = cache.save_stock_data("600000", _frame(), "2024-01-01", "2024-12-31", "tushare")
+    cache.save_stock_data("600000", _frame(), "2024-05-01", "2024-05-31", "tushare")
+    cache.save_stock_data("000001", _frame(), "2024-01-01", "2024-12-31", "tushare")
+
+    assert cache.find_cached_stock_data("600000", "2024-03-01", "2024-06-30", "tushare") == year_key
+    assert cache.find_cached_stock_data("600000", "20240301", "20240630") == year_key
+    assert cache.find_cached_stock_data("600000", "2023-12-01", "2024-06-30", "tushare") is None
+    assert cache.find_cached_stock_data("600000", "2024-03-01", "2024-06-30", "akshare") is None
+
+
+def test_find_respects_ttl(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("600000", _frame(), "2024-01-01", "2024-12-31", "tushare")
+
+    # 模拟两小时前写入的缓存
+    meta_path = cache._get_metadata_path(key)
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    metadata["cached_at"] = (datetime.now() - timedelta(hours=2)).isoformat()
+    meta_path.write_text(json.dumps(metadata), encoding="utf-8")
+    cache.index.upsert(key, metadata)
+
+    assert cache.find_cached_stock_data("600000", "2024-02-01", "2024-03-01", max_age_hours=1) is None
+    assert cache.find_cached_stock_data("600000", "2024-02-01", "2024-03-01", max_age_hours=3) == key
+
+
+def test_index_is_built_from_existing_metadata(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    stock_key = cache.save_stock_data("AAPL", _frame(), "2024-01-01", "2024-12-31", "yfinance")
+    fund_key = cache.save_fundamentals_data("AAPL", "report", "openai")
+    cache.index.close()
+
+    # 旧缓存目录：只有元数据文件，没有索引
+    (tmp_path / INDEX_FILENAME).unlink()
+    reopened = StockDataCache(cache_dir=str(tmp_path))
+
+    assert reopened.index.count() == 2
+    assert reopened.find_cached_stock_data("AAPL", "2024-02-01", "2024-02-28") == stock_key
+    assert reopened.find_cached_fundamentals_data("AAPL", "openai") == fund_key
+    assert reopened.find_cached_fundamentals_data("AAPL", "finnhub") is None
+
+
+def test_clear_old_cache_removes_index_entries(tmp_path):
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("600000", _frame(), "2024-01-01", "2024-12-31", "tushare")
+    meta_path = cache._get_metadata_path(key)
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    metadata["cached_at"] = (datetime.now() - timedelta(days=30)).isoformat()
+    meta_path.write_text(json.dumps(metadata), encoding="utf-8")
+
+    cache.clear_old_cache(max_age_days=7)
+    assert cache.index.count() == 0
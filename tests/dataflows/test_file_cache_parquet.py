@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache import file_cache
+from tradingagents.dataflows.cache.file_cache import StockDataCache
+
+pytestmark = pytest.mark.skipif(not file_cache.PARQUET_AVAILABLE, reason="pyarrow 未安装")
+
+
+def _kline(n=500):
+    dates = pd.bdate_range("2022-01-03", periods=n, name="date")
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "code": ["600000"] * n,
+        "open": rng.uniform(9, 11, n),
+        "close": rng.uniform(9, 11, n),
+        "volume": rng.integers(1_000, 100_000, n),
+    }, index=dates)
+
+
+def test_parquet_roundtrip_preserves_dtypes(tmp_path, monkeypatch):
+    monkeypatch.delenv("TA_FILE_CACHE_FORMAT", raising=False)
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    df = _kline()
+    key = cache.save_stock_data("600000", df, "2022-01-03", "2023-12-01", "tushare")
+
+    assert cache._load_metadata(key)["file_format"] == "parquet"
+    loaded = cache.load_stock_data(key)
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
+
+    projected = cache.load_stock_data(key, columns=["close"])
+    assert list(projected.columns) == ["close"]
+    assert isinstance(projected.index, pd.DatetimeIndex)
+
+
+def test_csv_format_can_be_forced(tmp_path, monkeypatch):
+    monkeypatch.setenv("TA_FILE_CACHE_FORMAT", "csv")
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("600000", _kline(), "2022-01-03", "2023-12-01", "tushare")
+
+    assert cache._load_metadata(key)["file_format"] == "csv"
+    assert list(cache.load_stock_data(key, columns=["close"]).columns) == ["close"]
+
+
+def test_migrate_csv_entries_to_parquet(tmp_path, monkeypatch):
+    monkeypatch.setenv("TA_FILE_CACHE_FORMAT", "csv")
+    cache = StockDataCache(cache_dir=str(tmp_path))
+    key = cache.save_stock_data("600000", _kline(), "2022-01-03", "2023-12-01", "tushare")
+    text_key = cache.save_stock_data("600001", "plain text report", "2022-01-03", "2023-12-01", "tushare")
+    before = cache.load_stock_data(key)
+    csv_path = cache._load_metadata(key)["file_path"]
+    cached_at = cache._load_metadata(key)["cached_at"]
+
+    stats = cache.migrate_csv_to_parquet()
+
+    assert stats["migrated"] == 1 and stats["failed"] == 0
+    metadata = cache._load_metadata(key)
+    assert metadata["file_format"] == "parquet"
+    assert metadata["cached_at"] == cached_at
+    assert not (tmp_path / csv_path).exists()
+    pd.testing.assert_frame_equal(cache.load_stock_data(key), before)
+    assert cache.load_stock_data(text_key) == "plain text report"
+    assert cache.find_cached_stock_data("600000", "2022-06-01", "2022-12-01", "tushare") == key
@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+
+from tradingagents.dataflows.cache import integrated
+from tradingagents.dataflows.cache.l1_cache import L1Cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _frame(n=100):
+    return pd.DataFrame({"close": [float(i) for i in range(n)]})
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(integrated, "ADAPTIVE_CACHE_AVAILABLE", False)
+    return integrated.IntegratedCacheManager(cache_dir=str(tmp_path))
+
+
+def test_repeated_loads_hit_l1(manager, monkeypatch):
+    key = manager.save_stock_data("600000", _frame(), "2024-01-01", "2024-06-30", "tushare")
+    manager.invalidate()  # 模拟另一个进程写入：L1 为空
+
+    calls = []
+    original = manager.legacy_cache.load_stock_data
+    monkeypatch.setattr(manager.legacy_cache, "load_stock_data", lambda k: calls.append(k) or original(k))
+
+    first = manager.load_stock_data(key)
+    first["close"] = -1.0  # 调用方原地修改不影响缓存
+    second = manager.load_stock_data(key)
+
+    assert calls == [key]
+    assert second["close"].iloc[0] == 0.0
+    stats = manager.get_cache_stats()["l1_cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+def test_ttl_comes_from_cache_config(manager):
+    assert manager._l1_ttl_seconds("stock_data", "600000") == 1 * 3600
+    assert manager._l1_ttl_seconds("stock_data", "AAPL") == 2 * 3600
+    assert manager._l1_ttl_seconds("fundamentals", None) == 12 * 3600
+
+
+def test_invalidation_hooks(manager):
+    k1 = manager.save_stock_data("600000", _frame(), "2024-01-01", "2024-06-30", "tushare")
+    manager.save_stock_data("000001", _frame(), "2024-01-01", "2024-06-30", "tushare")
+    manager.save_fundamentals_data("600000", "report", "openai")
+
+    assert manager.invalidate(symbol="600000", data_type="stock_data") == 1
+    assert manager.l1_cache.get(k1) is None
+    assert manager.invalidate(symbol="600000") == 1
+    assert manager.l1_cache.stats()["entries"] == 1
+
+    manager.clear_old_cache(max_age_days=7)
+    assert manager.l1_cache.stats()["entries"] == 0
+
+
+def test_lru_eviction_by_bytes_and_expiry():
+    clock = FakeClock()
+    frame = _frame()
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = L1Cache(max_bytes=size * 2, clock=clock)
+
+    cache.put("a", frame, ttl_seconds=60)
+    cache.put("b", frame, ttl_seconds=60)
+    cache.get("a")  # a 变为最近使用
+    cache.put("c", frame, ttl_seconds=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.current_bytes == size * 2
+
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert not cache.put("big", _frame(1000), ttl_seconds=60)
+
+
+def test_l1_expiry_starts_at_backend_write_time(manager, monkeypatch):
+    from datetime import datetime, timedelta
+
+    key = manager.save_stock_data("600000", _frame(), "2024-01-01", "2024-06-30", "tushare")
+    manager.invalidate()
+    # 下层缓存写入于 50 分钟前（A股日线 TTL 为 1 小时）
+    written = datetime.now() - timedelta(minutes=50)
+    monkeypatch.setattr(manager.legacy_cache, "get_cached_at", lambda k: written)
+
+    clock = FakeClock()
+    manager.l1_cache._clock = clock
+    assert manager.load_stock_data(key) is not None
+    clock.now += 11 * 60
+    assert manager.l1_cache.get(key) is None
+
+    # 已接近过期的数据不会以剩余 TTL 非正写入 L1
+    monkeypatch.setattr(manager.legacy_cache, "get_cached_at", lambda k: written - timedelta(hours=1))
+    manager.load_stock_data(key)
+    assert manager.l1_cache.stats()["entries"] == 0
+
+
+def test_put_counts_age_against_ttl():
+    clock = FakeClock()
+    cache = L1Cache(max_bytes=1 << 20, clock=clock)
+
+    assert cache.put("a", "value", ttl_seconds=60, age_seconds=50)
+    clock.now += 11
+    assert cache.get("a") is None
+    assert not cache.put("b", "value", ttl_seconds=60, age_seconds=60)
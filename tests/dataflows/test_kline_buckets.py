@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.cache import kline_buckets as kb
+
+
+def _docs(dates, symbol="000001", source="tushare", close_offset=0.0):
+    return [
+        {
+            "symbol": symbol, "code": symbol, "full_symbol": f"{symbol}.SZ", "market": "CN",
+            "data_source": source, "period": "daily", "trade_date": d,
+            "open": 10.0 + i, "high": 11.0 + i, "low": 9.0 + i, "close": 10.5 + i + close_offset,
+            "volume": 1000.0 * (i + 1), "amount": None,
+        }
+        for i, d in enumerate(dates)
+    ]
+
+
+def test_build_buckets_splits_by_year_and_round_trips():
+    dates = ["2023-12-28", "2023-12-29", "2024-01-02", "2024-01-03", "bad-date"]
+    buckets = kb.build_buckets(_docs(dates))
+
+    assert [b["_id"] for b in buckets] == ["000001:tushare:daily:2023", "000001:tushare:daily:2024"]
+    b2024 = buckets[1]
+    assert (b2024["count"], b2024["first_date"], b2024["last_date"]) == (2, "2024-01-02", "2024-01-03")
+    # 全部缺失的列不写入
+    assert "amount" not in b2024["values"] and "close" in b2024["values"]
+
+    frame = kb.buckets_to_frame(buckets)
+    assert frame["trade_date"].tolist() == dates[:4]
+    assert frame["close"].tolist() == [10.5, 11.5, 12.5, 13.5]
+    assert frame["amount"].isna().all()
+    assert (frame["symbol"] == "000001").all() and (frame["data_source"] == "tushare").all()
+
+
+def test_build_buckets_merges_existing_with_new_rows_winning():
+    first = {b["_id"]: b for b in kb.build_buckets(_docs(["2024-01-03", "2024-01-02"]))}
+    update = _docs(["2024-01-03", "2024-01-04"], close_offset=100.0)
+    merged = kb.build_buckets(update, existing=first)
+
+    assert len(merged) == 1 and merged[0]["count"] == 3
+    dates, values = kb.decode_bucket(merged[0])
+    assert dates.tolist() == [20240102, 20240103, 20240104]
+    # 2024-01-02 来自旧桶，2024-01-03 被新数据覆盖
+    assert values["close"].tolist() == [11.5, 110.5, 111.5]
+
+
+def test_columns_slice_by_date_range_and_query_covers_years():
+    dates = pd.bdate_range("2021-01-01", "2024-12-31").strftime("%Y-%m-%d").tolist()
+    buckets = kb.build_buckets(_docs(dates))
+    assert len(buckets) == 4
+
+    query = kb.bucket_query("000001", "daily", None, "2022-06-01", "2023-03-31")
+    assert query == {"symbol": "000001", "period": "daily", "year": {"$gte": 2022, "$lte": 2023}}
+
+    selected = [b for b in buckets if 2022 <= b["year"] <= 2023]
+    cols = kb.buckets_to_columns(selected, "2022-06-01", "2023-03-31", columns=["close"])
+    expected = [d for d in dates if "2022-06-01" <= d <= "2023-03-31"]
+    assert set(cols) == {"trade_date", "close"}
+    assert cols["trade_date"].dtype == np.dtype("datetime64[D]")
+    assert pd.DatetimeIndex(cols["trade_date"]).strftime("%Y-%m-%d").tolist() == expected
+    assert len(cols["close"]) == len(expected)
+
+
+def test_pick_source_follows_priority():
+    buckets = kb.build_buckets(_docs(["2024-01-02"], source="akshare") + _docs(["2024-01-02"], source="baostock"))
+    assert kb.pick_source(buckets) == "akshare"
+    assert kb.pick_source(buckets, ["baostock", "akshare"]) == "baostock"
+    assert kb.pick_source([]) is None
+
+
+def test_select_buckets_requires_backfill_marker():
+    buckets = kb.build_buckets(_docs(["2024-01-02"], source="akshare") + _docs(["2024-01-02"], source="baostock"))
+    assert kb.select_buckets(buckets, []) == []
+    # 优先数据源未回填时不改用其他数据源，由调用方按逐条布局选择
+    assert kb.select_buckets(buckets, ["000001:baostock:daily"]) == []
+    selected = kb.select_buckets(buckets, [kb.backfill_key("000001", "akshare", "daily")])
+    assert [b["data_source"] for b in selected] == ["akshare"]
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from datetime import datetime
+
+import pytest
+
+from tradingagents.dataflows.news import near_dedup
+from tradingagents.dataflows.news.near_dedup import NearDuplicateIndex, filter_near_duplicates
+
+CONTENT = (
+    "贵州茅台发布2024年年度报告，全年实现营业总收入1741亿元，同比增长15.7%；"
+    "归属于上市公司股东的净利润862亿元，同比增长15.4%。公司拟每10股派发现金红利276.24元。"
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes(monkeypatch):
+    monkeypatch.setattr(near_dedup, "_INDEXES", OrderedDict())
+
+
+def _news(key, title, content=CONTENT):
+    return {"url": key, "title": title, "content": content}
+
+
+def _filter(items, symbol="600519", drop_known=False):
+    return filter_near_duplicates(
+        items, symbol,
+        get_title=lambda n: n["title"], get_content=lambda n: n["content"],
+        get_key=lambda n: n["url"], drop_known=drop_known,
+    )
+
+
+def test_syndicated_variants_join_one_cluster():
+    index = NearDuplicateIndex()
+    assert index.assign("a", "贵州茅台：2024年营收1741亿元 同比增长15.7%", CONTENT) == ("a", True)
+    # 转载：来源前缀、标点不同，正文末尾附加来源说明
+    assert index.assign("b", "【财联社】贵州茅台2024年营收1741亿元，同比增长15.7%", CONTENT + "（来源：财联社）") == ("a", False)
+    assert index.assign("c", "宁德时代发布钠离子电池新品 能量密度提升", "宁德时代今日召开发布会，推出第二代钠离子电池。") == ("c", True)
+    # 同一篇再次出现直接命中
+    assert index.assign("b", "", "") == ("a", False)
+    assert index.stats["key_hits"] == 1 and index.stats["duplicates"] == 1
+
+
+def test_shared_state_across_calls_and_drop_known():
+    first = _filter([_news("a", "贵州茅台：2024年营收1741亿元 同比增长15.7%")], symbol="600519.SH")
+    assert [n["url"] for n in first] == ["a"]
+
+    batch = [
+        _news("a", "贵州茅台：2024年营收1741亿元 同比增长15.7%"),
+        _news("b", "【转载】贵州茅台2024年营收1741亿元，同比增长15.7%"),
+        _news("c", "贵州茅台股东大会将于6月召开", "公司董事会决定召开2024年年度股东大会，审议利润分配方案。"),
+    ]
+    # 分析时：本批内每个簇保留一篇（a 仍是簇代表）
+    assert [n["url"] for n in _filter(batch)] == ["a", "c"]
+    # 入库时：之前已出现过的其他文章的转载稿丢弃，但簇代表本身仍保留
+    assert [n["url"] for n in _filter(batch[1:], drop_known=True)] == ["c"]
+    assert [n["url"] for n in _filter(batch[:1], drop_known=True)] == ["a"]
+
+
+def test_eviction_removes_items_from_lsh_tables():
+    index = NearDuplicateIndex(max_items=2, ttl_seconds=None)
+    articles = [
+        ("平安银行发布三季度业绩快报", "前三季度净利润同比增长5.2%，不良率保持稳定。"),
+        ("万科拟发行公司债券", "本次债券发行规模不超过50亿元，期限为五年。"),
+        ("招商银行董事会换届", "新一届董事会成员名单已公告，独立董事占比过半。"),
+    ]
+    for i, (title, content) in enumerate(articles):
+        assert index.assign(str(i), title, content) == (str(i), True)
+
+    assert len(index) == 2 and index.stats["evicted"] == 1
+    assert all("0" not in keys for table in index._tables for keys in table.values())
+    # 被淘汰的文章不再参与匹配
+    assert index.assign("x", *articles[0]) == ("x", True)
+
+
+def test_aggregator_drops_near_duplicates():
+    from tradingagents.dataflows.news.realtime_news import NewsItem, RealtimeNewsAggregator
+
+    def item(title, url, content=CONTENT):
+        return NewsItem(title=title, content=content, source="test", publish_time=datetime(2025, 1, 1),
+                        url=url, urgency="low", relevance_score=0.9)
+
+    aggregator = RealtimeNewsAggregator(source_timeout=1, deadline=1)
+    news = aggregator._deduplicate_news([
+        item("贵州茅台：2024年营收1741亿元 同比增长15.7%", "u1"),
+        item("贵州茅台2024年营收1741亿元 同比增长15.7%！", "u2"),
+        item("贵州茅台股东大会将于6月召开", "u3", "公司董事会决定召开2024年年度股东大会。"),
+    ], "600519")
+
+    assert [n.url for n in news] == ["u1", "u3"]
+
+
+def test_sync_service_index_ignores_aggregator_and_forgets_failed_saves():
+    import asyncio
+    import logging
+
+    from app.worker.news_data_sync_service import NewsDataSyncService
+
+    original = _news("a", "贵州茅台：2024年营收1741亿元 同比增长15.7%")
+    repost = _news("b", "【转载】贵州茅台2024年营收1741亿元，同比增长15.7%")
+    # 分析时见过原文，不影响入库
+    assert [n["url"] for n in _filter([original])] == ["a"]
+
+    svc = NewsDataSyncService.__new__(NewsDataSyncService)
+    svc.logger = logging.getLogger("test")
+    assert [n["url"] for n in svc._deduplicate_news([repost], "600519")] == ["b"]
+
+    class _NewsService:
+        def __init__(self, fail):
+            self.fail = fail
+
+        async def save_news_data(self, news, data_source, market="CN", failed_indexes=None):
+            if self.fail:
+                failed_indexes.extend(range(len(news)))
+                return 0
+            return len(news)
+
+    # b 保存失败：之后出现的转载稿（c）仍可入库
+    asyncio.run(svc._save_unique_news(_NewsService(fail=True), [repost], "multi_source", "600519"))
+    reposted = _news("c", "【财联社】贵州茅台2024年营收1741亿元 同比增长15.7%")
+    assert [n["url"] for n in svc._deduplicate_news([reposted], "600519")] == ["c"]
+
+    # c 保存成功：再出现的转载稿不再入库
+    asyncio.run(svc._save_unique_news(_NewsService(fail=False), [reposted], "multi_source", "600519"))
+    assert svc._deduplicate_news([repost], "600519") == []
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+import requests
+
+from tradingagents.dataflows.news import near_dedup, realtime_news
+from tradingagents.dataflows.news.realtime_news import NewsItem, RealtimeNewsAggregator
+
+
+def _items(prefix, n, relevance=1.0):
+    # 标题各不相同（避免被近似去重合并）
+    return [
+        NewsItem(
+            title=f"AAPL {uuid.uuid4().hex} {prefix}", content="", source=prefix,
+            publish_time=datetime(2025, 1, 1, 9, i), url="", urgency="low", relevance_score=relevance,
+        )
+        for i in range(n)
+    ]
+
+
+def _slow(delay, items=(), error=None):
+    def source():
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return list(items)
+    return source
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    monkeypatch.setattr(realtime_news, "_SOURCE_LATENCY", {})
+    monkeypatch.setattr(near_dedup, "_INDEXES", OrderedDict())
+    executor = ThreadPoolExecutor(max_workers=8)
+    monkeypatch.setattr(realtime_news, "_EXECUTOR", executor)
+    yield RealtimeNewsAggregator(source_timeout=1, deadline=2)
+    # 等待被放弃的慢速新闻源结束，避免测试结束后线程继续写日志
+    executor.shutdown(wait=True)
+
+
+def _use_sources(monkeypatch, aggregator, sources):
+    monkeypatch.setattr(aggregator, "_news_sources", lambda ticker, hours_back: list(sources.items()))
+
+
+def test_sources_run_concurrently_and_record_latency(monkeypatch, aggregator):
+    _use_sources(monkeypatch, aggregator, {
+        "A": _slow(0.3, _items("A", 2, relevance=0.3)),
+        "B": _slow(0.3, _items("B", 2, relevance=0.3)),
+        "C": _slow(0.3, _items("C", 2, relevance=0.3)),
+        "D": _slow(0.05, error=requests.Timeout("read timed out")),
+        "E": _slow(0.05, error=RuntimeError("boom")),
+    })
+
+    started = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", max_news=10)
+    elapsed = time.perf_counter() - started
+
+    assert len(news) == 6
+    # 串行约 0.3 * 3 + 0.1 = 1.0 秒
+    assert elapsed < 0.6
+    stats = aggregator.get_source_latency_stats()
+    assert stats["A"]["count"] == 1 and stats["A"]["buckets"]["le_0.5s"] == 1
+    assert stats["D"]["timeouts"] == 1 and stats["E"]["errors"] == 1
+
+
+def test_returns_partial_results_at_deadline(monkeypatch, aggregator):
+    aggregator.deadline = 0.3
+    _use_sources(monkeypatch, aggregator, {
+        "fast": _slow(0.01, _items("fast", 3, relevance=0.3)),
+        "stalled": _slow(1.5, _items("stalled", 3)),
+    })
+
+    started = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", max_news=10)
+
+    assert time.perf_counter() - started < 0.6
+    assert {item.source for item in news} == {"fast"}
+
+
+def test_stops_early_once_enough_high_relevance_news(monkeypatch, aggregator):
+    _use_sources(monkeypatch, aggregator, {
+        "relevant": _slow(0.01, _items("relevant", 5)),
+        "slow": _slow(1.0, _items("slow", 5)),
+    })
+
+    started = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", max_news=5)
+
+    assert time.perf_counter() - started < 0.5
+    assert len(news) == 5 and {item.source for item in news} == {"relevant"}
+
+
+def test_cancel_event_returns_collected_news(monkeypatch, aggregator):
+    cancel = threading.Event()
+    _use_sources(monkeypatch, aggregator, {
+        "fast": _slow(0.01, _items("fast", 2, relevance=0.3)),
+        "slow": _slow(1.5, _items("slow", 2)),
+    })
+    threading.Timer(0.1, cancel.set).start()
+
+    started = time.perf_counter()
+    news = aggregator.get_realtime_stock_news("AAPL", max_news=10, cancel_event=cancel)
+
+    assert time.perf_counter() - started < 0.6
+    assert {item.source for item in news} == {"fast"}
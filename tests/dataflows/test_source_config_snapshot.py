@@ -0,0 +1,138 @@
+from tradingagents.dataflows import data_source_manager as dsm_mod
+from tradingagents.dataflows.data_source_manager import (
+    ChinaDataSource,
+    DataSourceManager,
+    USDataSource,
+    USDataSourceManager,
+)
+from tradingagents.dataflows.source_config_snapshot import SourceConfigCache
+
+
+class _Cursor(list):
+    def sort(self, key, direction):
+        return _Cursor(sorted(self, key=lambda d: d.get(key, 0), reverse=direction < 0))
+
+
+class _Collection:
+    """只实现快照用到的查询"""
+
+    def __init__(self, docs, counter):
+        self.docs = docs
+        self.counter = counter
+
+    def _match(self, query):
+        return [d for d in self.docs if all(d.get(k) == v for k, v in query.items())]
+
+    def find_one(self, query, projection=None, sort=None):
+        self.counter.append("find_one")
+        docs = self._match(query)
+        if sort:
+            key, direction = sort[0]
+            docs = sorted(docs, key=lambda d: str(d.get(key, "")), reverse=direction < 0)
+        return docs[0] if docs else None
+
+    def find(self, query):
+        self.counter.append("find")
+        return _Cursor(self._match(query))
+
+    def count_documents(self, query):
+        self.counter.append("count")
+        return len(self._match(query))
+
+
+class _DB:
+    def __init__(self):
+        self.queries = []
+        self.system_configs = _Collection([{
+            "_id": "cfg1",
+            "is_active": True,
+            "version": 1,
+            "data_source_configs": [
+                {"name": "Tushare", "type": "tushare", "priority": 3, "api_key": "tk", "market_categories": ["a_shares"]},
+                {"name": "AKShare", "type": "akshare", "priority": 2},
+                {"name": "BaoStock", "type": "baostock", "priority": 5, "enabled": False},
+            ],
+        }], self.queries)
+        self.datasource_groupings = _Collection([
+            {"data_source_name": "Finnhub", "market_category_id": "us_stocks", "enabled": True, "priority": 1},
+            {"data_source_name": "yfinance", "market_category_id": "us_stocks", "enabled": True, "priority": 2},
+        ], self.queries)
+
+
+def _china_manager(cache, monkeypatch):
+    monkeypatch.setattr(dsm_mod, "get_source_config_snapshot", cache.get)
+    manager = object.__new__(DataSourceManager)
+    manager.available_sources = [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE, ChinaDataSource.BAOSTOCK]
+    return manager
+
+
+def test_priority_lookups_are_served_from_memory(monkeypatch):
+    db = _DB()
+    cache = SourceConfigCache(db_getter=lambda: db, poll_seconds=60)
+    manager = _china_manager(cache, monkeypatch)
+
+    assert manager._get_data_source_priority_order("000001") == [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE]
+    assert manager._get_data_source_priority_order("0700.HK") == [ChinaDataSource.AKSHARE]
+    assert manager._get_datasource_configs_from_db()["tushare"]["api_key"] == "tk"
+    queries = len(db.queries)
+    for _ in range(100):
+        manager._get_data_source_priority_order("600519")
+
+    assert len(db.queries) == queries
+    assert cache.snapshot_info()["reloads"] == 1
+
+
+def test_invalidate_picks_up_new_version_and_poll_skips_unchanged(monkeypatch):
+    db = _DB()
+    cache = SourceConfigCache(db_getter=lambda: db, poll_seconds=60)
+    manager = _china_manager(cache, monkeypatch)
+    assert manager._get_data_source_priority_order("000001")[0] == ChinaDataSource.TUSHARE
+
+    # 版本未变化时只做版本检查，不重新加载
+    cache.invalidate()
+    manager._get_data_source_priority_order("000001")
+    assert cache.snapshot_info()["reloads"] == 1
+
+    config = db.system_configs.docs[0]
+    config["data_source_configs"][1]["priority"] = 10
+    config["version"] = 2
+    cache.invalidate()
+
+    assert manager._get_data_source_priority_order("000001") == [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE]
+    info = cache.snapshot_info()
+    assert info["reloads"] == 2 and info["version_checks"] == 3
+
+
+def test_database_failure_uses_defaults(monkeypatch):
+    def broken():
+        raise RuntimeError("mongo down")
+
+    cache = SourceConfigCache(db_getter=broken, poll_seconds=60)
+    manager = _china_manager(cache, monkeypatch)
+    us_manager = object.__new__(USDataSourceManager)
+    us_manager.available_sources = [USDataSource.YFINANCE, USDataSource.FINNHUB]
+
+    assert manager._get_data_source_priority_order("000001") == [
+        ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE, ChinaDataSource.BAOSTOCK]
+    assert us_manager._get_enabled_sources_from_db() == ['yfinance', 'alpha_vantage', 'finnhub']
+    assert us_manager._get_datasource_configs_from_db() == {}
+    # 失败结果在检查周期内同样缓存，不会每次调用都重试数据库
+    assert cache.snapshot_info()["errors"] == 1
+
+
+def test_us_manager_reads_groupings_from_snapshot(monkeypatch):
+    db = _DB()
+    cache = SourceConfigCache(db_getter=lambda: db, poll_seconds=60)
+    monkeypatch.setattr(dsm_mod, "get_source_config_snapshot", cache.get)
+    manager = object.__new__(USDataSourceManager)
+    manager.available_sources = [USDataSource.YFINANCE, USDataSource.FINNHUB]
+
+    assert manager._get_data_source_priority_order("AAPL") == [USDataSource.YFINANCE, USDataSource.FINNHUB]
+    assert manager._get_enabled_sources_from_db() == ["yfinance", "finnhub"]
+    assert set(manager._get_datasource_configs_from_db()) == {"tushare", "akshare", "baostock"}
+
+    # 新增分组后版本标识（分组数量）变化，轮询到期即重新加载
+    db.datasource_groupings.docs.append(
+        {"data_source_name": "Alpha Vantage", "market_category_id": "us_stocks", "enabled": True, "priority": 3})
+    cache.invalidate()
+    assert manager._get_enabled_sources_from_db() == ["alpha_vantage", "yfinance", "finnhub"]
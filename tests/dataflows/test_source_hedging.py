@@ -0,0 +1,142 @@
+import threading
+import time
+
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.source_hedging import MIN_SAMPLES, SourceHedger
+
+
+def _fetcher(behaviour, calls):
+    """behaviour: {source: (延迟秒数, 结果或异常)}"""
+    def fetch(source):
+        calls.append(source)
+        delay, value = behaviour[source]
+        time.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return fetch
+
+
+def _is_valid(value):
+    return bool(value) and "❌" not in value
+
+
+def test_slow_failing_primary_uses_hedge_already_in_flight():
+    hedger = SourceHedger(enabled=True, default_delay=0.05)
+    calls = []
+    fetch = _fetcher({"a": (0.6, TimeoutError("timeout")), "b": (0.3, "fast")}, calls)
+
+    started = time.perf_counter()
+    result, source, first = hedger.fetch("stock_data", ["a", "b"], fetch, _is_valid)
+
+    assert (result, source, first) == ("fast", "b", None)
+    # 依次降级约 0.9 秒；对冲请求在主数据源超时前已完成
+    assert time.perf_counter() - started < 0.8
+    assert hedger.stats("stock_data", "a").hedged == 1
+    assert hedger.stats("stock_data", "b").wins == 1
+
+
+def test_slow_valid_primary_loses_to_faster_hedge():
+    hedger = SourceHedger(enabled=True, default_delay=0.05)
+    threads = {}
+
+    def fetch(source):
+        threads[source] = threading.current_thread().name
+        time.sleep(1.0 if source == "a" else 0.01)
+        return source
+
+    started = time.perf_counter()
+    assert hedger.fetch("stock_data", ["a", "b"], fetch, _is_valid) == ("b", "b", None)
+    assert time.perf_counter() - started < 0.5
+    # 主请求不占用对冲线程池
+    assert threads["a"] == "source-primary" and threads["b"].startswith("source-hedge")
+    assert hedger.stats("stock_data", "b").wins == 1
+
+
+def test_full_hedge_pool_skips_hedging(monkeypatch):
+    monkeypatch.delenv("DATA_SOURCE_HEDGING", raising=False)
+    assert SourceHedger().enabled is False
+
+    hedger = SourceHedger(enabled=True, default_delay=0.01, max_workers=0)
+    calls = []
+    fetch = _fetcher({"a": (0.1, "❌ a"), "b": (0, "ok")}, calls)
+
+    assert hedger.fetch("stock_data", ["a", "b"], fetch, _is_valid) == ("ok", "b", "❌ a")
+    assert calls == ["a", "b"]
+    assert hedger.stats("stock_data", "a").hedged == 0
+
+
+def test_invalid_result_launches_next_source_without_waiting():
+    hedger = SourceHedger(enabled=True, default_delay=5)
+    calls = []
+    fetch = _fetcher({"a": (0, "❌ 无数据"), "b": (0, RuntimeError("down")), "c": (0, "ok")}, calls)
+
+    started = time.perf_counter()
+    result, source, first = hedger.fetch("stock_data", ["a", "b", "c"], fetch, _is_valid)
+
+    assert (result, source, first) == ("ok", "c", "❌ 无数据")
+    assert time.perf_counter() - started < 1
+    assert hedger.stats("stock_data", "b").error_rate() == 1
+
+
+def test_fallback_sources_are_only_resolved_when_needed():
+    hedger = SourceHedger(enabled=True, default_delay=5)
+    resolved = []
+
+    def sources():
+        yield "a"
+        resolved.append(True)
+        yield "b"
+
+    result, source, _ = hedger.fetch("news", sources(), _fetcher({"a": (0, "ok")}, []), _is_valid)
+
+    assert (result, source) == ("ok", "a")
+    assert resolved == []
+
+
+def test_sequential_mode_and_all_sources_failing():
+    hedger = SourceHedger(enabled=False, default_delay=0.01)
+    calls = []
+    fetch = _fetcher({"a": (0.1, "❌ a"), "b": (0, "❌ b")}, calls)
+
+    assert hedger.fetch("stock_data", ["a", "b"], fetch, _is_valid) == (None, None, "❌ a")
+    assert calls == ["a", "b"]
+    assert hedger.stats("stock_data", "a").hedged == 0
+
+
+def test_unhealthy_sources_are_demoted_and_p95_sets_hedge_delay():
+    hedger = SourceHedger(enabled=True, min_delay=0.05, max_delay=2, default_delay=1)
+    for _ in range(MIN_SAMPLES):
+        hedger.stats("fundamentals", "tushare").record(0.01, False)
+        hedger.stats("fundamentals", "akshare").record(0.3, True)
+
+    assert hedger.order("fundamentals", ["tushare", "akshare", "baostock"]) == ["akshare", "baostock", "tushare"]
+    assert hedger.hedge_delay("fundamentals", "akshare") == 0.3
+    assert hedger.hedge_delay("fundamentals", "tushare") == 0.05
+    assert hedger.hedge_delay("fundamentals", "baostock") == 1
+    snapshot = hedger.snapshot()["fundamentals"]
+    assert snapshot["tushare"]["error_rate"] == 1
+    assert snapshot["akshare"]["p95_seconds"] == 0.3
+
+
+def test_data_source_manager_hedges_stock_data(monkeypatch):
+    manager = object.__new__(DataSourceManager)
+    manager.current_source = ChinaDataSource.AKSHARE
+    manager.available_sources = [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE, ChinaDataSource.BAOSTOCK]
+    manager.hedger = SourceHedger(enabled=True, default_delay=0.05)
+
+    monkeypatch.setattr(manager, "_get_data_source_priority_order", lambda symbol=None: [
+        ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE, ChinaDataSource.BAOSTOCK])
+    monkeypatch.setattr(manager, "_get_akshare_data", lambda *a, **k: time.sleep(1) or "akshare data")
+    monkeypatch.setattr(manager, "_get_tushare_data", lambda *a, **k: "tushare data")
+    monkeypatch.setattr(manager, "_get_baostock_data", lambda *a, **k: "❌ baostock down")
+
+    started = time.perf_counter()
+    assert manager.get_stock_data("000001", "2025-01-01", "2025-01-31") == "tushare data"
+    assert time.perf_counter() - started < 0.5
+
+    # 降级入口不再请求当前数据源
+    monkeypatch.setattr(manager, "_get_tushare_data", lambda *a, **k: "❌ tushare down")
+    assert manager._try_fallback_sources("000001", "2025-01-01", "2025-01-31") == (
+        "❌ 所有数据源都无法获取000001的daily数据", None)
+    assert manager.get_source_stats()["stock_data"]["tushare"]["wins"] == 1
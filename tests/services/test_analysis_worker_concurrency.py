@@ -0,0 +1,136 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tradingagents.graph.cancellation import raise_if_cancelled
+
+
+class _FakeQueue:
+    def __init__(self, n):
+        self.ready = [
+            {"id": f"t{i}", "symbol": "000001", "user": "507f1f77bcf86cd799439011", "parameters": {}}
+            for i in range(n)
+        ]
+        self.status = {}
+        self.acked = []
+
+    async def dequeue_task(self, worker_id, block_timeout=0):
+        if not self.ready:
+            return None
+        task = self.ready.pop(0)
+        self.status[task["id"]] = "processing"
+        return task
+
+    async def get_task(self, task_id):
+        return {"id": task_id, "status": self.status.get(task_id)}
+
+    async def ack_task(self, task_id, success=True):
+        self.acked.append((task_id, success))
+        self.status[task_id] = "completed" if success else "failed"
+        return True
+
+
+class _FakeAnalysisService:
+    """在 executor 中逐节点阻塞执行，模拟 propagate（节点之间检查取消信号）"""
+
+    def __init__(self, seconds, nodes=5):
+        self.seconds = seconds
+        self.nodes = nodes
+        self.running = 0
+        self.max_running = 0
+        self.nodes_run = {}
+        self.stopped = set()
+
+    def _blocking(self, task_id, cancel_event):
+        try:
+            for _ in range(self.nodes):
+                raise_if_cancelled(cancel_event)
+                time.sleep(self.seconds / self.nodes)
+                self.nodes_run[task_id] = self.nodes_run.get(task_id, 0) + 1
+        finally:
+            self.stopped.add(task_id)
+
+    async def execute_analysis_task(self, task, progress_callback=None, executor=None, cancel_event=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            progress_callback(50, "执行股票分析...")
+            await asyncio.get_running_loop().run_in_executor(
+                executor, self._blocking, task.task_id, cancel_event
+            )
+            return SimpleNamespace(execution_time=self.seconds)
+        finally:
+            self.running -= 1
+
+
+def _worker(monkeypatch, queue, service, concurrency):
+    import app.worker.analysis_worker as analysis_worker
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(analysis_worker, "get_analysis_service", lambda: service)
+    w = analysis_worker.AnalysisWorker(worker_id="wtest")
+    w.queue_service = queue
+    w.concurrency = concurrency
+    w.poll_interval = 0.01
+    w.executor = ThreadPoolExecutor(max_workers=concurrency)
+    return w
+
+
+async def _run_until_drained(w, queue, total):
+    w.running = True
+    loop_task = asyncio.create_task(w._work_loop())
+    while len(queue.acked) + sum(s == "cancelled" for s in queue.status.values()) < total:
+        await asyncio.sleep(0.01)
+    w.running = False
+    await loop_task
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_worker_runs_up_to_concurrency_tasks(monkeypatch, concurrency):
+    queue = _FakeQueue(6)
+    service = _FakeAnalysisService(0.1)
+    w = _worker(monkeypatch, queue, service, concurrency)
+
+    started = time.perf_counter()
+    asyncio.run(_run_until_drained(w, queue, 6))
+    elapsed = time.perf_counter() - started
+
+    assert service.max_running == concurrency
+    assert sorted(queue.acked) == [(f"t{i}", True) for i in range(6)]
+    assert not w.active_tasks and w.current_task is None
+    # 6 个 0.1s 任务：串行约 0.6s，3 并发约 0.2s
+    assert elapsed < 0.6 / concurrency + 0.25
+
+
+def test_cancelled_task_is_stopped_without_ack(monkeypatch):
+    queue = _FakeQueue(2)
+    service = _FakeAnalysisService(0.3)
+    w = _worker(monkeypatch, queue, service, 2)
+
+    async def scenario():
+        w.running = True
+        loop_task = asyncio.create_task(w._work_loop())
+        while len(w.active_tasks) < 2:
+            await asyncio.sleep(0.01)
+        assert set(w.current_task_ids()) == {"t0", "t1"}
+
+        queue.status["t0"] = "cancelled"
+        while "t0" in w.active_tasks:
+            await asyncio.sleep(0.01)
+        # 任务只在分析线程退出后才结束
+        assert "t0" in service.stopped
+        while len(queue.acked) < 1:
+            await asyncio.sleep(0.01)
+        w.running = False
+        await loop_task
+
+    asyncio.run(scenario())
+
+    assert queue.acked == [("t1", True)]
+    assert queue.status["t0"] == "cancelled"
+    # 取消后不再执行后续节点
+    assert service.nodes_run.get("t0", 0) < service.nodes
+    assert service.nodes_run["t1"] == service.nodes
+    assert not w.cancel_events
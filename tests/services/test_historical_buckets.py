@@ -0,0 +1,164 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from app.services.historical_data_service import HistoricalDataService
+
+
+def _match(doc, query):
+    for key, cond in query.items():
+        value = doc.get(key)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and not value >= cond["$gte"]:
+                return False
+            if "$lte" in cond and not value <= cond["$lte"]:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+    def __aiter__(self):
+        async def gen():
+            for doc in self.docs:
+                yield doc
+        return gen()
+
+
+class _Collection:
+    """按 ReplaceOne 的 filter 做 upsert 的内存集合"""
+
+    def __init__(self, name):
+        self.name = name
+        self.docs = {}
+        self.finds = 0
+
+    async def bulk_write(self, operations, ordered=False):
+        for op in operations:
+            self.docs[tuple(sorted(op._filter.items()))] = dict(op._doc)
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        docs = [dict(d) for d in self.docs.values() if _match(d, query)]
+        if projection and any(v == 1 for v in projection.values()):
+            docs = [{k: v for k, v in d.items() if projection.get(k) == 1} for d in docs]
+        return _Cursor(docs)
+
+    async def distinct(self, key, query=None):
+        return list({d[key] for d in self.docs.values() if _match(d, query or {})})
+
+    async def delete_many(self, query):
+        for key in [k for k, d in self.docs.items() if _match(d, query)]:
+            del self.docs[key]
+
+
+def _service(enabled=True):
+    svc = HistoricalDataService()
+    svc.db = SimpleNamespace()
+    svc.collection = _Collection("stock_daily_quotes")
+    svc.bucket_collection = _Collection("stock_daily_quotes_buckets")
+    svc.backfill_collection = _Collection("stock_daily_quotes_bucket_backfill")
+    svc.bucket_layout_enabled = enabled
+    return svc
+
+
+def _frame(start, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 10 + rng.random(periods).cumsum()
+    return pd.DataFrame({
+        "date": pd.bdate_range(start, periods=periods).strftime("%Y-%m-%d"),
+        "open": close - 0.1, "high": close + 0.2, "low": close - 0.3, "close": close,
+        "volume": rng.integers(1_000, 9_000, periods).astype(float),
+    })
+
+
+def test_bucket_dual_write_and_columnar_read_match_rows():
+    svc = _service()
+    # 跨年的两次写入：第二次与第一次重叠 5 个交易日；第一次写入后完成回填
+    asyncio.run(svc.save_historical_data("000001", _frame("2022-11-01", 300), "akshare"))
+    asyncio.run(svc.rebuild_buckets())
+    asyncio.run(svc.save_historical_data("000001", _frame("2023-12-25", 30, seed=1), "akshare"))
+
+    bucket_ids = sorted(d["_id"] for d in svc.bucket_collection.docs.values())
+    assert bucket_ids == [f"000001:akshare:daily:{y}" for y in (2022, 2023, 2024)]
+
+    from_buckets = asyncio.run(svc.get_historical_frame("000001", "2023-01-01", "2024-01-31", columns=["close", "volume"]))
+    rows_before = svc.collection.finds
+    svc.bucket_layout_enabled = False
+    from_rows = asyncio.run(svc.get_historical_frame("000001", "2023-01-01", "2024-01-31", columns=["close", "volume"]))
+
+    assert svc.collection.finds == rows_before + 1
+    assert from_buckets["trade_date"].tolist() == from_rows["trade_date"].tolist()
+    np.testing.assert_allclose(from_buckets["close"], from_rows["close"])
+    np.testing.assert_allclose(from_buckets["volume"], from_rows["volume"])
+
+    svc.bucket_layout_enabled = True
+    cols = asyncio.run(svc.get_historical_columns("000001", "2023-01-01", "2024-01-31", columns=["close"]))
+    np.testing.assert_allclose(cols["close"], from_rows["close"])
+
+
+def test_buckets_disabled_by_default_and_rebuild_backfills():
+    svc = _service(enabled=False)
+    frames = [(f"00000{i}", _frame("2024-01-02", 20, seed=i)) for i in (1, 2)]
+    asyncio.run(svc.save_historical_batch(frames, data_source="tushare"))
+    assert svc.bucket_collection.docs == {}
+
+    stats = asyncio.run(svc.rebuild_buckets())
+    assert stats == {"symbols": 2, "rows": 40, "buckets": 2}
+
+    svc.bucket_layout_enabled = True
+    frame = asyncio.run(svc.get_historical_frame("000002"))
+    assert len(frame) == 20 and (frame["data_source"] == "tushare").all()
+
+
+def test_partially_bucketed_history_reads_rows_until_backfilled():
+    svc = _service(enabled=False)
+    asyncio.run(svc.save_historical_data("000001", _frame("2022-01-03", 600), "tushare"))
+    full = asyncio.run(svc.get_historical_frame("000001", "2022-01-01", "2024-12-31", columns=["close"]))
+
+    # 开启分桶后一次增量同步只写出当年的桶
+    svc.bucket_layout_enabled = True
+    asyncio.run(svc.save_historical_data("000001", _frame("2024-03-01", 5, seed=1), "tushare"))
+    assert sorted(d["year"] for d in svc.bucket_collection.docs.values()) == [2024]
+
+    rows_before = svc.collection.finds
+    partial = asyncio.run(svc.get_historical_frame("000001", "2022-01-01", "2024-12-31", columns=["close"]))
+    cols = asyncio.run(svc.get_historical_columns("000001", "2022-01-01", "2024-12-31", columns=["close"]))
+    assert svc.collection.finds == rows_before + 2
+    assert partial["trade_date"].tolist() == full["trade_date"].tolist()
+    assert len(cols["close"]) == len(full)
+
+    # 回填后使用分桶
+    asyncio.run(svc.rebuild_buckets())
+    assert list(svc.backfill_collection.docs.values())[0]["_id"] == "000001:tushare:daily"
+    rows_before = svc.collection.finds
+    from_buckets = asyncio.run(svc.get_historical_frame("000001", "2022-01-01", "2024-12-31", columns=["close"]))
+    assert svc.collection.finds == rows_before
+    assert from_buckets["trade_date"].tolist() == full["trade_date"].tolist()
+
+    # 分桶写入失败后删除回填标记，重新退回逐条布局
+    async def broken_bulk_write(operations, ordered=False):
+        raise RuntimeError("bucket write failed")
+
+    svc.bucket_collection.bulk_write = broken_bulk_write
+    asyncio.run(svc.save_historical_data("000001", _frame("2024-06-03", 3, seed=2), "tushare"))
+    assert svc.backfill_collection.docs == {}
+    rows_before = svc.collection.finds
+    asyncio.run(svc.get_historical_frame("000001", "2022-01-01", "2024-12-31", columns=["close"]))
+    assert svc.collection.finds == rows_before + 1
@@ -0,0 +1,148 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.historical_data_service import HistoricalDataService
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+
+def _rowwise(svc, symbol, data, data_source, market, period="daily"):
+    """逐行参考实现（改造前 save_historical_data 的标准化方式）"""
+    docs = []
+    for date_index, row in data.iterrows():
+        try:
+            docs.append(svc._standardize_record(symbol, row, data_source, market, period, date_index))
+        except Exception:
+            continue
+    return docs
+
+
+def _strip(doc):
+    return {k: v for k, v in doc.items() if k not in TIMESTAMP_FIELDS}
+
+
+def _assert_same(got, expected):
+    assert len(got) == len(expected)
+    for g, e in zip(got, expected):
+        g, e = _strip(g), _strip(e)
+        assert list(g) == list(e)
+        for key in e:
+            a, b = g[key], e[key]
+            if isinstance(b, float) and math.isnan(b):
+                assert isinstance(a, float) and math.isnan(a), key
+            else:
+                assert a == b and type(a) is type(b), (key, a, b)
+
+
+def _tushare_frame(n=50, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 10 + rng.random(n).cumsum()
+    df = pd.DataFrame({
+        "ts_code": "000001.SZ",
+        "trade_date": pd.date_range("2024-01-01", periods=n).strftime("%Y%m%d"),
+        "open": close * 0.99, "high": close * 1.01, "low": close * 0.98, "close": close,
+        "pre_close": np.r_[0.0, close[:-1]],
+        "change": rng.normal(size=n), "pct_chg": rng.normal(size=n),
+        "vol": rng.integers(0, 10000, n).astype(float), "amount": rng.random(n) * 1e5,
+        "turnover_rate": np.where(rng.random(n) < 0.2, 0.0, rng.random(n)),
+        "pe": np.where(rng.random(n) < 0.2, np.nan, rng.random(n) * 30),
+    })
+    df.loc[3, "close"] = np.nan
+    df.loc[5, "amount"] = 0.0
+    return df
+
+
+def _akshare_frame(n=30):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(pd.date_range("2023-06-01", periods=n)),
+        "code": "600000",
+        "open": np.linspace(9, 10, n), "close": np.linspace(9.1, 10.1, n),
+        "high": np.linspace(9.2, 10.2, n), "low": np.linspace(8.9, 9.9, n),
+        "volume": np.arange(n, dtype=np.int64) * 100, "amount": np.arange(n) * 1e4,
+        "change_percent": np.linspace(-1, 1, n), "turnover_rate": np.linspace(0, 2, n),
+    })
+    return df
+
+
+def _baostock_frame():
+    # BaoStock 返回字符串列，包含空字符串
+    return pd.DataFrame({
+        "date": ["2024-03-01", "2024-03-04", "20240305", ""],
+        "code": ["sh.600000"] * 4,
+        "open": ["9.1", "9.2", "", "9.4"], "high": ["9.5", "abc", "9.6", "9.7"],
+        "low": ["9.0", "9.1", "9.2", "9.3"], "close": ["9.3", "9.4", "9.5", "0"],
+        "preclose": ["9.0", "9.3", "9.4", "9.5"], "volume": ["100", "0", "", "300"],
+        "amount": ["1000.5", "", "3000", "0"], "turn": ["1.5", "", "0", "2"],
+        "tradestatus": ["1", "1", "0", "1"], "isST": ["0", "0", "1", ""],
+        "adjustflag": ["3", "3", "", "3"], "pctChg": ["1", "2", "3", "4"],
+    }, index=pd.date_range("2024-03-01", periods=4))
+
+
+def _yfinance_frame():
+    # 港股/美股：日期在索引中，无 pre_close（由 _prepare_frame 补齐）
+    idx = pd.date_range("2024-05-01", periods=6, name="Date")
+    return pd.DataFrame({
+        "open": [1.0, 2, 3, 4, 5, 6], "high": [2.0, 3, 4, 5, 6, 7], "low": [0.5, 1, 2, 3, 4, 5],
+        "close": [1.5, 2.5, 3.5, 0.0, 5.5, 6.5], "volume": [100, 200, 0, 400, 500, 600],
+    }, index=idx)
+
+
+@pytest.mark.parametrize("make_frame, data_source, market", [
+    (_tushare_frame, "tushare", "CN"),
+    (_akshare_frame, "akshare", "CN"),
+    (_baostock_frame, "baostock", "CN"),
+    (_yfinance_frame, "yfinance", "HK"),
+    (_yfinance_frame, "yfinance", "US"),
+])
+def test_vectorized_standardization_matches_rowwise(make_frame, data_source, market):
+    svc = HistoricalDataService()
+    data = make_frame()
+    svc._prepare_frame("000001", data, data_source, market)
+
+    expected = _rowwise(svc, "000001", data, data_source, market, "weekly")
+    got = svc._standardize_frame("000001", data, data_source, market, "weekly")
+
+    _assert_same(got, expected)
+
+
+def test_vectorized_standardization_with_per_row_symbols():
+    svc = HistoricalDataService()
+    data = pd.concat([_tushare_frame(8, seed=1), _tushare_frame(8, seed=2)], ignore_index=True)
+    codes = ["600000"] * 8 + ["300750"] * 8
+    data["code"] = codes
+
+    expected = [d for i, (_, row) in enumerate(data.iterrows())
+                for d in [svc._standardize_record(codes[i], row, "tushare", "CN", "daily", i)]]
+    got = svc._standardize_frame(codes, data, "tushare", "CN", "daily")
+
+    _assert_same(got, expected)
+    assert {d["full_symbol"] for d in got} == {"600000.SH", "300750.SZ"}
+
+
+def test_chunked_bulk_writes_run_in_parallel():
+    import asyncio
+    from types import SimpleNamespace
+
+    running = {"now": 0, "max": 0}
+    sizes = []
+
+    class _Collection:
+        async def bulk_write(self, operations, ordered=False):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            sizes.append(len(operations))
+            return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+    svc = HistoricalDataService()
+    svc.collection = _Collection()
+    svc.bulk_write_concurrency = 3
+
+    saved = asyncio.run(svc.save_historical_data("000001", _tushare_frame(1000), "tushare"))
+
+    assert saved == 1000 and sorted(sizes) == [200] * 5
+    assert running["max"] == 3
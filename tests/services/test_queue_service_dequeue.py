@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.services.queue import (
+    INFLIGHT_PREFIX,
+    READY_LIST,
+    SET_PROCESSING,
+    TASK_PREFIX,
+    VISIBILITY_DEADLINES,
+)
+from app.services.queue_service import QueueService
+
+
+def _service(**limits):
+    qs = QueueService(fakeredis.FakeAsyncRedis(decode_responses=True))
+    for name, value in limits.items():
+        setattr(qs, name, value)
+    return qs
+
+
+def test_dequeue_claims_oldest_task_atomically():
+    async def scenario():
+        qs = _service()
+        first = await qs.enqueue_task("u1", "000001", {"research_depth": "快速"})
+        await qs.enqueue_task("u1", "000002", {})
+
+        task = await qs.dequeue_task("w1")
+
+        assert task["id"] == first and task["status"] == "processing" and task["worker_id"] == "w1"
+        assert task["parameters"] == {"research_depth": "快速"}
+        assert await qs.r.sismember(SET_PROCESSING, first)
+        assert await qs.r.zscore(VISIBILITY_DEADLINES, first) >= int(time.time()) + qs.visibility_timeout - 1
+        assert await qs.r.llen(INFLIGHT_PREFIX + "w1") == 0
+        assert await qs.r.llen(READY_LIST) == 1
+
+        assert await qs.ack_task(first)
+        assert await qs.r.zscore(VISIBILITY_DEADLINES, first) is None
+        assert not await qs.r.sismember(SET_PROCESSING, first)
+
+    asyncio.run(scenario())
+
+
+def test_dequeue_respects_user_and_global_limits():
+    async def scenario():
+        qs = _service(user_concurrent_limit=1)
+        await qs.enqueue_task("u1", "000001", {})
+        blocked = await qs.enqueue_task("u1", "000002", {})
+
+        assert await qs.dequeue_task("w1") is not None
+        assert await qs.dequeue_task("w1") is None
+        assert await qs.r.lrange(READY_LIST, 0, -1) == [blocked]
+        assert await qs.r.hget(TASK_PREFIX + blocked, "status") == "queued"
+
+        qs.user_concurrent_limit = 10
+        qs.global_concurrent_limit = 1
+        assert await qs.dequeue_task("w2") is None
+        assert await qs.r.lrange(READY_LIST, 0, -1) == [blocked]
+
+    asyncio.run(scenario())
+
+
+def test_blocking_dequeue_uses_same_claim_path():
+    async def scenario():
+        qs = _service()
+        task_id = await qs.enqueue_task("u1", "000001", {})
+
+        task = await qs.dequeue_task("w1", block_timeout=1)
+
+        assert task["id"] == task_id and task["status"] == "processing"
+        assert await qs.r.llen(INFLIGHT_PREFIX + "w1") == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_task_is_not_claimed():
+    async def scenario():
+        qs = _service()
+        task_id = await qs.enqueue_task("u1", "000001", {})
+        await qs.r.hset(TASK_PREFIX + task_id, "status", "cancelled")
+
+        assert await qs.dequeue_task("w1") is None
+        assert await qs.r.llen(READY_LIST) == 0
+        assert not await qs.r.sismember(SET_PROCESSING, task_id)
+
+    asyncio.run(scenario())
+
+
+def test_cleanup_recovers_orphaned_and_expired_tasks():
+    async def scenario():
+        qs = _service()
+        # Worker 在移入在途列表后、认领前崩溃（无心跳）
+        orphan = await qs.enqueue_task("u1", "000001", {})
+        await qs.r.rpoplpush(READY_LIST, INFLIGHT_PREFIX + "dead")
+        # 已认领但可见性超时的任务
+        expired = await qs.enqueue_task("u1", "000002", {})
+        assert (await qs.dequeue_task("w2"))["id"] == expired
+        await qs.r.zadd(VISIBILITY_DEADLINES, {expired: int(time.time()) - 1})
+
+        await qs.cleanup_expired_tasks()
+
+        assert set(await qs.r.lrange(READY_LIST, 0, -1)) == {orphan, expired}
+        assert await qs.r.hget(TASK_PREFIX + expired, "status") == "queued"
+        assert not await qs.r.sismember(SET_PROCESSING, expired)
+        assert await qs.r.exists(INFLIGHT_PREFIX + "dead") == 0
+
+        # 重新入队后可以被正常认领
+        claimed = {(await qs.dequeue_task("w3"))["id"], (await qs.dequeue_task("w3"))["id"]}
+        assert claimed == {orphan, expired}
+
+    asyncio.run(scenario())
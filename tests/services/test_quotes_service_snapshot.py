@@ -0,0 +1,109 @@
+import asyncio
+import math
+import threading
+
+import pandas as pd
+
+
+def _spot_frame():
+    return pd.DataFrame({
+        "代码": ["000001", "600000", "601", "0000002", "300750", None, ""],
+        "名称": ["平安银行", "浦发银行", "x", "y", "宁德时代", "z", "w"],
+        "最新价": ["10.50", "9.9", "-", "1,234.5", "180", "1", "2"],
+        "涨跌幅": ["1.2%", "-0.5", "", "0", "3.1%", "0", "0"],
+        "成交额": [1.23e8, 8.76e7, None, 5e6, float("nan"), 1, 2],
+    })
+
+
+def _rowwise(df):
+    """改造前逐行构建字典的实现，用于对照"""
+    from app.services.quotes_service import _safe_float
+
+    result = {}
+    for _, row in df.iterrows():
+        code_raw = row.get("代码")
+        if not code_raw:
+            continue
+        code_str = str(code_raw).strip()
+        code = (code_str.lstrip("0") or "0").zfill(6) if code_str.isdigit() else code_str.zfill(6)
+        result[code] = {
+            "close": _safe_float(row.get("最新价")),
+            "pct_chg": _safe_float(row.get("涨跌幅")),
+            "amount": _safe_float(row.get("成交额")),
+        }
+    return result
+
+
+def _same(a, b):
+    # 缺失值统一为 None（旧实现对数值列的 NaN 原样返回）
+    a = None if a is None or math.isnan(a) else a
+    b = None if b is None or math.isnan(b) else b
+    return a == b
+
+
+def test_snapshot_matches_rowwise_parsing():
+    from app.services.quotes_service import SpotSnapshot
+
+    df = _spot_frame()
+    expected = _rowwise(df)
+    snapshot = SpotSnapshot.from_spot_frame(df)
+
+    assert len(snapshot) == len(expected)
+    got = snapshot.lookup(list(expected))
+    for code, quote in expected.items():
+        assert all(_same(got[code][k], v) for k, v in quote.items()), code
+    assert got["000001"] == {"close": 10.5, "pct_chg": 1.2, "amount": 1.23e8}
+    assert got["000002"]["close"] == 1234.5
+    assert got["000601"] == {"close": None, "pct_chg": None, "amount": None}
+    assert snapshot.lookup(["999999", "600000"]) == {"600000": expected["600000"]}
+
+
+def test_stale_snapshot_served_while_refreshing(monkeypatch):
+    from app.services.quotes_service import QuotesService, SpotSnapshot
+
+    release = threading.Event()
+    calls = []
+
+    def fake_fetch(self):
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        price = float(len(calls))
+        return SpotSnapshot.from_spot_frame(pd.DataFrame({"代码": ["000001"], "最新价": [price]}))
+
+    monkeypatch.setattr(QuotesService, "_fetch_spot_akshare", fake_fetch)
+
+    async def scenario():
+        svc = QuotesService(ttl_seconds=30)
+        # 首次加载：并发请求只拉取一次
+        first = await asyncio.gather(*[svc.get_quotes(["000001"]) for _ in range(5)])
+        assert len(calls) == 1 and all(q["000001"]["close"] == 1.0 for q in first)
+
+        # 过期后立即返回旧快照，后台刷新只启动一次
+        svc._snapshot.ts -= 60
+        stale = await asyncio.gather(*[svc.get_quotes(["000001"]) for _ in range(5)])
+        assert all(q["000001"]["close"] == 1.0 for q in stale)
+
+        release.set()
+        await svc._refresh_task
+        assert len(calls) == 2
+        assert (await svc.get_quotes(["000001"]))["000001"]["close"] == 2.0
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_previous_snapshot(monkeypatch):
+    from app.services.quotes_service import QuotesService, SpotSnapshot
+
+    results = [SpotSnapshot.from_spot_frame(pd.DataFrame({"代码": ["600000"], "最新价": [9.9]})), None]
+    monkeypatch.setattr(QuotesService, "_fetch_spot_akshare", lambda self: results.pop(0))
+
+    async def scenario():
+        svc = QuotesService(ttl_seconds=30)
+        assert (await svc.get_quotes(["600000"]))["600000"]["close"] == 9.9
+        svc._snapshot.ts -= 60
+        await svc.get_quotes(["600000"])
+        await svc._refresh_task
+        assert (await svc.get_quotes(["600000"]))["600000"]["close"] == 9.9
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.rate_limiter import RateLimiter
+
+
+def test_waiters_are_staggered_not_serialized():
+    # 10次/秒，突发1：第1次立即放行，其余按 0.1s 间隔错开
+    limiter = RateLimiter(10, 1, name="test", burst=1)
+
+    async def scenario():
+        started = time.perf_counter()
+        done = []
+
+        async def call(i):
+            await limiter.acquire()
+            done.append(time.perf_counter() - started)
+
+        await asyncio.gather(*[call(i) for i in range(6)])
+        return sorted(done)
+
+    done = asyncio.run(scenario())
+    # 等待在锁外进行：各等待者按预约顺序错开放行，而不是排队依次 sleep
+    assert done[0] < 0.05
+    assert done[-1] == pytest.approx(0.5, abs=0.08)
+    stats = limiter.get_stats()
+    assert stats["total_calls"] == 6 and stats["total_waits"] == 5
+
+
+def test_weighted_cost_and_burst():
+    limiter = RateLimiter(100, 1, name="test", burst=10)
+
+    async def scenario():
+        started = time.perf_counter()
+        for _ in range(10):
+            await limiter.acquire()
+        burst_elapsed = time.perf_counter() - started
+        # 桶已空：cost=5 需要等待 5 / 100 = 0.05s
+        started = time.perf_counter()
+        await limiter.acquire(cost=5)
+        return burst_elapsed, time.perf_counter() - started
+
+    burst_elapsed, weighted_wait = asyncio.run(scenario())
+    assert burst_elapsed < 0.02
+    assert weighted_wait == pytest.approx(0.05, abs=0.03)
+    assert limiter.get_stats()["total_cost"] == 15
+
+
+def test_shared_budget_is_split_across_limiters():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    r = fakeredis.FakeAsyncRedis(decode_responses=True)
+    # 两个“进程”各自的限制器共享同一个 Redis 令牌桶
+    limiters = [RateLimiter(20, 1, name="test", burst=2, redis=r, redis_key="rate_limit:test") for _ in range(2)]
+
+    async def scenario():
+        started = time.perf_counter()
+        await asyncio.gather(*[limiters[i % 2].acquire() for i in range(8)])
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+    # 共享预算：8 次调用 - 突发 2 次 = 6 次按 20次/秒 补充，约 0.3s（各自独立时约 0.15s）
+    assert elapsed == pytest.approx(0.3, abs=0.1)
+    assert all(limiter.shared for limiter in limiters)
+    assert sum(limiter.get_stats()["total_calls"] for limiter in limiters) == 8
+
+
+def test_shared_budget_falls_back_to_local_when_redis_unavailable():
+    def broken():
+        raise RuntimeError("Redis客户端未初始化")
+
+    limiter = RateLimiter(1000, 1, name="test", burst=5, redis=broken)
+    asyncio.run(limiter.acquire())
+    assert limiter.get_stats()["total_calls"] == 1
+    assert limiter._tokens == pytest.approx(4, abs=0.5)
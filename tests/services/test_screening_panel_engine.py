@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.screening.eval_utils import evaluate_conditions, evaluate_conditions_mask
+from app.services.screening.panel_engine import build_panel, compute_panel_indicators
+from tradingagents.tools.analysis.indicators import IndicatorSpec, compute_many
+
+FIELDS = {
+    "open", "high", "low", "close", "vol", "amount", "pct_chg",
+    "ma5", "ma10", "ma20", "ma60", "ema12", "ema26", "dif", "dea", "macd_hist",
+    "rsi14", "boll_mid", "boll_upper", "boll_lower", "atr14", "kdj_k", "kdj_d", "kdj_j",
+}
+OPS = {">", "<", ">=", "<=", "==", "!=", "between", "cross_up", "cross_down"}
+SPECS = [
+    IndicatorSpec("ma", {"n": 5}),
+    IndicatorSpec("ma", {"n": 10}),
+    IndicatorSpec("ma", {"n": 20}),
+    IndicatorSpec("ma", {"n": 60}),
+    IndicatorSpec("ema", {"n": 12}),
+    IndicatorSpec("ema", {"n": 26}),
+    IndicatorSpec("macd"),
+    IndicatorSpec("rsi", {"n": 14}),
+    IndicatorSpec("boll", {"n": 20, "k": 2}),
+    IndicatorSpec("atr", {"n": 14}),
+    IndicatorSpec("kdj", {"n": 9, "m1": 3, "m2": 3}),
+]
+
+
+def _random_universe(n_symbols=40, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=150).strftime("%Y-%m-%d")
+    frames = {}
+    for i in range(n_symbols):
+        code = f"{600000 + i:06d}"
+        # 不同股票上市时间不同（长度参差），部分股票只有几根K线
+        length = int(rng.integers(1, len(dates) + 1)) if i % 5 == 0 else len(dates) - int(rng.integers(0, 40))
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+        high = close * (1 + rng.uniform(0, 0.03, length))
+        low = close * (1 - rng.uniform(0, 0.03, length))
+        frames[code] = pd.DataFrame({
+            "trade_date": dates[-length:],
+            "open": close * (1 + rng.normal(0, 0.01, length)),
+            "high": high,
+            "low": low,
+            "close": close,
+            "vol": rng.uniform(1e5, 1e6, length),
+            "amount": rng.uniform(1e6, 1e7, length),
+        })
+    return frames
+
+
+def _per_symbol(df):
+    dfu = df.copy()
+    dfu["pct_chg"] = dfu["close"].pct_change() * 100.0
+    return compute_many(dfu, SPECS)
+
+
+def test_panel_indicators_match_per_symbol_functions():
+    frames = _random_universe()
+    long_df = pd.concat([f.assign(symbol=code) for code, f in frames.items()], ignore_index=True)
+    panel = compute_panel_indicators(build_panel(long_df))
+
+    latest = panel.latest_columns()
+    previous = panel.previous_columns()
+    for i, code in enumerate(panel.codes):
+        expected = _per_symbol(frames[code])
+        for field in FIELDS:
+            np.testing.assert_allclose(latest[field][i], expected[field].iloc[-1], rtol=1e-9, equal_nan=True,
+                                       err_msg=f"{code} {field}")
+            if len(expected) >= 2:
+                np.testing.assert_allclose(previous[field][i], expected[field].iloc[-2], rtol=1e-9,
+                                           equal_nan=True, err_msg=f"{code} {field} prev")
+
+
+@pytest.mark.parametrize("conditions", [
+    {"field": "close", "op": ">", "right_field": "ma20"},
+    {"field": "rsi14", "op": "between", "value": [30, 70]},
+    {"field": "dif", "op": "cross_up", "right_field": "dea"},
+    {"field": "kdj_k", "op": "cross_down", "right_field": "kdj_d"},
+    {"op": "group", "logic": "OR", "children": [
+        {"field": "pct_chg", "op": ">=", "value": 1},
+        {"op": "group", "logic": "AND", "children": [
+            {"field": "atr14", "op": "<", "value": 0.3},
+            {"field": "close", "op": "<", "right_field": "boll_lower"},
+        ]},
+    ]},
+    {"field": "unknown", "op": ">", "value": 1},
+])
+def test_condition_masks_match_row_evaluation(conditions):
+    frames = _random_universe(seed=11)
+    long_df = pd.concat([f.assign(symbol=code) for code, f in frames.items()], ignore_index=True)
+    panel = compute_panel_indicators(build_panel(long_df))
+
+    mask = evaluate_conditions_mask(
+        panel.latest_columns(), panel.previous_columns(), conditions, FIELDS, OPS, panel.size
+    )
+    expected = [evaluate_conditions(_per_symbol(frames[code]), conditions, FIELDS, OPS) for code in panel.codes]
+    assert mask.tolist() == expected
+
+
+def test_build_panel_keeps_preferred_source():
+    df = pd.DataFrame([
+        {"symbol": "000001", "trade_date": "2024-01-02", "data_source": "baostock", "close": 1.0},
+        {"symbol": "000001", "trade_date": "2024-01-02", "data_source": "tushare", "close": 2.0},
+        {"symbol": "000001", "trade_date": "2024-01-03", "data_source": "akshare", "close": 3.0},
+    ])
+    panel = build_panel(df)
+    assert panel.columns["close"].tolist() == [[2.0, 3.0]]
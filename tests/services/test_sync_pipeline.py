@@ -0,0 +1,293 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from app.worker.sync_pipeline import PipelinedSyncEngine
+
+
+def _frame(n=3):
+    return pd.DataFrame({"date": pd.date_range("2025-01-02", periods=n).strftime("%Y-%m-%d"), "close": range(n)})
+
+
+class _Recorder:
+    def __init__(self, fetch_delay=0.02, save_delay=0.0, empty=(), fail=()):
+        self.fetch_delay = fetch_delay
+        self.save_delay = save_delay
+        self.empty = set(empty)
+        self.fail = set(fail)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.batches = []
+
+    async def fetch(self, symbol):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.fetch_delay)
+            if symbol in self.fail:
+                raise ValueError(f"boom {symbol}")
+            return pd.DataFrame() if symbol in self.empty else _frame()
+        finally:
+            self.in_flight -= 1
+
+    async def save_batch(self, frames):
+        await asyncio.sleep(self.save_delay)
+        self.batches.append([s for s, _ in frames])
+        return {s: len(df) for s, df in frames}
+
+
+def test_pipeline_bounds_concurrency_and_batches_writes():
+    rec = _Recorder(fetch_delay=0.02, save_delay=0.03)
+    symbols = [f"{i:06d}" for i in range(40)]
+    progress = []
+
+    async def on_progress(done, total, symbol):
+        progress.append((done, total))
+
+    engine = PipelinedSyncEngine(rec.fetch, rec.save_batch, concurrency=4, save_batch_size=8, on_progress=on_progress)
+    started = time.perf_counter()
+    stats = asyncio.run(engine.run(symbols))
+    elapsed = time.perf_counter() - started
+
+    assert rec.max_in_flight == 4
+    assert stats["success_count"] == 40 and stats["total_records"] == 120 and stats["error_count"] == 0
+    assert sorted(s for b in rec.batches for s in b) == symbols
+    assert max(len(b) for b in rec.batches) <= 8 and len(rec.batches) < 40
+    assert progress[-1] == (40, 40) and [d for d, _ in progress] == list(range(1, 41))
+    # 串行约 40 * (0.02 + 0.03) = 2s
+    assert elapsed < 1.0
+
+
+def test_pipeline_backpressure_limits_buffered_results():
+    rec = _Recorder(fetch_delay=0.0, save_delay=0.02)
+    engine = PipelinedSyncEngine(rec.fetch, rec.save_batch, concurrency=4, save_batch_size=2, queue_size=3)
+    fetched = []
+    original = rec.fetch
+
+    async def fetch(symbol):
+        fetched.append(symbol)
+        return await original(symbol)
+
+    engine.fetch = fetch
+    saved_at_fetch = []
+
+    async def save_batch(frames):
+        saved_at_fetch.append(len(fetched) - sum(len(b) for b in rec.batches) - len(frames))
+        return await rec.save_batch(frames)
+
+    engine.save_batch = save_batch
+    stats = asyncio.run(engine.run([f"{i:06d}" for i in range(30)]))
+
+    assert stats["success_count"] == 30
+    # 已拉取未写入的数据不超过：队列容量 + 各拉取协程手中的一项
+    assert max(saved_at_fetch) <= 3 + 4
+
+
+def test_pipeline_records_errors_empty_and_stop():
+    rec = _Recorder(fetch_delay=0.01, empty={"000002"}, fail={"000003"})
+    checks = []
+
+    async def should_stop():
+        checks.append(1)
+        return len(checks) > 5
+
+    async def failing_save(frames):
+        if any(s == "000004" for s, _ in frames):
+            raise RuntimeError("mongo down")
+        return await rec.save_batch(frames)
+
+    engine = PipelinedSyncEngine(rec.fetch, failing_save, concurrency=1, save_batch_size=1, should_stop=should_stop)
+    stats = asyncio.run(engine.run([f"{i:06d}" for i in range(1, 20)]))
+
+    assert stats["stopped"] is True
+    assert stats["empty_symbols"] == ["000002"]
+    assert {(e["code"], e["context"], e["error_type"]) for e in stats["errors"]} == {
+        ("000003", "fetch", "ValueError"),
+        ("000004", "save", "RuntimeError"),
+    }
+    # 停止前派发的 5 只股票都已处理，之后不再派发
+    assert stats["success_count"] + stats["error_count"] + stats["empty_count"] == 5
+
+
+def test_tushare_per_symbol_sync_uses_pipeline():
+    from types import SimpleNamespace
+
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    rec = _Recorder(fetch_delay=0.01, empty={"000003"}, fail={"000004"})
+    acquired = []
+
+    async def acquire():
+        acquired.append(1)
+
+    class _Historical:
+        async def save_historical_batch(self, frames, data_source, market="CN", period="daily"):
+            assert data_source == "tushare" and period == "daily"
+            return await rec.save_batch(frames)
+
+    class _Provider:
+        async def get_historical_data(self, symbol, start, end, period="daily"):
+            return await rec.fetch(symbol)
+
+    svc = TushareSyncService.__new__(TushareSyncService)
+    svc.provider = _Provider()
+    svc.historical_service = _Historical()
+    svc.rate_limiter = SimpleNamespace(acquire=acquire, get_stats=lambda: {
+        "current_calls": 0, "max_calls": 1, "total_waits": 0, "total_wait_time": 0.0})
+    svc.fetch_concurrency = 3
+    svc.save_batch_size = 4
+    progress = []
+
+    async def update_progress(job_id, percent, message):
+        progress.append(percent)
+
+    async def should_stop(job_id):
+        return False
+
+    svc._update_progress = update_progress
+    svc._should_stop = should_stop
+
+    symbols = [f"{i:06d}" for i in range(1, 11)]
+    stats = asyncio.run(svc.sync_historical_data(symbols=symbols, start_date="2025-01-01", job_id="j1"))
+
+    assert len(acquired) == 10 and rec.max_in_flight == 3
+    assert stats["success_count"] == 8 and stats["total_records"] == 24
+    assert stats["error_count"] == 1 and stats["errors"][0]["code"] == "000004"
+    assert stats["api_calls"] == 10
+    assert progress[-1] == 100 and len(progress) == 10
+
+
+def test_akshare_historical_sync_goes_through_rate_limiter():
+    from types import SimpleNamespace
+
+    from app.worker.akshare_sync_service import AKShareSyncService
+
+    rec = _Recorder(fetch_delay=0.01, fail={"000002"})
+    acquired = []
+
+    async def acquire():
+        acquired.append(1)
+
+    class _Historical:
+        async def save_historical_batch(self, frames, data_source, market="CN", period="daily"):
+            assert data_source == "akshare"
+            return await rec.save_batch(frames)
+
+    class _Provider:
+        async def get_historical_data(self, symbol, start, end, period="daily"):
+            return await rec.fetch(symbol)
+
+    svc = AKShareSyncService.__new__(AKShareSyncService)
+    svc.provider = _Provider()
+    svc.historical_service = _Historical()
+    svc.rate_limiter = SimpleNamespace(acquire=acquire)
+    svc.fetch_concurrency = 3
+    svc.save_batch_size = 4
+    svc.batch_size = 100
+
+    symbols = [f"{i:06d}" for i in range(1, 7)]
+    stats = asyncio.run(svc.sync_historical_data(start_date="2025-01-01", symbols=symbols))
+
+    assert len(acquired) == 6 and rec.max_in_flight == 3
+    assert stats["success_count"] == 5 and stats["error_count"] == 1
+
+
+def test_save_historical_batch_merges_symbols_into_bulk_writes():
+    from types import SimpleNamespace
+
+    from app.services.historical_data_service import HistoricalDataService
+
+    writes = []
+
+    class _Collection:
+        async def bulk_write(self, operations, ordered=False):
+            writes.append(operations)
+            return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+    svc = HistoricalDataService()
+    svc.collection = _Collection()
+    frames = [(f"{i:06d}", _frame(3)) for i in range(1, 5)] + [("000009", pd.DataFrame())]
+
+    saved = asyncio.run(svc.save_historical_batch(frames, data_source="akshare", batch_size=5))
+
+    assert saved == {"000001": 3, "000002": 3, "000003": 3, "000004": 3, "000009": 0}
+    assert [len(ops) for ops in writes] == [5, 5, 2]
+    docs = [op._doc for ops in writes for op in ops]
+    assert {(d["symbol"], d["trade_date"]) for d in docs} == {
+        (f"{i:06d}", d) for i in range(1, 5) for d in ("2025-01-02", "2025-01-03", "2025-01-04")
+    }
+
+
+def test_baostock_daily_quotes_and_historical_sync_entry_points():
+    from types import SimpleNamespace
+
+    from app.worker.baostock_sync_service import BaoStockSyncService
+
+    codes = ["600000", "600001", "600002"]
+    quote_upserts = []
+    meta_writes = []
+
+    class _Cursor:
+        def __init__(self, docs):
+            self.docs = docs
+
+        def __aiter__(self):
+            self._it = iter(self.docs)
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._it)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    class _BasicInfo:
+        def find(self, query, projection=None):
+            return _Cursor([{"code": c} for c in codes])
+
+    class _Quotes:
+        async def update_one(self, query, update, upsert=False):
+            quote_upserts.append(query["code"])
+
+        async def bulk_write(self, operations, ordered=False):
+            meta_writes.extend(operations)
+
+    class _DB:
+        stock_basic_info = _BasicInfo()
+        market_quotes = _Quotes()
+
+    class _Provider:
+        async def get_stock_quotes(self, code):
+            return None if code == "600002" else {"code": code, "close": 10.0}
+
+        async def get_historical_data(self, code, start_date, end_date, period="daily"):
+            assert start_date == "1990-01-01" and period == "weekly"
+            if code == "600001":
+                raise ValueError("boom")
+            return _frame(2)
+
+    class _Historical:
+        async def save_historical_batch(self, frames, data_source, market="CN", period="daily"):
+            assert data_source == "baostock" and period == "weekly"
+            return {s: len(df) for s, df in frames}
+
+    acquired = []
+
+    async def acquire():
+        acquired.append(1)
+
+    svc = BaoStockSyncService.__new__(BaoStockSyncService)
+    svc.provider = _Provider()
+    svc.historical_service = _Historical()
+    svc.db = _DB()
+    svc.rate_limiter = SimpleNamespace(acquire=acquire)
+
+    quotes = asyncio.run(svc.sync_daily_quotes(batch_size=10))
+    assert quotes.quotes_count == 2 and quote_upserts == ["600000", "600001"]
+    assert quotes.errors == ["获取600002日K线失败"]
+
+    hist = asyncio.run(svc.sync_historical_data(days=3650, batch_size=10, period="weekly", incremental=False))
+    assert hist.historical_records == 4 and len(acquired) == 3
+    assert len(hist.errors) == 1 and hist.errors[0].startswith("处理600001历史数据失败")
+    assert len(meta_writes) == 2
@@ -0,0 +1,174 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from tradingagents.dataflows.providers.china.tushare import QFQ_PRICE_COLS, apply_qfq_cross_section
+
+DATES = ["20250102", "20250103", "20250106", "20250107"]
+CODES = ["000001.SZ", "600000.SH", "300750.SZ"]
+
+
+def _market(seed=0):
+    """合成全市场未复权日线和复权因子（第三天 600000 除权）"""
+    rng = np.random.default_rng(seed)
+    rows, factors = [], []
+    for code in CODES:
+        close = 10 + rng.random()
+        for i, d in enumerate(DATES):
+            pre = close
+            close = round(pre * (1 + rng.normal(0, 0.02)), 2)
+            rows.append({
+                "ts_code": code, "trade_date": d, "open": round(pre * 1.001, 2), "high": close + 0.1,
+                "low": close - 0.1, "close": close, "pre_close": round(pre, 2), "change": round(close - pre, 2),
+                "pct_chg": round((close - pre) / pre * 100, 4), "vol": 1000.0 + i, "amount": 12345.6 + i,
+            })
+            factor = 1.5 if code == "600000.SH" and i >= 2 else 1.0
+            factors.append({"ts_code": code, "trade_date": d, "adj_factor": factor * (1 + 0.1 * (code == "000001.SZ"))})
+    return pd.DataFrame(rows), pd.DataFrame(factors)
+
+
+def _pro_bar_qfq(daily, fcts, code, start, end):
+    """ts.pro_bar(adj='qfq') 的复权计算（接口按日期降序返回）"""
+    fmt = lambda x: '%.2f' % x  # noqa: E731
+    data = daily[(daily.ts_code == code) & daily.trade_date.between(start, end)].sort_values("trade_date", ascending=False)
+    f = fcts[(fcts.ts_code == code) & fcts.trade_date.between(start, end)].sort_values("trade_date", ascending=False)
+    f = f[["trade_date", "adj_factor"]].reset_index(drop=True)
+    data = data.set_index("trade_date", drop=False).merge(f.set_index("trade_date"), left_index=True, right_index=True, how="left")
+    data["adj_factor"] = data["adj_factor"].bfill()
+    for col in QFQ_PRICE_COLS:
+        data[col] = data[col] * data["adj_factor"] / float(f["adj_factor"][0])
+        data[col] = data[col].map(fmt).astype(float)
+    data["change"] = data["close"] - data["pre_close"]
+    data["pct_chg"] = (data["change"] / data["pre_close"] * 100).map(fmt).astype(float)
+    return data.drop(columns="adj_factor").reset_index(drop=True)
+
+
+def test_cross_section_qfq_matches_pro_bar():
+    daily, fcts = _market()
+    start, end = DATES[1], DATES[-1]
+    anchor = fcts[fcts.trade_date == end].set_index("ts_code")["adj_factor"]
+
+    sliced = []
+    for d in DATES[1:]:
+        day = daily[daily.trade_date == d]
+        factors = fcts[fcts.trade_date == d].set_index("ts_code")["adj_factor"]
+        sliced.append(apply_qfq_cross_section(day, factors, anchor))
+    sliced = pd.concat(sliced)
+
+    cols = ["ts_code", "trade_date", *QFQ_PRICE_COLS, "change", "pct_chg", "vol", "amount"]
+    for code in CODES:
+        expected = _pro_bar_qfq(daily, fcts, code, start, end).sort_values("trade_date")[cols].reset_index(drop=True)
+        got = sliced[sliced.ts_code == code].sort_values("trade_date")[cols].reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+
+class _FakeProvider:
+    def __init__(self):
+        self.daily, self.fcts = _market()
+        self.calls = []
+
+    async def get_trade_dates(self, start, end):
+        self.calls.append(("trade_cal",))
+        return [f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in DATES]
+
+    async def get_daily_by_trade_date(self, trade_date):
+        self.calls.append(("daily", trade_date))
+        return self.daily[self.daily.trade_date == trade_date.replace("-", "")].reset_index(drop=True)
+
+    async def get_adj_factors_by_trade_date(self, trade_date):
+        self.calls.append(("adj_factor", trade_date))
+        f = self.fcts[self.fcts.trade_date == trade_date.replace("-", "")]
+        return f.set_index("ts_code")["adj_factor"]
+
+
+class _FakeHistorical:
+    def __init__(self, latest):
+        self.latest = latest
+        self.saved = []
+
+    async def get_latest_dates(self, data_source, period="daily", symbols=None):
+        return dict(self.latest)
+
+    async def save_cross_section_data(self, data, data_source, market="CN", period="daily", batch_size=2000):
+        self.saved.append(data)
+        return len(data)
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _FakeLimiter:
+    async def acquire(self):
+        return None
+
+
+def _service(latest, symbols):
+    from types import SimpleNamespace
+
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    svc = TushareSyncService.__new__(TushareSyncService)
+    svc.provider = _FakeProvider()
+    svc.historical_service = _FakeHistorical(latest)
+    svc.db = SimpleNamespace(stock_basic_info=SimpleNamespace(find=lambda *a, **k: _FakeCursor([{"code": c} for c in symbols])))
+    svc.rate_limiter = _FakeLimiter()
+    svc.historical_sync_mode = "by_date"
+    svc.by_date_max_gap_days = 2
+    return svc
+
+
+def test_by_date_sync_fetches_each_missing_date_once():
+    latest = {"000001": "2025-01-03", "600000": "2025-01-06", "300750": "2025-01-07"}
+    svc = _service(latest, ["000001", "600000", "300750", "688981"])
+    fallback = []
+
+    async def fake_per_symbol(**kwargs):
+        fallback.append(kwargs["symbols"])
+        return {"success_count": 1, "error_count": 0, "total_records": 4, "errors": [], "api_calls": 1}
+
+    svc.sync_historical_data = fake_per_symbol
+    stats = asyncio.run(svc.sync_historical_data_by_date(end_date="2025-01-07"))
+
+    # 688981 没有历史数据，走逐只同步；300750 已最新
+    assert fallback == [["688981"]]
+    assert [c for c in svc.provider.calls if c[0] == "daily"] == [("daily", "2025-01-07"), ("daily", "2025-01-06")]
+    saved = {(r.code, r.trade_date) for df in svc.historical_service.saved for r in df.itertuples()}
+    assert saved == {("000001", "20250107"), ("600000", "20250107"), ("000001", "20250106")}
+    assert stats["trade_dates"] == 2 and stats["api_calls"] == 1 + 4 + 1
+    assert stats["api_calls_saved"] == 2 * 3 - 5
+    assert stats["success_count"] == 3 and stats["total_records"] == 3 + 4
+
+    # 写入的价格为以最后交易日为基准的前复权价
+    day = svc.historical_service.saved[1]
+    raw = svc.provider.daily
+    raw_close = raw[(raw.ts_code == "000001.SZ") & (raw.trade_date == "20250106")].close.iloc[0]
+    assert day[day.code == "000001"].close.iloc[0] == float('%.2f' % raw_close)
+    assert "volume" in day.columns and "vol" not in day.columns
+
+
+def test_whole_market_incremental_dispatches_to_by_date():
+    svc = _service({}, [])
+    called = {}
+
+    async def fake_by_date(end_date=None, job_id=None):
+        called["job_id"] = job_id
+        return {"mode": "by_date"}
+
+    svc.sync_historical_data_by_date = fake_by_date
+    from app.worker.tushare_sync_service import TushareSyncService
+
+    result = asyncio.run(TushareSyncService.sync_historical_data(svc, incremental=True, job_id="j1"))
+    assert result == {"mode": "by_date"} and called["job_id"] == "j1"
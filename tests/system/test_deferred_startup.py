@@ -0,0 +1,56 @@
+import asyncio
+
+from app.core.startup_tasks import DeferredStartup
+
+
+def test_deferred_jobs_run_in_background_and_failures_are_isolated():
+    order = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        order.append("slow")
+
+    async def broken():
+        raise RuntimeError("backfill down")
+
+    async def fast():
+        order.append("fast")
+
+    async def run():
+        deferred = DeferredStartup()
+        for name, job in (("slow", slow), ("broken", broken), ("fast", fast)):
+            deferred.add(name, job)
+        task = deferred.start()
+        # start 立即返回，任务尚未执行
+        assert order == [] and deferred.results["slow"]["status"] == "pending"
+        await task
+        return deferred.results
+
+    results = asyncio.run(run())
+    assert order == ["slow", "fast"]
+    assert results["slow"]["status"] == "done" and results["slow"]["seconds"] >= 0.05
+    assert results["broken"] == {"status": "failed", "error": "backfill down", "seconds": results["broken"]["seconds"]}
+    assert results["fast"]["status"] == "done"
+
+
+def test_cancel_stops_pending_jobs_on_shutdown():
+    ran = []
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def after():
+        ran.append("after")
+
+    async def run():
+        deferred = DeferredStartup()
+        deferred.add("hang", hang)
+        deferred.add("after", after)
+        deferred.start()
+        await asyncio.sleep(0)
+        await deferred.cancel()
+        return deferred.results
+
+    results = asyncio.run(run())
+    assert results["hang"]["status"] == "cancelled"
+    assert results["after"]["status"] == "pending" and ran == []
@@ -0,0 +1,184 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import tradingagents.graph.engine_pool as engine_pool
+from tradingagents.graph.cancellation import GraphCancelledError
+from tradingagents.graph.engine_pool import GraphEnginePool, config_fingerprint
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+
+@pytest.fixture(autouse=True)
+def _no_global_config(monkeypatch):
+    monkeypatch.setattr(engine_pool, "set_config", lambda config: None)
+
+
+class _Factory:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.builds = []
+
+    def __call__(self, selected_analysts, debug, config):
+        time.sleep(self.delay)
+        self.builds.append(list(selected_analysts))
+        return SimpleNamespace(config=config, build_seconds=self.delay)
+
+
+def test_same_config_is_built_once_and_shared_across_threads():
+    factory = _Factory(delay=0.1)
+    pool = GraphEnginePool(max_size=2, factory=factory)
+    config = {"llm_provider": "dashscope", "selected_analysts": ["market"], "max_debate_rounds": 1}
+    results = []
+
+    def worker():
+        results.append(pool.acquire(dict(reversed(list(config.items())))))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(factory.builds) == 1
+    assert len({id(engine) for engine, _ in results}) == 1
+    assert sorted(info["pool_hit"] for _, info in results) == [False, True, True, True]
+
+    _, info = pool.acquire(config)
+    assert info["pool_hit"] and info["build_seconds"] == 0.1
+    assert info["pool_hits"] == 4 and info["pool_misses"] == 1
+    assert info["pool_hit_rate"] == pytest.approx(0.8)
+
+
+def test_fingerprint_covers_analysts_and_pool_evicts_lru():
+    assert config_fingerprint({"a": 1}, ["market"]) != config_fingerprint({"a": 1}, ["market", "news"])
+    assert config_fingerprint({"a": 1, "b": 2}) == config_fingerprint({"b": 2, "a": 1})
+
+    factory = _Factory()
+    pool = GraphEnginePool(max_size=2, factory=factory)
+    first, _ = pool.acquire({"deep_think_llm": "a"})
+    pool.acquire({"deep_think_llm": "b"})
+    pool.acquire({"deep_think_llm": "a"})
+    pool.acquire({"deep_think_llm": "c"})  # 淘汰最久未用的 b
+
+    again, info = pool.acquire({"deep_think_llm": "a"})
+    assert again is first and info["pool_hit"]
+    _, info = pool.acquire({"deep_think_llm": "b"})
+    assert not info["pool_hit"]
+    assert info["pool_size"] == 2 and info["pool_evictions"] == 2
+    assert factory.builds == [["market", "fundamentals"]] * 4
+
+
+class _FakeCompiledGraph:
+    """等所有运行都开始后再返回，确保两次 propagate 重叠执行"""
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties)
+
+    def stream(self, state, **kwargs):
+        self.barrier.wait(timeout=5)
+        ticker = state["company_of_interest"]
+        debate = {"bull_history": "", "bear_history": "", "history": "", "current_response": "",
+                  "judge_decision": ""}
+        risk = {"risky_history": "", "safe_history": "", "neutral_history": "", "history": "",
+                "judge_decision": ""}
+        yield {"Risk Judge": {
+            "market_report": f"{ticker} report",
+            "investment_debate_state": debate,
+            "risk_debate_state": risk,
+            "trader_investment_plan": "",
+            "investment_plan": "",
+            "final_trade_decision": f"BUY {ticker}",
+        }}
+
+
+def _shared_engine(parties):
+    engine = TradingAgentsGraph.__new__(TradingAgentsGraph)
+    engine.debug = False
+    engine.config = {"llm_provider": "test"}
+    engine.build_seconds = 1.5
+    engine._local = threading.local()
+    engine.propagator = Propagator()
+    engine.graph = _FakeCompiledGraph(parties)
+    engine.deep_thinking_llm = SimpleNamespace(model_name="fake")
+    engine.signal_processor = SimpleNamespace(process_signal=lambda signal, symbol: {"action": signal})
+    return engine
+
+
+def test_concurrent_runs_on_shared_engine_keep_separate_state(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = _shared_engine(parties=2)
+    seen = {}
+
+    def run(ticker, task_id):
+        state, decision = engine.propagate(
+            ticker, "2024-05-10", progress_callback=lambda *a, **k: None, task_id=task_id,
+            engine_metrics={"pool_hit": True, "build_seconds": 1.5},
+        )
+        seen[ticker] = (state, decision, engine.ticker, engine.curr_state, engine._current_task_id)
+
+    threads = [threading.Thread(target=run, args=(t, f"task-{t}")) for t in ("000001", "AAPL")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for ticker in ("000001", "AAPL"):
+        state, decision, own_ticker, curr_state, task_id = seen[ticker]
+        assert own_ticker == ticker and task_id == f"task-{ticker}"
+        assert curr_state is state and state["market_report"] == f"{ticker} report"
+        assert decision["action"] == f"BUY {ticker}"
+        assert state["performance_metrics"]["graph_engine"] == {"pool_hit": True, "build_seconds": 1.5}
+        assert (tmp_path / "eval_results" / ticker / "TradingAgentsStrategy_logs" / "full_states_log.json").exists()
+
+    # 主线程没有运行过，实例本身不携带任何运行状态
+    assert engine.curr_state is None and engine.ticker is None
+
+
+class _NodeByNodeGraph:
+    """每个节点产出一个 chunk，记录实际开始执行的节点"""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.started = []
+        self.closed = False
+
+    def stream(self, state, **kwargs):
+        try:
+            for node in self.nodes:
+                self.started.append(node)
+                yield {node: {}}
+        finally:
+            self.closed = True
+
+
+def test_cancel_event_stops_run_between_nodes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = _shared_engine(parties=1)
+    engine.graph = _NodeByNodeGraph(["Market Analyst", "Bull Researcher", "Risk Judge"])
+    cancel_event = threading.Event()
+
+    def progress(message):
+        # 第一个节点完成后收到取消
+        cancel_event.set()
+
+    with pytest.raises(GraphCancelledError):
+        engine.propagate("000001", "2024-05-10", progress_callback=progress, cancel_event=cancel_event)
+
+    assert engine.graph.started == ["Market Analyst"]
+    assert engine.graph.closed
+
+
+def test_cancel_event_set_before_run_starts_no_node(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = _shared_engine(parties=1)
+    engine.graph = _NodeByNodeGraph(["Market Analyst"])
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(GraphCancelledError):
+        engine.propagate("000001", "2024-05-10", cancel_event=cancel_event)
+
+    assert engine.graph.started == []
@@ -0,0 +1,92 @@
+import pytest
+
+import tradingagents.agents.utils.instrument_context as instrument_mod
+from tradingagents.agents.utils.instrument_context import (
+    get_instrument_context,
+    get_instrument_stats,
+    reset_instrument_stats,
+    resolve_instrument_context,
+)
+from tradingagents.graph.propagation import Propagator
+
+
+@pytest.fixture
+def name_lookups(monkeypatch):
+    calls = []
+
+    def fake_lookup(ticker, market_info):
+        calls.append(ticker)
+        return f"名称{ticker}"
+
+    monkeypatch.setattr(instrument_mod, "resolve_company_name", fake_lookup)
+    reset_instrument_stats()
+    return calls
+
+
+@pytest.mark.parametrize("ticker,market,board,currency", [
+    ("688981", "china_a", "科创板", "人民币"),
+    ("300750", "china_a", "创业板", "人民币"),
+    ("600519", "china_a", "沪市主板", "人民币"),
+    ("000001", "china_a", "深市主板", "人民币"),
+    ("0700.HK", "hong_kong", "港股主板", "港币"),
+    ("AAPL", "us", "美股", "美元"),
+])
+def test_resolve_instrument_context(name_lookups, ticker, market, board, currency):
+    context = resolve_instrument_context(ticker, "2025-01-04")
+
+    assert context["ticker"] == ticker
+    assert context["company_name"] == f"名称{ticker}"
+    assert context["market"] == market
+    assert context["board"] == board
+    assert context["currency_name"] == currency
+    assert context["calendar"]["trade_date"] == "2025-01-04"
+    assert context["calendar"]["is_weekday"] is False  # 2025-01-04 是周六
+    assert name_lookups == [ticker]
+
+
+def test_nodes_read_context_from_state_without_lookups(name_lookups):
+    state = Propagator().create_initial_state("000001", "2025-01-02")
+
+    for _ in range(10):
+        context = get_instrument_context(state)
+        assert context["company_name"] == "名称000001"
+        assert context["is_china"] and context["currency_symbol"] == "¥"
+
+    stats = get_instrument_stats()
+    assert name_lookups == ["000001"]
+    assert stats["resolved"] == 1
+    assert stats["served_from_state"] == stats["lookups_saved"] == 10
+    assert stats["fallback_resolved"] == 0
+
+
+def test_missing_or_stale_context_is_resolved_by_node(name_lookups):
+    state = Propagator().create_initial_state("000001", "2025-01-02")
+    state["company_of_interest"] = "AAPL"
+
+    assert get_instrument_context(state)["company_name"] == "名称AAPL"
+    assert get_instrument_context({"company_of_interest": "AAPL"})["market"] == "us"
+    assert get_instrument_stats()["fallback_resolved"] == 2
+
+
+def test_run_stats_exclude_other_runs(name_lookups):
+    import contextvars
+    import threading
+
+    from tradingagents.agents.utils.instrument_context import begin_run_stats
+
+    def run(result):
+        stats = begin_run_stats()
+        state = Propagator().create_initial_state("600519", "2025-01-02")
+        # 节点在图执行器的线程中运行，上下文随之复制
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(get_instrument_context, state))
+        worker.start()
+        worker.join()
+        result.append(get_instrument_stats(stats))
+
+    earlier = []
+    contextvars.copy_context().run(run, earlier)
+    current = []
+    contextvars.copy_context().run(run, current)
+
+    assert current[0]["resolved"] == 1 and current[0]["lookups_saved"] == 1
+    assert get_instrument_stats()["resolved"] == 2
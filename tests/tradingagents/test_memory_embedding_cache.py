@@ -0,0 +1,116 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.utils import embedding_cache
+
+
+class FakeEmbeddings:
+    """OpenAI 兼容 embeddings 接口：记录每次请求的输入"""
+
+    def __init__(self, fail_batches=False):
+        self.calls = []
+        self.fail_batches = fail_batches
+
+    def create(self, model, input):
+        texts = [input] if isinstance(input, str) else list(input)
+        self.calls.append(texts)
+        if self.fail_batches and len(texts) > 1:
+            raise RuntimeError("batch not supported")
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), float(i + 1), 1.0]) for i, t in enumerate(texts)]
+        # 返回顺序与输入不同，按 index 还原
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+@pytest.fixture
+def make_memory(monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_CACHES", {})
+    monkeypatch.setenv("EMBEDDING_CACHE_PERSIST", "false")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    embeddings = FakeEmbeddings()
+
+    def make(name):
+        memory = FinancialSituationMemory(
+            f"{name}_{uuid.uuid4().hex[:8]}", {"llm_provider": "openai", "backend_url": "http://embedding.test/v1"}
+        )
+        memory.client = SimpleNamespace(embeddings=embeddings)
+        return memory
+
+    return make, embeddings
+
+
+SITUATIONS = [
+    ("High inflation with rising rates", "Favor consumer staples"),
+    ("Tech selloff on institutional selling", "Trim growth exposure"),
+    ("Strong dollar hurting emerging markets", "Hedge currency risk"),
+]
+
+
+def test_situations_are_embedded_in_one_call_and_shared_across_memories(make_memory):
+    make, embeddings = make_memory
+    bull, bear = make("bull_memory"), make("bear_memory")
+
+    bull.add_situations(SITUATIONS)
+    assert embeddings.calls == [[s for s, _ in SITUATIONS]]
+
+    # 另一个记忆实例写入相同情况、查询相同文本：全部命中共享缓存
+    bear.add_situations(SITUATIONS)
+    query = SITUATIONS[1][0]
+    bull_matches = bull.get_memories(query, n_matches=1)
+    bear_matches = bear.get_memories(query, n_matches=1)
+    assert len(embeddings.calls) == 1
+    assert bull_matches[0]["recommendation"] == bear_matches[0]["recommendation"] == "Trim growth exposure"
+
+    assert bull.get_embedding(SITUATIONS[0][0]) == [float(len(SITUATIONS[0][0])), 1.0, 1.0]
+    stats = bear.get_embedding_stats()
+    assert stats["computed_batches"] == 1 and stats["computed_texts"] == 3
+    assert stats["hit_rate"] == pytest.approx(6 / 9, abs=1e-3)
+    assert bull.get_cache_info()["embedding_stats"]["namespace"] == stats["namespace"]
+
+
+def test_failed_batch_falls_back_per_text_and_zero_vectors_are_not_cached(make_memory):
+    make, embeddings = make_memory
+    embeddings.fail_batches = True
+    memory = make("trader_memory")
+
+    vectors = memory.get_embeddings(["a", "", "bb", "a"])
+    assert vectors[1] == [0.0] * 1024
+    assert vectors[0] == vectors[3] == [1.0, 1.0, 1.0] and vectors[2] == [2.0, 1.0, 1.0]
+    # 一次失败的批量请求 + 两次逐条请求（重复文本只请求一次）
+    assert [len(call) for call in embeddings.calls] == [2, 1, 1]
+
+    memory.client = SimpleNamespace(embeddings=SimpleNamespace(create=lambda **kw: (_ for _ in ()).throw(RuntimeError("down"))))
+    assert memory.get_embedding("new text") == [0.0] * 1024
+    memory.client = SimpleNamespace(embeddings=embeddings)
+    assert memory.get_embedding("new text") == [8.0, 1.0, 1.0]
+
+
+def test_persistent_cache_is_trimmed_by_last_use(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "embeddings.sqlite3")
+    # 旧版本的表结构：没有 used_at 列
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+    legacy.execute("INSERT INTO embeddings VALUES ('stale', ?)", (b"\0" * 4,))
+    legacy.commit()
+    legacy.close()
+
+    cache = embedding_cache.EmbeddingCache("m", max_items=2, path=path, max_disk_items=3)
+    compute = lambda texts: [[float(len(t))] for t in texts]
+    cache.get_or_compute(["a", "bb"], compute)
+    # 旧数据最久未使用，先被淘汰
+    cache.get_or_compute(["ccc"], compute)
+    # "a" 从磁盘读取后刷新使用时间，淘汰时保留
+    fresh = embedding_cache.EmbeddingCache("m", max_items=2, path=path, max_disk_items=3)
+    assert fresh.get_many(["a"])[0].tolist() == [1.0]
+    fresh.get_or_compute(["dddd"], compute)
+    fresh.close()
+    cache.close()
+
+    conn = sqlite3.connect(path)
+    keys = {key for (key,) in conn.execute("SELECT key FROM embeddings")}
+    conn.close()
+    assert keys == {fresh.key(t) for t in ("a", "ccc", "dddd")}
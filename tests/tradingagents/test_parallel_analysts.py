@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+
+import tradingagents.agents.utils.instrument_context as instrument_mod
+import tradingagents.graph.setup as setup_mod
+from tradingagents.graph.conditional_logic import ConditionalLogic
+from tradingagents.graph.propagation import Propagator
+from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+
+ANALYSTS = ["market", "social", "news", "fundamentals"]
+REPORT_KEYS = {k: v[0] for k, v in setup_mod.ANALYST_STATE_KEYS.items()}
+
+
+def _fake_analyst(analyst_type, active, peak, lock, delay=0.2):
+    def node(state):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(delay)
+        with lock:
+            active[0] -= 1
+        return {
+            "messages": [AIMessage(content=f"{analyst_type} done")],
+            REPORT_KEYS[analyst_type]: f"{analyst_type} report " + "x" * 120,
+        }
+
+    return lambda *args, **kwargs: node
+
+
+def _fake_simple(update):
+    return lambda *args, **kwargs: (lambda state: update)
+
+
+@pytest.fixture
+def graph_setup(monkeypatch):
+    active, peak, lock = [0], [0], threading.Lock()
+    # 初始状态解析证券信息时不访问数据源，计时只覆盖图的执行
+    monkeypatch.setattr(instrument_mod, "resolve_company_name", lambda ticker, market_info: f"股票{ticker}")
+    for analyst_type in ANALYSTS:
+        factory = {
+            "market": "create_market_analyst",
+            "social": "create_social_media_analyst",
+            "news": "create_news_analyst",
+            "fundamentals": "create_fundamentals_analyst",
+        }[analyst_type]
+        monkeypatch.setattr(setup_mod, factory, _fake_analyst(analyst_type, active, peak, lock))
+
+    debate = {"history": "", "bull_history": "", "bear_history": "", "current_response": "",
+              "judge_decision": "", "count": 99}
+    risk = {"history": "", "risky_history": "", "safe_history": "", "neutral_history": "",
+            "latest_speaker": "Neutral", "current_risky_response": "", "current_safe_response": "",
+            "current_neutral_response": "", "judge_decision": "", "count": 99}
+    monkeypatch.setattr(setup_mod, "create_bull_researcher", _fake_simple({"investment_debate_state": debate}))
+    monkeypatch.setattr(setup_mod, "create_bear_researcher", _fake_simple({"investment_debate_state": debate}))
+    monkeypatch.setattr(setup_mod, "create_research_manager", _fake_simple({"investment_plan": "plan"}))
+    monkeypatch.setattr(setup_mod, "create_trader", _fake_simple({"trader_investment_plan": "trade"}))
+    monkeypatch.setattr(setup_mod, "create_risky_debator", _fake_simple({"risk_debate_state": risk}))
+    monkeypatch.setattr(setup_mod, "create_safe_debator", _fake_simple({"risk_debate_state": risk}))
+    monkeypatch.setattr(setup_mod, "create_neutral_debator", _fake_simple({"risk_debate_state": risk}))
+    monkeypatch.setattr(setup_mod, "create_risk_manager", _fake_simple({"final_trade_decision": "BUY"}))
+
+    def build(mode):
+        return setup_mod.GraphSetup(
+            quick_thinking_llm=None,
+            deep_thinking_llm=None,
+            toolkit=None,
+            tool_nodes={k: (lambda state: {}) for k in ANALYSTS},
+            bull_memory=None,
+            bear_memory=None,
+            trader_memory=None,
+            invest_judge_memory=None,
+            risk_manager_memory=None,
+            conditional_logic=ConditionalLogic(),
+            config={"analyst_execution_mode": mode},
+        )
+
+    return build, peak
+
+
+def _run(graph):
+    state = Propagator().create_initial_state("000001", "2025-01-02")
+    final_state = dict(state)
+    for chunk in graph.stream(state, stream_mode="updates"):
+        for node_name, update in chunk.items():
+            if update:
+                final_state.update(update)
+    return final_state
+
+
+def test_parallel_mode_runs_analysts_concurrently(graph_setup):
+    build, peak = graph_setup
+    graph = build("parallel").setup_graph(ANALYSTS)
+
+    assert setup_mod.ANALYST_JOIN_NODE in graph.get_graph().nodes
+
+    start = time.time()
+    final_state = _run(graph)
+    elapsed = time.time() - start
+
+    assert peak[0] == len(ANALYSTS)
+    assert elapsed < 0.2 * len(ANALYSTS)
+    for analyst_type in ANALYSTS:
+        assert final_state[REPORT_KEYS[analyst_type]].startswith(f"{analyst_type} report")
+    assert final_state["final_trade_decision"] == "BUY"
+
+
+def test_sequential_mode_is_default(graph_setup):
+    build, peak = graph_setup
+    graph = build("sequential").setup_graph(ANALYSTS)
+
+    assert setup_mod.ANALYST_JOIN_NODE not in graph.get_graph().nodes
+    final_state = _run(graph)
+    assert peak[0] == 1
+    assert final_state["final_trade_decision"] == "BUY"
+
+
+def test_record_node_timings_uses_branch_reported_timings():
+    graph = TradingAgentsGraph.__new__(TradingAgentsGraph)
+    graph.config = {"analyst_execution_mode": "parallel"}
+
+    node_timings, branch_timings = {}, {}
+    last = time.time() - 5
+    chunk = {
+        "Market Analyst": {
+            "market_report": "r",
+            "analyst_branch_timings": {"market": {"Market Analyst": 1.5, "tools_market": 0.5}},
+        }
+    }
+    graph._record_node_timings(chunk, node_timings, last, branch_timings)
+    graph._record_node_timings(
+        {"News Analyst": {"analyst_branch_timings": {"news": {"News Analyst": 3.0}}}},
+        node_timings, last, branch_timings,
+    )
+
+    assert node_timings == {"Market Analyst": 1.5, "tools_market": 0.5, "News Analyst": 3.0}
+
+    perf = graph._build_performance_data(node_timings, 3.2, branch_timings)
+    assert perf["parallel_analysts"]["wall_time"] == 3.0
+    assert perf["parallel_analysts"]["saved_time"] == 2.0
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.utils import embedding_cache
+from tradingagents.utils.embedding_cache import EmbeddingCache
+from tradingagents.utils.enhanced_news_filter import EnhancedNewsFilter
+
+
+class CountingEncoder:
+    """按字符哈希生成确定性向量，记录每次 encode 的输入"""
+
+    def __init__(self, dim=32):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for ch in text:
+                vectors[row, ord(ch) % self.dim] += 1.0
+        return vectors
+
+
+NEWS = pd.DataFrame([
+    {'新闻标题': '招商银行发布2024年第三季度业绩报告', '新闻内容': '招商银行今日发布第三季度财报，净利润同比增长8%。'},
+    {'新闻标题': '银行ETF指数多只成分股上涨', '新闻内容': '银行板块今日表现强势，招商银行、工商银行等多只成分股上涨。'},
+    {'新闻标题': '某科技公司发布新款手机', '新闻内容': None},
+    {'新闻标题': '招商银行与某科技公司签署战略合作协议', '新闻内容': '双方将在数字化转型方面深度合作。'},
+])
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_CACHES", {})
+    monkeypatch.setenv("EMBEDDING_CACHE_PERSIST", "false")
+
+
+@pytest.fixture
+def semantic_filter():
+    news_filter = EnhancedNewsFilter('600036', '招商银行', use_semantic=False)
+    encoder = CountingEncoder()
+    news_filter.sentence_model = encoder
+    news_filter.company_embedding = encoder.encode(['招商银行', '招商银行股票', '600036'])
+    news_filter.use_semantic = True
+    encoder.calls.clear()
+    return news_filter, encoder
+
+
+def _reference_semantic(encoder, company, title, content):
+    """原逐条实现：单条编码后与每个公司向量求余弦，取最大值"""
+    vector = encoder.encode([f"{title} {content[:200]}"])[0]
+    best = max(np.dot(vector, c) / (np.linalg.norm(vector) * np.linalg.norm(c)) for c in company)
+    return max(0, min(100, best * 100))
+
+
+def test_filter_encodes_whole_batch_once_and_matches_per_article_scores(semantic_filter):
+    news_filter, encoder = semantic_filter
+
+    result = news_filter.filter_news_enhanced(NEWS, min_score=0)
+
+    assert len(encoder.calls) == 1 and len(encoder.calls[0]) == len(NEWS)
+    assert list(result.columns[:2]) == ['新闻标题', '新闻内容']
+    assert result['final_score'].is_monotonic_decreasing
+
+    reference = CountingEncoder()
+    for _, row in result.iterrows():
+        content = row['新闻内容'] or ''
+        expected_semantic = _reference_semantic(reference, news_filter.company_embedding, row['新闻标题'], content)
+        expected_rule = news_filter.calculate_relevance_score(row['新闻标题'], content)
+        assert row['semantic_score'] == pytest.approx(expected_semantic, rel=1e-5)
+        assert row['rule_score'] == expected_rule
+        assert row['final_score'] == pytest.approx(0.4 * expected_rule + 0.35 * expected_semantic, rel=1e-5)
+
+
+def test_repeated_runs_reuse_cached_embeddings(semantic_filter):
+    news_filter, encoder = semantic_filter
+
+    first = news_filter.filter_news_enhanced(NEWS, min_score=30)
+    extra = pd.DataFrame([{'新闻标题': '招商银行召开股东大会', '新闻内容': '审议年度利润分配方案。'}])
+    news_filter.filter_news_enhanced(pd.concat([NEWS, extra], ignore_index=True), min_score=30)
+    second = news_filter.filter_news_enhanced(NEWS, min_score=30)
+
+    # 第二次只编码新增的一条，第三次全部命中缓存
+    assert [len(call) for call in encoder.calls] == [len(NEWS), 1]
+    pd.testing.assert_frame_equal(first, second)
+    # 单条接口走同一缓存
+    assert news_filter.calculate_semantic_similarity(NEWS['新闻标题'][0], NEWS['新闻内容'][0]) == \
+        pytest.approx(first.loc[first['新闻标题'] == NEWS['新闻标题'][0], 'semantic_score'].iloc[0])
+    assert len(encoder.calls) == 2
+
+
+def test_embedding_cache_persists_to_disk(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    encoder = CountingEncoder()
+    cache = EmbeddingCache("model-a", path=path)
+    first = cache.get_or_compute(["a", "b", "a"], encoder.encode)
+    cache.close()
+
+    assert encoder.calls == [["a", "b"]]
+    assert np.array_equal(first[0], first[2])
+
+    reopened = EmbeddingCache("model-a", path=path)
+    assert np.array_equal(reopened.get_or_compute(["b", "a"], encoder.encode), first[[1, 0]])
+    assert len(encoder.calls) == 1 and reopened.stats["disk_hits"] == 2
+
+    # 不同命名空间（模型）不共用向量
+    other = EmbeddingCache("model-b", path=path, max_items=1)
+    other.get_or_compute(["a"], encoder.encode)
+    assert len(encoder.calls) == 2
+    reopened.close()
+    other.close()
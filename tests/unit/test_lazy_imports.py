@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from tradingagents.utils.lazy_import import lazy_exports
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 导入这些模块时不应连带加载的重量级依赖（与 scripts/profile_import_time.py 的守卫一致）
+GUARDS = {
+    "tradingagents.agents": ["chromadb", "yfinance", "stockstats", "tradingagents.dataflows.interface"],
+    "tradingagents.agents.utils.memory": ["chromadb", "dashscope", "openai"],
+    "tradingagents.dataflows": ["yfinance", "stockstats", "akshare", "tushare", "tradingagents.dataflows.interface"],
+    "tradingagents.graph.engine_pool": ["langchain_openai", "tradingagents.graph.trading_graph"],
+}
+
+
+@pytest.mark.parametrize("module", sorted(GUARDS))
+def test_heavy_dependencies_are_not_loaded_on_import(module):
+    code = f"import sys, {module}; print('LOADED=' + ','.join(m for m in {GUARDS[module]!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(PROJECT_ROOT), os.environ.get("PYTHONPATH", "")]))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    loaded = [line[len("LOADED="):] for line in proc.stdout.splitlines() if line.startswith("LOADED=")]
+    assert loaded == [""], f"{module} 导入时加载了: {loaded}"
+
+
+def test_lazy_exports_resolve_on_first_access_with_fallbacks():
+    module = types.ModuleType("lazy_demo")
+    namespace = module.__dict__
+    lazy_exports(namespace, {
+        "dumps": "json:dumps",
+        "Missing": ["no_such_module_xyz:Missing", "json:NoSuchName"],
+        "path_module": "os.path",
+    }, optional=["Missing"], availability={"MISSING_AVAILABLE": "Missing", "DUMPS_AVAILABLE": "dumps"})
+
+    assert "dumps" not in namespace
+    import json
+    assert module.dumps is json.dumps and namespace["dumps"] is json.dumps
+    assert module.path_module is os.path
+    assert module.Missing is None
+    assert module.MISSING_AVAILABLE is False and module.DUMPS_AVAILABLE is True
+    assert {"dumps", "Missing", "MISSING_AVAILABLE"} <= set(dir(module))
+    with pytest.raises(AttributeError):
+        module.not_exported
+
+
+def test_required_export_raises_import_error():
+    module = types.ModuleType("lazy_required")
+    lazy_exports(module.__dict__, {"Thing": "no_such_module_xyz:Thing"})
+    with pytest.raises(ImportError):
+        module.Thing
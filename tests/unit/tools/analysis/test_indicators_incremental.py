@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tradingagents.tools.analysis.indicators import (
+    IncrementalIndicators,
+    IndicatorSpec,
+    add_all_indicators,
+    compute_many,
+)
+
+SPECS = [
+    IndicatorSpec('ma', {'n': 5}),
+    IndicatorSpec('ma', {'n': 60}),
+    IndicatorSpec('ma', {'n': 1}),
+    IndicatorSpec('ema', {'n': 12}),
+    IndicatorSpec('macd'),
+    IndicatorSpec('rsi', {'n': 14}),
+    IndicatorSpec('rsi', {'n': 6, 'method': 'china'}),
+    IndicatorSpec('rsi', {'n': 14, 'method': 'sma'}),
+    IndicatorSpec('boll', {'n': 20, 'k': 2}),
+    IndicatorSpec('atr', {'n': 14}),
+    IndicatorSpec('kdj', {'n': 9, 'm1': 3, 'm2': 3}),
+]
+
+
+def make_df(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[40:60] = close[40]  # 停牌/一字板：连续相同价格
+    if seed % 2:
+        close = np.round(close, 2)
+        close[rng.integers(0, n, 8)] = np.nan
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    high[40:60] = low[40:60] = close[40]
+    return pd.DataFrame({'high': high, 'low': low, 'close': close})
+
+
+def assert_bit_identical(actual, expected, name):
+    a = np.asarray(actual, dtype=float)
+    e = np.asarray(expected, dtype=float)
+    assert np.array_equal(np.isnan(a), np.isnan(e)), name
+    ok = ~np.isnan(a)
+    assert np.array_equal(a[ok].view(np.int64), e[ok].view(np.int64)), name
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_incremental_matches_compute_many_bit_for_bit(seed):
+    df = make_df(seed=seed)
+    expected = compute_many(df, SPECS)
+    actual = IncrementalIndicators(SPECS).update_many(df)
+
+    for col in actual.columns:
+        assert_bit_identical(actual[col], expected[col], col)
+
+
+def test_warm_state_update_matches_full_recompute():
+    df = make_df(seed=3)
+    state = IncrementalIndicators.from_history(df.iloc[:250], SPECS)
+    state = IncrementalIndicators.loads(state.dumps())  # 模拟按股票持久化后恢复
+
+    tail = df.iloc[250:]
+    preview = state.preview(tail['close'].iloc[0], tail['high'].iloc[0], tail['low'].iloc[0])
+    rows = [state.update(r.close, r.high, r.low) for r in tail.itertuples()]
+
+    expected = compute_many(df, SPECS).iloc[250:]
+    assert state.bars == len(df)
+    assert preview.keys() == rows[0].keys()
+    for col in rows[0]:
+        assert_bit_identical([preview[col]], [rows[0][col]], col)
+        assert_bit_identical([r[col] for r in rows], expected[col], col)
+
+
+def test_add_all_indicators_china_style_matches_incremental_rsi():
+    df = make_df(seed=4)
+    expected = add_all_indicators(df.copy(), rsi_style='china')
+    specs = [IndicatorSpec('rsi', {'n': n, 'method': 'china'}) for n in (6, 12, 24)]
+    actual = IncrementalIndicators(specs + [IndicatorSpec('rsi', {'n': 14, 'method': 'sma'})]).update_many(df)
+
+    for col in ('rsi6', 'rsi12', 'rsi24', 'rsi14'):
+        assert_bit_identical(actual[col], expected[col], col)
@@ -6,6 +6,8 @@ import json
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
+from tradingagents.agents.utils.instrument_context import get_instrument_context
+
 
 def create_trader(llm, memory):
     def trader_node(state, name):
@@ -16,9 +18,8 @@ def create_trader(llm, memory):
         news_report = state["news_report"]
         fundamentals_report = state["fundamentals_report"]
 
-        # 使用统一的股票类型检测
-        from tradingagents.utils.stock_utils import StockUtils
-        market_info = StockUtils.get_market_info(company_name)
+        # 证券信息在运行开始时已解析，直接从状态读取
+        market_info = get_instrument_context(state)
         is_china = market_info['is_china']
         is_hk = market_info['is_hk']
         is_us = market_info['is_us']
@@ -1,8 +1,6 @@
 from typing import Annotated, Sequence
 from datetime import date, timedelta, datetime
 from typing_extensions import TypedDict, Optional
-from langchain_openai import ChatOpenAI
-from tradingagents.agents import *
 from langgraph.prebuilt import ToolNode
 from langgraph.graph import END, StateGraph, START, MessagesState
 
@@ -11,6 +9,14 @@ from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
+def merge_branch_timings(left: dict, right: dict) -> dict:
+    """合并并行分析师分支上报的节点耗时（按分析师类型合并，支持并发写入）"""
+    merged = dict(left or {})
+    for analyst_type, timings in (right or {}).items():
+        merged[analyst_type] = {**merged.get(analyst_type, {}), **timings}
+    return merged
+
+
 # Researcher team state
 class InvestDebateState(TypedDict):
     bull_history: Annotated[
@@ -54,6 +60,8 @@ class RiskDebateState(TypedDict):
 class AgentState(MessagesState):
     company_of_interest: Annotated[str, "Company that we are interested in trading"]
     trade_date: Annotated[str, "What date we are trading at"]
+    # 运行开始时解析一次的证券信息（名称、市场、货币、板块、交易日历），节点只读
+    instrument_context: Annotated[dict, "Instrument metadata resolved once per run"]
 
     sender: Annotated[str, "Agent that sent this message"]
 
@@ -71,6 +79,9 @@ class AgentState(MessagesState):
     sentiment_tool_call_count: Annotated[int, "Social media analyst tool call counter"]
     fundamentals_tool_call_count: Annotated[int, "Fundamentals analyst tool call counter"]
 
+    # ⚡ 并行分析师模式: 各分支自行上报的节点耗时 {analyst_type: {node_name: seconds}}
+    analyst_branch_timings: Annotated[dict, merge_branch_timings]
+
     # researcher team discussion step
     investment_debate_state: Annotated[
         InvestDebateState, "Current state of the debate on if to invest or not"
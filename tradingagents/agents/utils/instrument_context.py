@@ -0,0 +1,215 @@
+"""
+单次分析运行的证券信息上下文
+
+公司名称需要查询数据源 / 数据库，之前每个分析师、研究员、交易员节点都会各自查询一次，
+一次分析要重复十余次。现在由 Propagator.create_initial_state 在运行开始时解析一次，
+放入 AgentState["instrument_context"]，各节点通过 get_instrument_context(state) 直接读取：
+
+    {
+        "ticker": "000001", "company_name": "平安银行",
+        "market": "china_a", "market_name": "中国A股", "is_china": True, "is_hk": False, "is_us": False,
+        "currency_name": "人民币", "currency_symbol": "¥", "data_source": "china_unified",
+        "board": "深市主板", "exchange": "深圳证券交易所",
+        "calendar": {"timezone": "Asia/Shanghai", "trading_hours": "09:30-11:30, 13:00-15:00",
+                     "trade_date": "2025-01-02", "is_weekday": True},
+    }
+
+market_info 中的键（is_china / currency_name 等）原样保留，节点可直接把上下文当作 market_info 使用。
+"""
+
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.stock_utils import StockUtils
+
+logger = get_logger("default")
+
+US_STOCK_NAMES = {
+    'AAPL': '苹果公司',
+    'TSLA': '特斯拉',
+    'NVDA': '英伟达',
+    'MSFT': '微软',
+    'GOOGL': '谷歌',
+    'AMZN': '亚马逊',
+    'META': 'Meta',
+    'NFLX': '奈飞'
+}
+
+# 交易日历只包含无需查询的静态信息；节假日仍以数据源返回的交易数据为准
+MARKET_CALENDARS = {
+    "china_a": {"timezone": "Asia/Shanghai", "trading_hours": "09:30-11:30, 13:00-15:00"},
+    "hong_kong": {"timezone": "Asia/Hong_Kong", "trading_hours": "09:30-12:00, 13:00-16:00"},
+    "us": {"timezone": "America/New_York", "trading_hours": "09:30-16:00"},
+}
+
+# 代码前缀 -> (板块, 交易所)，按前缀长度从长到短匹配
+CHINA_BOARDS = [
+    ("688", "科创板", "上海证券交易所"),
+    ("689", "科创板", "上海证券交易所"),
+    ("60", "沪市主板", "上海证券交易所"),
+    ("90", "沪市B股", "上海证券交易所"),
+    ("300", "创业板", "深圳证券交易所"),
+    ("301", "创业板", "深圳证券交易所"),
+    ("00", "深市主板", "深圳证券交易所"),
+    ("20", "深市B股", "深圳证券交易所"),
+    ("92", "北交所", "北京证券交易所"),
+    ("8", "北交所", "北京证券交易所"),
+    ("4", "北交所", "北京证券交易所"),
+]
+
+_stats_lock = threading.Lock()
+_stats = {
+    "resolved": 0,           # 解析上下文次数（每次运行一次）
+    "name_lookups": 0,       # 实际发起的公司名称查询
+    "served_from_state": 0,  # 节点直接从状态读取，省去的查询
+    "fallback_resolved": 0,  # 状态中没有上下文、由节点自行解析
+}
+
+
+# 当前运行的统计；随上下文传递到 LangGraph 执行节点的线程中，并发运行之间互不影响
+_run_stats: ContextVar[Optional[Dict[str, int]]] = ContextVar("instrument_run_stats", default=None)
+
+
+def _count(key: str):
+    run_stats = _run_stats.get()
+    with _stats_lock:
+        _stats[key] += 1
+        if run_stats is not None:
+            run_stats[key] += 1
+
+
+def resolve_company_name(ticker: str, market_info: Dict[str, Any]) -> str:
+    """根据股票代码查询公司名称（会访问数据源，应只在解析上下文时调用）"""
+    _count("name_lookups")
+    try:
+        if market_info['is_china']:
+            from tradingagents.dataflows.interface import get_china_stock_info_unified
+            stock_info = get_china_stock_info_unified(ticker)
+            if stock_info and "股票名称:" in stock_info:
+                company_name = stock_info.split("股票名称:")[1].split("\n")[0].strip()
+                logger.info(f"✅ [证券上下文] 成功获取中国股票名称: {ticker} -> {company_name}")
+                return company_name
+
+            # 降级方案：直接从数据源管理器获取
+            logger.warning(f"⚠️ [证券上下文] 无法从统一接口解析股票名称: {ticker}，尝试降级方案")
+            try:
+                from tradingagents.dataflows.data_source_manager import get_china_stock_info_unified as get_info_dict
+                info_dict = get_info_dict(ticker)
+                if info_dict and info_dict.get('name'):
+                    logger.info(f"✅ [证券上下文] 降级方案成功获取股票名称: {ticker} -> {info_dict['name']}")
+                    return info_dict['name']
+            except Exception as e:
+                logger.error(f"❌ [证券上下文] 降级方案也失败: {e}")
+            return f"股票代码{ticker}"
+
+        if market_info['is_hk']:
+            try:
+                from tradingagents.dataflows.providers.hk.improved_hk import get_hk_company_name_improved
+                return get_hk_company_name_improved(ticker)
+            except Exception as e:
+                logger.debug(f"📊 [证券上下文] 改进港股工具获取名称失败: {e}")
+                clean_ticker = ticker.replace('.HK', '').replace('.hk', '')
+                return f"港股{clean_ticker}"
+
+        if market_info['is_us']:
+            return US_STOCK_NAMES.get(ticker.upper(), f"美股{ticker}")
+
+    except Exception as e:
+        logger.error(f"❌ [证券上下文] 获取公司名称失败: {e}")
+    return f"股票{ticker}"
+
+
+def _board(ticker: str, market: str) -> Dict[str, str]:
+    code = ticker.split('.')[0]
+    if market == "china_a":
+        for prefix, board, exchange in CHINA_BOARDS:
+            if code.startswith(prefix):
+                return {"board": board, "exchange": exchange}
+        return {"board": "未知板块", "exchange": "未知交易所"}
+    if market == "hong_kong":
+        # 港股创业板代码为 08xxx
+        board = "港股创业板" if code.zfill(5).startswith("08") else "港股主板"
+        return {"board": board, "exchange": "香港交易所"}
+    if market == "us":
+        return {"board": "美股", "exchange": "美国证券交易所"}
+    return {"board": "未知板块", "exchange": "未知交易所"}
+
+
+def _calendar(market: str, trade_date: Optional[str]) -> Dict[str, Any]:
+    calendar = dict(MARKET_CALENDARS.get(market, {"timezone": None, "trading_hours": None}))
+    calendar["trade_date"] = str(trade_date) if trade_date else None
+    try:
+        calendar["is_weekday"] = datetime.strptime(str(trade_date)[:10], "%Y-%m-%d").weekday() < 5
+    except (TypeError, ValueError):
+        calendar["is_weekday"] = None
+    return calendar
+
+
+def resolve_instrument_context(ticker: str, trade_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    解析一次分析运行所需的证券信息
+
+    Args:
+        ticker: 股票代码
+        trade_date: 分析日期
+
+    Returns:
+        Dict: 证券信息上下文（包含 StockUtils.get_market_info 的全部字段）
+    """
+    _count("resolved")
+    market_info = StockUtils.get_market_info(ticker)
+    context = dict(market_info)
+    context["company_name"] = resolve_company_name(ticker, market_info)
+    context.update(_board(ticker, market_info["market"]))
+    context["calendar"] = _calendar(market_info["market"], trade_date)
+    logger.info(
+        f"🏷️ [证券上下文] {ticker} -> {context['company_name']} "
+        f"({context['market_name']}/{context['board']}, {context['currency_name']})"
+    )
+    return context
+
+
+def get_instrument_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    节点读取本次运行的证券信息上下文
+
+    正常情况下直接返回 create_initial_state 解析好的上下文，不做任何 I/O；
+    状态中没有上下文（或与 company_of_interest 不一致）时才现场解析。
+    """
+    ticker = state.get("company_of_interest", "Unknown")
+    context = state.get("instrument_context")
+    if context and context.get("ticker") == ticker:
+        _count("served_from_state")
+        return context
+    _count("fallback_resolved")
+    logger.debug(f"📊 [证券上下文] 状态中没有 {ticker} 的上下文，现场解析")
+    return resolve_instrument_context(ticker, state.get("trade_date"))
+
+
+def begin_run_stats() -> Dict[str, int]:
+    """在当前上下文中开始统计一次运行（在 create_initial_state 之前调用），返回该运行的计数"""
+    stats = dict.fromkeys(_stats, 0)
+    _run_stats.set(stats)
+    return stats
+
+
+def get_instrument_stats(run_stats: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    上下文统计；lookups_saved 为节点从状态读取而省去的名称查询次数
+
+    Args:
+        run_stats: begin_run_stats 返回的单次运行计数，None 时返回进程内累计值
+    """
+    with _stats_lock:
+        stats = dict(_stats if run_stats is None else run_stats)
+    stats["lookups_saved"] = stats["served_from_state"]
+    return stats
+
+
+def reset_instrument_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
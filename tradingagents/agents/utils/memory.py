@@ -1,15 +1,15 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
-import dashscope
-from dashscope import TextEmbedding
+# chromadb / dashscope / openai 导入较慢，在首次使用时才导入
 import os
 import threading
 import hashlib
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.embedding_cache import get_embedding_cache
 logger = get_logger("agents.utils.memory")
 
 
@@ -52,6 +52,8 @@ class ChromaDBManager:
             except Exception as e:
                 logger.error(f"❌ [ChromaDB] 初始化失败: {e}")
                 # 使用最简单的配置作为备用
+                import chromadb
+                from chromadb.config import Settings
                 try:
                     settings = Settings(
                         allow_reset=True,
@@ -97,7 +99,13 @@ class ChromaDBManager:
 
 
 class FinancialSituationMemory:
+    # 单次 embedding 请求的文本数上限（DashScope text-embedding-v3 每次最多 10 条）
+    DASHSCOPE_BATCH_SIZE = 10
+    OPENAI_BATCH_SIZE = 256
+
     def __init__(self, name, config):
+        from openai import OpenAI
+
         self.config = config
         self.llm_provider = config.get("llm_provider", "openai").lower()
 
@@ -310,6 +318,21 @@ class FinancialSituationMemory:
         self.chroma_manager = ChromaDBManager()
         self.situation_collection = self.chroma_manager.get_or_create_collection(name)
 
+        # 按内容哈希缓存embedding，同一模型的所有记忆实例（bull/bear/trader/judge/risk）共享
+        self.embedding_cache = None
+        if self.client != "DISABLED":
+            route = "dashscope" if self._uses_dashscope() else config.get("backend_url", "")
+            self.embedding_cache = get_embedding_cache(f"memory:{route}:{self.embedding}")
+
+    def _uses_dashscope(self):
+        """是否使用阿里百炼的嵌入模型"""
+        return (self.llm_provider == "dashscope" or
+                self.llm_provider == "alibaba" or
+                self.llm_provider == "qianfan" or
+                (self.llm_provider == "google" and self.client is None) or
+                (self.llm_provider == "deepseek" and self.client is None) or
+                (self.llm_provider == "openrouter" and self.client is None))
+
     def _smart_text_truncation(self, text, max_length=8192):
         """智能文本截断，保持语义完整性和缓存兼容性"""
         if len(text) <= max_length:
@@ -350,22 +373,54 @@ class FinancialSituationMemory:
 
     def get_embedding(self, text):
         """Get embedding for a text using the configured provider"""
+        return self.get_embeddings([text])[0]
 
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量获取embedding
+
+        先按内容哈希查共享缓存，未命中的文本（去重后）合并为尽量少的请求；
+        无法向量化的文本（记忆功能禁用、空文本、超长）返回零向量，失败结果不缓存。
+        """
         # 检查记忆功能是否被禁用
         if self.client == "DISABLED":
             # 内存功能已禁用，返回空向量
             logger.debug(f"⚠️ 记忆功能已禁用，返回空向量")
-            return [0.0] * 1024  # 返回1024维的零向量
+            return [[0.0] * 1024 for _ in texts]  # 返回1024维的零向量
+
+        results = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if self._check_embedding_text(text):
+                pending.append(i)
+            else:
+                results[i] = [0.0] * 1024
 
+        if pending:
+            vectors = self.embedding_cache.get_or_compute_list(
+                [texts[i] for i in pending], self._embed_batch, should_cache=lambda v: bool(np.any(v))
+            )
+            for i, vector in zip(pending, vectors):
+                results[i] = vector.tolist()
+        return results
+
+    def get_embedding_stats(self):
+        """embedding 缓存命中率与请求耗时统计（同一模型的记忆实例共享）"""
+        if self.embedding_cache is None:
+            return {}
+        return self.embedding_cache.snapshot()
+
+    def _check_embedding_text(self, text):
+        """检查文本能否向量化并记录文本处理信息，不能时返回 False（调用方返回零向量）"""
         # 验证输入文本
         if not text or not isinstance(text, str):
             logger.warning(f"⚠️ 输入文本为空或无效，返回空向量")
-            return [0.0] * 1024
+            return False
 
         text_length = len(text)
         if text_length == 0:
             logger.warning(f"⚠️ 输入文本长度为0，返回空向量")
-            return [0.0] * 1024
+            return False
         
         # 检查是否启用长度限制
         if self.enable_embedding_length_check and text_length > self.max_embedding_length:
@@ -380,7 +435,7 @@ class FinancialSituationMemory:
                 'strategy': 'length_limit_skip',
                 'max_length': self.max_embedding_length
             }
-            return [0.0] * 1024
+            return False
         
         # 记录文本信息（不进行任何截断）
         if text_length > 8192:
@@ -395,13 +450,59 @@ class FinancialSituationMemory:
             'provider': self.llm_provider,
             'strategy': 'no_truncation_with_fallback'  # 标记策略
         }
+        return True
 
-        if (self.llm_provider == "dashscope" or
-            self.llm_provider == "alibaba" or
-            self.llm_provider == "qianfan" or
-            (self.llm_provider == "google" and self.client is None) or
-            (self.llm_provider == "deepseek" and self.client is None) or
-            (self.llm_provider == "openrouter" and self.client is None)):
+    def _embed_batch(self, texts):
+        """一次（按批大小分段）请求多条文本的embedding，批量请求失败时逐条请求（含长度降级处理）"""
+        if len(texts) == 1:
+            return [self._embed_single(texts[0])]
+        try:
+            started = time.perf_counter()
+            if self._uses_dashscope():
+                vectors = self._dashscope_embed_batch(texts)
+            else:
+                vectors = self._openai_embed_batch(texts)
+            logger.debug(f"✅ {self.llm_provider} 批量embedding成功: {len(texts)}条，耗时{time.perf_counter() - started:.2f}秒")
+            return vectors
+        except Exception as e:
+            logger.warning(f"⚠️ {self.llm_provider} 批量embedding失败，逐条请求: {str(e)}")
+            return [self._embed_single(text) for text in texts]
+
+    def _dashscope_embed_batch(self, texts):
+        import dashscope
+        from dashscope import TextEmbedding
+
+        if not hasattr(dashscope, 'api_key') or not dashscope.api_key:
+            logger.warning(f"⚠️ DashScope API密钥未设置，记忆功能降级")
+            return [[0.0] * 1024 for _ in texts]
+
+        vectors = []
+        for start in range(0, len(texts), self.DASHSCOPE_BATCH_SIZE):
+            chunk = texts[start:start + self.DASHSCOPE_BATCH_SIZE]
+            response = TextEmbedding.call(model=self.embedding, input=chunk)
+            if response.status_code != 200:
+                raise RuntimeError(f"{response.code} - {response.message}")
+            items = sorted(response.output['embeddings'], key=lambda item: item['text_index'])
+            vectors.extend(item['embedding'] for item in items)
+        return vectors
+
+    def _openai_embed_batch(self, texts):
+        if self.client is None:
+            logger.warning(f"⚠️ 嵌入客户端未初始化，返回空向量")
+            return [[0.0] * 1024 for _ in texts]
+
+        vectors = []
+        for start in range(0, len(texts), self.OPENAI_BATCH_SIZE):
+            response = self.client.embeddings.create(
+                model=self.embedding,
+                input=texts[start:start + self.OPENAI_BATCH_SIZE]
+            )
+            vectors.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return vectors
+
+    def _embed_single(self, text):
+        """请求单条文本的embedding（失败或长度超限时按提供商降级，最终返回零向量）"""
+        if self._uses_dashscope():
             # 使用阿里百炼的嵌入模型
             try:
                 # 导入DashScope模块
@@ -562,7 +663,6 @@ class FinancialSituationMemory:
         situations = []
         advice = []
         ids = []
-        embeddings = []
 
         offset = self.situation_collection.count()
 
@@ -570,7 +670,9 @@ class FinancialSituationMemory:
             situations.append(situation)
             advice.append(recommendation)
             ids.append(str(offset + i))
-            embeddings.append(self.get_embedding(situation))
+
+        # 一次批量获取全部情况的embedding
+        embeddings = self.get_embeddings(situations)
 
         self.situation_collection.add(
             documents=situations,
@@ -645,7 +747,8 @@ class FinancialSituationMemory:
             'collection_count': self.situation_collection.count(),
             'client_status': 'enabled' if self.client != "DISABLED" else 'disabled',
             'embedding_model': self.embedding,
-            'provider': self.llm_provider
+            'provider': self.llm_provider,
+            'embedding_stats': self.get_embedding_stats()
         }
         
         # 添加最后一次文本处理信息
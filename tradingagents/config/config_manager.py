@@ -12,6 +12,7 @@
 import json
 import os
 import re
+import threading
 import warnings
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -40,6 +41,7 @@ logger = get_logger('agents')
 
 # 导入数据模型（避免循环导入）
 from .usage_models import UsageRecord, ModelConfig, PricingConfig
+from .usage_sink import SQLiteUsageStore, UsageRecordSink
 
 try:
     from .mongodb_storage import MongoDBStorage
@@ -67,9 +69,16 @@ class ConfigManager:
 
         self.models_file = self.config_dir / "models.json"
         self.pricing_file = self.config_dir / "pricing.json"
-        self.usage_file = self.config_dir / "usage.json"
+        self.usage_file = self.config_dir / "usage.json"  # 旧版使用记录，首次使用时导入 usage_db_file
+        self.usage_db_file = self.config_dir / "usage.sqlite3"
         self.settings_file = self.config_dir / "settings.json"
 
+        # 定价索引：(供应商, 模型) -> PricingConfig，定价文件变化时重建
+        self._pricing_index: Optional[Dict[tuple, PricingConfig]] = None
+        self._pricing_signature = None
+        self._usage_sink: Optional[UsageRecordSink] = None
+        self._usage_sink_lock = threading.Lock()
+
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
@@ -362,25 +371,57 @@ class ConfigManager:
                 json.dump(data, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.error(f"保存定价配置失败: {e}")
-    
+        finally:
+            self._pricing_index = None
+
+    def _get_pricing_index(self) -> Dict[tuple, PricingConfig]:
+        """(供应商, 模型) -> 定价配置，定价文件未变化时复用"""
+        try:
+            stat = self.pricing_file.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if self._pricing_index is None or signature != self._pricing_signature:
+            index = {}
+            for pricing in self.load_pricing():
+                index.setdefault((pricing.provider, pricing.model_name), pricing)
+            self._pricing_index, self._pricing_signature = index, signature
+        return self._pricing_index
+
+    @property
+    def usage_sink(self) -> UsageRecordSink:
+        """使用记录缓冲区（首次使用时创建）"""
+        if self._usage_sink is None:
+            with self._usage_sink_lock:
+                if self._usage_sink is None:
+                    if self.mongodb_storage is None:
+                        logger.info(f"📄 [Token记录] MongoDB存储未启用，使用本地存储: {self.usage_db_file}")
+                    store = SQLiteUsageStore(self.usage_db_file, legacy_json=self.usage_file)
+                    self._usage_sink = UsageRecordSink(
+                        store,
+                        mongodb_storage=self.mongodb_storage,
+                        max_records=lambda: self.load_settings().get("max_usage_records", 10000),
+                    )
+        return self._usage_sink
+
+    def flush_usage_records(self) -> int:
+        """立即写入缓冲中的使用记录，返回写入条数"""
+        return self.usage_sink.flush()
+
     def load_usage_records(self) -> List[UsageRecord]:
-        """加载使用记录"""
+        """加载使用记录（本地存储，按时间顺序）"""
         try:
-            if not self.usage_file.exists():
-                return []
-            with open(self.usage_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return [UsageRecord(**item) for item in data]
+            self.flush_usage_records()
+            return self.usage_sink.store.load()
         except Exception as e:
             logger.error(f"加载使用记录失败: {e}")
             return []
     
     def save_usage_records(self, records: List[UsageRecord]):
-        """保存使用记录"""
+        """保存使用记录（替换本地存储中的全部记录）"""
         try:
-            data = [asdict(record) for record in records]
-            with open(self.usage_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.flush_usage_records()
+            self.usage_sink.store.replace(records)
         except Exception as e:
             logger.error(f"保存使用记录失败: {e}")
     
@@ -402,40 +443,9 @@ class ConfigManager:
             analysis_type=analysis_type
         )
 
-        # 🔍 详细日志：记录保存位置
-        logger.info(f"💾 [Token记录] 准备保存: {provider}/{model_name}, 输入={input_tokens}, 输出={output_tokens}, 成本=¥{cost:.4f}, session={session_id}")
-
-        # 优先使用MongoDB存储
-        if self.mongodb_storage and self.mongodb_storage.is_connected():
-            logger.info(f"📊 [Token记录] 使用 MongoDB 存储 (数据库: {self.mongodb_storage.database_name}, 集合: {self.mongodb_storage.collection_name})")
-            success = self.mongodb_storage.save_usage_record(record)
-            if success:
-                logger.info(f"✅ [Token记录] MongoDB 保存成功: {provider}/{model_name}")
-                return record
-            else:
-                logger.error(f"⚠️ [Token记录] MongoDB保存失败，回退到JSON文件存储")
-        else:
-            # 🔍 详细日志：为什么没有使用MongoDB
-            if self.mongodb_storage is None:
-                logger.warning(f"⚠️ [Token记录] MongoDB存储未初始化 (mongodb_storage=None)")
-                logger.warning(f"   💡 请检查环境变量: USE_MONGODB_STORAGE={os.getenv('USE_MONGODB_STORAGE', '未设置')}")
-            elif not self.mongodb_storage.is_connected():
-                logger.warning(f"⚠️ [Token记录] MongoDB未连接 (is_connected=False)")
-
-            logger.info(f"📄 [Token记录] 使用 JSON 文件存储: {self.usage_file}")
-
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
-
-        # 限制记录数量
-        settings = self.load_settings()
-        max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
-
-        self.save_usage_records(records)
-        logger.info(f"✅ [Token记录] JSON 文件保存成功: {self.usage_file}")
+        # 写入缓冲区，按批写入 MongoDB 或本地存储
+        self.usage_sink.add(record)
+        logger.info(f"💾 [Token记录] {provider}/{model_name}, 输入={input_tokens}, 输出={output_tokens}, 成本=¥{cost:.4f}, session={session_id}")
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> tuple[float, str]:
@@ -445,20 +455,20 @@ class ConfigManager:
         Returns:
             tuple[float, str]: (成本, 货币单位)
         """
-        pricing_configs = self.load_pricing()
+        pricing_index = self._get_pricing_index()
 
-        for pricing in pricing_configs:
-            if pricing.provider == provider and pricing.model_name == model_name:
-                input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
-                output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
-                total_cost = input_cost + output_cost
-                return round(total_cost, 6), pricing.currency
+        pricing = pricing_index.get((provider, model_name))
+        if pricing is not None:
+            input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
+            output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
+            total_cost = input_cost + output_cost
+            return round(total_cost, 6), pricing.currency
 
         # 只在找不到配置时输出调试信息
         logger.warning(f"⚠️ [calculate_cost] 未找到匹配的定价配置: {provider}/{model_name}")
         logger.debug(f"⚠️ [calculate_cost] 可用的配置:")
-        for pricing in pricing_configs:
-            logger.debug(f"⚠️ [calculate_cost]   - {pricing.provider}/{pricing.model_name}")
+        for provider_name, configured_model in pricing_index:
+            logger.debug(f"⚠️ [calculate_cost]   - {provider_name}/{configured_model}")
 
         return 0.0, "CNY"
     
@@ -557,68 +567,12 @@ class ConfigManager:
         return None
     
     def get_usage_statistics(self, days: int = 30) -> Dict[str, Any]:
-        """获取使用统计"""
-        # 优先使用MongoDB获取统计
-        if self.mongodb_storage and self.mongodb_storage.is_connected():
-            try:
-                # 从MongoDB获取基础统计
-                stats = self.mongodb_storage.get_usage_statistics(days)
-                # 获取供应商统计
-                provider_stats = self.mongodb_storage.get_provider_statistics(days)
-                
-                if stats:
-                    stats["provider_stats"] = provider_stats
-                    stats["records_count"] = stats.get("total_requests", 0)
-                    return stats
-            except Exception as e:
-                logger.error(f"⚠️ MongoDB统计获取失败，回退到JSON文件: {e}")
-        
-        # 回退到JSON文件统计
-        records = self.load_usage_records()
-        
-        # 过滤最近N天的记录
-        from datetime import datetime, timedelta
+        """获取使用统计（优先MongoDB，聚合查询，包含尚未写入的缓冲记录）"""
+        return self.usage_sink.usage_statistics(days)
 
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        recent_records = []
-        for record in records:
-            try:
-                record_date = datetime.fromisoformat(record.timestamp)
-                if record_date >= cutoff_date:
-                    recent_records.append(record)
-            except:
-                continue
-        
-        # 统计数据
-        total_cost = sum(record.cost for record in recent_records)
-        total_input_tokens = sum(record.input_tokens for record in recent_records)
-        total_output_tokens = sum(record.output_tokens for record in recent_records)
-        
-        # 按供应商统计
-        provider_stats = {}
-        for record in recent_records:
-            if record.provider not in provider_stats:
-                provider_stats[record.provider] = {
-                    "cost": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "requests": 0
-                }
-            provider_stats[record.provider]["cost"] += record.cost
-            provider_stats[record.provider]["input_tokens"] += record.input_tokens
-            provider_stats[record.provider]["output_tokens"] += record.output_tokens
-            provider_stats[record.provider]["requests"] += 1
-        
-        return {
-            "period_days": days,
-            "total_cost": round(total_cost, 4),
-            "total_input_tokens": total_input_tokens,
-            "total_output_tokens": total_output_tokens,
-            "total_requests": len(recent_records),
-            "provider_stats": provider_stats,
-            "records_count": len(recent_records)
-        }
+    def get_session_cost(self, session_id: str) -> float:
+        """获取会话成本"""
+        return self.usage_sink.session_cost(session_id)
     
     def get_data_dir(self) -> str:
         """获取数据目录路径"""
@@ -739,9 +693,7 @@ class TokenTracker:
 
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
-        records = self.config_manager.load_usage_records()
-        session_cost = sum(record.cost for record in records if record.session_id == session_id)
-        return session_cost
+        return self.config_manager.get_session_cost(session_id)
 
     def estimate_cost(self, provider: str, model_name: str, estimated_input_tokens: int,
                      estimated_output_tokens: int) -> tuple[float, str]:
@@ -144,6 +144,40 @@ class MongoDBStorage:
             logger.error(f"   堆栈: {traceback.format_exc()}")
             return False
     
+    def save_usage_records(self, records: List[UsageRecord]) -> bool:
+        """批量保存使用记录到MongoDB（insert_many）"""
+        if not self._connected:
+            logger.warning(f"⚠️ [MongoDB存储] 未连接，无法保存记录")
+            return False
+        if not records:
+            return True
+
+        try:
+            created_at = datetime.now(ZoneInfo(get_timezone_name()))
+            docs = [{**asdict(record), '_created_at': created_at} for record in records]
+            result = self.collection.insert_many(docs, ordered=False)
+            logger.debug(f"✅ [MongoDB存储] 批量保存 {len(result.inserted_ids)} 条记录")
+            return len(result.inserted_ids) == len(docs)
+
+        except Exception as e:
+            logger.error(f"❌ [MongoDB存储] 批量保存记录失败: {e}")
+            return False
+
+    def get_session_cost(self, session_id: str) -> Optional[float]:
+        """会话总成本（聚合查询），失败时返回 None"""
+        if not self._connected:
+            return None
+
+        try:
+            result = list(self.collection.aggregate([
+                {'$match': {'session_id': session_id}},
+                {'$group': {'_id': None, 'cost': {'$sum': '$cost'}}}
+            ]))
+            return result[0]['cost'] if result else 0.0
+        except Exception as e:
+            logger.error(f"获取会话成本失败: {e}")
+            return None
+
     def load_usage_records(self, limit: int = 10000, days: int = None) -> List[UsageRecord]:
         """从MongoDB加载使用记录"""
         if not self._connected:
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Token 使用记录的缓冲写入
+
+每次 LLM 调用都会产生一条使用记录。原来的 JSON 文件存储每条记录都要读入全部历史、追加、再整体重写，
+开销随记录数线性增长。这里改为：
+
+- UsageRecordSink 先把记录放入内存缓冲，达到批量大小或间隔时间后一次写入
+  （MongoDB 用 insert_many，否则追加到本地 SQLite）
+- SQLiteUsageStore 只追加写入，按自增 id 裁剪旧记录，统计用 SQL 聚合，不加载全部记录
+- 统计时把尚未写入的缓冲记录一并计入，读取不需要强制刷新
+
+进程退出时自动刷新所有缓冲。
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from tradingagents.config.runtime_settings import get_float, get_int
+from tradingagents.utils.logging_manager import get_logger
+
+from .usage_models import UsageRecord
+
+logger = get_logger('agents')
+
+_RECORD_FIELDS = [f.name for f in fields(UsageRecord)]
+
+
+def record_epoch(record: UsageRecord) -> float:
+    """记录时间戳转为 epoch 秒（无时区的时间戳按本地时间处理），无法解析时返回 0"""
+    try:
+        return datetime.fromisoformat(record.timestamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {"cost": 0.0, "input_tokens": 0, "output_tokens": 0, "requests": 0}
+
+
+def _add_to_totals(totals: Dict[str, Any], cost: float, input_tokens: int, output_tokens: int, requests: int = 1):
+    totals["cost"] += cost or 0
+    totals["input_tokens"] += input_tokens or 0
+    totals["output_tokens"] += output_tokens or 0
+    totals["requests"] += requests or 0
+
+
+class SQLiteUsageStore:
+    """追加写入的本地使用记录存储（线程安全）"""
+
+    def __init__(self, path: Path, legacy_json: Optional[Path] = None):
+        """
+        Args:
+            path: SQLite 文件路径
+            legacy_json: 旧版 usage.json，首次打开时导入一次（原文件保留不动）
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage_records ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, timestamp TEXT, provider TEXT, "
+                "model_name TEXT, input_tokens INTEGER, output_tokens INTEGER, cost REAL, currency TEXT, "
+                "session_id TEXT, analysis_type TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_ts ON usage_records (ts)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usage_session ON usage_records (session_id)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+        if legacy_json is not None:
+            self._import_legacy_json(Path(legacy_json))
+
+    def _import_legacy_json(self, legacy_json: Path):
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_imported'").fetchone():
+                return
+        records = []
+        if legacy_json.exists():
+            try:
+                with open(legacy_json, 'r', encoding='utf-8') as f:
+                    records = [UsageRecord(**item) for item in json.load(f)]
+            except Exception as e:
+                logger.error(f"❌ [Token记录] 导入旧版使用记录失败: {legacy_json} ({e})")
+                return
+        self.append(records)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+                               (datetime.now().isoformat(),))
+            self._conn.commit()
+        if records:
+            logger.info(f"📥 [Token记录] 已导入旧版使用记录 {len(records)} 条: {legacy_json}")
+
+    def append(self, records: Iterable[UsageRecord], max_records: Optional[int] = None):
+        """追加记录，max_records 指定时只保留最新的 max_records 条"""
+        rows = [(record_epoch(r), *(getattr(r, name) for name in _RECORD_FIELDS)) for r in records]
+        with self._lock:
+            if rows:
+                self._conn.executemany(
+                    f"INSERT INTO usage_records (ts, {', '.join(_RECORD_FIELDS)}) "
+                    f"VALUES ({', '.join('?' * (len(_RECORD_FIELDS) + 1))})",
+                    rows,
+                )
+            if max_records is not None:
+                self._conn.execute(
+                    "DELETE FROM usage_records WHERE id <= (SELECT MAX(id) FROM usage_records) - ?", (max_records,)
+                )
+            self._conn.commit()
+
+    def replace(self, records: Iterable[UsageRecord]):
+        """用给定记录替换全部记录"""
+        with self._lock:
+            self._conn.execute("DELETE FROM usage_records")
+            self._conn.commit()
+        self.append(records)
+
+    def load(self, limit: Optional[int] = None) -> List[UsageRecord]:
+        """按写入顺序返回记录（limit 指定时返回最新的 limit 条）"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_RECORD_FIELDS)} FROM usage_records ORDER BY id DESC LIMIT ?",
+                (-1 if limit is None else limit,),
+            ).fetchall()
+        return [UsageRecord(*row) for row in reversed(rows)]
+
+    def aggregate(self, since: float) -> Dict[str, Dict[str, Any]]:
+        """since（epoch 秒）之后的记录按供应商汇总"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT provider, SUM(cost), SUM(input_tokens), SUM(output_tokens), COUNT(*) "
+                "FROM usage_records WHERE ts >= ? GROUP BY provider",
+                (since,),
+            ).fetchall()
+        provider_stats = {}
+        for provider, cost, input_tokens, output_tokens, requests in rows:
+            _add_to_totals(provider_stats.setdefault(provider, _empty_totals()),
+                           cost, input_tokens, output_tokens, requests)
+        return provider_stats
+
+    def session_cost(self, session_id: str) -> float:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT SUM(cost) FROM usage_records WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] or 0.0
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM usage_records").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class UsageRecordSink:
+    """使用记录缓冲区：批量写入 MongoDB 或本地 SQLite"""
+
+    def __init__(
+        self,
+        store: SQLiteUsageStore,
+        mongodb_storage=None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_records: Callable[[], Optional[int]] = lambda: None,
+    ):
+        """
+        Args:
+            store: 本地存储（MongoDB 不可用或写入失败时使用）
+            mongodb_storage: MongoDBStorage 实例，已连接时优先写入
+            batch_size: 缓冲记录数达到该值立即写入（USAGE_FLUSH_BATCH_SIZE，默认 50）
+            flush_interval: 缓冲记录最长等待秒数（USAGE_FLUSH_INTERVAL_SECONDS，默认 5）
+            max_records: 返回本地存储保留记录数上限的函数（每批第一条记录加入时在调用方线程读取，
+                写入时不再读取配置）
+        """
+        self.store = store
+        self.mongodb_storage = mongodb_storage
+        self.batch_size = batch_size or get_int("USAGE_FLUSH_BATCH_SIZE", None, 50)
+        self.flush_interval = flush_interval or get_float("USAGE_FLUSH_INTERVAL_SECONDS", None, 5.0)
+        self._max_records = max_records
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: List[UsageRecord] = []
+        self._oldest = 0.0
+        self._batch_max_records: Optional[int] = None
+        self.stats = {"added": 0, "flushes": 0, "mongodb_written": 0, "local_written": 0}
+
+    def _use_mongodb(self) -> bool:
+        return bool(self.mongodb_storage and self.mongodb_storage.is_connected())
+
+    def add(self, record: UsageRecord):
+        max_records = None if self._buffer else self._max_records()
+        with self._lock:
+            if not self._buffer:
+                self._batch_max_records = max_records
+                self._oldest = time.monotonic()
+                _mark_dirty(self)
+            self._buffer.append(record)
+            self.stats["added"] += 1
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def pending(self) -> List[UsageRecord]:
+        with self._lock:
+            return list(self._buffer)
+
+    def due(self) -> bool:
+        with self._lock:
+            return bool(self._buffer) and time.monotonic() - self._oldest >= self.flush_interval
+
+    def flush(self) -> int:
+        """写入全部缓冲记录，返回写入条数"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                max_records = self._batch_max_records
+                _mark_clean(self)
+            if not batch:
+                return 0
+            self.stats["flushes"] += 1
+            if self._use_mongodb():
+                if self.mongodb_storage.save_usage_records(batch):
+                    self.stats["mongodb_written"] += len(batch)
+                    logger.debug(f"📊 [Token记录] MongoDB 批量写入 {len(batch)} 条")
+                    return len(batch)
+                logger.error(f"⚠️ [Token记录] MongoDB批量写入失败，回退到本地存储: {self.store.path}")
+            try:
+                self.store.append(batch, max_records=max_records)
+                self.stats["local_written"] += len(batch)
+                logger.debug(f"📄 [Token记录] 本地批量写入 {len(batch)} 条: {self.store.path}")
+            except Exception as e:
+                logger.error(f"❌ [Token记录] 本地写入失败，{len(batch)} 条记录放回缓冲: {e}")
+                with self._lock:
+                    if not self._buffer:
+                        self._oldest = time.monotonic()
+                        _mark_dirty(self)
+                    self._buffer[:0] = batch
+                return 0
+            return len(batch)
+
+    def usage_statistics(self, days: int = 30) -> Dict[str, Any]:
+        """最近 days 天的统计（已写入的记录用聚合查询，加上尚未写入的缓冲记录）"""
+        since = time.time() - days * 86400
+        provider_stats = None
+        if self._use_mongodb():
+            try:
+                if self.mongodb_storage.get_usage_statistics(days):
+                    provider_stats = {
+                        provider: dict(stats)
+                        for provider, stats in self.mongodb_storage.get_provider_statistics(days).items()
+                    }
+            except Exception as e:
+                logger.error(f"⚠️ MongoDB统计获取失败，回退到本地存储: {e}")
+        if provider_stats is None:
+            provider_stats = self.store.aggregate(since)
+
+        for record in self.pending():
+            if record_epoch(record) >= since:
+                _add_to_totals(provider_stats.setdefault(record.provider, _empty_totals()),
+                               record.cost, record.input_tokens, record.output_tokens)
+
+        totals = _empty_totals()
+        for stats in provider_stats.values():
+            _add_to_totals(totals, stats["cost"], stats["input_tokens"], stats["output_tokens"], stats["requests"])
+        return {
+            "period_days": days,
+            "total_cost": round(totals["cost"], 4),
+            "total_input_tokens": totals["input_tokens"],
+            "total_output_tokens": totals["output_tokens"],
+            "total_requests": totals["requests"],
+            "provider_stats": provider_stats,
+            "records_count": totals["requests"],
+        }
+
+    def session_cost(self, session_id: str) -> float:
+        cost = sum(record.cost for record in self.pending() if record.session_id == session_id)
+        if self._use_mongodb():
+            mongo_cost = self.mongodb_storage.get_session_cost(session_id)
+            if mongo_cost is not None:
+                return cost + mongo_cost
+        return cost + self.store.session_cost(session_id)
+
+    def close(self):
+        self.flush()
+        self.store.close()
+
+
+# 有待写入记录的缓冲区（写入前保持引用，避免随所属对象回收而丢失记录），
+# 共用一个后台线程按间隔刷新，进程退出时统一刷新
+_DIRTY: Set[UsageRecordSink] = set()
+_DIRTY_LOCK = threading.Lock()
+_FLUSHER: Optional[threading.Thread] = None
+_FLUSHER_TICK = 1.0
+
+
+def _mark_dirty(sink: UsageRecordSink):
+    global _FLUSHER
+    with _DIRTY_LOCK:
+        _DIRTY.add(sink)
+        if _FLUSHER is None:
+            _FLUSHER = threading.Thread(target=_flush_loop, name="usage-sink-flusher", daemon=True)
+            _FLUSHER.start()
+
+
+def _mark_clean(sink: UsageRecordSink):
+    with _DIRTY_LOCK:
+        _DIRTY.discard(sink)
+
+
+def _dirty_sinks() -> List[UsageRecordSink]:
+    with _DIRTY_LOCK:
+        return list(_DIRTY)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(_FLUSHER_TICK)
+        for sink in _dirty_sinks():
+            if sink.due():
+                try:
+                    sink.flush()
+                except Exception as e:
+                    logger.error(f"❌ [Token记录] 定时写入失败: {e}")
+
+
+def flush_all() -> int:
+    """刷新所有缓冲区，返回写入总条数"""
+    total = 0
+    for sink in _dirty_sinks():
+        try:
+            total += sink.flush()
+        except Exception as e:
+            logger.error(f"❌ [Token记录] 写入失败: {e}")
+    return total
+
+
+atexit.register(flush_all)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+文件缓存索引
+
+StockDataCache 的元数据仍然以 *_meta.json 逐个保存（作为权威来源），
+这里额外维护一个 SQLite 索引，按 (symbol, data_type, market_type, data_source,
+日期区间, 缓存时间) 查询缓存键，避免每次未命中时遍历并解析整个 metadata 目录。
+
+索引只是元数据的派生数据：损坏或丢失时可以随时从 metadata 目录重建。
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+INDEX_FILENAME = "cache_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    cache_key   TEXT PRIMARY KEY,
+    symbol      TEXT NOT NULL,
+    data_type   TEXT NOT NULL,
+    market_type TEXT,
+    data_source TEXT,
+    start_date  TEXT,
+    end_date    TEXT,
+    cached_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_lookup
+    ON cache_entries (symbol, data_type, market_type, data_source, cached_at);
+"""
+
+
+def _normalize_date(value: Any) -> Optional[str]:
+    """统一日期格式为 YYYYMMDD，便于按字符串比较区间"""
+    if value is None or value == "":
+        return None
+    return str(value).replace("-", "").replace("/", "")[:8]
+
+
+def _to_timestamp(cached_at: Any) -> float:
+    if isinstance(cached_at, (int, float)):
+        return float(cached_at)
+    try:
+        return datetime.fromisoformat(str(cached_at)).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _index_row(cache_key: str, metadata: Dict[str, Any]) -> tuple:
+    return (
+        cache_key,
+        str(metadata.get('symbol', '')),
+        metadata.get('data_type', 'unknown'),
+        metadata.get('market_type'),
+        metadata.get('data_source'),
+        _normalize_date(metadata.get('start_date')),
+        _normalize_date(metadata.get('end_date')),
+        _to_timestamp(metadata.get('cached_at')),
+    )
+
+
+class CacheIndex:
+    """基于 SQLite 的缓存元数据索引"""
+
+    def __init__(self, index_path: Path, metadata_dir: Optional[Path] = None):
+        self.index_path = Path(index_path)
+        self.metadata_dir = Path(metadata_dir) if metadata_dir else None
+        self._lock = threading.Lock()
+
+        is_new = not self.index_path.exists()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        # 首次创建索引时从已有元数据文件导入（兼容旧缓存目录）
+        if is_new and self.metadata_dir is not None:
+            self.rebuild()
+
+    def upsert(self, cache_key: str, metadata: Dict[str, Any]):
+        """新增或更新一条缓存记录"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _index_row(cache_key, metadata),
+            )
+            self._conn.commit()
+
+    def remove(self, cache_key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+            self._conn.commit()
+
+    def find(self, symbol: str, data_type: str, market_type: Optional[str] = None,
+             data_source: Optional[str] = None, start_date: Optional[str] = None,
+             end_date: Optional[str] = None, max_age_hours: Optional[float] = None,
+             limit: int = 20) -> List[str]:
+        """
+        查找候选缓存键（最新的在前）
+
+        指定 start_date/end_date 时只返回区间完全覆盖请求区间的缓存，
+        例如 2024-01-01~2024-12-31 的缓存可以服务 2024-03-01~2024-06-30 的请求。
+        """
+        sql = ["SELECT cache_key FROM cache_entries WHERE symbol = ? AND data_type = ?"]
+        params: List[Any] = [str(symbol), data_type]
+
+        if market_type is not None:
+            sql.append("AND market_type = ?")
+            params.append(market_type)
+        if data_source is not None:
+            sql.append("AND data_source = ?")
+            params.append(data_source)
+
+        start = _normalize_date(start_date)
+        end = _normalize_date(end_date)
+        if start is not None:
+            sql.append("AND start_date IS NOT NULL AND start_date <= ?")
+            params.append(start)
+        if end is not None:
+            sql.append("AND end_date IS NOT NULL AND end_date >= ?")
+            params.append(end)
+
+        if max_age_hours is not None:
+            sql.append("AND cached_at >= ?")
+            params.append(time.time() - float(max_age_hours) * 3600)
+
+        sql.append("ORDER BY cached_at DESC LIMIT ?")
+        params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(" ".join(sql), params).fetchall()
+        return [r[0] for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def rebuild(self) -> int:
+        """从 metadata 目录重建索引，返回导入的记录数"""
+        if self.metadata_dir is None or not self.metadata_dir.exists():
+            return 0
+
+        rows = []
+        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except Exception:
+                continue
+            cache_key = metadata_file.name[:-len("_meta.json")]
+            rows.append(_index_row(cache_key, metadata))
+
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+        logger.info(f"🗂️ 缓存索引已重建: {len(rows)} 条记录")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
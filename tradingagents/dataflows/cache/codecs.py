@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+数据库缓存负载编解码
+
+DatabaseCacheManager 写入 Redis/MongoDB 的数据统一经过这里编码：
+
+- arrow-zstd / arrow-lz4（默认，需 pyarrow）：DataFrame 用 Arrow IPC 流格式，
+  文本用 UTF-8 + 块压缩，保留 dtype 和索引，解码几乎无需解析
+- json：旧格式（DataFrame.to_json(orient='records')），用于兼容和无 pyarrow 环境
+
+二进制负载带固定头部：魔数 + 格式版本 + 数据类型 + 编解码器 ID，读取时按头部
+选择解码方式；不带魔数的负载按旧 JSON 格式解析，因此已有缓存可以继续读取。
+"""
+
+import io
+import os
+import struct
+from typing import Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    ARROW_AVAILABLE = False
+
+
+MAGIC = b"TAC"
+FORMAT_VERSION = 1
+
+# 头部：魔数(3) + 版本(1) + 数据类型(1) + 编解码器ID(1)
+_HEADER = struct.Struct(">3sBcB")
+_KIND_DATAFRAME = b"D"
+_KIND_TEXT = b"T"
+
+# 兼容旧文档的 data_format 取值
+LEGACY_DATAFRAME_FORMAT = "dataframe_json"
+LEGACY_TEXT_FORMAT = "text"
+BINARY_FORMAT = "binary"
+
+Payload = Union[pd.DataFrame, str]
+
+
+class PayloadCodec:
+    """编解码器基类"""
+
+    name = ""
+    codec_id = 0
+
+    def encode(self, data: Payload) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, raw: bytes) -> Payload:
+        raise NotImplementedError
+
+
+class JsonCodec(PayloadCodec):
+    """旧格式：records JSON 字符串（不带头部）"""
+
+    name = "json"
+
+    def encode(self, data: Payload) -> str:
+        if isinstance(data, pd.DataFrame):
+            return data.to_json(orient='records', date_format='iso')
+        return str(data)
+
+    def decode(self, raw: Union[str, bytes], data_format: str = LEGACY_DATAFRAME_FORMAT) -> Payload:
+        if isinstance(raw, bytes):
+            raw = raw.decode('utf-8')
+        if data_format == LEGACY_DATAFRAME_FORMAT:
+            return pd.read_json(io.StringIO(raw), orient='records')
+        return raw
+
+
+class ArrowCodec(PayloadCodec):
+    """Arrow IPC（DataFrame）+ 块压缩（文本）"""
+
+    def __init__(self, compression: str, codec_id: int):
+        self.compression = compression
+        self.codec_id = codec_id
+        self.name = f"arrow-{compression}"
+
+    def encode(self, data: Payload) -> bytes:
+        if isinstance(data, pd.DataFrame):
+            table = pa.Table.from_pandas(data, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            options = pa.ipc.IpcWriteOptions(compression=self.compression)
+            with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            return _HEADER.pack(MAGIC, FORMAT_VERSION, _KIND_DATAFRAME, self.codec_id) + sink.getvalue().to_pybytes()
+
+        text = str(data).encode('utf-8')
+        body = pa.compress(text, codec=self.compression, asbytes=True)
+        return (_HEADER.pack(MAGIC, FORMAT_VERSION, _KIND_TEXT, self.codec_id)
+                + struct.pack(">Q", len(text)) + body)
+
+    def decode(self, raw: bytes) -> Payload:
+        _, _, kind, _ = _HEADER.unpack_from(raw)
+        body = memoryview(raw)[_HEADER.size:]
+        if kind == _KIND_DATAFRAME:
+            with pa.ipc.open_stream(pa.py_buffer(body)) as reader:
+                return reader.read_all().to_pandas()
+        (size,) = struct.unpack_from(">Q", body)
+        return pa.decompress(body[8:], decompressed_size=size, codec=self.compression,
+                             asbytes=True).decode('utf-8')
+
+
+_CODECS: Dict[str, PayloadCodec] = {"json": JsonCodec()}
+_CODECS_BY_ID: Dict[int, PayloadCodec] = {}
+
+
+def register_codec(codec: PayloadCodec):
+    """注册编解码器（codec_id 写入负载头部，已有 ID 不可复用）"""
+    _CODECS[codec.name] = codec
+    if codec.codec_id:
+        _CODECS_BY_ID[codec.codec_id] = codec
+
+
+if ARROW_AVAILABLE:
+    for _compression, _codec_id in (("zstd", 1), ("lz4", 2)):
+        if pa.Codec.is_available(_compression):
+            register_codec(ArrowCodec(_compression, _codec_id))
+
+
+def get_codec(name: Optional[str] = None) -> PayloadCodec:
+    """按名称获取编解码器，默认读取 TA_DB_CACHE_CODEC，不可用时回退到 json"""
+    name = (name or os.getenv("TA_DB_CACHE_CODEC", "arrow-zstd")).lower()
+    codec = _CODECS.get(name)
+    if codec is None:
+        logger.warning(f"⚠️ 缓存编解码器 {name} 不可用，回退到 json")
+        codec = _CODECS["json"]
+    return codec
+
+
+def encode_payload(data: Payload, codec: Optional[PayloadCodec] = None) -> Tuple[Union[bytes, str], str]:
+    """编码负载，返回 (数据, data_format)"""
+    codec = codec or get_codec()
+    if isinstance(codec, JsonCodec):
+        data_format = LEGACY_DATAFRAME_FORMAT if isinstance(data, pd.DataFrame) else LEGACY_TEXT_FORMAT
+        return codec.encode(data), data_format
+    return codec.encode(data), BINARY_FORMAT
+
+
+def is_binary_payload(raw) -> bool:
+    return isinstance(raw, (bytes, bytearray, memoryview)) and bytes(raw[:3]) == MAGIC
+
+
+def decode_payload(raw: Union[bytes, str], data_format: Optional[str] = None) -> Payload:
+    """解码负载：带头部的按头部中的编解码器解码，否则按旧 JSON 格式解析"""
+    if is_binary_payload(raw):
+        raw = bytes(raw)
+        _, version, _, codec_id = _HEADER.unpack_from(raw)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"不支持的缓存负载版本: {version}")
+        codec = _CODECS_BY_ID.get(codec_id)
+        if codec is None:
+            raise ValueError(f"未知的缓存编解码器ID: {codec_id}")
+        return codec.decode(raw)
+    return _CODECS["json"].decode(raw, data_format or LEGACY_DATAFRAME_FORMAT)
@@ -19,6 +19,8 @@ import pandas as pd
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .codecs import BINARY_FORMAT, FORMAT_VERSION, decode_payload, encode_payload, get_codec, is_binary_payload
+
 # MongoDB
 try:
     from pymongo import MongoClient
@@ -66,6 +68,9 @@ class DatabaseCacheManager:
         self.mongodb_db_name = mongodb_db
         self.redis_db = redis_db
 
+        # 股票数据负载编解码器（TA_DB_CACHE_CODEC: arrow-zstd / arrow-lz4 / json）
+        self.codec = get_codec()
+
         # 初始化连接
         self.mongodb_client = None
         self.mongodb_db = None
@@ -122,7 +127,7 @@ class DatabaseCacheManager:
                 db=self.redis_db,
                 socket_timeout=5,
                 socket_connect_timeout=5,
-                decode_responses=True
+                decode_responses=False  # 二进制负载不能按 UTF-8 解码
             )
             # 测试连接
             self.redis_client.ping()
@@ -226,13 +231,10 @@ class DatabaseCacheManager:
             "updated_at": datetime.now(ZoneInfo(get_timezone_name()))
         }
 
-        # 处理数据格式
-        if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
-            doc["data_format"] = "dataframe_json"
-        else:
-            doc["data"] = str(data)
-            doc["data_format"] = "text"
+        # 处理数据格式（二进制负载带版本头，旧 JSON 格式仍可读取）
+        doc["data"], doc["data_format"] = encode_payload(data, self.codec)
+        doc["codec"] = self.codec.name
+        doc["codec_version"] = FORMAT_VERSION
 
         # 保存到MongoDB（持久化）
         if self.mongodb_db is not None:
@@ -246,17 +248,10 @@ class DatabaseCacheManager:
         # 保存到Redis（快速缓存，6小时过期）
         if self.redis_client:
             try:
-                redis_data = {
-                    "data": doc["data"],
-                    "data_format": doc["data_format"],
-                    "symbol": symbol,
-                    "data_source": data_source,
-                    "created_at": doc["created_at"].isoformat()
-                }
                 self.redis_client.setex(
                     cache_key,
                     6 * 3600,  # 6小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
+                    self._redis_stock_payload(doc)
                 )
                 logger.info(f"⚡ 股票数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
@@ -264,6 +259,19 @@ class DatabaseCacheManager:
 
         return cache_key
 
+    @staticmethod
+    def _redis_stock_payload(doc: Dict[str, Any]) -> Union[bytes, str]:
+        """Redis 中的股票数据：二进制负载直接存储，旧格式仍包一层 JSON"""
+        if doc["data_format"] == BINARY_FORMAT:
+            return doc["data"]
+        return json.dumps({
+            "data": doc["data"],
+            "data_format": doc["data_format"],
+            "symbol": doc["symbol"],
+            "data_source": doc["data_source"],
+            "created_at": doc["created_at"].isoformat()
+        }, ensure_ascii=False)
+
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从Redis或MongoDB加载股票数据"""
 
@@ -272,13 +280,12 @@ class DatabaseCacheManager:
             try:
                 redis_data = self.redis_client.get(cache_key)
                 if redis_data:
-                    data_dict = json.loads(redis_data)
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
 
-                    if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
-                    else:
-                        return data_dict["data"]
+                    if is_binary_payload(redis_data):
+                        return decode_payload(redis_data)
+                    data_dict = json.loads(redis_data)
+                    return decode_payload(data_dict["data"], data_dict["data_format"])
             except Exception as e:
                 logger.error(f"⚠️ Redis加载失败: {e}")
 
@@ -294,26 +301,16 @@ class DatabaseCacheManager:
                     # 同时更新到Redis缓存
                     if self.redis_client:
                         try:
-                            redis_data = {
-                                "data": doc["data"],
-                                "data_format": doc["data_format"],
-                                "symbol": doc["symbol"],
-                                "data_source": doc["data_source"],
-                                "created_at": doc["created_at"].isoformat()
-                            }
                             self.redis_client.setex(
                                 cache_key,
                                 6 * 3600,
-                                json.dumps(redis_data, ensure_ascii=False)
+                                self._redis_stock_payload(doc)
                             )
                             logger.info(f"⚡ 数据已同步到Redis缓存")
                         except Exception as e:
                             logger.error(f"⚠️ Redis同步失败: {e}")
 
-                    if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
-                    else:
-                        return doc["data"]
+                    return decode_payload(doc["data"], doc["data_format"])
 
             except Exception as e:
                 logger.error(f"⚠️ MongoDB加载失败: {e}")
@@ -17,6 +17,15 @@ import hashlib
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from .cache_index import CacheIndex, INDEX_FILENAME, _normalize_date
+
+# Parquet 列式存储（可选依赖 pyarrow，不可用时回退到 CSV）
+try:
+    import pyarrow.parquet  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 
 class StockDataCache:
     """股票数据缓存管理器 - 支持美股和A股数据缓存优化"""
@@ -85,6 +94,13 @@ class StockDataCache:
             }
         }
 
+        # DataFrame 缓存格式：parquet（保留 dtype、支持列裁剪和内存映射读取）或 csv
+        default_format = 'parquet' if PARQUET_AVAILABLE else 'csv'
+        self.dataframe_format = os.getenv('TA_FILE_CACHE_FORMAT', default_format).lower()
+        if self.dataframe_format == 'parquet' and not PARQUET_AVAILABLE:
+            logger.warning("⚠️ 未安装 pyarrow，文件缓存回退到 CSV 格式")
+            self.dataframe_format = 'csv'
+
         # 内容长度限制配置（文件缓存默认不限制）
         self.content_length_config = {
             'max_content_length': int(os.getenv('MAX_CACHE_CONTENT_LENGTH', '50000')),  # 50K字符
@@ -92,6 +108,13 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # 元数据索引（SQLite），未命中时不再遍历整个 metadata 目录
+        try:
+            self.index = CacheIndex(self.cache_dir / INDEX_FILENAME, self.metadata_dir)
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存索引不可用，回退到目录扫描: {e}")
+            self.index = None
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -216,7 +239,57 @@ class StockDataCache:
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        if self.index is not None:
+            try:
+                self.index.upsert(cache_key, metadata)
+            except Exception as e:
+                logger.warning(f"⚠️ 更新缓存索引失败: {e}")
+
+    def _find_candidates(self, symbol: str, data_type: str, market_type: str,
+                         data_source: str = None, start_date: str = None,
+                         end_date: str = None, max_age_hours: int = None) -> List[str]:
+        """
+        查找候选缓存键：优先查索引，索引不可用时回退到扫描 metadata 目录
+
+        指定日期区间时只返回区间覆盖请求区间的缓存。
+        """
+        if self.index is not None:
+            try:
+                return self.index.find(symbol, data_type, market_type=market_type,
+                                       data_source=data_source, start_date=start_date,
+                                       end_date=end_date, max_age_hours=max_age_hours)
+            except Exception as e:
+                logger.warning(f"⚠️ 查询缓存索引失败，回退到目录扫描: {e}")
+
+        start, end = _normalize_date(start_date), _normalize_date(end_date)
+        candidates = []
+        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+
+                cached_start = _normalize_date(metadata.get('start_date'))
+                cached_end = _normalize_date(metadata.get('end_date'))
+                if (metadata.get('symbol') == symbol and
+                    metadata.get('data_type') == data_type and
+                    metadata.get('market_type') == market_type and
+                    (data_source is None or metadata.get('data_source') == data_source) and
+                    (start is None or (cached_start is not None and cached_start <= start)) and
+                    (end is None or (cached_end is not None and cached_end >= end))):
+                    candidates.append(metadata_file.stem.replace('_meta', ''))
+            except Exception:
+                continue
+        return candidates
     
+    def get_cached_at(self, cache_key: str) -> Optional[datetime]:
+        """缓存写入时间（元数据中的 cached_at），不存在时返回 None"""
+        metadata = self._load_metadata(cache_key)
+        try:
+            return datetime.fromisoformat(metadata['cached_at']) if metadata else None
+        except (KeyError, TypeError, ValueError):
+            return None
+
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
         metadata_path = self._get_metadata_path(cache_key)
@@ -302,10 +375,9 @@ class StockDataCache:
 
         # 保存数据
         if isinstance(data, pd.DataFrame):
-            cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
-            cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-            data.to_csv(cache_path, index=True)
+            cache_path, file_format = self._write_dataframe(data, cache_key, symbol)
         else:
+            file_format = 'txt'
             cache_path = self._get_cache_path("stock_data", cache_key, "txt", symbol)
             cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
             with open(cache_path, 'w', encoding='utf-8') as f:
@@ -320,7 +392,7 @@ class StockDataCache:
             'end_date': end_date,
             'data_source': data_source,
             'file_path': str(cache_path),
-            'file_format': 'csv' if isinstance(data, pd.DataFrame) else 'txt',
+            'file_format': file_format,
             'content_length': len(content_to_check)
         }
         self._save_metadata(cache_key, metadata)
@@ -331,8 +403,35 @@ class StockDataCache:
         logger.info(f"💾 {desc}已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
-    def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
-        """从缓存加载股票数据"""
+    def _write_dataframe(self, data: pd.DataFrame, cache_key: str, symbol: str):
+        """按配置格式写入 DataFrame，返回 (路径, 格式)；Parquet 写入失败时回退到 CSV"""
+        if self.dataframe_format == 'parquet':
+            cache_path = self._get_cache_path("stock_data", cache_key, "parquet", symbol)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+            try:
+                data.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=True)
+                return cache_path, 'parquet'
+            except Exception as e:
+                # 例如 object 列中混有无法转换为 Arrow 类型的值
+                logger.warning(f"⚠️ Parquet 写入失败，回退到 CSV: {e}")
+                if cache_path.exists():
+                    cache_path.unlink()
+
+        cache_path = self._get_cache_path("stock_data", cache_key, "csv", symbol)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        data.to_csv(cache_path, index=True)
+        return cache_path, 'csv'
+
+    def load_stock_data(self, cache_key: str, columns: List[str] = None,
+                        memory_map: bool = True) -> Optional[Union[pd.DataFrame, str]]:
+        """
+        从缓存加载股票数据
+
+        Args:
+            cache_key: 缓存键
+            columns: 只读取指定列（Parquet 格式下在读取时裁剪，不解码其他列）
+            memory_map: Parquet 格式下是否使用内存映射读取
+        """
         metadata = self._load_metadata(cache_key)
         if not metadata:
             return None
@@ -342,8 +441,12 @@ class StockDataCache:
             return None
         
         try:
-            if metadata['file_format'] == 'csv':
-                return pd.read_csv(cache_path, index_col=0)
+            if metadata['file_format'] == 'parquet':
+                return pd.read_parquet(cache_path, engine='pyarrow', columns=columns,
+                                       memory_map=memory_map)
+            elif metadata['file_format'] == 'csv':
+                df = pd.read_csv(cache_path, index_col=0)
+                return df[columns] if columns else df
             else:
                 with open(cache_path, 'r', encoding='utf-8') as f:
                     return f.read()
@@ -351,6 +454,59 @@ class StockDataCache:
             logger.error(f"⚠️ 加载缓存数据失败: {e}")
             return None
     
+    def migrate_csv_to_parquet(self, delete_csv: bool = True, dry_run: bool = False) -> Dict[str, int]:
+        """
+        把已有的 CSV 股票数据缓存转换为 Parquet
+
+        按旧的读取方式（read_csv(index_col=0)）加载后写成 Parquet，因此迁移前后
+        load_stock_data 返回的数据一致；元数据中的 cached_at 保持不变，不会延长 TTL。
+
+        Returns:
+            统计信息：scanned / migrated / failed / saved_bytes
+        """
+        stats = {'scanned': 0, 'migrated': 0, 'failed': 0, 'saved_bytes': 0}
+        if not PARQUET_AVAILABLE:
+            logger.error("❌ 未安装 pyarrow，无法迁移到 Parquet")
+            return stats
+
+        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                if metadata.get('data_type') != 'stock_data' or metadata.get('file_format') != 'csv':
+                    continue
+
+                stats['scanned'] += 1
+                csv_path = Path(metadata['file_path'])
+                if not csv_path.exists():
+                    continue
+                if dry_run:
+                    continue
+
+                parquet_path = csv_path.with_suffix('.parquet')
+                pd.read_csv(csv_path, index_col=0).to_parquet(
+                    parquet_path, engine='pyarrow', compression='zstd', index=True
+                )
+                stats['saved_bytes'] += csv_path.stat().st_size - parquet_path.stat().st_size
+
+                metadata['file_path'] = str(parquet_path)
+                metadata['file_format'] = 'parquet'
+                with open(metadata_file, 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, ensure_ascii=False, indent=2)
+                if self.index is not None:
+                    self.index.upsert(metadata_file.stem.replace('_meta', ''), metadata)
+
+                if delete_csv:
+                    csv_path.unlink()
+                stats['migrated'] += 1
+            except Exception as e:
+                stats['failed'] += 1
+                logger.warning(f"⚠️ 迁移缓存失败 {metadata_file.name}: {e}")
+
+        logger.info(f"📦 CSV→Parquet 迁移完成: 扫描 {stats['scanned']}, 迁移 {stats['migrated']}, "
+                    f"失败 {stats['failed']}, 节省 {stats['saved_bytes'] / (1024 * 1024):.2f}MB")
+        return stats
+
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
                               max_age_hours: int = None) -> Optional[str]:
@@ -387,24 +543,13 @@ class StockDataCache:
             logger.info(f"🎯 找到精确匹配的{desc}: {symbol} -> {search_key}")
             return search_key
 
-        # 如果没有精确匹配，查找部分匹配（相同股票代码的其他缓存）
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'stock_data' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
-                        desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
-                        logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        # 如果没有精确匹配，查找部分匹配（相同股票代码、日期区间覆盖请求区间的其他缓存）
+        for cache_key in self._find_candidates(symbol, 'stock_data', market_type, data_source,
+                                               start_date, end_date, max_age_hours):
+            if self.is_cache_valid(cache_key, max_age_hours, symbol, 'stock_data'):
+                desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
+                logger.info(f"📋 找到部分匹配的{desc}: {symbol} -> {cache_key}")
+                return cache_key
 
         desc = self.cache_config.get(f"{market_type}_stock_data", {}).get('description', '数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
@@ -529,23 +674,12 @@ class StockDataCache:
             max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
         
         # 查找匹配的缓存
-        for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if (metadata.get('symbol') == symbol and
-                    metadata.get('data_type') == 'fundamentals' and
-                    metadata.get('market_type') == market_type and
-                    (data_source is None or metadata.get('data_source') == data_source)):
-                    
-                    cache_key = metadata_file.stem.replace('_meta', '')
-                    if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
-                        desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
-                        logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
-                        return cache_key
-            except Exception:
-                continue
+        for cache_key in self._find_candidates(symbol, 'fundamentals', market_type, data_source,
+                                               max_age_hours=max_age_hours):
+            if self.is_cache_valid(cache_key, max_age_hours, symbol, 'fundamentals'):
+                desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
+                logger.info(f"🎯 找到匹配的{desc}缓存: {symbol} ({data_source}) -> {cache_key}")
+                return cache_key
         
         desc = self.cache_config.get(f"{market_type}_fundamentals", {}).get('description', '基本面数据')
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
@@ -570,6 +704,8 @@ class StockDataCache:
                     
                     # 删除元数据文件
                     metadata_file.unlink()
+                    if self.index is not None:
+                        self.index.remove(metadata_file.stem.replace('_meta', ''))
                     cleared_count += 1
                     
             except Exception as e:
@@ -7,8 +7,10 @@
 
 import os
 import logging
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 import pandas as pd
 
 # 导入统一日志系统
@@ -16,6 +18,7 @@ from tradingagents.utils.logging_init import setup_dataflow_logging
 
 # 导入原有缓存系统
 from .file_cache import StockDataCache
+from .l1_cache import L1Cache
 
 # 导入自适应缓存系统
 try:
@@ -35,6 +38,11 @@ class IntegratedCacheManager:
         
         # 初始化原有缓存系统（作为备用）
         self.legacy_cache = StockDataCache(cache_dir)
+
+        # 进程内 L1 缓存（TA_L1_CACHE_MAX_MB=0 关闭），TTL 沿用 legacy_cache.cache_config
+        l1_max_mb = float(os.getenv("TA_L1_CACHE_MAX_MB", "256"))
+        self.l1_cache = L1Cache(max_bytes=int(l1_max_mb * 1024 * 1024))
+        self._key_symbols: "OrderedDict[str, str]" = OrderedDict()
         
         # 尝试初始化自适应缓存系统
         self.adaptive_cache = None
@@ -70,6 +78,78 @@ class IntegratedCacheManager:
         else:
             self.logger.info("📁 使用传统文件缓存系统")
     
+    # --- L1 缓存 ---
+
+    _MAX_TRACKED_KEYS = 10000
+
+    def _remember_key(self, cache_key: Optional[str], symbol: str):
+        """记录缓存键对应的股票代码，用于确定 L1 TTL 和按股票失效"""
+        if not cache_key:
+            return
+        self._key_symbols[cache_key] = symbol
+        self._key_symbols.move_to_end(cache_key)
+        while len(self._key_symbols) > self._MAX_TRACKED_KEYS:
+            self._key_symbols.popitem(last=False)
+
+    def _l1_ttl_seconds(self, data_type: str, symbol: Optional[str]) -> float:
+        """按数据类型和市场取 cache_config 中的 TTL；未知市场时取该类型的最短 TTL"""
+        cache_config = self.legacy_cache.cache_config
+        if symbol:
+            market_type = self.legacy_cache._determine_market_type(symbol)
+            ttl_hours = cache_config.get(f"{market_type}_{data_type}", {}).get('ttl_hours')
+            if ttl_hours is not None:
+                return ttl_hours * 3600
+        candidates = [cfg['ttl_hours'] for name, cfg in cache_config.items() if name.endswith(f"_{data_type}")]
+        return min(candidates, default=1) * 3600
+
+    def _l1_put(self, cache_key: Optional[str], data: Any, data_type: str, symbol: Optional[str] = None,
+                cached_at: Optional[datetime] = None):
+        if cache_key is None or data is None:
+            return
+        symbol = symbol or self._key_symbols.get(cache_key)
+        # 从下层加载的数据按下层写入时间过期，不在 L1 中额外延长一个 TTL
+        age = (datetime.now(cached_at.tzinfo) - cached_at).total_seconds() if cached_at else 0.0
+        self.l1_cache.put(cache_key, data, self._l1_ttl_seconds(data_type, symbol), data_type, symbol, age)
+
+    def _load_through_l1(self, cache_key: str, data_type: str, loader) -> Optional[Any]:
+        """loader(cache_key) -> (数据, 下层写入时间)"""
+        data = self.l1_cache.get(cache_key)
+        if data is not None:
+            return data
+        data, cached_at = loader(cache_key)
+        self._l1_put(cache_key, data, data_type, cached_at=cached_at)
+        return data
+
+    def _adaptive_loader(self, cache_key: str) -> Tuple[Optional[Any], Optional[datetime]]:
+        entry = self.adaptive_cache.load_entry(cache_key)
+        if not entry:
+            return None, None
+        timestamp = entry.get('timestamp')
+        return entry['data'], timestamp if isinstance(timestamp, datetime) else None
+
+    def _legacy_loader(self, load: Callable[[str], Any]):
+        def loader(cache_key: str):
+            data = load(cache_key)
+            return data, self.legacy_cache.get_cached_at(cache_key) if data is not None else None
+        return loader
+
+    def invalidate(self, cache_key: str = None, symbol: str = None, data_type: str = None) -> int:
+        """
+        使 L1 缓存失效（不影响 Redis/MongoDB/文件缓存）
+
+        Args:
+            cache_key: 指定缓存键
+            symbol: 指定股票代码的全部缓存
+            data_type: 指定数据类型（stock_data / news / fundamentals）
+        """
+        if cache_key is not None:
+            return int(self.l1_cache.invalidate(cache_key))
+        if symbol is None and data_type is None:
+            count = self.l1_cache.stats()['entries']
+            self.l1_cache.clear()
+            return count
+        return self.l1_cache.invalidate_where(symbol=symbol, data_type=data_type)
+
     def save_stock_data(self, symbol: str, data: Any, start_date: str = None, 
                        end_date: str = None, data_source: str = "default") -> str:
         """
@@ -87,7 +167,7 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date or "",
@@ -97,13 +177,19 @@ class IntegratedCacheManager:
             )
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.save_stock_data(
+            cache_key = self.legacy_cache.save_stock_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date,
                 end_date=end_date,
                 data_source=data_source
             )
+
+        # 写穿 L1：同一键的旧值被替换
+        self._remember_key(cache_key, symbol)
+        self.l1_cache.invalidate(cache_key)
+        self._l1_put(cache_key, data, "stock_data", symbol)
+        return cache_key
     
     def load_stock_data(self, cache_key: str) -> Optional[Any]:
         """
@@ -117,10 +203,11 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.load_data(cache_key)
+            loader = self._adaptive_loader
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.load_stock_data(cache_key)
+            loader = self._legacy_loader(self.legacy_cache.load_stock_data)
+        return self._load_through_l1(cache_key, "stock_data", loader)
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None, 
                               end_date: str = None, data_source: str = "default") -> Optional[str]:
@@ -137,60 +224,71 @@ class IntegratedCacheManager:
             缓存键或None
         """
         if self.use_adaptive:
-            # 使用自适应缓存系统
-            return self.adaptive_cache.find_cached_data(
-                symbol=symbol,
-                start_date=start_date or "",
-                end_date=end_date or "",
-                data_source=data_source,
-                data_type="stock_data"
+            # 自适应缓存的查找需要加载数据本身，这里经过 L1，随后的 load_stock_data 直接命中
+            cache_key = self.adaptive_cache._get_cache_key(
+                symbol, start_date or "", end_date or "", data_source, "stock_data"
             )
+            self._remember_key(cache_key, symbol)
+            data = self._load_through_l1(cache_key, "stock_data", self._adaptive_loader)
+            return cache_key if data is not None else None
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.find_cached_stock_data(
+            cache_key = self.legacy_cache.find_cached_stock_data(
                 symbol=symbol,
                 start_date=start_date,
                 end_date=end_date,
                 data_source=data_source
             )
+            self._remember_key(cache_key, symbol)
+            return cache_key
     
     def save_news_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="news_data"
             )
         else:
-            return self.legacy_cache.save_news_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_news_data(symbol, data, data_source)
+        self._remember_key(cache_key, symbol)
+        self.l1_cache.invalidate(cache_key)
+        self._l1_put(cache_key, data, "news", symbol)
+        return cache_key
     
     def load_news_data(self, cache_key: str) -> Optional[Any]:
         """加载新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
+            loader = self._adaptive_loader
         else:
-            return self.legacy_cache.load_news_data(cache_key)
+            loader = self._legacy_loader(self.legacy_cache.load_news_data)
+        return self._load_through_l1(cache_key, "news", loader)
     
     def save_fundamentals_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="fundamentals_data"
             )
         else:
-            return self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+        self._remember_key(cache_key, symbol)
+        self.l1_cache.invalidate(cache_key)
+        self._l1_put(cache_key, data, "fundamentals", symbol)
+        return cache_key
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[Any]:
         """加载基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
+            loader = self._adaptive_loader
         else:
-            return self.legacy_cache.load_fundamentals_data(cache_key)
+            loader = self._legacy_loader(self.legacy_cache.load_fundamentals_data)
+        return self._load_through_l1(cache_key, "fundamentals", loader)
 
     def find_cached_fundamentals_data(self, symbol: str, data_source: str = None,
                                      max_age_hours: int = None) -> Optional[str]:
@@ -205,11 +303,10 @@ class IntegratedCacheManager:
         Returns:
             cache_key: 如果找到有效缓存则返回缓存键，否则返回None
         """
-        if self.use_adaptive:
-            # 自适应缓存暂不支持查找功能，降级到文件缓存
-            return self.legacy_cache.find_cached_fundamentals_data(symbol, data_source, max_age_hours)
-        else:
-            return self.legacy_cache.find_cached_fundamentals_data(symbol, data_source, max_age_hours)
+        # 自适应缓存暂不支持查找功能，降级到文件缓存
+        cache_key = self.legacy_cache.find_cached_fundamentals_data(symbol, data_source, max_age_hours)
+        self._remember_key(cache_key, symbol)
+        return cache_key
 
     def is_fundamentals_cache_valid(self, symbol: str, data_source: str = None,
                                    max_age_hours: int = None) -> bool:
@@ -243,6 +340,7 @@ class IntegratedCacheManager:
             stats['backend_info']['database_available'] = self.db_manager.is_database_available()
             stats['backend_info']['mongodb_available'] = self.db_manager.is_mongodb_available()
             stats['backend_info']['redis_available'] = self.db_manager.is_redis_available()
+            stats['l1_cache'] = self.l1_cache.stats()
 
             return stats
         else:
@@ -259,11 +357,13 @@ class IntegratedCacheManager:
             stats['backend_info']['database_available'] = False
             stats['backend_info']['mongodb_available'] = False
             stats['backend_info']['redis_available'] = False
+            stats['l1_cache'] = self.l1_cache.stats()
 
             return stats
     
     def clear_expired_cache(self):
         """清理过期缓存"""
+        self.l1_cache.purge_expired()
         if self.use_adaptive:
             self.adaptive_cache.clear_expired_cache()
 
@@ -282,6 +382,9 @@ class IntegratedCacheManager:
         """
         cleared_count = 0
 
+        # 0. 下层缓存即将被清理，L1 中的副本全部失效
+        self.l1_cache.clear()
+
         # 1. 清理 Redis 缓存
         if self.use_adaptive and self.db_manager.is_redis_available():
             try:
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+K线分桶存储布局
+
+stock_daily_quotes 每根K线一个文档，读取多年数据要逐条解码成字典再重建 DataFrame。
+分桶布局把同一股票、数据源、周期、年份的K线合并为一个文档（stock_daily_quotes_buckets）：
+
+- 日期列：int32 小端 YYYYMMDD，二进制存储
+- 数值列：float64 小端，缺失值为 NaN，二进制存储
+- 元信息：symbol/data_source/period/year/count/first_date/last_date，可被索引和查询
+
+读取时每年一个文档，np.frombuffer 直接得到列数组，不为每根K线分配字典。
+写入时按桶读取旧数据、合并（同一交易日新数据覆盖旧数据）后整桶替换。
+
+分桶由双写逐步产生，启用后第一次增量同步只会写出当年的桶。读取方只在
+(股票, 数据源, 周期) 已由 rebuild_buckets 从逐条布局完整回填（stock_daily_quotes_bucket_backfill
+中有回填标记）时使用分桶，否则退回逐条布局；分桶写入失败时删除对应标记。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BUCKET_COLLECTION = "stock_daily_quotes_buckets"
+# 回填标记：(股票, 数据源, 周期) 的分桶已包含逐条布局中的全部历史
+BACKFILL_COLLECTION = "stock_daily_quotes_bucket_backfill"
+LAYOUT_VERSION = 1
+
+# 分桶保存的数值列（与 HistoricalDataService 标准化后的字段一致）
+VALUE_COLUMNS = (
+    "open", "high", "low", "close", "pre_close", "volume", "amount", "change", "pct_chg",
+    "turnover_rate", "volume_ratio", "pe", "pb", "ps",
+)
+
+# 未指定数据源时的选择顺序
+DEFAULT_SOURCE_PRIORITY = ("tushare", "akshare", "baostock")
+
+
+def bucket_layout_enabled() -> bool:
+    """是否启用分桶布局（ENV: HISTORICAL_BUCKET_LAYOUT_ENABLED）"""
+    from tradingagents.config.runtime_settings import get_bool
+    return get_bool("HISTORICAL_BUCKET_LAYOUT_ENABLED", None, False)
+
+
+def bucket_key(symbol: str, data_source: str, period: str, year: int) -> str:
+    return f"{symbol}:{data_source}:{period}:{year}"
+
+
+def backfill_key(symbol: str, data_source: str, period: str) -> str:
+    return f"{symbol}:{data_source}:{period}"
+
+
+def backfill_keys(docs: Iterable[Dict[str, Any]]) -> List[str]:
+    """K线文档涉及的回填标记键"""
+    return sorted({backfill_key(d["symbol"], d["data_source"], d["period"]) for d in docs})
+
+
+def _date_int(value: str) -> Optional[int]:
+    """YYYY-MM-DD / YYYYMMDD -> int YYYYMMDD，格式不符返回 None"""
+    digits = str(value).replace("-", "")
+    if len(digits) != 8 or not digits.isdigit():
+        return None
+    return int(digits)
+
+
+def _format_date_int(value: int) -> str:
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def _to_datetime64(dates: np.ndarray) -> np.ndarray:
+    """int YYYYMMDD 数组 -> datetime64[D] 数组（整数运算，不经过字符串解析）"""
+    years = (dates // 10000 - 1970).astype("datetime64[Y]")
+    months = (years.astype("datetime64[M]") + (dates // 100 % 100 - 1).astype("timedelta64[M]"))
+    return months.astype("datetime64[D]") + (dates % 100 - 1).astype("timedelta64[D]")
+
+
+def _encode(values: np.ndarray, dtype: str) -> bytes:
+    # bytes 由驱动编码为 BSON 二进制（subtype 0），读取时原样返回 bytes
+    return np.ascontiguousarray(values, dtype=dtype).tobytes()
+
+
+def _decode(raw, dtype: str) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype=dtype)
+
+
+def decode_bucket(bucket: Dict[str, Any]):
+    """解码单个桶，返回 (日期 int32 数组, {列名: float64 数组})"""
+    dates = _decode(bucket["dates"], "<i4")
+    values = bucket.get("values") or {}
+    return dates, {col: _decode(values[col], "<f8") for col in values}
+
+
+def build_buckets(
+    docs: Iterable[Dict[str, Any]],
+    existing: Optional[Dict[str, Dict[str, Any]]] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    把标准化后的K线文档合并进分桶
+
+    Args:
+        docs: HistoricalDataService 标准化后的逐条K线文档
+        existing: 已有的桶（_id -> 桶文档），同一交易日以新数据为准
+        now: 更新时间
+
+    Returns:
+        需要整桶替换写入的桶文档列表
+    """
+    existing = existing or {}
+    now = now or datetime.utcnow()
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    meta: Dict[str, Dict[str, Any]] = {}
+    for doc in docs:
+        date = _date_int(doc.get("trade_date", ""))
+        if date is None:
+            continue
+        key = bucket_key(doc["symbol"], doc["data_source"], doc["period"], date // 10000)
+        groups.setdefault(key, []).append(doc)
+        meta.setdefault(key, doc)
+
+    buckets = []
+    for key, rows in groups.items():
+        dates = np.array([_date_int(r["trade_date"]) for r in rows], dtype=np.int32)
+        columns = {
+            col: np.array([np.nan if r.get(col) is None else r[col] for r in rows], dtype=np.float64)
+            for col in VALUE_COLUMNS
+        }
+
+        old = existing.get(key)
+        if old is not None:
+            old_dates, old_columns = decode_bucket(old)
+            dates = np.concatenate([old_dates, dates])
+            for col in VALUE_COLUMNS:
+                old_values = old_columns.get(col, np.full(len(old_dates), np.nan))
+                columns[col] = np.concatenate([old_values, columns[col]])
+
+        # 同一交易日保留最后出现的（新数据），并按日期升序
+        reversed_dates = dates[::-1]
+        _, first_in_reversed = np.unique(reversed_dates, return_index=True)
+        keep = len(dates) - 1 - first_in_reversed
+        dates = dates[keep]
+
+        present = [col for col in VALUE_COLUMNS if not np.isnan(columns[col][keep]).all()]
+        first = meta[key]
+        buckets.append({
+            "_id": key,
+            "symbol": first["symbol"],
+            "code": first.get("code", first["symbol"]),
+            "full_symbol": first.get("full_symbol"),
+            "market": first.get("market"),
+            "data_source": first["data_source"],
+            "period": first["period"],
+            "year": int(dates[0] // 10000),
+            "layout_version": LAYOUT_VERSION,
+            "count": int(len(dates)),
+            "first_date": _format_date_int(int(dates[0])),
+            "last_date": _format_date_int(int(dates[-1])),
+            "dates": _encode(dates, "<i4"),
+            "values": {col: _encode(columns[col][keep], "<f8") for col in present},
+            "updated_at": now,
+        })
+    return buckets
+
+
+def bucket_query(
+    symbol: str,
+    period: str = "daily",
+    data_source: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> Dict[str, Any]:
+    """按年份范围查询桶的条件"""
+    query: Dict[str, Any] = {"symbol": symbol, "period": period}
+    if data_source:
+        query["data_source"] = data_source
+    years = {}
+    if start_date and _date_int(start_date):
+        years["$gte"] = _date_int(start_date) // 10000
+    if end_date and _date_int(end_date):
+        years["$lte"] = _date_int(end_date) // 10000
+    if years:
+        query["year"] = years
+    return query
+
+
+def pick_source(buckets: Sequence[Dict[str, Any]], priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY) -> Optional[str]:
+    """多个数据源都有桶时按优先级选择一个"""
+    sources = {b["data_source"] for b in buckets}
+    for source in priority:
+        if source in sources:
+            return source
+    return min(sources) if sources else None
+
+
+def select_buckets(
+    buckets: Sequence[Dict[str, Any]],
+    backfilled: Iterable[str],
+    priority: Sequence[str] = DEFAULT_SOURCE_PRIORITY,
+) -> List[Dict[str, Any]]:
+    """
+    按优先级选择一个数据源的桶；该数据源尚未回填时返回空列表（调用方退回逐条布局）
+
+    Args:
+        buckets: 同一股票/周期的桶
+        backfilled: 已完成回填的标记键（backfill_key）
+    """
+    source = pick_source(buckets, priority)
+    if source is None:
+        return []
+    selected = [b for b in buckets if b["data_source"] == source]
+    if backfill_key(selected[0]["symbol"], source, selected[0]["period"]) not in set(backfilled):
+        return []
+    return selected
+
+
+def buckets_to_columns(
+    buckets: Iterable[Dict[str, Any]],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    拼接多个桶（同一股票/数据源/周期）为列数组
+
+    Returns:
+        {"trade_date": datetime64[D] 数组, 列名: float64 数组}，按日期升序
+    """
+    wanted = list(columns) if columns else list(VALUE_COLUMNS)
+    date_parts, value_parts = [], {col: [] for col in wanted}
+    for bucket in sorted(buckets, key=lambda b: b["year"]):
+        dates, values = decode_bucket(bucket)
+        date_parts.append(dates)
+        for col in wanted:
+            value_parts[col].append(values.get(col, np.full(len(dates), np.nan)))
+
+    if not date_parts:
+        return {"trade_date": np.array([], dtype="datetime64[D]"), **{col: np.array([], dtype=np.float64) for col in wanted}}
+
+    dates = np.concatenate(date_parts)
+    mask = np.ones(len(dates), dtype=bool)
+    if start_date and _date_int(start_date):
+        mask &= dates >= _date_int(start_date)
+    if end_date and _date_int(end_date):
+        mask &= dates <= _date_int(end_date)
+
+    dates = dates[mask]
+    result = {"trade_date": _to_datetime64(dates)}
+    for col in wanted:
+        result[col] = np.concatenate(value_parts[col])[mask]
+    return result
+
+
+def buckets_to_frame(
+    buckets: Sequence[Dict[str, Any]],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    拼接桶为 DataFrame，列与逐条布局查询结果一致（trade_date 为 YYYY-MM-DD 字符串，按日期升序）
+    """
+    data = buckets_to_columns(buckets, start_date, end_date, columns)
+    frame = pd.DataFrame({col: values for col, values in data.items() if col != "trade_date"})
+    frame.insert(0, "trade_date", np.datetime_as_string(data["trade_date"], unit="D").astype(object))
+    if buckets:
+        first = buckets[0]
+        for pos, field in enumerate(("symbol", "code", "full_symbol", "market", "data_source", "period")):
+            frame.insert(pos, field, first.get(field))
+    return frame
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+进程内 L1 缓存
+
+放在 IntegratedCacheManager 前面的一层内存缓存：同一次分析中多个分析师
+先后读取同一只股票的数据时，不必每次都访问 Redis/MongoDB/磁盘。
+
+- 按字节数限制总大小，超出时按 LRU 淘汰
+- 每条记录有自己的过期时间（由调用方按数据类型传入 TTL）；从下层缓存加载的记录
+  按下层的写入时间计算过期，不会因进入 L1 而延长
+- DataFrame 读写时复制，调用方原地修改不会污染缓存
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+    data_type: str
+    symbol: Optional[str]
+
+
+def estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return sys.getsizeof(value)
+
+
+def _copy(value: Any) -> Any:
+    return value.copy() if isinstance(value, pd.DataFrame) else value
+
+
+class L1Cache:
+    """按字节限制大小的线程安全 LRU 缓存"""
+
+    def __init__(self, max_bytes: int, clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = int(max_bytes)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry.value
+        return _copy(value)
+
+    def put(self, key: str, value: Any, ttl_seconds: float, data_type: str = "stock_data",
+            symbol: Optional[str] = None, age_seconds: float = 0.0) -> bool:
+        """
+        写入一条记录；单条超过容量上限或剩余 TTL 非正时不缓存
+
+        Args:
+            age_seconds: 记录在下层缓存中已存在的时间，过期时间为 min(现在 + TTL, 写入时间 + TTL)
+        """
+        ttl_seconds -= max(0.0, age_seconds)
+        if not self.enabled or value is None or ttl_seconds <= 0:
+            return False
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        entry = _Entry(_copy(value), size, self._clock() + ttl_seconds, data_type, symbol)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._drop(key)
+            self.invalidations += 1
+            return True
+
+    def invalidate_where(self, symbol: Optional[str] = None, data_type: Optional[str] = None) -> int:
+        """按股票代码和/或数据类型批量失效"""
+        with self._lock:
+            keys = [
+                k for k, e in self._entries.items()
+                if (symbol is None or e.symbol == symbol) and (data_type is None or e.data_type == data_type)
+            ]
+            for k in keys:
+                self._drop(k)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def purge_expired(self) -> int:
+        now = self._clock()
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e.expires_at <= now]
+            for k in keys:
+                self._drop(k)
+            self.expirations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
@@ -14,6 +14,14 @@ logger = get_logger('agents')
 
 # 导入配置
 from tradingagents.config.runtime_settings import use_app_cache_enabled
+from tradingagents.dataflows.cache.kline_buckets import (
+    BACKFILL_COLLECTION,
+    BUCKET_COLLECTION,
+    bucket_layout_enabled,
+    bucket_query,
+    buckets_to_frame,
+    select_buckets,
+)
 
 class MongoDBCacheAdapter:
     """MongoDB 缓存适配器（从 app 的 MongoDB 读取同步数据）"""
@@ -22,6 +30,7 @@ class MongoDBCacheAdapter:
         self.use_app_cache = use_app_cache_enabled(False)
         self.mongodb_client = None
         self.db = None
+        self.bucket_layout = bucket_layout_enabled()
         
         if self.use_app_cache:
             self._init_mongodb_connection()
@@ -181,6 +190,13 @@ class MongoDBCacheAdapter:
             # 获取数据源优先级
             priority_order = self._get_data_source_priority(symbol)
 
+            # 分桶布局：一次查询取回所有数据源的年度桶，按优先级选择后列式解码
+            if self.bucket_layout:
+                df = self._get_bucketed_history(code6, start_date, end_date, period, priority_order)
+                if df is not None:
+                    logger.info(f"✅ [数据来源: MongoDB分桶-{df['data_source'].iloc[0]}] {symbol}, {len(df)}条记录 (period={period})")
+                    return df
+
             # 按优先级查询
             for data_source in priority_order:
                 # 构建查询条件
@@ -218,6 +234,28 @@ class MongoDBCacheAdapter:
             logger.warning(f"⚠️ 获取历史数据失败: {e}")
             return None
     
+    def _get_bucketed_history(self, code6: str, start_date: Optional[str], end_date: Optional[str],
+                              period: str, priority_order: List[str]) -> Optional[pd.DataFrame]:
+        """
+        从按年分桶的集合读取历史数据
+
+        没有分桶数据、或所选数据源尚未由 rebuild_buckets 完整回填时返回 None（调用方退回逐条查询）
+        """
+        try:
+            query = bucket_query(code6, period, None, start_date, end_date)
+            buckets = list(self.db[BUCKET_COLLECTION].find(query))
+            if not buckets:
+                return None
+            markers = self.db[BACKFILL_COLLECTION].find({"symbol": code6, "period": period}, {"_id": 1})
+            selected = select_buckets(buckets, [m["_id"] for m in markers], priority_order)
+            if not selected:
+                return None
+            df = buckets_to_frame(selected, start_date, end_date)
+            return df if not df.empty else None
+        except Exception as e:
+            logger.debug(f"⚠️ [MongoDB分桶] 查询失败，改用逐条数据: {e}")
+            return None
+
     def get_financial_data(self, symbol: str, report_period: str = None) -> Optional[Dict[str, Any]]:
         """获取财务数据，按数据源优先级查询"""
         if not self.use_app_cache or self.db is None:
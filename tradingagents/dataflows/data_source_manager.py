@@ -10,7 +10,6 @@ from typing import Dict, List, Optional, Any
 from enum import Enum
 import warnings
 import pandas as pd
-import numpy as np
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -23,6 +22,8 @@ logger = setup_dataflow_logging()
 
 # 导入统一数据源编码
 from tradingagents.constants import DataSourceCode
+from .source_config_snapshot import get_source_config_snapshot
+from .source_hedging import get_source_hedger
 
 
 class ChinaDataSource(Enum):
@@ -57,8 +58,17 @@ class USDataSource(Enum):
 class DataSourceManager:
     """数据源管理器"""
 
+    # 各类数据支持的数据源，对冲请求 / 降级时只在其中选择
+    STOCK_DATA_SOURCES = (ChinaDataSource.MONGODB, ChinaDataSource.TUSHARE,
+                          ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK)
+    FUNDAMENTALS_SOURCES = (ChinaDataSource.MONGODB, ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE)
+    NEWS_SOURCES = (ChinaDataSource.MONGODB, ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE)
+
     def __init__(self):
         """初始化数据源管理器"""
+        # 对冲请求与各数据源耗时 / 错误率统计（进程内共享）
+        self.hedger = get_source_hedger()
+
         # 检查是否启用MongoDB缓存
         self.use_mongodb_cache = self._check_mongodb_enabled()
 
@@ -101,64 +111,29 @@ class DataSourceManager:
         # 🔥 识别市场类型
         market_category = self._identify_market_category(symbol)
 
-        try:
-            # 🔥 从数据库读取数据源配置（使用同步客户端）
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 🔥 过滤出启用的数据源，并按市场分类过滤
-                enabled_sources = []
-                for ds in data_source_configs:
-                    if not ds.get('enabled', True):
-                        continue
-
-                    # 检查数据源是否属于当前市场分类
-                    market_categories = ds.get('market_categories', [])
-                    if market_categories and market_category:
-                        # 如果数据源配置了市场分类，只选择匹配的数据源
-                        if market_category not in market_categories:
-                            continue
-
-                    enabled_sources.append(ds)
-
-                # 按优先级排序（数字越大优先级越高）
-                enabled_sources.sort(key=lambda x: x.get('priority', 0), reverse=True)
+        # 🔥 从进程内共享的配置快照读取（按版本号刷新，热路径不访问数据库）
+        snapshot = get_source_config_snapshot()
+        if snapshot.has_config:
+            # 转换为 ChinaDataSource 枚举（使用统一编码）
+            source_mapping = {
+                DataSourceCode.TUSHARE: ChinaDataSource.TUSHARE,
+                DataSourceCode.AKSHARE: ChinaDataSource.AKSHARE,
+                DataSourceCode.BAOSTOCK: ChinaDataSource.BAOSTOCK,
+            }
 
-                # 转换为 ChinaDataSource 枚举（使用统一编码）
-                source_mapping = {
-                    DataSourceCode.TUSHARE: ChinaDataSource.TUSHARE,
-                    DataSourceCode.AKSHARE: ChinaDataSource.AKSHARE,
-                    DataSourceCode.BAOSTOCK: ChinaDataSource.BAOSTOCK,
-                }
+            result = []
+            for ds_type in snapshot.priority_types(market_category):
+                source = source_mapping.get(ds_type)
+                # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
+                if source is not None and source in self.available_sources:
+                    result.append(source)
 
-                result = []
-                for ds in enabled_sources:
-                    ds_type = ds.get('type', '').lower()
-                    if ds_type in source_mapping:
-                        source = source_mapping[ds_type]
-                        # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
-                        if source != ChinaDataSource.MONGODB and source in self.available_sources:
-                            result.append(source)
-
-                if result:
-                    logger.info(f"✅ [数据源优先级] 市场={market_category or '全部'}, 从数据库读取: {[s.value for s in result]}")
-                    return result
-                else:
-                    logger.warning(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
-            else:
-                logger.warning("⚠️ [数据源优先级] 数据库中没有数据源配置，使用默认顺序")
-        except Exception as e:
-            logger.warning(f"⚠️ [数据源优先级] 从数据库读取失败: {e}，使用默认顺序")
+            if result:
+                logger.debug(f"✅ [数据源优先级] 市场={market_category or '全部'}, 配置快照: {[s.value for s in result]}")
+                return result
+            logger.debug(f"⚠️ [数据源优先级] 市场={market_category or '全部'}, 数据库配置中没有可用的数据源，使用默认顺序")
+        elif snapshot.available:
+            logger.debug("⚠️ [数据源优先级] 数据库中没有数据源配置，使用默认顺序")
 
         # 🔥 回退到默认顺序（兼容性）
         # 默认顺序：AKShare > Tushare > BaoStock
@@ -267,39 +242,35 @@ class DataSourceManager:
         start_time = time.time()
 
         try:
-            # 根据数据源调用相应的获取方法
-            if self.current_source == ChinaDataSource.MONGODB:
-                result = self._get_mongodb_fundamentals(symbol)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                result = self._get_tushare_fundamentals(symbol)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_fundamentals(symbol)
-            else:
-                # 其他数据源暂不支持基本面数据，生成基本分析
-                result = self._generate_fundamentals_analysis(symbol)
-
-            # 检查结果
+            # 当前数据源优先，慢或失败时并行 / 依次请求备用数据源
+            result, source, _ = self.hedger.fetch(
+                "fundamentals",
+                self._hedge_sources("fundamentals", symbol, self.FUNDAMENTALS_SOURCES),
+                lambda s: self._fetch_fundamentals_from(s, symbol),
+                self._is_valid_fundamentals,
+            )
             duration = time.time() - start_time
-            result_length = len(result) if result else 0
 
-            if result and "❌" not in result:
-                logger.info(f"✅ [数据来源: {self.current_source.value}] 成功获取基本面数据: {symbol} ({result_length}字符, 耗时{duration:.2f}秒)",
+            if source is not None:
+                logger.info(f"✅ [数据来源: {source.value}] 成功获取基本面数据: {symbol} ({len(result)}字符, 耗时{duration:.2f}秒)",
                            extra={
                                'symbol': symbol,
-                               'data_source': self.current_source.value,
+                               'data_source': source.value,
+                               'requested_source': self.current_source.value,
                                'duration': duration,
-                               'result_length': result_length,
+                               'result_length': len(result),
                                'event_type': 'fundamentals_fetch_success'
                            })
                 return result
-            else:
-                logger.warning(f"⚠️ [数据来源: {self.current_source.value}失败] 基本面数据质量异常，尝试降级: {symbol}",
-                              extra={
-                                  'symbol': symbol,
-                                  'data_source': self.current_source.value,
-                                  'event_type': 'fundamentals_fetch_fallback'
-                              })
-                return self._try_fallback_fundamentals(symbol)
+
+            # 所有数据源都失败，生成基本分析
+            logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}",
+                          extra={
+                              'symbol': symbol,
+                              'data_source': self.current_source.value,
+                              'event_type': 'fundamentals_fetch_fallback'
+                          })
+            return self._generate_fundamentals_analysis(symbol)
 
         except Exception as e:
             duration = time.time() - start_time
@@ -351,41 +322,35 @@ class DataSourceManager:
         start_time = time.time()
 
         try:
-            # 根据数据源调用相应的获取方法
-            if self.current_source == ChinaDataSource.MONGODB:
-                result = self._get_mongodb_news(symbol, hours_back, limit)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                result = self._get_tushare_news(symbol, hours_back, limit)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_news(symbol, hours_back, limit)
-            else:
-                # 其他数据源暂不支持新闻数据
-                logger.warning(f"⚠️ 数据源 {self.current_source.value} 不支持新闻数据")
-                result = []
-
-            # 检查结果
+            # 当前数据源优先，慢或失败时并行 / 依次请求备用数据源
+            result, source, _ = self.hedger.fetch(
+                "news",
+                self._hedge_sources("news", symbol, self.NEWS_SOURCES),
+                lambda s: self._fetch_news_from(s, symbol, hours_back, limit),
+                self._is_valid_news,
+            )
             duration = time.time() - start_time
-            result_count = len(result) if result else 0
 
-            if result and result_count > 0:
-                logger.info(f"✅ [数据来源: {self.current_source.value}] 成功获取新闻数据: {symbol or '市场新闻'} ({result_count}条, 耗时{duration:.2f}秒)",
+            if source is not None:
+                logger.info(f"✅ [数据来源: {source.value}] 成功获取新闻数据: {symbol or '市场新闻'} ({len(result)}条, 耗时{duration:.2f}秒)",
                            extra={
                                'symbol': symbol,
-                               'data_source': self.current_source.value,
-                               'news_count': result_count,
+                               'data_source': source.value,
+                               'requested_source': self.current_source.value,
+                               'news_count': len(result),
                                'duration': duration,
                                'event_type': 'news_fetch_success'
                            })
                 return result
-            else:
-                logger.warning(f"⚠️ [数据来源: {self.current_source.value}] 未获取到新闻数据: {symbol or '市场新闻'}，尝试降级",
-                              extra={
-                                  'symbol': symbol,
-                                  'data_source': self.current_source.value,
-                                  'duration': duration,
-                                  'event_type': 'news_fetch_fallback'
-                              })
-                return self._try_fallback_news(symbol, hours_back, limit)
+
+            logger.warning(f"⚠️ [数据来源: 所有数据源失败] 无法获取新闻: {symbol or '市场新闻'}",
+                          extra={
+                              'symbol': symbol,
+                              'data_source': self.current_source.value,
+                              'duration': duration,
+                              'event_type': 'news_fetch_fallback'
+                          })
+            return []
 
         except Exception as e:
             duration = time.time() - start_time
@@ -412,36 +377,17 @@ class DataSourceManager:
         """
         available = []
 
-        # 🔥 从数据库读取数据源配置，获取启用状态
-        enabled_sources_in_db = set()
-        try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-            config_collection = db.system_configs
-
-            # 获取最新的激活配置
-            config_data = config_collection.find_one(
-                {"is_active": True},
-                sort=[("version", -1)]
-            )
-
-            if config_data and config_data.get('data_source_configs'):
-                data_source_configs = config_data.get('data_source_configs', [])
-
-                # 提取已启用的数据源类型
-                for ds in data_source_configs:
-                    if ds.get('enabled', True):
-                        ds_type = ds.get('type', '').lower()
-                        enabled_sources_in_db.add(ds_type)
-
-                logger.info(f"✅ [数据源配置] 从数据库读取到已启用的数据源: {enabled_sources_in_db}")
-            else:
+        # 🔥 从数据源配置快照读取启用状态
+        snapshot = get_source_config_snapshot()
+        if snapshot.has_config:
+            enabled_sources_in_db = snapshot.enabled_types
+            logger.info(f"✅ [数据源配置] 从数据库读取到已启用的数据源: {enabled_sources_in_db}")
+        else:
+            if snapshot.available:
                 logger.warning("⚠️ [数据源配置] 数据库中没有数据源配置，将检查所有已安装的数据源")
-                # 如果数据库中没有配置，默认所有数据源都启用
-                enabled_sources_in_db = {'mongodb', 'tushare', 'akshare', 'baostock'}
-        except Exception as e:
-            logger.warning(f"⚠️ [数据源配置] 从数据库读取失败: {e}，将检查所有已安装的数据源")
-            # 如果读取失败，默认所有数据源都启用
+            else:
+                logger.warning("⚠️ [数据源配置] 从数据库读取失败，将检查所有已安装的数据源")
+            # 如果数据库中没有配置或读取失败，默认所有数据源都启用
             enabled_sources_in_db = {'mongodb', 'tushare', 'akshare', 'baostock'}
 
         # 检查MongoDB（最高优先级）
@@ -507,33 +453,12 @@ class DataSourceManager:
         return available
 
     def _get_datasource_configs_from_db(self) -> dict:
-        """从数据库读取数据源配置（包括 API Key）"""
-        try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
+        """从数据库读取数据源配置（包括 API Key），{数据源名称: {api_key, api_secret, ...}}"""
+        return dict(get_source_config_snapshot().datasource_configs)
 
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
-            # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
-
-            return result
-        except Exception as e:
-            logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
-            return {}
+    def get_source_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各数据源的近期耗时（p95）、错误率与对冲次数，按数据类型分组"""
+        return self.hedger.snapshot()
 
     def get_current_source(self) -> ChinaDataSource:
         """获取当前数据源"""
@@ -703,55 +628,10 @@ class DataSourceManager:
             if 'date' in data.columns:
                 data = data.sort_values('date')
 
-            # 计算移动平均线
-            data['ma5'] = data['close'].rolling(window=5, min_periods=1).mean()
-            data['ma10'] = data['close'].rolling(window=10, min_periods=1).mean()
-            data['ma20'] = data['close'].rolling(window=20, min_periods=1).mean()
-            data['ma60'] = data['close'].rolling(window=60, min_periods=1).mean()
-
-            # 计算RSI（相对强弱指标）- 同花顺风格：使用中国式SMA（EMA with adjust=True）
-            # 参考：https://blog.csdn.net/u011218867/article/details/117427927
+            # 统一使用 indicators 模块的公式（MA5/10/20/60、同花顺风格 RSI6/12/24 + RSI14、MACD、BOLL）
             # 同花顺/通达信的RSI使用SMA函数，等价于pandas的ewm(com=N-1, adjust=True)
-            delta = data['close'].diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
-
-            # RSI6 - 使用中国式SMA
-            avg_gain6 = gain.ewm(com=5, adjust=True).mean()  # com = N - 1
-            avg_loss6 = loss.ewm(com=5, adjust=True).mean()
-            rs6 = avg_gain6 / avg_loss6.replace(0, np.nan)
-            data['rsi6'] = 100 - (100 / (1 + rs6))
-
-            # RSI12 - 使用中国式SMA
-            avg_gain12 = gain.ewm(com=11, adjust=True).mean()
-            avg_loss12 = loss.ewm(com=11, adjust=True).mean()
-            rs12 = avg_gain12 / avg_loss12.replace(0, np.nan)
-            data['rsi12'] = 100 - (100 / (1 + rs12))
-
-            # RSI24 - 使用中国式SMA
-            avg_gain24 = gain.ewm(com=23, adjust=True).mean()
-            avg_loss24 = loss.ewm(com=23, adjust=True).mean()
-            rs24 = avg_gain24 / avg_loss24.replace(0, np.nan)
-            data['rsi24'] = 100 - (100 / (1 + rs24))
-
-            # 保留RSI14作为国际标准参考（使用简单移动平均）
-            gain14 = gain.rolling(window=14, min_periods=1).mean()
-            loss14 = loss.rolling(window=14, min_periods=1).mean()
-            rs14 = gain14 / loss14.replace(0, np.nan)
-            data['rsi14'] = 100 - (100 / (1 + rs14))
-
-            # 计算MACD
-            ema12 = data['close'].ewm(span=12, adjust=False).mean()
-            ema26 = data['close'].ewm(span=26, adjust=False).mean()
-            data['macd_dif'] = ema12 - ema26
-            data['macd_dea'] = data['macd_dif'].ewm(span=9, adjust=False).mean()
-            data['macd'] = (data['macd_dif'] - data['macd_dea']) * 2
-
-            # 计算布林带
-            data['boll_mid'] = data['close'].rolling(window=20, min_periods=1).mean()
-            std = data['close'].rolling(window=20, min_periods=1).std()
-            data['boll_upper'] = data['boll_mid'] + 2 * std
-            data['boll_lower'] = data['boll_mid'] - 2 * std
+            from tradingagents.tools.analysis.indicators import add_all_indicators
+            data = add_all_indicators(data, rsi_style='china')
 
             logger.info(f"✅ [技术指标] 技术指标计算完成")
 
@@ -1061,41 +941,25 @@ class DataSourceManager:
         start_time = time.time()
 
         try:
-            # 根据数据源调用相应的获取方法
-            actual_source = None  # 实际使用的数据源
-
-            if self.current_source == ChinaDataSource.MONGODB:
-                result, actual_source = self._get_mongodb_data(symbol, start_date, end_date, period)
-            elif self.current_source == ChinaDataSource.TUSHARE:
-                logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}', period='{period}'")
-                result = self._get_tushare_data(symbol, start_date, end_date, period)
-                actual_source = "tushare"
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date, period)
-                actual_source = "akshare"
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date, period)
-                actual_source = "baostock"
-            # TDX 已移除
-            else:
-                result = f"❌ 不支持的数据源: {self.current_source.value}"
-                actual_source = None
-
-            # 记录详细的输出结果
+            # 当前数据源优先；超过其 p95 耗时未返回或结果无效时启动下一优先级数据源，先返回有效结果者胜出
+            result, source, primary_result = self.hedger.fetch(
+                "stock_data",
+                self._hedge_sources("stock_data", symbol, self.STOCK_DATA_SOURCES),
+                lambda s: self._fetch_stock_data_from(s, symbol, start_date, end_date, period),
+                self._is_valid_text,
+            )
             duration = time.time() - start_time
-            result_length = len(result) if result else 0
-            is_success = result and "❌" not in result and "错误" not in result
 
-            # 使用实际数据源名称，如果没有则使用 current_source
-            display_source = actual_source or self.current_source.value
-
-            if is_success:
-                logger.info(f"✅ [数据来源: {display_source}] 成功获取股票数据: {symbol} ({result_length}字符, 耗时{duration:.2f}秒)",
+            if source is not None:
+                # 使用实际数据源名称
+                actual_source = source.value
+                result_length = len(result)
+                logger.info(f"✅ [数据来源: {actual_source}] 成功获取股票数据: {symbol} ({result_length}字符, 耗时{duration:.2f}秒)",
                            extra={
                                'symbol': symbol,
                                'start_date': start_date,
                                'end_date': end_date,
-                               'data_source': display_source,
+                               'data_source': actual_source,
                                'actual_source': actual_source,
                                'requested_source': self.current_source.value,
                                'duration': duration,
@@ -1104,27 +968,18 @@ class DataSourceManager:
                                'event_type': 'data_fetch_success'
                            })
                 return result
-            else:
-                logger.warning(f"⚠️ [数据来源: {self.current_source.value}失败] 数据质量异常，尝试降级到其他数据源: {symbol}",
-                              extra={
-                                  'symbol': symbol,
-                                  'start_date': start_date,
-                                  'end_date': end_date,
-                                  'data_source': self.current_source.value,
-                                  'duration': duration,
-                                  'result_length': result_length,
-                                  'result_preview': result[:200] + '...' if result_length > 200 else result,
-                                  'event_type': 'data_fetch_warning'
-                              })
-
-                # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
-                if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
-                    logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取数据: {symbol}")
-                    return fallback_result
-                else:
-                    logger.error(f"❌ [数据来源: 所有数据源失败] 所有数据源都无法获取有效数据: {symbol}")
-                    return result  # 返回原始结果（包含错误信息）
+
+            logger.error(f"❌ [数据来源: 所有数据源失败] 所有数据源都无法获取有效数据: {symbol}",
+                         extra={
+                             'symbol': symbol,
+                             'start_date': start_date,
+                             'end_date': end_date,
+                             'data_source': self.current_source.value,
+                             'duration': duration,
+                             'event_type': 'data_fetch_warning'
+                         })
+            # 返回当前数据源的原始结果（包含错误信息）
+            return primary_result or f"❌ 所有数据源都无法获取{symbol}的{period}数据"
 
         except Exception as e:
             duration = time.time() - start_time
@@ -1138,12 +993,16 @@ class DataSourceManager:
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            return self._try_fallback_sources(symbol, start_date, end_date, period)[0]
 
-    def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
+    def _get_mongodb_data(self, symbol: str, start_date: str, end_date: str, period: str = "daily",
+                          fallback: bool = True) -> tuple[str, str | None]:
         """
         从MongoDB获取多周期数据 - 包含技术指标计算
 
+        Args:
+            fallback: 未命中或异常时是否降级到其他数据源；对冲请求中由调用方负责降级
+
         Returns:
             tuple[str, str | None]: (结果字符串, 实际使用的数据源名称)
         """
@@ -1172,11 +1031,15 @@ class DataSourceManager:
                 return result, "mongodb"
             else:
                 # MongoDB没有数据（adapter内部已记录详细的数据源信息），降级到其他数据源
+                if not fallback:
+                    return f"❌ MongoDB未找到{symbol}的{period}数据", None
                 logger.info(f"🔄 [MongoDB] 未找到{period}数据: {symbol}，开始尝试备用数据源")
                 return self._try_fallback_sources(symbol, start_date, end_date, period)
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB异常] 获取{period}数据失败: {symbol}, 错误: {e}")
+            if not fallback:
+                return f"❌ MongoDB获取{symbol}的{period}数据失败: {e}", None
             # MongoDB异常，降级到其他数据源
             return self._try_fallback_sources(symbol, start_date, end_date, period)
 
@@ -1379,6 +1242,38 @@ class DataSourceManager:
             logger.error(f"❌ 获取成交量失败: {e}")
             return 0
 
+    @staticmethod
+    def _is_valid_text(result) -> bool:
+        return bool(result) and "❌" not in result and "错误" not in result
+
+    def _hedge_sources(self, kind: str, symbol: Optional[str], supported, include_current: bool = True):
+        """
+        对冲请求的数据源顺序：当前数据源，然后是按优先级配置排列、再按近期错误率调整的备用数据源
+
+        生成器形式：只有需要备用数据源时才读取优先级配置
+        """
+        if include_current:
+            yield self.current_source
+        # 注意：优先级中不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
+        fallback = [source for source in self._get_data_source_priority_order(symbol)
+                    if source != self.current_source and source in self.available_sources and source in supported]
+        yield from self.hedger.order(kind, fallback)
+
+    def _fetch_stock_data_from(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str,
+                               period: str = "daily") -> str:
+        """从指定数据源获取多周期数据，不做降级"""
+        if source == ChinaDataSource.MONGODB:
+            return self._get_mongodb_data(symbol, start_date, end_date, period, fallback=False)[0]
+        if source == ChinaDataSource.TUSHARE:
+            logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}', period='{period}'")
+            return self._get_tushare_data(symbol, start_date, end_date, period)
+        if source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_data(symbol, start_date, end_date, period)
+        if source == ChinaDataSource.BAOSTOCK:
+            return self._get_baostock_data(symbol, start_date, end_date, period)
+        # TDX 已移除
+        return f"❌ 不支持的数据源: {source.value}"
+
     def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str, period: str = "daily") -> tuple[str, str | None]:
         """
         尝试备用数据源 - 避免递归调用
@@ -1388,36 +1283,15 @@ class DataSourceManager:
         """
         logger.info(f"🔄 [{self.current_source.value}] 失败，尝试备用数据源获取{period}数据: {symbol}")
 
-        # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
-        # 注意：不包含MongoDB，因为MongoDB是最高优先级，如果失败了就不再尝试
-        fallback_order = self._get_data_source_priority_order(symbol)
-
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 [备用数据源] 尝试 {source.value} 获取{period}数据: {symbol}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date, period)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date, period)
-                    # TDX 已移除
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
-
-                    if "❌" not in result:
-                        logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
-                        return result, source.value  # 返回结果和实际使用的数据源
-                    else:
-                        logger.warning(f"⚠️ [备用数据源-{source.value}] 返回错误结果: {symbol}")
-
-                except Exception as e:
-                    logger.error(f"❌ [备用数据源-{source.value}] 获取失败: {symbol}, 错误: {e}")
-                    continue
+        result, source, _ = self.hedger.fetch(
+            "stock_data",
+            self._hedge_sources("stock_data", symbol, self.STOCK_DATA_SOURCES, include_current=False),
+            lambda s: self._fetch_stock_data_from(s, symbol, start_date, end_date, period),
+            self._is_valid_text,
+        )
+        if source is not None:
+            logger.info(f"✅ [备用数据源-{source.value}] 成功获取{period}数据: {symbol}")
+            return result, source.value  # 返回结果和实际使用的数据源
 
         logger.error(f"❌ [所有数据源失败] 无法获取{period}数据: {symbol}")
         return f"❌ 所有数据源都无法获取{symbol}的{period}数据", None
@@ -1785,8 +1659,8 @@ class DataSourceManager:
 
     # ==================== 基本面数据获取方法 ====================
 
-    def _get_mongodb_fundamentals(self, symbol: str) -> str:
-        """从 MongoDB 获取财务数据"""
+    def _get_mongodb_fundamentals(self, symbol: str, fallback: bool = True) -> str:
+        """从 MongoDB 获取财务数据（fallback=False 时未命中直接返回错误，由调用方降级）"""
         logger.debug(f"📊 [MongoDB] 调用参数: symbol={symbol}")
 
         try:
@@ -1809,7 +1683,7 @@ class DataSourceManager:
                         return self._format_financial_data(symbol, financial_dict_list)
                     else:
                         logger.warning(f"⚠️ [数据来源: MongoDB] 财务数据为空: {symbol}，降级到其他数据源")
-                        return self._try_fallback_fundamentals(symbol)
+                        return self._try_fallback_fundamentals(symbol) if fallback else f"❌ MongoDB未找到{symbol}的财务数据"
                 # 如果是列表
                 elif isinstance(financial_data, list) and len(financial_data) > 0:
                     logger.info(f"✅ [数据来源: MongoDB-财务数据] 成功获取: {symbol} ({len(financial_data)}条记录)")
@@ -1822,16 +1696,16 @@ class DataSourceManager:
                     return self._format_financial_data(symbol, financial_dict_list)
                 else:
                     logger.warning(f"⚠️ [数据来源: MongoDB] 未找到财务数据: {symbol}，降级到其他数据源")
-                    return self._try_fallback_fundamentals(symbol)
+                    return self._try_fallback_fundamentals(symbol) if fallback else f"❌ MongoDB未找到{symbol}的财务数据"
             else:
                 logger.warning(f"⚠️ [数据来源: MongoDB] 未找到财务数据: {symbol}，降级到其他数据源")
                 # MongoDB 没有数据，降级到其他数据源
-                return self._try_fallback_fundamentals(symbol)
+                return self._try_fallback_fundamentals(symbol) if fallback else f"❌ MongoDB未找到{symbol}的财务数据"
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB异常] 获取财务数据失败: {e}", exc_info=True)
             # MongoDB 异常，降级到其他数据源
-            return self._try_fallback_fundamentals(symbol)
+            return self._try_fallback_fundamentals(symbol) if fallback else f"❌ MongoDB未找到{symbol}的财务数据"
 
     def _get_tushare_fundamentals(self, symbol: str) -> str:
         """从 Tushare 获取基本面数据 - 暂时不可用，需要实现"""
@@ -2016,42 +1890,41 @@ class DataSourceManager:
             logger.error(f"❌ 生成基本面分析失败: {e}")
             return f"❌ 生成{symbol}基本面分析失败: {e}"
 
+    @staticmethod
+    def _is_valid_fundamentals(result) -> bool:
+        return bool(result) and "❌" not in result
+
+    def _fetch_fundamentals_from(self, source: ChinaDataSource, symbol: str) -> str:
+        """从指定数据源获取基本面数据，不做降级"""
+        if source == ChinaDataSource.MONGODB:
+            return self._get_mongodb_fundamentals(symbol, fallback=False)
+        if source == ChinaDataSource.TUSHARE:
+            return self._get_tushare_fundamentals(symbol)
+        if source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_fundamentals(symbol)
+        # 其他数据源暂不支持基本面数据，生成基本分析
+        return self._generate_fundamentals_analysis(symbol)
+
     def _try_fallback_fundamentals(self, symbol: str) -> str:
         """基本面数据降级处理"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取基本面...")
 
-        # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
-        fallback_order = self._get_data_source_priority_order(symbol)
-
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源获取基本面: {source.value}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_fundamentals(symbol)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_fundamentals(symbol)
-                    else:
-                        continue
-
-                    if result and "❌" not in result:
-                        logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {source.value}")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ 备用数据源{source.value}返回错误结果")
-
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}异常: {e}")
-                    continue
+        result, source, _ = self.hedger.fetch(
+            "fundamentals",
+            self._hedge_sources("fundamentals", symbol, self.FUNDAMENTALS_SOURCES, include_current=False),
+            lambda s: self._fetch_fundamentals_from(s, symbol),
+            self._is_valid_fundamentals,
+        )
+        if source is not None:
+            logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取基本面: {source.value}")
+            return result
 
         # 所有数据源都失败，生成基本分析
         logger.warning(f"⚠️ [数据来源: 生成分析] 所有数据源失败，生成基本分析: {symbol}")
         return self._generate_fundamentals_analysis(symbol)
 
-    def _get_mongodb_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
-        """从MongoDB获取新闻数据"""
+    def _get_mongodb_news(self, symbol: str, hours_back: int, limit: int, fallback: bool = True) -> List[Dict[str, Any]]:
+        """从MongoDB获取新闻数据（fallback=False 时未命中直接返回空列表，由调用方降级）"""
         try:
             from tradingagents.dataflows.cache.mongodb_cache_adapter import get_mongodb_cache_adapter
             adapter = get_mongodb_cache_adapter()
@@ -2064,11 +1937,11 @@ class DataSourceManager:
                 return news_data
             else:
                 logger.warning(f"⚠️ [数据来源: MongoDB] 未找到新闻: {symbol or '市场新闻'}，降级到其他数据源")
-                return self._try_fallback_news(symbol, hours_back, limit)
+                return self._try_fallback_news(symbol, hours_back, limit) if fallback else []
 
         except Exception as e:
             logger.error(f"❌ [数据来源: MongoDB] 获取新闻失败: {e}")
-            return self._try_fallback_news(symbol, hours_back, limit)
+            return self._try_fallback_news(symbol, hours_back, limit) if fallback else []
 
     def _get_tushare_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
         """从Tushare获取新闻数据"""
@@ -2092,35 +1965,35 @@ class DataSourceManager:
             logger.error(f"❌ [数据来源: AKShare] 获取新闻失败: {e}")
             return []
 
+    @staticmethod
+    def _is_valid_news(result) -> bool:
+        return bool(result) and len(result) > 0
+
+    def _fetch_news_from(self, source: ChinaDataSource, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
+        """从指定数据源获取新闻数据，不做降级"""
+        if source == ChinaDataSource.MONGODB:
+            return self._get_mongodb_news(symbol, hours_back, limit, fallback=False)
+        if source == ChinaDataSource.TUSHARE:
+            return self._get_tushare_news(symbol, hours_back, limit)
+        if source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_news(symbol, hours_back, limit)
+        # 其他数据源暂不支持新闻数据
+        logger.warning(f"⚠️ 数据源 {source.value} 不支持新闻数据")
+        return []
+
     def _try_fallback_news(self, symbol: str, hours_back: int, limit: int) -> List[Dict[str, Any]]:
         """新闻数据降级处理"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源获取新闻...")
 
-        # 🔥 从数据库获取数据源优先级顺序（根据股票代码识别市场）
-        fallback_order = self._get_data_source_priority_order(symbol)
-
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源获取新闻: {source.value}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_news(symbol, hours_back, limit)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_news(symbol, hours_back, limit)
-                    else:
-                        continue
-
-                    if result and len(result) > 0:
-                        logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取新闻: {source.value}")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ 备用数据源{source.value}未返回新闻")
-
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}异常: {e}")
-                    continue
+        result, source, _ = self.hedger.fetch(
+            "news",
+            self._hedge_sources("news", symbol, self.NEWS_SOURCES, include_current=False),
+            lambda s: self._fetch_news_from(s, symbol, hours_back, limit),
+            self._is_valid_news,
+        )
+        if source is not None:
+            logger.info(f"✅ [数据来源: 备用数据源] 降级成功获取新闻: {source.value}")
+            return result
 
         # 所有数据源都失败
         logger.warning(f"⚠️ [数据来源: 所有数据源失败] 无法获取新闻: {symbol or '市场新闻'}")
@@ -2257,44 +2130,31 @@ class USDataSourceManager:
         Returns:
             按优先级排序的数据源列表（不包含MongoDB）
         """
-        try:
-            # 从数据库读取数据源配置
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 方法1: 从 datasource_groupings 集合读取（推荐）
-            groupings_collection = db.datasource_groupings
-            groupings = list(groupings_collection.find({
-                "market_category_id": "us_stocks",
-                "enabled": True
-            }).sort("priority", -1))  # 降序排序，优先级高的在前
-
-            if groupings:
-                # 转换为 USDataSource 枚举
-                # 🔥 数据源名称映射（数据库名称 → USDataSource 枚举）
-                source_mapping = {
-                    'yfinance': USDataSource.YFINANCE,
-                    'yahoo_finance': USDataSource.YFINANCE,  # 别名
-                    'alpha_vantage': USDataSource.ALPHA_VANTAGE,
-                    'finnhub': USDataSource.FINNHUB,
-                }
+        # 从进程内共享的配置快照读取 datasource_groupings（按版本号刷新，热路径不访问数据库）
+        snapshot = get_source_config_snapshot()
+        if snapshot.us_groupings:
+            # 转换为 USDataSource 枚举
+            # 🔥 数据源名称映射（数据库名称 → USDataSource 枚举）
+            source_mapping = {
+                'yfinance': USDataSource.YFINANCE,
+                'yahoo_finance': USDataSource.YFINANCE,  # 别名
+                'alpha_vantage': USDataSource.ALPHA_VANTAGE,
+                'finnhub': USDataSource.FINNHUB,
+            }
 
-                result = []
-                for grouping in groupings:
-                    ds_name = grouping.get('data_source_name', '').lower()
-                    if ds_name in source_mapping:
-                        source = source_mapping[ds_name]
-                        # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
-                        if source != USDataSource.MONGODB and source in self.available_sources:
-                            result.append(source)
-
-                if result:
-                    logger.info(f"✅ [美股数据源优先级] 从数据库读取: {[s.value for s in result]}")
-                    return result
+            result = []
+            for ds_name in snapshot.us_groupings:
+                source = source_mapping.get(ds_name)
+                # 排除 MongoDB（MongoDB 是最高优先级，不参与降级）
+                if source is not None and source in self.available_sources:
+                    result.append(source)
 
-            logger.warning("⚠️ [美股数据源优先级] 数据库中没有配置，使用默认顺序")
-        except Exception as e:
-            logger.warning(f"⚠️ [美股数据源优先级] 从数据库读取失败: {e}，使用默认顺序")
+            if result:
+                logger.debug(f"✅ [美股数据源优先级] 配置快照: {[s.value for s in result]}")
+                return result
+
+        if snapshot.available:
+            logger.debug("⚠️ [美股数据源优先级] 数据库中没有配置，使用默认顺序")
 
         # 回退到默认顺序
         # 默认顺序：yfinance > Alpha Vantage > Finnhub
@@ -2387,66 +2247,24 @@ class USDataSourceManager:
         return available
 
     def _get_enabled_sources_from_db(self) -> List[str]:
-        """从数据库读取启用的数据源列表"""
-        try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 datasource_groupings 集合读取
-            groupings = list(db.datasource_groupings.find({
-                "market_category_id": "us_stocks",
-                "enabled": True
-            }))
-
-            # 🔥 数据源名称映射（数据库名称 → 代码中使用的名称）
-            name_mapping = {
-                'alpha vantage': 'alpha_vantage',
-                'yahoo finance': 'yfinance',
-                'finnhub': 'finnhub',
-            }
-
-            result = []
-            for g in groupings:
-                db_name = g.get('data_source_name', '').lower()
-                # 使用映射表转换名称
-                code_name = name_mapping.get(db_name, db_name)
-                result.append(code_name)
-                logger.debug(f"🔄 数据源名称映射: '{db_name}' → '{code_name}'")
-
-            return result
-        except Exception as e:
-            logger.warning(f"⚠️ 从数据库读取启用的数据源失败: {e}")
+        """从数据库读取启用的数据源列表（datasource_groupings，经配置快照缓存）"""
+        snapshot = get_source_config_snapshot()
+        if not snapshot.available:
+            logger.warning("⚠️ 从数据库读取启用的数据源失败")
             # 默认全部启用
             return ['yfinance', 'alpha_vantage', 'finnhub']
 
-    def _get_datasource_configs_from_db(self) -> dict:
-        """从数据库读取数据源配置（包括 API Key）"""
-        try:
-            from app.core.database import get_mongo_db_sync
-            db = get_mongo_db_sync()
-
-            # 从 system_configs 集合读取激活的配置
-            config = db.system_configs.find_one({"is_active": True})
-            if not config:
-                return {}
-
-            # 提取数据源配置
-            datasource_configs = config.get('data_source_configs', [])
-
-            # 构建配置字典 {数据源名称: {api_key, api_secret, ...}}
-            result = {}
-            for ds_config in datasource_configs:
-                name = ds_config.get('name', '').lower()
-                result[name] = {
-                    'api_key': ds_config.get('api_key', ''),
-                    'api_secret': ds_config.get('api_secret', ''),
-                    'config_params': ds_config.get('config_params', {})
-                }
+        # 🔥 数据源名称映射（数据库名称 → 代码中使用的名称）
+        name_mapping = {
+            'alpha vantage': 'alpha_vantage',
+            'yahoo finance': 'yfinance',
+            'finnhub': 'finnhub',
+        }
+        return [name_mapping.get(db_name, db_name) for db_name in snapshot.us_groupings]
 
-            return result
-        except Exception as e:
-            logger.warning(f"⚠️ 从数据库读取数据源配置失败: {e}")
-            return {}
+    def _get_datasource_configs_from_db(self) -> dict:
+        """从数据库读取数据源配置（包括 API Key），{数据源名称: {api_key, api_secret, ...}}"""
+        return dict(get_source_config_snapshot().datasource_configs)
 
     def get_current_source(self) -> USDataSource:
         """获取当前数据源"""
@@ -192,7 +192,6 @@ import json
 import os
 import pandas as pd
 from tqdm import tqdm
-from openai import OpenAI
 
 # 尝试导入yfinance，如果失败则设置为None
 try:
@@ -938,6 +937,7 @@ def get_YFin_data(
 
 def get_stock_news_openai(ticker, curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -973,6 +973,7 @@ def get_stock_news_openai(ticker, curr_date):
 
 def get_global_news_openai(curr_date):
     config = get_config()
+    from openai import OpenAI
     client = OpenAI(base_url=config["backend_url"])
 
     response = client.responses.create(
@@ -1360,6 +1361,8 @@ def _get_fundamentals_openai_impl(ticker, curr_date, config, cache):
     try:
         logger.debug(f"📊 [OpenAI] 尝试使用OpenAI获取 {ticker} 的基本面数据...")
 
+        from openai import OpenAI
+
         client = OpenAI(base_url=config["backend_url"])
 
         response = client.responses.create(
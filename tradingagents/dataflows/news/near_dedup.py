@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+新闻近似去重（MinHash + LSH）
+
+转载的财经新闻标题常有细微差别（来源前缀、标点、个别字词），按标题精确去重无法识别。
+本模块对 标题+正文开头 做字符 n-gram 分片，计算 MinHash 签名，并用 LSH 分段索引：
+
+- 新文章只与同一分段桶中的候选比较（不随索引规模线性增长），再用签名估算 Jaccard 相似度确认
+- 同一篇文章（相同 key）再次出现时直接命中，不重复计算
+- 每只股票一个索引，按命名空间在进程内共享，按条数上限和过期时间淘汰。
+  新闻同步任务使用独立的命名空间：只有已入库的文章才能作为簇代表
+  （保存失败时用 discard 移除），分析时 RealtimeNewsAggregator 见过的文章不会导致转载稿不入库
+
+哈希全部基于码点的多项式滚动哈希和固定种子的置换参数，不依赖 Python 的随机化 hash，
+同一文本在不同进程中得到相同签名。
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+T = TypeVar("T")
+
+_PRIME = np.uint64(4294967311)  # 大于 2^32 的最小素数
+_MASK32 = np.uint64(0xFFFFFFFF)
+_ROLLING_BASE = 1000003
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# 参与计算的正文长度（转载稿差异主要在标题和开头，截断可控制单篇计算量）
+CONTENT_CHARS = 400
+# 未指定股票时（市场新闻）使用的索引名
+MARKET_KEY = "__market__"
+# 默认命名空间（分析时的新闻聚合）
+DEFAULT_NAMESPACE = "analysis"
+
+
+def normalize_text(text: str) -> str:
+    """小写并去掉空白和标点（中文无需分词，按字符分片）"""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """字符 n-gram 的 32 位哈希（去重后），空文本返回空数组"""
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) < size:
+        codes = np.pad(codes, (0, size - len(codes)))
+    powers = np.array([pow(_ROLLING_BASE, size - 1 - i, 1 << 32) for i in range(size)], dtype=np.uint64)
+    hashes = (sliding_window_view(codes, size) * powers).sum(axis=1) & _MASK32
+    # 乘法散列打散相邻 n-gram 的哈希值
+    return np.unique((hashes * np.uint64(0x9E3779B1)) & _MASK32)
+
+
+class NearDuplicateIndex:
+    """MinHash LSH 近似去重索引（线程安全）"""
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.6,
+        shingle_size: int = 3,
+        max_items: int = 5000,
+        ttl_seconds: Optional[float] = 72 * 3600,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            num_perm: MinHash 置换数（签名长度）
+            bands: LSH 分段数（num_perm 需能被整除），分段越多召回越高、候选越多
+            threshold: 估算 Jaccard 相似度不低于该值视为近似重复
+            shingle_size: 字符 n-gram 长度
+            max_items: 索引保留的文章数上限（超出淘汰最早的）
+            ttl_seconds: 文章在索引中的保留时间，None 表示不过期
+            seed: 置换参数的随机种子（固定以保证跨进程一致）
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+
+        self._lock = threading.Lock()
+        # key -> (签名, 所属簇代表 key, 加入时间)
+        self._items: "OrderedDict[str, Tuple[np.ndarray, str, float]]" = OrderedDict()
+        self._tables: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self.stats = {"queries": 0, "key_hits": 0, "candidates": 0, "duplicates": 0, "evicted": 0}
+
+    def signature(self, title: str, content: str = "") -> Optional[np.ndarray]:
+        """标题+正文开头的 MinHash 签名（没有可用文字时返回 None）"""
+        text = normalize_text(title) + normalize_text((content or "")[:CONTENT_CHARS])
+        hashes = shingle_hashes(text, self.shingle_size)
+        if not len(hashes):
+            return None
+        return ((self._a * hashes[None, :] + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def assign(self, key: str, title: str, content: str = "") -> Tuple[str, bool]:
+        """
+        把文章归入近似重复簇
+
+        Args:
+            key: 文章唯一标识（URL 或标题），同一 key 再次出现时直接返回原来的簇
+            title: 标题
+            content: 正文
+
+        Returns:
+            (簇代表的 key, 是否为新簇)。文章与已有文章近似重复时返回已有文章所在簇的代表。
+        """
+        with self._lock:
+            self.stats["queries"] += 1
+            self._expire()
+            known = self._items.get(key)
+            if known is not None:
+                self.stats["key_hits"] += 1
+                return known[1], False
+
+        signature = self.signature(title, content)
+        if signature is None:
+            return key, True  # 没有文字无法比较，视为独立文章且不入索引
+        band_keys = self._band_keys(signature)
+
+        with self._lock:
+            if key in self._items:  # 其他线程刚刚加入了同一篇
+                return self._items[key][1], False
+            cluster, best = None, self.threshold
+            seen = set()
+            for table, band_key in zip(self._tables, band_keys):
+                for candidate in table.get(band_key, ()):
+                    if candidate in seen:
+                        continue
+                    seen.add(candidate)
+                    item = self._items.get(candidate)
+                    if item is None:
+                        continue
+                    similarity = float(np.mean(item[0] == signature))
+                    if similarity >= best:
+                        cluster, best = item[1], similarity
+            self.stats["candidates"] += len(seen)
+
+            is_new = cluster is None
+            if is_new:
+                cluster = key
+            else:
+                self.stats["duplicates"] += 1
+            self._items[key] = (signature, cluster, time.time())
+            for table, band_key in zip(self._tables, band_keys):
+                table.setdefault(band_key, []).append(key)
+            while len(self._items) > self.max_items:
+                self._evict_oldest()
+            return cluster, is_new
+
+    def discard(self, keys: Iterable[str]) -> int:
+        """
+        移除文章以及以它们为代表的簇（如文章保存失败，之后的转载稿需要重新作为簇代表）
+
+        Returns:
+            移除的文章数
+        """
+        keys = set(keys)
+        with self._lock:
+            removed = [key for key, item in self._items.items() if key in keys or item[1] in keys]
+            for key in removed:
+                self._remove(key)
+            return len(removed)
+
+    def _expire(self):
+        if self.ttl_seconds is None:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        while self._items and next(iter(self._items.values()))[2] < cutoff:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        self._remove(next(iter(self._items)))
+        self.stats["evicted"] += 1
+
+    def _remove(self, key: str):
+        signature = self._items.pop(key)[0]
+        for table, band_key in zip(self._tables, self._band_keys(signature)):
+            bucket = table.get(band_key)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(key)
+            except ValueError:
+                pass
+            if not bucket:
+                del table[band_key]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_INDEXES: "OrderedDict[Tuple[str, str], NearDuplicateIndex]" = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+# 进程内最多保留的股票索引数（超出淘汰最久未使用的）
+MAX_SYMBOL_INDEXES = 2000
+
+
+def get_news_dedup_index(symbol: Optional[str], namespace: str = DEFAULT_NAMESPACE) -> NearDuplicateIndex:
+    """获取股票在命名空间中的共享去重索引（symbol 为空时为市场新闻索引）"""
+    # 000001.SZ 与 000001 共用一个索引
+    name = (namespace, str(symbol).upper().split(".")[0] if symbol else MARKET_KEY)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(name)
+        if index is None:
+            index = _INDEXES[name] = NearDuplicateIndex()
+            while len(_INDEXES) > MAX_SYMBOL_INDEXES:
+                _INDEXES.popitem(last=False)
+        else:
+            _INDEXES.move_to_end(name)
+        return index
+
+
+def filter_near_duplicates(
+    items: Iterable[T],
+    symbol: Optional[str],
+    get_title: Callable[[T], str],
+    get_content: Callable[[T], str],
+    get_key: Callable[[T], str],
+    drop_known: bool = False,
+    namespace: str = DEFAULT_NAMESPACE,
+) -> List[T]:
+    """
+    近似去重：每个簇只保留一篇
+
+    Args:
+        items: 新闻列表（保持原有顺序，保留每个簇中最先出现的一篇）
+        symbol: 股票代码（决定使用哪个共享索引）
+        get_title / get_content / get_key: 取标题、正文、唯一标识
+        drop_known: 为 True 时，簇代表是之前调用中已出现的其他文章也丢弃
+            （新闻入库时使用：转载稿不再重复保存）；为 False 时只在本批内去重
+        namespace: 索引命名空间，不同命名空间的状态互不影响
+
+    Returns:
+        去重后的新闻列表
+    """
+    index = get_news_dedup_index(symbol, namespace)
+    kept, clusters = [], set()
+    for item in items:
+        key = get_key(item)
+        cluster, is_new = index.assign(key, get_title(item), get_content(item) or "")
+        if cluster in clusters:
+            continue
+        if drop_known and not is_new and cluster != key:
+            continue
+        clusters.add(cluster)
+        kept.append(item)
+    return kept
@@ -9,13 +9,18 @@ import json
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 import time
 import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
+from requests.adapters import HTTPAdapter
+
 # 导入日志模块
-from tradingagents.config.runtime_settings import get_timezone_name
+from tradingagents.config.runtime_settings import get_float, get_timezone_name
+from tradingagents.dataflows.news.near_dedup import filter_near_duplicates
 
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -34,92 +39,200 @@ class NewsItem:
     relevance_score: float
 
 
+# 各新闻源并发查询：共享连接池和线程池（聚合器每次调用都会新建，连接和线程需跨调用复用）
+_SESSION: Optional[requests.Session] = None
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_SHARED_LOCK = threading.Lock()
+
+# 中文财经 RSS 源（每个源单独并发查询）
+CHINESE_RSS_SOURCES = [
+    "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
+]
+
+# relevance_score 不低于该值视为高相关新闻（股票代码/公司名出现在标题中）
+HIGH_RELEVANCE_SCORE = 0.8
+
+
+def _get_session() -> requests.Session:
+    """共享的 HTTP 会话（连接池复用，避免每个请求重新握手）"""
+    global _SESSION
+    with _SHARED_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _SHARED_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="news-source")
+        return _EXECUTOR
+
+
+class SourceLatencyHistogram:
+    """单个新闻源的耗时直方图（线程安全）"""
+
+    BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.errors = 0
+        self.timeouts = 0
+        self.empty = 0
+
+    def observe(self, seconds: float, outcome: str = "ok"):
+        """记录一次耗时，outcome: ok / empty / error / timeout"""
+        index = next((i for i, bound in enumerate(self.BUCKETS) if seconds <= bound), len(self.BUCKETS))
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if outcome == "error":
+                self.errors += 1
+            elif outcome == "timeout":
+                self.timeouts += 1
+            elif outcome == "empty":
+                self.empty += 1
+
+    def _percentile(self, q: float) -> Optional[float]:
+        """按桶上界估算分位数（落在最后一个桶时返回最大耗时）"""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.BUCKETS, self.bucket_counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return round(self.max_seconds, 3)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [f"le_{bound:g}s" for bound in self.BUCKETS] + ["inf"]
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "empty": self.empty,
+                "avg_seconds": round(self.total_seconds / self.count, 3) if self.count else None,
+                "max_seconds": round(self.max_seconds, 3),
+                "p50_seconds": self._percentile(0.5),
+                "p95_seconds": self._percentile(0.95),
+                "buckets": dict(zip(labels, self.bucket_counts)),
+            }
+
+
+_SOURCE_LATENCY: Dict[str, SourceLatencyHistogram] = {}
+
+
+def _latency_histogram(source: str) -> SourceLatencyHistogram:
+    with _SHARED_LOCK:
+        if source not in _SOURCE_LATENCY:
+            _SOURCE_LATENCY[source] = SourceLatencyHistogram()
+        return _SOURCE_LATENCY[source]
+
+
+def get_news_source_latency_stats() -> Dict[str, Dict]:
+    """各新闻源的耗时直方图（进程内累计）"""
+    with _SHARED_LOCK:
+        histograms = dict(_SOURCE_LATENCY)
+    return {source: histogram.snapshot() for source, histogram in histograms.items()}
+
+
 class RealtimeNewsAggregator:
     """实时新闻聚合器"""
 
-    def __init__(self):
+    def __init__(self, source_timeout: Optional[float] = None, deadline: Optional[float] = None):
+        """
+        Args:
+            source_timeout: 单个新闻源的 HTTP 超时（秒），默认 ENV NEWS_SOURCE_TIMEOUT 或 8
+            deadline: 一次聚合的总时限（秒），默认 ENV NEWS_AGGREGATE_DEADLINE 或 15；
+                到时返回已获取的结果，未完成的新闻源不再等待
+        """
         self.headers = {
             'User-Agent': 'TradingAgents-CN/1.0'
         }
+        self.session = _get_session()
+        self.source_timeout = source_timeout or get_float("NEWS_SOURCE_TIMEOUT", None, 8.0)
+        self.deadline = deadline or get_float("NEWS_AGGREGATE_DEADLINE", None, 15.0)
 
         # API密钥配置
         self.finnhub_key = os.getenv('FINNHUB_API_KEY')
         self.alpha_vantage_key = os.getenv('ALPHA_VANTAGE_API_KEY')
         self.newsapi_key = os.getenv('NEWSAPI_KEY')
 
-    def get_realtime_stock_news(self, ticker: str, hours_back: int = 6, max_news: int = 10) -> List[NewsItem]:
+    def get_realtime_stock_news(
+        self,
+        ticker: str,
+        hours_back: int = 6,
+        max_news: int = 10,
+        cancel_event: Optional[threading.Event] = None
+    ) -> List[NewsItem]:
         """
         获取实时股票新闻
-        优先级：专业API > 新闻API > 搜索引擎
+        各新闻源（专业API、新闻API、中文财经源）并发查询，总耗时取决于最慢的源而不是所有源之和。
+
+        提前返回的情况（未完成的新闻源不再等待，结果照常去重排序）：
+        - 已获取 max_news 条不重复的高相关新闻
+        - 超过总时限 deadline
+        - cancel_event 被设置
 
         Args:
             ticker: 股票代码
             hours_back: 回溯小时数
             max_news: 最大新闻数量，默认10条
+            cancel_event: 取消信号
         """
         logger.info(f"[新闻聚合器] 开始获取 {ticker} 的实时新闻，回溯时间: {hours_back}小时")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
+        started = time.monotonic()
         all_news = []
 
-        # 1. FinnHub实时新闻 (最高优先级)
-        logger.info(f"[新闻聚合器] 尝试从 FinnHub 获取 {ticker} 的新闻")
-        finnhub_start = datetime.now(ZoneInfo(get_timezone_name()))
-        finnhub_news = self._get_finnhub_realtime_news(ticker, hours_back)
-        finnhub_time = (datetime.now(ZoneInfo(get_timezone_name())) - finnhub_start).total_seconds()
-
-        if finnhub_news:
-            logger.info(f"[新闻聚合器] 成功从 FinnHub 获取 {len(finnhub_news)} 条新闻，耗时: {finnhub_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] FinnHub 未返回新闻，耗时: {finnhub_time:.2f}秒")
-
-        all_news.extend(finnhub_news)
-
-        # 2. Alpha Vantage新闻
-        logger.info(f"[新闻聚合器] 尝试从 Alpha Vantage 获取 {ticker} 的新闻")
-        av_start = datetime.now(ZoneInfo(get_timezone_name()))
-        av_news = self._get_alpha_vantage_news(ticker, hours_back)
-        av_time = (datetime.now(ZoneInfo(get_timezone_name())) - av_start).total_seconds()
-
-        if av_news:
-            logger.info(f"[新闻聚合器] 成功从 Alpha Vantage 获取 {len(av_news)} 条新闻，耗时: {av_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] Alpha Vantage 未返回新闻，耗时: {av_time:.2f}秒")
-
-        all_news.extend(av_news)
-
-        # 3. NewsAPI (如果配置了)
-        if self.newsapi_key:
-            logger.info(f"[新闻聚合器] 尝试从 NewsAPI 获取 {ticker} 的新闻")
-            newsapi_start = datetime.now(ZoneInfo(get_timezone_name()))
-            newsapi_news = self._get_newsapi_news(ticker, hours_back)
-            newsapi_time = (datetime.now(ZoneInfo(get_timezone_name())) - newsapi_start).total_seconds()
-
-            if newsapi_news:
-                logger.info(f"[新闻聚合器] 成功从 NewsAPI 获取 {len(newsapi_news)} 条新闻，耗时: {newsapi_time:.2f}秒")
-            else:
-                logger.info(f"[新闻聚合器] NewsAPI 未返回新闻，耗时: {newsapi_time:.2f}秒")
-
-            all_news.extend(newsapi_news)
-        else:
-            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
-
-        # 4. 中文财经新闻源
-        logger.info(f"[新闻聚合器] 尝试获取 {ticker} 的中文财经新闻")
-        chinese_start = datetime.now(ZoneInfo(get_timezone_name()))
-        chinese_news = self._get_chinese_finance_news(ticker, hours_back)
-        chinese_time = (datetime.now(ZoneInfo(get_timezone_name())) - chinese_start).total_seconds()
-
-        if chinese_news:
-            logger.info(f"[新闻聚合器] 成功获取 {len(chinese_news)} 条中文财经新闻，耗时: {chinese_time:.2f}秒")
-        else:
-            logger.info(f"[新闻聚合器] 未获取到中文财经新闻，耗时: {chinese_time:.2f}秒")
-
-        all_news.extend(chinese_news)
+        sources = self._news_sources(ticker, hours_back)
+        executor = _get_executor()
+        futures: Dict[Future, str] = {
+            executor.submit(self._timed_source, name, func): name for name, func in sources
+        }
+        logger.info(f"[新闻聚合器] 并发查询 {len(futures)} 个新闻源: {', '.join(futures.values())}")
+
+        pending = set(futures)
+        stop_reason = None
+        while pending:
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                stop_reason = f"超过总时限 {self.deadline:.1f}秒"
+                break
+            if cancel_event is not None and cancel_event.is_set():
+                stop_reason = "收到取消信号"
+                break
+            # 有取消信号时分段等待，以便及时响应
+            timeout = min(remaining, 0.2) if cancel_event is not None else remaining
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                all_news.extend(future.result())
+            if self._enough_relevant_news(all_news, max_news):
+                stop_reason = f"已获取 {max_news} 条高相关新闻"
+                break
+
+        if pending:
+            skipped = [futures[f] for f in pending]
+            for future in pending:
+                future.cancel()  # 尚未开始的直接取消；已在执行的完成后只记录耗时
+            logger.warning(f"[新闻聚合器] {stop_reason}，返回部分结果，未等待的新闻源: {', '.join(skipped)}")
 
         # 去重和排序
         logger.info(f"[新闻聚合器] 开始对 {len(all_news)} 条新闻进行去重和排序")
         dedup_start = datetime.now(ZoneInfo(get_timezone_name()))
-        unique_news = self._deduplicate_news(all_news)
+        unique_news = self._deduplicate_news(all_news, ticker)
         sorted_news = sorted(unique_news, key=lambda x: x.publish_time, reverse=True)
         dedup_time = (datetime.now(ZoneInfo(get_timezone_name())) - dedup_start).total_seconds()
 
@@ -144,6 +257,52 @@ class RealtimeNewsAggregator:
 
         return sorted_news
 
+    def _news_sources(self, ticker: str, hours_back: int) -> List[Tuple[str, Callable[[], List[NewsItem]]]]:
+        """本次需要查询的新闻源（未配置密钥的源不提交）"""
+        sources = []
+        if self.finnhub_key:
+            sources.append(("FinnHub", lambda: self._get_finnhub_realtime_news(ticker, hours_back)))
+        if self.alpha_vantage_key:
+            sources.append(("Alpha Vantage", lambda: self._get_alpha_vantage_news(ticker, hours_back)))
+        if self.newsapi_key:
+            sources.append(("NewsAPI", lambda: self._get_newsapi_news(ticker, hours_back)))
+        else:
+            logger.info(f"[新闻聚合器] NewsAPI 密钥未配置，跳过此新闻源")
+        sources.append(("东方财富", lambda: self._get_eastmoney_news(ticker, hours_back)))
+        for rss_url in CHINESE_RSS_SOURCES:
+            sources.append((f"RSS:{rss_url.split('/')[2]}", lambda url=rss_url: self._parse_rss_feed(url, ticker, hours_back)))
+        return sources
+
+    def _timed_source(self, name: str, func: Callable[[], List[NewsItem]]) -> List[NewsItem]:
+        """执行单个新闻源并记录耗时直方图（不抛出异常，失败返回空列表）"""
+        source_start = time.monotonic()
+        try:
+            items = func() or []
+            outcome = "ok" if items else "empty"
+        except requests.Timeout as e:
+            logger.warning(f"[新闻聚合器] {name} 请求超时: {e}")
+            items, outcome = [], "timeout"
+        except Exception as e:
+            logger.error(f"[新闻聚合器] {name} 获取新闻失败: {e}")
+            items, outcome = [], "error"
+        elapsed = time.monotonic() - source_start
+        _latency_histogram(name).observe(elapsed, outcome)
+        logger.info(f"[新闻聚合器] {name} 返回 {len(items)} 条新闻，耗时: {elapsed:.2f}秒")
+        return items
+
+    @staticmethod
+    def _enough_relevant_news(news_items: List[NewsItem], max_news: int) -> bool:
+        """不重复的高相关新闻是否已达到 max_news 条"""
+        titles = {
+            item.title.lower().strip() for item in news_items
+            if item.relevance_score >= HIGH_RELEVANCE_SCORE and len(item.title.strip()) > 10
+        }
+        return len(titles) >= max_news
+
+    def get_source_latency_stats(self) -> Dict[str, Dict]:
+        """各新闻源的耗时直方图"""
+        return get_news_source_latency_stats()
+
     def _get_finnhub_realtime_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
         """获取FinnHub实时新闻"""
         if not self.finnhub_key:
@@ -163,7 +322,7 @@ class RealtimeNewsAggregator:
                 'token': self.finnhub_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             news_data = response.json()
@@ -190,6 +349,8 @@ class RealtimeNewsAggregator:
 
             return news_items
 
+        except requests.Timeout:
+            raise  # 由聚合器记录为超时
         except Exception as e:
             logger.error(f"FinnHub新闻获取失败: {e}")
             return []
@@ -208,7 +369,7 @@ class RealtimeNewsAggregator:
                 'limit': 50
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -241,6 +402,8 @@ class RealtimeNewsAggregator:
 
             return news_items
 
+        except requests.Timeout:
+            raise  # 由聚合器记录为超时
         except Exception as e:
             logger.error(f"Alpha Vantage新闻获取失败: {e}")
             return []
@@ -268,7 +431,7 @@ class RealtimeNewsAggregator:
                 'apiKey': self.newsapi_key
             }
 
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=self.source_timeout)
             response.raise_for_status()
 
             data = response.json()
@@ -296,6 +459,8 @@ class RealtimeNewsAggregator:
 
             return news_items
 
+        except requests.Timeout:
+            raise  # 由聚合器记录为超时
         except Exception as e:
             logger.error(f"NewsAPI新闻获取失败: {e}")
             return []
@@ -309,90 +474,16 @@ class RealtimeNewsAggregator:
         try:
             news_items = []
 
-            # 1. 尝试使用AKShare获取东方财富个股新闻
+            # 1. 东方财富个股新闻
             try:
-                logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
-                from tradingagents.dataflows.providers.china.akshare import AKShareProvider
-
-                provider = AKShareProvider()
-
-                # 处理股票代码格式
-                # 如果是美股代码，不使用东方财富新闻
-                if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
-                    logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
-                else:
-                    # 处理A股和港股代码
-                    clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
-                                    .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
-
-                    # 获取东方财富新闻
-                    logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
-                    em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-                    news_df = provider.get_stock_news_sync(symbol=clean_ticker)
-
-                    if not news_df.empty:
-                        logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
-                        processed_count = 0
-                        skipped_count = 0
-                        error_count = 0
-
-                        # 转换为NewsItem格式
-                        for _, row in news_df.iterrows():
-                            try:
-                                # 解析时间
-                                time_str = row.get('时间', '')
-                                if time_str:
-                                    # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
-                                    try:
-                                        publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                    except:
-                                        # 尝试其他可能的格式
-                                        try:
-                                            publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
-                                        except:
-                                            logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
-                                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-                                else:
-                                    logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
-                                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
-
-                                # 检查时效性
-                                if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
-                                    skipped_count += 1
-                                    continue
-
-                                # 评估紧急程度
-                                title = row.get('标题', '')
-                                content = row.get('内容', '')
-                                urgency = self._assess_news_urgency(title, content)
-
-                                news_items.append(NewsItem(
-                                    title=title,
-                                    content=content,
-                                    source='东方财富',
-                                    publish_time=publish_time,
-                                    url=row.get('链接', ''),
-                                    urgency=urgency,
-                                    relevance_score=self._calculate_relevance(title, ticker)
-                                ))
-                                processed_count += 1
-                            except Exception as item_e:
-                                logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
-                                error_count += 1
-                                continue
-
-                        em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
-                        logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
+                news_items.extend(self._get_eastmoney_news(ticker, hours_back))
             except Exception as ak_e:
                 logger.error(f"[中文财经新闻] 获取东方财富新闻失败: {ak_e}")
 
             # 2. 财联社RSS (如果可用)
             logger.info(f"[中文财经新闻] 开始获取财联社RSS新闻")
             rss_start_time = datetime.now(ZoneInfo(get_timezone_name()))
-            rss_sources = [
-                "https://www.cls.cn/api/sw?app=CailianpressWeb&os=web&sv=7.7.5",
-                # 可以添加更多RSS源
-            ]
+            rss_sources = CHINESE_RSS_SOURCES
 
             rss_success_count = 0
             rss_error_count = 0
@@ -431,6 +522,84 @@ class RealtimeNewsAggregator:
             logger.error(f"[中文财经新闻] 中文财经新闻获取失败: {e}")
             return []
 
+    def _get_eastmoney_news(self, ticker: str, hours_back: int) -> List[NewsItem]:
+        """通过AKShare获取东方财富个股新闻"""
+        news_items = []
+        logger.info(f"[中文财经新闻] 尝试通过 AKShare Provider 获取新闻")
+        from tradingagents.dataflows.providers.china.akshare import AKShareProvider
+
+        provider = AKShareProvider()
+
+        # 处理股票代码格式
+        # 如果是美股代码，不使用东方财富新闻
+        if '.' in ticker and any(suffix in ticker for suffix in ['.US', '.N', '.O', '.NYSE', '.NASDAQ']):
+            logger.info(f"[中文财经新闻] 检测到美股代码 {ticker}，跳过东方财富新闻获取")
+        else:
+            # 处理A股和港股代码
+            clean_ticker = ticker.replace('.SH', '').replace('.SZ', '').replace('.SS', '')\
+                            .replace('.HK', '').replace('.XSHE', '').replace('.XSHG', '')
+
+            # 获取东方财富新闻
+            logger.info(f"[中文财经新闻] 开始获取 {clean_ticker} 的东方财富新闻")
+            em_start_time = datetime.now(ZoneInfo(get_timezone_name()))
+            news_df = provider.get_stock_news_sync(symbol=clean_ticker)
+
+            if not news_df.empty:
+                logger.info(f"[中文财经新闻] 东方财富返回 {len(news_df)} 条新闻数据，开始处理")
+                processed_count = 0
+                skipped_count = 0
+                error_count = 0
+
+                # 转换为NewsItem格式
+                for _, row in news_df.iterrows():
+                    try:
+                        # 解析时间
+                        time_str = row.get('时间', '')
+                        if time_str:
+                            # 尝试解析时间格式，可能是'2023-01-01 12:34:56'格式
+                            try:
+                                publish_time = datetime.strptime(time_str, '%Y-%m-%d %H:%M:%S').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                            except:
+                                # 尝试其他可能的格式
+                                try:
+                                    publish_time = datetime.strptime(time_str, '%Y-%m-%d').replace(tzinfo=ZoneInfo(get_timezone_name()))
+                                except:
+                                    logger.warning(f"[中文财经新闻] 无法解析时间格式: {time_str}，使用当前时间")
+                                    publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+                        else:
+                            logger.warning(f"[中文财经新闻] 新闻时间为空，使用当前时间")
+                            publish_time = datetime.now(ZoneInfo(get_timezone_name()))
+
+                        # 检查时效性
+                        if publish_time < datetime.now(ZoneInfo(get_timezone_name())) - timedelta(hours=hours_back):
+                            skipped_count += 1
+                            continue
+
+                        # 评估紧急程度
+                        title = row.get('标题', '')
+                        content = row.get('内容', '')
+                        urgency = self._assess_news_urgency(title, content)
+
+                        news_items.append(NewsItem(
+                            title=title,
+                            content=content,
+                            source='东方财富',
+                            publish_time=publish_time,
+                            url=row.get('链接', ''),
+                            urgency=urgency,
+                            relevance_score=self._calculate_relevance(title, ticker)
+                        ))
+                        processed_count += 1
+                    except Exception as item_e:
+                        logger.error(f"[中文财经新闻] 处理东方财富新闻项目失败: {item_e}")
+                        error_count += 1
+                        continue
+
+                em_time = (datetime.now(ZoneInfo(get_timezone_name())) - em_start_time).total_seconds()
+                logger.info(f"[中文财经新闻] 东方财富新闻处理完成，成功: {processed_count}条，跳过: {skipped_count}条，错误: {error_count}条，耗时: {em_time:.2f}秒")
+
+        return news_items
+
     def _parse_rss_feed(self, rss_url: str, ticker: str, hours_back: int) -> List[NewsItem]:
         """解析RSS源"""
         logger.info(f"[RSS解析] 开始解析RSS源: {rss_url}，股票: {ticker}，回溯时间: {hours_back}小时")
@@ -442,7 +611,10 @@ class RealtimeNewsAggregator:
             import feedparser
 
             logger.info(f"[RSS解析] 尝试获取RSS源内容")
-            feed = feedparser.parse(rss_url)
+            # 通过共享会话下载（带超时），feedparser 只负责解析
+            response = self.session.get(rss_url, headers=self.headers, timeout=self.source_timeout)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
 
             if not feed or not feed.entries:
                 logger.warning(f"[RSS解析] RSS源未返回有效内容")
@@ -498,6 +670,8 @@ class RealtimeNewsAggregator:
         except ImportError:
             logger.error(f"[RSS解析] feedparser库未安装，无法解析RSS源")
             return []
+        except requests.Timeout:
+            raise  # 由聚合器记录为超时
         except Exception as e:
             logger.error(f"[RSS解析] 解析RSS源失败: {e}")
             return []
@@ -568,8 +742,8 @@ class RealtimeNewsAggregator:
         logger.debug(f"[相关性计算] 未检测到明确相关性，使用默认评分: 0.3，标题: {title[:50]}...")
         return 0.3  # 默认相关性
 
-    def _deduplicate_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
-        """去重新闻"""
+    def _deduplicate_news(self, news_items: List[NewsItem], ticker: Optional[str] = None) -> List[NewsItem]:
+        """去重新闻：标题精确去重后，再按 MinHash 近似去重（转载稿只保留一篇）"""
         logger.info(f"[新闻去重] 开始对 {len(news_items)} 条新闻进行去重处理")
         start_time = datetime.now(ZoneInfo(get_timezone_name()))
 
@@ -598,10 +772,20 @@ class RealtimeNewsAggregator:
             seen_titles.add(title_key)
             unique_news.append(item)
 
+        # 近似去重：与新闻同步任务共享该股票的索引
+        exact_count = len(unique_news)
+        unique_news = filter_near_duplicates(
+            unique_news, ticker,
+            get_title=lambda item: item.title,
+            get_content=lambda item: item.content,
+            get_key=lambda item: item.url or item.title.lower().strip(),
+        )
+        near_duplicate_count = exact_count - len(unique_news)
+
         # 记录去重结果
         time_taken = (datetime.now(ZoneInfo(get_timezone_name())) - start_time).total_seconds()
         logger.info(f"[新闻去重] 去重完成，原始新闻: {len(news_items)}条，去重后: {len(unique_news)}条，")
-        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
+        logger.info(f"[新闻去重] 去除重复: {duplicate_count}条，近似重复: {near_duplicate_count}条，标题过短: {short_title_count}条，耗时: {time_taken:.2f}秒")
 
         return unique_news
 
@@ -1,99 +1,47 @@
 """
 统一数据源提供器包
 按市场分类组织数据提供器
-"""
-from .base_provider import BaseStockDataProvider
-
-# 导入中国市场提供器（新路径）
-try:
-    from .china import (
-        AKShareProvider,
-        TushareProvider,
-        BaostockProvider as BaoStockProvider,
-        AKSHARE_AVAILABLE,
-        TUSHARE_AVAILABLE,
-        BAOSTOCK_AVAILABLE
-    )
-except ImportError:
-    # 向后兼容：尝试从旧路径导入
-    try:
-        from .tushare_provider import TushareProvider
-    except ImportError:
-        TushareProvider = None
-
-    try:
-        from .akshare_provider import AKShareProvider
-    except ImportError:
-        AKShareProvider = None
-
-    try:
-        from .baostock_provider import BaoStockProvider
-    except ImportError:
-        BaoStockProvider = None
-
-    AKSHARE_AVAILABLE = AKShareProvider is not None
-    TUSHARE_AVAILABLE = TushareProvider is not None
-    BAOSTOCK_AVAILABLE = BaoStockProvider is not None
-
-# 导入港股提供器
-try:
-    from .hk import (
-        ImprovedHKStockProvider,
-        get_improved_hk_provider,
-        HK_PROVIDER_AVAILABLE
-    )
-except ImportError:
-    ImprovedHKStockProvider = None
-    get_improved_hk_provider = None
-    HK_PROVIDER_AVAILABLE = False
 
-# 导入美股提供器
-try:
-    from .us import (
-        YFinanceUtils,
-        OptimizedUSDataProvider,
-        get_data_in_range,
-        YFINANCE_AVAILABLE,
-        OPTIMIZED_US_AVAILABLE,
-        FINNHUB_AVAILABLE
-    )
-except ImportError:
-    # 向后兼容：尝试从旧路径导入
-    try:
-        from ..yfin_utils import YFinanceUtils
-    except ImportError:
-        YFinanceUtils = None
-
-    try:
-        from ..optimized_us_data import OptimizedUSDataProvider
-    except ImportError:
-        OptimizedUSDataProvider = None
-
-    try:
-        from ..finnhub_utils import get_data_in_range
-    except ImportError:
-        get_data_in_range = None
-
-    YFINANCE_AVAILABLE = YFinanceUtils is not None
-    OPTIMIZED_US_AVAILABLE = OptimizedUSDataProvider is not None
-    FINNHUB_AVAILABLE = get_data_in_range is not None
-
-# 其他提供器（预留）
-try:
-    from .yahoo_provider import YahooProvider
-except ImportError:
-    YahooProvider = None
+各市场提供器依赖的 SDK（Tushare、AKShare、BaoStock、yfinance 等）导入较慢，
+除基类外均在首次访问时才导入。
+"""
+from tradingagents.utils.lazy_import import lazy_exports
 
-try:
-    from .finnhub_provider import FinnhubProvider
-except ImportError:
-    FinnhubProvider = None
+from .base_provider import BaseStockDataProvider
 
-# TDXProvider 已移除
-# try:
-#     from .tdx_provider import TDXProvider
-# except ImportError:
-#     TDXProvider = None
+lazy_exports(globals(), {
+    # 中国市场提供器（新路径优先，兼容旧路径）
+    "AKShareProvider": [".china:AKShareProvider", ".akshare_provider:AKShareProvider"],
+    "TushareProvider": [".china:TushareProvider", ".tushare_provider:TushareProvider"],
+    "BaoStockProvider": [".china:BaostockProvider", ".baostock_provider:BaoStockProvider"],
+
+    # 港股提供器
+    "ImprovedHKStockProvider": ".hk:ImprovedHKStockProvider",
+    "get_improved_hk_provider": ".hk:get_improved_hk_provider",
+
+    # 美股提供器（新路径优先，兼容旧路径）
+    "YFinanceUtils": [".us:YFinanceUtils", "..yfin_utils:YFinanceUtils"],
+    "OptimizedUSDataProvider": [".us:OptimizedUSDataProvider", "..optimized_us_data:OptimizedUSDataProvider"],
+    "get_data_in_range": [".us:get_data_in_range", "..finnhub_utils:get_data_in_range"],
+
+    # 其他提供器（预留）
+    "YahooProvider": ".yahoo_provider:YahooProvider",
+    "FinnhubProvider": ".finnhub_provider:FinnhubProvider",
+    # TDXProvider 已移除
+}, optional=[
+    "AKShareProvider", "TushareProvider", "BaoStockProvider",
+    "ImprovedHKStockProvider", "get_improved_hk_provider",
+    "YFinanceUtils", "OptimizedUSDataProvider", "get_data_in_range",
+    "YahooProvider", "FinnhubProvider",
+], availability={
+    "AKSHARE_AVAILABLE": "AKShareProvider",
+    "TUSHARE_AVAILABLE": "TushareProvider",
+    "BAOSTOCK_AVAILABLE": "BaoStockProvider",
+    "HK_PROVIDER_AVAILABLE": "ImprovedHKStockProvider",
+    "YFINANCE_AVAILABLE": "YFinanceUtils",
+    "OPTIMIZED_US_AVAILABLE": "OptimizedUSDataProvider",
+    "FINNHUB_AVAILABLE": "get_data_in_range",
+})
 
 __all__ = [
     # 基类
@@ -1,39 +1,21 @@
 """
 中国市场数据提供器
-包含 A股、港股等中国市场的数据源
+包含 A股、港股等中国市场的数据源（首次访问时才导入对应 SDK）
 """
+from tradingagents.utils.lazy_import import lazy_exports
 
-# 导入 AKShare 提供器
-try:
-    from .akshare import AKShareProvider
-    AKSHARE_AVAILABLE = True
-except ImportError:
-    AKShareProvider = None
-    AKSHARE_AVAILABLE = False
-
-# 导入 Tushare 提供器
-try:
-    from .tushare import TushareProvider
-    TUSHARE_AVAILABLE = True
-except ImportError:
-    TushareProvider = None
-    TUSHARE_AVAILABLE = False
-
-# 导入 Baostock 提供器
-try:
-    from .baostock import BaostockProvider
-    BAOSTOCK_AVAILABLE = True
-except ImportError:
-    BaostockProvider = None
-    BAOSTOCK_AVAILABLE = False
-
-# 导入基本面快照工具
-try:
-    from .fundamentals_snapshot import get_fundamentals_snapshot
-    FUNDAMENTALS_SNAPSHOT_AVAILABLE = True
-except ImportError:
-    get_fundamentals_snapshot = None
-    FUNDAMENTALS_SNAPSHOT_AVAILABLE = False
+lazy_exports(globals(), {
+    "AKShareProvider": ".akshare:AKShareProvider",
+    "TushareProvider": ".tushare:TushareProvider",
+    "BaostockProvider": ".baostock:BaostockProvider",
+    # 基本面快照工具
+    "get_fundamentals_snapshot": ".fundamentals_snapshot:get_fundamentals_snapshot",
+}, optional=["AKShareProvider", "TushareProvider", "BaostockProvider", "get_fundamentals_snapshot"], availability={
+    "AKSHARE_AVAILABLE": "AKShareProvider",
+    "TUSHARE_AVAILABLE": "TushareProvider",
+    "BAOSTOCK_AVAILABLE": "BaostockProvider",
+    "FUNDAMENTALS_SNAPSHOT_AVAILABLE": "get_fundamentals_snapshot",
+})
 
 __all__ = [
     'AKShareProvider',
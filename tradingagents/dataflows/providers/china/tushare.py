@@ -21,6 +21,32 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# ts.pro_bar 复权时处理的价格列
+QFQ_PRICE_COLS = ['open', 'close', 'high', 'low', 'pre_close']
+
+
+def apply_qfq_cross_section(daily: pd.DataFrame, factors: pd.Series, anchor_factors: pd.Series) -> pd.DataFrame:
+    """对某个交易日的全市场日线做前复权，结果与逐只股票调用 ts.pro_bar(adj='qfq') 一致
+
+    Args:
+        daily: api.daily(trade_date=...) 返回的原始日线（含 ts_code）
+        factors: 当日复权因子（index 为 ts_code）
+        anchor_factors: 同步区间最后一个交易日的复权因子（index 为 ts_code），
+            对应 pro_bar 中作为分母的最新复权因子
+
+    缺少复权因子的股票保持不复权价格。
+    """
+    df = daily.copy()
+    ratio = (df['ts_code'].map(factors) / df['ts_code'].map(anchor_factors)).fillna(1.0)
+    for col in QFQ_PRICE_COLS:
+        if col in df.columns:
+            # 与 pro_bar 相同：乘以因子比后按 '%.2f' 格式化再转回 float
+            df[col] = (df[col] * ratio).map(lambda x: float('%.2f' % x))
+    if 'close' in df.columns and 'pre_close' in df.columns:
+        df['change'] = df['close'] - df['pre_close']
+        df['pct_chg'] = (df['change'] / df['pre_close'] * 100).map(lambda x: float('%.2f' % x))
+    return df
+
 
 class TushareProvider(BaseStockDataProvider):
     """
@@ -617,6 +643,57 @@ class TushareProvider(BaseStockDataProvider):
             self.logger.error(f"❌ 获取每日基础数据失败 trade_date={trade_date}: {e}")
             return None
     
+    async def get_trade_dates(self, start_date: Union[str, date], end_date: Union[str, date]) -> Optional[List[str]]:
+        """获取区间内的交易日（升序，YYYY-MM-DD）"""
+        if not self.is_available():
+            return None
+
+        try:
+            df = await asyncio.to_thread(
+                self.api.trade_cal,
+                exchange='SSE',
+                start_date=self._format_date(start_date),
+                end_date=self._format_date(end_date),
+                is_open='1'
+            )
+            if df is None or df.empty:
+                return []
+            return sorted(f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in df['cal_date'].astype(str))
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取交易日历失败 {start_date}~{end_date}: {e}")
+            return None
+
+    async def get_daily_by_trade_date(self, trade_date: Union[str, date]) -> Optional[pd.DataFrame]:
+        """获取某个交易日全市场的日线（未复权，一次调用返回所有股票）"""
+        if not self.is_available():
+            return None
+
+        try:
+            df = await asyncio.to_thread(self.api.daily, trade_date=self._format_date(trade_date))
+            if df is None or df.empty:
+                return None
+            return df
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取全市场日线失败 trade_date={trade_date}: {e}")
+            return None
+
+    async def get_adj_factors_by_trade_date(self, trade_date: Union[str, date]) -> Optional[pd.Series]:
+        """获取某个交易日全市场的复权因子（index 为 ts_code）"""
+        if not self.is_available():
+            return None
+
+        try:
+            df = await asyncio.to_thread(self.api.adj_factor, trade_date=self._format_date(trade_date))
+            if df is None or df.empty:
+                return None
+            return df.set_index('ts_code')['adj_factor'].astype(float)
+
+        except Exception as e:
+            self.logger.error(f"❌ 获取复权因子失败 trade_date={trade_date}: {e}")
+            return None
+
     async def find_latest_trade_date(self) -> Optional[str]:
         """查找最新交易日期"""
         if not self.is_available():
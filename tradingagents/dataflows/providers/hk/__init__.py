@@ -1,28 +1,21 @@
 """
-港股数据提供器
+港股数据提供器（首次访问时才导入）
 """
+from tradingagents.utils.lazy_import import lazy_exports
 
-# 导入改进的港股工具
-try:
-    from .improved_hk import (
-        ImprovedHKStockProvider,
-        get_improved_hk_provider,
-        get_hk_stock_info_improved
-    )
-    HK_PROVIDER_AVAILABLE = True
-except ImportError:
-    ImprovedHKStockProvider = None
-    get_improved_hk_provider = None
-    get_hk_stock_info_improved = None
-    HK_PROVIDER_AVAILABLE = False
-
-# 导入港股数据工具
-try:
-    from .hk_stock import HKStockProvider
-    HK_STOCK_AVAILABLE = True
-except ImportError:
-    HKStockProvider = None
-    HK_STOCK_AVAILABLE = False
+lazy_exports(globals(), {
+    # 改进的港股工具
+    "ImprovedHKStockProvider": ".improved_hk:ImprovedHKStockProvider",
+    "get_improved_hk_provider": ".improved_hk:get_improved_hk_provider",
+    "get_hk_stock_info_improved": ".improved_hk:get_hk_stock_info_improved",
+    # 港股数据工具
+    "HKStockProvider": ".hk_stock:HKStockProvider",
+}, optional=[
+    "ImprovedHKStockProvider", "get_improved_hk_provider", "get_hk_stock_info_improved", "HKStockProvider",
+], availability={
+    "HK_PROVIDER_AVAILABLE": "ImprovedHKStockProvider",
+    "HK_STOCK_AVAILABLE": "HKStockProvider",
+})
 
 __all__ = [
     'ImprovedHKStockProvider',
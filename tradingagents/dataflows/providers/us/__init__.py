@@ -1,34 +1,22 @@
 """
 美股数据提供器
-包含 Finnhub, Yahoo Finance 等美股数据源
+包含 Finnhub, Yahoo Finance 等美股数据源（首次访问时才导入对应 SDK）
 """
+from tradingagents.utils.lazy_import import lazy_exports
 
-# 导入 Finnhub 工具
-try:
-    from .finnhub import get_data_in_range
-    FINNHUB_AVAILABLE = True
-except ImportError:
-    get_data_in_range = None
-    FINNHUB_AVAILABLE = False
-
-# 导入 Yahoo Finance 工具
-try:
-    from .yfinance import YFinanceUtils
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFinanceUtils = None
-    YFINANCE_AVAILABLE = False
-
-# 导入优化的美股数据提供器
-try:
-    from .optimized import OptimizedUSDataProvider
-    OPTIMIZED_US_AVAILABLE = True
-except ImportError:
-    OptimizedUSDataProvider = None
-    OPTIMIZED_US_AVAILABLE = False
-
-# 默认使用优化的提供器
-DefaultUSProvider = OptimizedUSDataProvider
+lazy_exports(globals(), {
+    # Finnhub
+    "get_data_in_range": ".finnhub:get_data_in_range",
+    # Yahoo Finance
+    "YFinanceUtils": ".yfinance:YFinanceUtils",
+    # 优化的美股数据提供器（默认使用）
+    "OptimizedUSDataProvider": ".optimized:OptimizedUSDataProvider",
+    "DefaultUSProvider": ".optimized:OptimizedUSDataProvider",
+}, optional=["get_data_in_range", "YFinanceUtils", "OptimizedUSDataProvider", "DefaultUSProvider"], availability={
+    "FINNHUB_AVAILABLE": "get_data_in_range",
+    "YFINANCE_AVAILABLE": "YFinanceUtils",
+    "OPTIMIZED_US_AVAILABLE": "OptimizedUSDataProvider",
+})
 
 __all__ = [
     # Finnhub
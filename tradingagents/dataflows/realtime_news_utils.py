@@ -6,12 +6,14 @@
 
 from tradingagents.dataflows.news.realtime_news import (
     get_realtime_stock_news,
+    get_news_source_latency_stats,
     RealtimeNewsAggregator,
     NewsItem
 )
 
 __all__ = [
     'get_realtime_stock_news',
+    'get_news_source_latency_stats',
     'RealtimeNewsAggregator',
     'NewsItem'
 ]
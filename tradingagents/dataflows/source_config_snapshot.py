@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+数据源配置快照
+
+DataSourceManager / USDataSourceManager 排序降级数据源、读取启用状态和 API Key 时，
+原先每次都同步查询 system_configs / datasource_groupings，一次分析中每个工具调用都要查一次。
+这里维护进程内共享、带版本号的配置快照：
+- 加载时按市场分类预先算好数据源优先级列表，热路径只做内存字典读取
+- 每隔 DATA_SOURCE_CONFIG_POLL_SECONDS（默认 10 秒）用轻量查询比较版本
+  （system_configs 的 _id / version，datasource_groupings 的数量和最近更新时间），变化时才重新加载
+- 配置服务修改数据源配置或优先级后调用 invalidate_source_config_snapshot()，本进程立即生效；
+  其他进程（如 Worker）在下一次版本检查时生效
+- 数据库不可用时快照 available=False，调用方使用各自的默认顺序，下一个检查周期再重试
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_float
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+# 预先计算优先级的市场分类（None 表示不区分市场）
+MARKET_CATEGORIES = (None, "a_shares", "us_stocks", "hk_stocks")
+
+
+@dataclass
+class SourceConfigSnapshot:
+    """某一版本的数据源配置，加载后只读"""
+
+    version: Tuple = ()
+    # 是否成功从数据库加载；为 False 时调用方使用默认配置
+    available: bool = False
+    # system_configs 中是否有 data_source_configs
+    has_config: bool = False
+    # 已启用的数据源配置，按优先级降序（数字越大优先级越高）
+    enabled_configs: List[Dict[str, Any]] = field(default_factory=list)
+    # 市场分类 -> 已启用数据源类型（小写）的优先级列表
+    china_priority: Dict[Optional[str], List[str]] = field(default_factory=dict)
+    # {数据源名称(小写): {api_key, api_secret, config_params}}
+    datasource_configs: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # datasource_groupings 中 us_stocks 分类下启用的数据源名称（小写），按优先级降序
+    us_groupings: List[str] = field(default_factory=list)
+    loaded_at: float = 0.0
+
+    @property
+    def enabled_types(self) -> set:
+        return {ds.get('type', '').lower() for ds in self.enabled_configs}
+
+    def priority_types(self, market_category: Optional[str]) -> List[str]:
+        """指定市场分类的数据源类型优先级列表"""
+        types = self.china_priority.get(market_category)
+        if types is None:
+            types = _priority_for_category(self.enabled_configs, market_category)
+        return types
+
+
+def _priority_for_category(enabled_configs: List[Dict[str, Any]], market_category: Optional[str]) -> List[str]:
+    types = []
+    for ds in enabled_configs:
+        # 数据源配置了市场分类时，只在匹配的市场中使用
+        market_categories = ds.get('market_categories', [])
+        if market_categories and market_category and market_category not in market_categories:
+            continue
+        types.append(ds.get('type', '').lower())
+    return types
+
+
+def _default_db():
+    from app.core.database import get_mongo_db_sync
+    return get_mongo_db_sync()
+
+
+def read_version(db) -> Tuple:
+    """版本标识：任一数据源配置或分组变更后都会变化"""
+    config = db.system_configs.find_one({"is_active": True}, {"version": 1}, sort=[("version", -1)])
+    groupings = db.datasource_groupings
+    latest = groupings.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+    return (
+        str(config.get("_id")) if config else None,
+        config.get("version") if config else None,
+        groupings.count_documents({}),
+        str(latest.get("updated_at")) if latest else None,
+    )
+
+
+def load_snapshot(db, version: Tuple = ()) -> SourceConfigSnapshot:
+    """从数据库加载完整快照并预先计算各市场分类的优先级"""
+    config = db.system_configs.find_one({"is_active": True}, sort=[("version", -1)])
+    data_source_configs = (config or {}).get('data_source_configs') or []
+
+    enabled_configs = [ds for ds in data_source_configs if ds.get('enabled', True)]
+    enabled_configs.sort(key=lambda x: x.get('priority', 0), reverse=True)
+
+    categories = set(MARKET_CATEGORIES)
+    for ds in enabled_configs:
+        categories.update(ds.get('market_categories') or [])
+
+    datasource_configs = {}
+    for ds in data_source_configs:
+        datasource_configs[ds.get('name', '').lower()] = {
+            'api_key': ds.get('api_key', ''),
+            'api_secret': ds.get('api_secret', ''),
+            'config_params': ds.get('config_params', {})
+        }
+
+    groupings = db.datasource_groupings.find({
+        "market_category_id": "us_stocks",
+        "enabled": True
+    }).sort("priority", -1)
+
+    return SourceConfigSnapshot(
+        version=version,
+        available=True,
+        has_config=bool(data_source_configs),
+        enabled_configs=enabled_configs,
+        china_priority={c: _priority_for_category(enabled_configs, c) for c in categories},
+        datasource_configs=datasource_configs,
+        us_groupings=[g.get('data_source_name', '').lower() for g in groupings],
+        loaded_at=time.time(),
+    )
+
+
+class SourceConfigCache:
+    """进程内共享的数据源配置快照，按版本号轮询刷新，线程安全"""
+
+    def __init__(self, db_getter: Optional[Callable[[], Any]] = None, poll_seconds: Optional[float] = None):
+        """
+        Args:
+            db_getter: 返回同步数据库对象的函数，默认 app.core.database.get_mongo_db_sync
+            poll_seconds: 版本检查间隔（秒），默认读取 DATA_SOURCE_CONFIG_POLL_SECONDS（10 秒）
+        """
+        self._db_getter = db_getter or _default_db
+        self.poll_seconds = (
+            get_float("DATA_SOURCE_CONFIG_POLL_SECONDS", None, 10.0) if poll_seconds is None else poll_seconds
+        )
+        self._lock = threading.Lock()
+        self._snapshot: Optional[SourceConfigSnapshot] = None
+        self._next_check = 0.0
+        self.stats = {"version_checks": 0, "reloads": 0, "invalidations": 0, "errors": 0}
+
+    def get(self) -> SourceConfigSnapshot:
+        """当前快照；检查周期内直接返回内存中的快照"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or time.monotonic() >= self._next_check:
+                self._refresh()
+            return self._snapshot
+
+    def _refresh(self):
+        current = self._snapshot
+        try:
+            db = self._db_getter()
+            self.stats["version_checks"] += 1
+            version = read_version(db)
+            if current is None or not current.available or version != current.version:
+                self._snapshot = load_snapshot(db, version)
+                self.stats["reloads"] += 1
+                logger.info(f"🔄 [数据源配置快照] 已加载版本 {version[1]}，"
+                            f"启用数据源: {[ds.get('type') for ds in self._snapshot.enabled_configs]}")
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ [数据源配置快照] 从数据库读取失败: {e}，使用默认顺序")
+            if current is None or not current.available:
+                self._snapshot = SourceConfigSnapshot(loaded_at=time.time())
+        self._next_check = time.monotonic() + self.poll_seconds
+
+    def invalidate(self):
+        """配置变更后调用，下一次读取时重新检查版本"""
+        with self._lock:
+            self._next_check = 0.0
+            self.stats["invalidations"] += 1
+
+    def snapshot_info(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "available": snapshot.available if snapshot else False,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "poll_seconds": self.poll_seconds,
+            **self.stats,
+        }
+
+
+_cache: Optional[SourceConfigCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_source_config_cache() -> SourceConfigCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SourceConfigCache()
+        return _cache
+
+
+def get_source_config_snapshot() -> SourceConfigSnapshot:
+    """当前进程的数据源配置快照"""
+    return get_source_config_cache().get()
+
+
+def invalidate_source_config_snapshot():
+    """数据源配置或优先级变更后调用，使本进程的快照立即失效"""
+    get_source_config_cache().invalidate()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+数据源对冲请求
+
+DataSourceManager 原先按优先级逐个尝试数据源，只有前一个失败后才请求下一个，
+尾延迟是各数据源超时之和。开启对冲（DATA_SOURCE_HEDGING=true）后：
+- 先请求第一个数据源，超过它的 p95 耗时仍未返回时，并行请求下一个数据源
+- 某个数据源返回无效结果或异常时，立即请求下一个，不再等待
+- 第一个有效结果胜出；落后的请求在后台完成，只用于更新统计
+- 主请求和失败后的降级请求各自使用独立线程，不在线程池中排队；线程池只执行按时间发起的对冲请求，
+  大小由 DATA_SOURCE_HEDGE_MAX_WORKERS 限制，已满时不再发起对冲，避免连锁对冲
+- 按 (数据类型, 数据源) 记录耗时与错误率，错误率过高的备用数据源在优先级中后移
+
+对冲会增加备用数据源（Tushare/AKShare 等）的配额消耗，默认关闭，此时在调用线程中依次尝试，
+与原先的降级行为一致。
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_bool, get_float, get_int
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+# 统计窗口（每个数据源保留最近的请求数）
+STATS_WINDOW = 100
+# 样本数达到该值后才使用 p95 / 错误率
+MIN_SAMPLES = 5
+# 错误率达到该值的备用数据源后移
+UNHEALTHY_ERROR_RATE = 0.5
+MAX_WORKERS = 8
+
+# 对冲线程内再次发起的请求直接依次执行，避免嵌套对冲占满线程池
+_worker_state = threading.local()
+
+
+def _mark_worker():
+    _worker_state.active = True
+
+
+class SourceStats:
+    """单个数据源最近请求的耗时与成败"""
+
+    def __init__(self, window: int = STATS_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self.hedged = 0
+        self.wins = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self._latencies.append(seconds)
+            self._outcomes.append(ok)
+
+    @property
+    def samples(self) -> int:
+        return len(self._outcomes)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return 1 - sum(self._outcomes) / len(self._outcomes)
+
+    def is_unhealthy(self) -> bool:
+        return self.samples >= MIN_SAMPLES and self.error_rate() >= UNHEALTHY_ERROR_RATE
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "samples": self.samples,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 4),
+            "hedged": self.hedged,
+            "wins": self.wins,
+        }
+
+
+class SourceHedger:
+    """按数据源耗时分布发起对冲请求，线程安全"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        default_delay: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            enabled: 是否并行对冲，默认读取 DATA_SOURCE_HEDGING（默认关闭）
+            min_delay / max_delay: 对冲等待时间（p95）的上下限（秒）
+            default_delay: 样本不足时的对冲等待时间（秒）
+            max_workers: 同时进行的对冲请求上限，默认读取 DATA_SOURCE_HEDGE_MAX_WORKERS
+        """
+        self.enabled = get_bool("DATA_SOURCE_HEDGING", None, False) if enabled is None else enabled
+        self.min_delay = get_float("DATA_SOURCE_HEDGE_MIN_DELAY", None, 0.5) if min_delay is None else min_delay
+        self.max_delay = get_float("DATA_SOURCE_HEDGE_MAX_DELAY", None, 10.0) if max_delay is None else max_delay
+        self.default_delay = (
+            get_float("DATA_SOURCE_HEDGE_DEFAULT_DELAY", None, 3.0) if default_delay is None else default_delay
+        )
+        self._max_workers = (
+            get_int("DATA_SOURCE_HEDGE_MAX_WORKERS", None, MAX_WORKERS) if max_workers is None else max_workers
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], SourceStats] = {}
+
+    def stats(self, kind: str, source: str) -> SourceStats:
+        with self._lock:
+            stats = self._stats.get((kind, source))
+            if stats is None:
+                stats = self._stats[(kind, source)] = SourceStats()
+            return stats
+
+    def hedge_delay(self, kind: str, source: str) -> float:
+        """启动下一个数据源前等待的时间：该数据源的 p95 耗时（限制在上下限内）"""
+        p95 = self.stats(kind, source).p95()
+        if p95 is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, p95))
+
+    def order(self, kind: str, sources: Iterable[Any]) -> List[Any]:
+        """按错误率调整优先级：近期错误率过高的数据源后移，其余保持配置顺序"""
+        sources = list(sources)
+        return sorted(sources, key=lambda s: self.stats(kind, _name(s)).is_unhealthy())
+
+    def fetch(
+        self,
+        kind: str,
+        sources: Iterable[Any],
+        fetch: Callable[[Any], Any],
+        is_valid: Callable[[Any], bool],
+    ) -> Tuple[Any, Optional[Any], Any]:
+        """
+        按顺序请求数据源，返回第一个有效结果
+
+        Args:
+            kind: 数据类型（stock_data / fundamentals / news），统计按类型区分
+            sources: 按优先级排列的数据源，可以是生成器（需要下一个数据源时才取值）
+            fetch: fetch(source) -> 结果
+            is_valid: 判断结果是否有效
+
+        Returns:
+            (有效结果, 提供结果的数据源, 第一个数据源的结果)；全部失败时前两项为 None
+        """
+        if self.enabled and not getattr(_worker_state, "active", False):
+            return self._fetch_hedged(kind, iter(sources), fetch, is_valid)
+        return self._fetch_sequential(kind, iter(sources), fetch, is_valid)
+
+    def _call(self, kind: str, source, fetch, is_valid):
+        started = time.perf_counter()
+        try:
+            value, error = fetch(source), None
+            ok = bool(is_valid(value))
+        except Exception as e:
+            value, error, ok = None, e, False
+        self.stats(kind, _name(source)).record(time.perf_counter() - started, ok)
+        return value, ok, error
+
+    def _fetch_sequential(self, kind, sources, fetch, is_valid):
+        first = None
+        for index, source in enumerate(sources):
+            value, ok, error = self._call(kind, source, fetch, is_valid)
+            if index == 0:
+                first = value
+            if ok:
+                self.stats(kind, _name(source)).wins += 1
+                return value, source, first
+            _log_failure(kind, source, error)
+        return None, None, first
+
+    def _fetch_hedged(self, kind, sources, fetch, is_valid):
+        pending: Dict[Future, Tuple[int, Any]] = {}
+        launched: List[Any] = []
+        state = {"exhausted": False, "pool_full": False}
+        # 线程池已满时跳过的数据源，在降级时优先请求
+        sources_left: List[Any] = []
+        sources = _chain(sources_left, sources)
+
+        def launch(hedge: bool) -> bool:
+            if state["exhausted"]:
+                return False
+            source = next(sources, None)
+            if source is None:
+                state["exhausted"] = True
+                return False
+            if hedge:
+                future = self._submit_hedge(kind, source, fetch, is_valid)
+                if future is None:
+                    # 线程池已满：本次不再按时间发起对冲，数据源留到前面的请求失败后再请求
+                    state["pool_full"] = True
+                    sources_left.append(source)
+                    return False
+            else:
+                future = self._start_thread(kind, source, fetch, is_valid)
+            pending[future] = (len(launched), source)
+            launched.append(source)
+            return True
+
+        if not launch(hedge=False):
+            return None, None, None
+
+        first = None
+        while pending:
+            can_hedge = not state["exhausted"] and not state["pool_full"]
+            timeout = self.hedge_delay(kind, _name(launched[-1])) if can_hedge else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                slow = launched[-1]
+                if launch(hedge=True):
+                    self.stats(kind, _name(slow)).hedged += 1
+                    logger.info(f"🛡️ [对冲请求] {kind}: {_name(slow)} 超过 {timeout:.2f}秒未返回，"
+                                f"并行请求 {_name(launched[-1])}")
+                continue
+
+            for future in sorted(done, key=lambda f: pending[f][0]):
+                index, source = pending.pop(future)
+                value, ok, error = future.result()
+                if index == 0:
+                    first = value
+                if ok:
+                    self.stats(kind, _name(source)).wins += 1
+                    if index > 0:
+                        logger.info(f"✅ [对冲请求] {kind}: 采用 {_name(source)} 的结果")
+                    # 未返回的请求在后台完成，结果只计入统计
+                    return value, source, first
+                _log_failure(kind, source, error)
+                launch(hedge=False)
+        return None, None, first
+
+    def _start_thread(self, kind, source, fetch, is_valid) -> Future:
+        """在独立线程中请求 source（主请求和降级请求不占用对冲线程池）"""
+        future: Future = Future()
+        context = contextvars.copy_context()
+
+        def run():
+            _mark_worker()
+            try:
+                future.set_result(context.run(self._call, kind, source, fetch, is_valid))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="source-primary", daemon=True).start()
+        return future
+
+    def _submit_hedge(self, kind, source, fetch, is_valid) -> Optional[Future]:
+        """在对冲线程池中请求 source；线程池已满时返回 None"""
+        with self._lock:
+            if self._in_flight >= self._max_workers:
+                return None
+            self._in_flight += 1
+        context = contextvars.copy_context()
+        future = self._get_executor().submit(context.run, self._call, kind, source, fetch, is_valid)
+        future.add_done_callback(self._hedge_done)
+        return future
+
+    def _hedge_done(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="source-hedge", initializer=_mark_worker,
+                )
+            return self._executor
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """{数据类型: {数据源: 统计}}"""
+        with self._lock:
+            items = list(self._stats.items())
+        result: Dict[str, Dict[str, Any]] = {}
+        for (kind, source), stats in items:
+            result.setdefault(kind, {})[source] = stats.snapshot()
+        return result
+
+
+def _chain(first: List[Any], rest):
+    """先取 first 中（可在迭代过程中追加）的元素，再取 rest"""
+    while True:
+        if first:
+            yield first.pop(0)
+            continue
+        item = next(rest, None)
+        if item is None:
+            return
+        yield item
+
+
+def _name(source) -> str:
+    # ChinaDataSource.value 本身也是枚举（DataSourceCode），统一取到字符串
+    while hasattr(source, "value"):
+        source = source.value
+    return str(source)
+
+
+def _log_failure(kind: str, source, error: Optional[Exception]):
+    if error is not None:
+        logger.warning(f"⚠️ [对冲请求] {kind}: {_name(source)} 异常: {error}")
+    else:
+        logger.warning(f"⚠️ [对冲请求] {kind}: {_name(source)} 返回无效结果")
+
+
+_hedger: Optional[SourceHedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_source_hedger() -> SourceHedger:
+    """进程内共享的对冲器（各数据源统计在所有管理器实例间共享）"""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = SourceHedger()
+        return _hedger
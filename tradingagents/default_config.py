@@ -17,6 +17,9 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # Analyst execution: "sequential" runs analysts one after another,
+    # "parallel" fans them out concurrently and joins before the research debate
+    "analyst_execution_mode": os.getenv("ANALYST_EXECUTION_MODE", "sequential"),
     # Tool settings - 从环境变量读取，提供默认值
     "online_tools": os.getenv("ONLINE_TOOLS_ENABLED", "false").lower() == "true",
     "online_news": os.getenv("ONLINE_NEWS_ENABLED", "true").lower() == "true", 
@@ -1,18 +1,31 @@
 # TradingAgents/graph/__init__.py
+# 图构建依赖 LLM SDK 与全部智能体，按需导入：import graph.engine_pool 等轻量模块时不加载 trading_graph
 
-from .trading_graph import TradingAgentsGraph
-from .conditional_logic import ConditionalLogic
-from .setup import GraphSetup
-from .propagation import Propagator
-from .reflection import Reflector
-from .signal_processing import SignalProcessor
+from tradingagents.utils.lazy_import import lazy_exports
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
+lazy_exports(globals(), {
+    "TradingAgentsGraph": ".trading_graph:TradingAgentsGraph",
+    "GraphRunContext": ".trading_graph:GraphRunContext",
+    "GraphCancelledError": ".cancellation:GraphCancelledError",
+    "GraphEnginePool": ".engine_pool:GraphEnginePool",
+    "get_graph_engine_pool": ".engine_pool:get_graph_engine_pool",
+    "ConditionalLogic": ".conditional_logic:ConditionalLogic",
+    "GraphSetup": ".setup:GraphSetup",
+    "Propagator": ".propagation:Propagator",
+    "Reflector": ".reflection:Reflector",
+    "SignalProcessor": ".signal_processing:SignalProcessor",
+})
+
 __all__ = [
     "TradingAgentsGraph",
+    "GraphRunContext",
+    "GraphCancelledError",
+    "GraphEnginePool",
+    "get_graph_engine_pool",
     "ConditionalLogic",
     "GraphSetup",
     "Propagator",
@@ -0,0 +1,14 @@
+# TradingAgents/graph/cancellation.py
+# 图运行的协作式取消：调用方持有 threading.Event，propagate 在节点之间检查
+
+import threading
+
+
+class GraphCancelledError(Exception):
+    """图运行在节点之间被取消（cancel_event 已设置）"""
+
+
+def raise_if_cancelled(cancel_event: threading.Event | None) -> None:
+    """cancel_event 已设置时抛出 GraphCancelledError"""
+    if cancel_event is not None and cancel_event.is_set():
+        raise GraphCancelledError("分析已取消")
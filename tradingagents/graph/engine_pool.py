@@ -0,0 +1,168 @@
+# TradingAgents/graph/engine_pool.py
+"""
+已构建的 TradingAgentsGraph 引擎池
+
+构建 TradingAgentsGraph 需要创建 LLM 客户端、五个记忆集合、工具节点并编译 LangGraph，
+而这些在构建后只读，运行状态都放在 GraphRunContext 中，因此同一配置的实例可以被并发任务共享：
+- 按配置指纹（配置内容 + 分析师列表 + debug）缓存已构建的实例
+- 同一指纹同时只构建一次，其他任务等待构建完成后直接复用
+- 超过容量时淘汰最近最少使用的实例（正在运行的任务仍持有引用，不受影响）
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tradingagents.config.runtime_settings import get_int
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+DEFAULT_ANALYSTS = ["market", "fundamentals"]
+
+
+def set_config(config: Dict[str, Any]):
+    """同 dataflows.interface.set_config；数据接口模块较重，复用实例时它已随构建导入"""
+    from tradingagents.dataflows.interface import set_config as _set_config
+    _set_config(config)
+
+
+def config_fingerprint(config: Dict[str, Any], selected_analysts: Optional[List[str]] = None, debug: bool = False) -> str:
+    """配置指纹：内容相同的配置（键顺序无关）得到相同的指纹"""
+    payload = json.dumps(
+        {"config": config, "selected_analysts": list(selected_analysts or []), "debug": bool(debug)},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class GraphEnginePool:
+    """按配置指纹共享的 TradingAgentsGraph 实例池，线程安全"""
+
+    def __init__(self, max_size: int = 4, factory: Optional[Callable[..., Any]] = None):
+        """
+        Args:
+            max_size: 保留的实例数上限
+            factory: 构建函数，参数同 TradingAgentsGraph(selected_analysts, debug, config)，默认即 TradingAgentsGraph
+        """
+        self.max_size = max(1, max_size)
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._engines: "OrderedDict[str, Any]" = OrderedDict()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "build_seconds": 0.0}
+
+    def acquire(self, config: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        获取与配置对应的已构建实例，没有时构建一个
+
+        Args:
+            config: 分析配置，selected_analysts / debug 也从中读取
+
+        Returns:
+            (实例, 引擎信息)，引擎信息可直接传给 propagate(engine_metrics=...)
+        """
+        selected_analysts = config.get("selected_analysts") or DEFAULT_ANALYSTS
+        debug = config.get("debug", False)
+        key = config_fingerprint(config, selected_analysts, debug)
+        started = time.perf_counter()
+
+        engine = self._lookup(key)
+        built = False
+        if engine is None:
+            with self._lock:
+                build_lock = self._build_locks.setdefault(key, threading.Lock())
+            with build_lock:
+                # 等锁期间可能已由其他任务构建完成
+                engine = self._lookup(key)
+                if engine is None:
+                    engine = self._build(selected_analysts, debug, config)
+                    built = True
+                    self._store(key, engine)
+            with self._lock:
+                self._build_locks.pop(key, None)
+
+        if not built:
+            # 构建时会写入全局数据流配置，复用时保持一致
+            set_config(engine.config)
+
+        info = {
+            "pool_hit": not built,
+            "build_seconds": round(getattr(engine, "build_seconds", 0.0), 3),
+            "acquire_seconds": round(time.perf_counter() - started, 3),
+            "fingerprint": key[:12],
+            **self.snapshot(),
+        }
+        logger.info(
+            f"🔧 [引擎池] {'复用' if info['pool_hit'] else '新建'}分析引擎 {info['fingerprint']} "
+            f"(构建耗时 {info['build_seconds']:.2f}秒, 命中率 {info['pool_hit_rate']:.0%})"
+        )
+        return engine, info
+
+    def _lookup(self, key: str):
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                self.stats["hits"] += 1
+            return engine
+
+    def _build(self, selected_analysts: List[str], debug: bool, config: Dict[str, Any]):
+        factory = self._factory
+        if factory is None:
+            from tradingagents.graph.trading_graph import TradingAgentsGraph
+            factory = TradingAgentsGraph
+        started = time.perf_counter()
+        engine = factory(selected_analysts=selected_analysts, debug=debug, config=config)
+        elapsed = time.perf_counter() - started
+        if getattr(engine, "build_seconds", None) is None:
+            engine.build_seconds = elapsed
+        with self._lock:
+            self.stats["misses"] += 1
+            self.stats["build_seconds"] += elapsed
+        return engine
+
+    def _store(self, key: str, engine):
+        with self._lock:
+            self._engines[key] = engine
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_size:
+                evicted, _ = self._engines.popitem(last=False)
+                self.stats["evictions"] += 1
+                logger.info(f"♻️ [引擎池] 淘汰分析引擎 {evicted[:12]}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """池大小、命中率与累计构建耗时"""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._engines)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "pool_size": size,
+            "pool_max_size": self.max_size,
+            "pool_hits": stats["hits"],
+            "pool_misses": stats["misses"],
+            "pool_evictions": stats["evictions"],
+            "pool_hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "pool_build_seconds": round(stats["build_seconds"], 3),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._engines.clear()
+
+
+_POOL: Optional[GraphEnginePool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_graph_engine_pool() -> GraphEnginePool:
+    """进程内共享的引擎池，容量读取 TRADING_GRAPH_POOL_SIZE（默认 4）"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = GraphEnginePool(max_size=get_int("TRADING_GRAPH_POOL_SIZE", None, 4))
+        return _POOL
@@ -10,6 +10,7 @@ from tradingagents.agents.utils.agent_states import (
     InvestDebateState,
     RiskDebateState,
 )
+from tradingagents.agents.utils.instrument_context import resolve_instrument_context
 
 
 class Propagator:
@@ -22,7 +23,11 @@ class Propagator:
     def create_initial_state(
         self, company_name: str, trade_date: str
     ) -> Dict[str, Any]:
-        """Create the initial state for the agent graph."""
+        """Create the initial state for the agent graph.
+
+        证券信息（公司名称、市场、货币、板块、交易日历）在这里解析一次，
+        各节点通过 get_instrument_context(state) 读取，不再各自查询数据源。
+        """
         from langchain_core.messages import HumanMessage
 
         # 🔥 修复：创建明确的分析请求消息，而不是只传递股票代码
@@ -33,6 +38,7 @@ class Propagator:
             "messages": [HumanMessage(content=analysis_request)],
             "company_of_interest": company_name,
             "trade_date": str(trade_date),
+            "instrument_context": resolve_instrument_context(company_name, trade_date),
             "investment_debate_state": InvestDebateState(
                 {"history": "", "current_response": "", "count": 0}
             ),
@@ -1,5 +1,6 @@
 # TradingAgents/graph/setup.py
 
+import time
 from typing import Dict, Any
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, StateGraph, START
@@ -15,6 +16,20 @@ from .conditional_logic import ConditionalLogic
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
+# 分析师类型 -> (报告字段, 工具调用计数字段)
+ANALYST_STATE_KEYS = {
+    "market": ("market_report", "market_tool_call_count"),
+    "social": ("sentiment_report", "sentiment_tool_call_count"),
+    "news": ("news_report", "news_tool_call_count"),
+    "fundamentals": ("fundamentals_report", "fundamentals_tool_call_count"),
+}
+
+# 分析师执行模式: sequential（默认，依次执行）| parallel（并发扇出，汇合后进入研究辩论）
+ANALYST_EXECUTION_MODES = ("sequential", "parallel")
+
+# 并行模式下的汇合节点
+ANALYST_JOIN_NODE = "Analyst Join"
+
 
 class GraphSetup:
     """Handles the setup and configuration of the agent graph."""
@@ -159,13 +174,20 @@ class GraphSetup:
         # Create workflow
         workflow = StateGraph(AgentState)
 
-        # Add analyst nodes to the graph
-        for analyst_type, node in analyst_nodes.items():
-            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
-            workflow.add_node(
-                f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
+        analyst_mode = self.config.get("analyst_execution_mode", "sequential")
+        if analyst_mode not in ANALYST_EXECUTION_MODES:
+            logger.warning(f"⚠️ 未知的分析师执行模式: {analyst_mode}，使用 sequential")
+            analyst_mode = "sequential"
+
+        if analyst_mode == "parallel":
+            logger.info(f"⚡ [并行分析师] 并发执行: {selected_analysts}")
+            self._add_parallel_analysts(
+                workflow, selected_analysts, analyst_nodes, delete_nodes, tool_nodes
+            )
+        else:
+            self._add_sequential_analysts(
+                workflow, selected_analysts, analyst_nodes, delete_nodes, tool_nodes
             )
-            workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
 
         # Add other nodes
         workflow.add_node("Bull Researcher", bull_researcher_node)
@@ -177,32 +199,6 @@ class GraphSetup:
         workflow.add_node("Safe Analyst", safe_analyst)
         workflow.add_node("Risk Judge", risk_manager_node)
 
-        # Define edges
-        # Start with the first analyst
-        first_analyst = selected_analysts[0]
-        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
-
-        # Connect analysts in sequence
-        for i, analyst_type in enumerate(selected_analysts):
-            current_analyst = f"{analyst_type.capitalize()} Analyst"
-            current_tools = f"tools_{analyst_type}"
-            current_clear = f"Msg Clear {analyst_type.capitalize()}"
-
-            # Add conditional edges for current analyst
-            workflow.add_conditional_edges(
-                current_analyst,
-                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
-                [current_tools, current_clear],
-            )
-            workflow.add_edge(current_tools, current_analyst)
-
-            # Connect to next analyst or to Bull Researcher if this is the last analyst
-            if i < len(selected_analysts) - 1:
-                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
-                workflow.add_edge(current_clear, next_analyst)
-            else:
-                workflow.add_edge(current_clear, "Bull Researcher")
-
         # Add remaining edges
         workflow.add_conditional_edges(
             "Bull Researcher",
@@ -251,3 +247,126 @@ class GraphSetup:
 
         # Compile and return
         return workflow.compile()
+
+    def _add_sequential_analysts(
+        self, workflow, selected_analysts, analyst_nodes, delete_nodes, tool_nodes
+    ):
+        """依次执行分析师：每个分析师完成工具循环后再进入下一个"""
+        for analyst_type, node in analyst_nodes.items():
+            workflow.add_node(f"{analyst_type.capitalize()} Analyst", node)
+            workflow.add_node(
+                f"Msg Clear {analyst_type.capitalize()}", delete_nodes[analyst_type]
+            )
+            workflow.add_node(f"tools_{analyst_type}", tool_nodes[analyst_type])
+
+        # Start with the first analyst
+        first_analyst = selected_analysts[0]
+        workflow.add_edge(START, f"{first_analyst.capitalize()} Analyst")
+
+        # Connect analysts in sequence
+        for i, analyst_type in enumerate(selected_analysts):
+            current_analyst = f"{analyst_type.capitalize()} Analyst"
+            current_tools = f"tools_{analyst_type}"
+            current_clear = f"Msg Clear {analyst_type.capitalize()}"
+
+            # Add conditional edges for current analyst
+            workflow.add_conditional_edges(
+                current_analyst,
+                getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+                [current_tools, current_clear],
+            )
+            workflow.add_edge(current_tools, current_analyst)
+
+            # Connect to next analyst or to Bull Researcher if this is the last analyst
+            if i < len(selected_analysts) - 1:
+                next_analyst = f"{selected_analysts[i+1].capitalize()} Analyst"
+                workflow.add_edge(current_clear, next_analyst)
+            else:
+                workflow.add_edge(current_clear, "Bull Researcher")
+
+    def _add_parallel_analysts(
+        self, workflow, selected_analysts, analyst_nodes, delete_nodes, tool_nodes
+    ):
+        """并发执行分析师：每个分析师作为独立子图同时运行，全部完成后汇合到看涨研究员
+
+        分析师之间互不依赖，但共享 messages 通道会导致工具循环互相干扰，
+        因此每个分支在独立子图中维护自己的消息历史，只把报告和计数写回主图。
+        """
+        for analyst_type in selected_analysts:
+            subgraph = self._build_analyst_subgraph(
+                analyst_type,
+                analyst_nodes[analyst_type],
+                delete_nodes[analyst_type],
+                tool_nodes[analyst_type],
+            )
+            branch_name = f"{analyst_type.capitalize()} Analyst"
+            workflow.add_node(branch_name, self._create_analyst_branch(analyst_type, subgraph))
+            workflow.add_edge(START, branch_name)
+
+        # 汇合节点：等待所有分支完成，并清理消息（与顺序模式最后的 Msg Clear 等价）
+        workflow.add_node(ANALYST_JOIN_NODE, create_msg_delete())
+        workflow.add_edge(
+            [f"{analyst_type.capitalize()} Analyst" for analyst_type in selected_analysts],
+            ANALYST_JOIN_NODE,
+        )
+        workflow.add_edge(ANALYST_JOIN_NODE, "Bull Researcher")
+
+    def _build_analyst_subgraph(self, analyst_type, analyst_node, delete_node, tool_node):
+        """构建单个分析师的子图：分析师 ⇄ 工具 → 消息清理"""
+        analyst_name = f"{analyst_type.capitalize()} Analyst"
+        tools_name = f"tools_{analyst_type}"
+        clear_name = f"Msg Clear {analyst_type.capitalize()}"
+
+        subgraph = StateGraph(AgentState)
+        subgraph.add_node(analyst_name, analyst_node)
+        subgraph.add_node(tools_name, tool_node)
+        subgraph.add_node(clear_name, delete_node)
+
+        subgraph.add_edge(START, analyst_name)
+        subgraph.add_conditional_edges(
+            analyst_name,
+            getattr(self.conditional_logic, f"should_continue_{analyst_type}"),
+            [tools_name, clear_name],
+        )
+        subgraph.add_edge(tools_name, analyst_name)
+        subgraph.add_edge(clear_name, END)
+        return subgraph.compile()
+
+    def _create_analyst_branch(self, analyst_type, subgraph):
+        """把分析师子图包装成主图节点
+
+        主图中的并行节点执行时间互相重叠，无法用流式输出的时间间隔计时，
+        因此由分支自己统计子图内每个节点的耗时，通过 analyst_branch_timings 上报。
+        """
+        report_key, count_key = ANALYST_STATE_KEYS[analyst_type]
+        recursion_limit = self.config.get("max_recur_limit", 100)
+
+        def analyst_branch_node(state):
+            branch_state = dict(state)
+            timings = {}
+            last_time = time.time()
+
+            for chunk in subgraph.stream(
+                dict(state),
+                stream_mode="updates",
+                config={"recursion_limit": recursion_limit},
+            ):
+                now = time.time()
+                for node_name, node_update in chunk.items():
+                    if node_name.startswith('__'):
+                        continue
+                    timings[node_name] = timings.get(node_name, 0.0) + (now - last_time)
+                    if node_update:
+                        branch_state.update(node_update)
+                last_time = now
+
+            logger.info(
+                f"⚡ [并行分析师] {analyst_type} 分支完成，耗时 {sum(timings.values()):.2f}秒"
+            )
+            return {
+                report_key: branch_state.get(report_key, ""),
+                count_key: branch_state.get(count_key, 0),
+                "analyst_branch_timings": {analyst_type: timings},
+            }
+
+        return analyst_branch_node
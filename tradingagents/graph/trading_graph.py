@@ -3,13 +3,14 @@
 import os
 from pathlib import Path
 import json
+from dataclasses import dataclass, field
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
+import threading
 import time
 
 from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
+# langchain_anthropic 等可选 SDK 只在选择对应供应商时导入
 from tradingagents.llm_adapters import ChatDashScopeOpenAI, ChatGoogleOpenAI
 
 from langgraph.prebuilt import ToolNode
@@ -17,6 +18,7 @@ from langgraph.prebuilt import ToolNode
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
 from tradingagents.agents.utils.memory import FinancialSituationMemory
+from tradingagents.agents.utils.instrument_context import begin_run_stats, get_instrument_stats
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -31,6 +33,7 @@ from tradingagents.agents.utils.agent_states import (
 )
 from tradingagents.dataflows.interface import set_config
 
+from .cancellation import raise_if_cancelled
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
@@ -141,6 +144,7 @@ def create_llm_by_provider(provider: str, model: str, backend_url: str, temperat
         )
 
     elif provider.lower() == "anthropic":
+        from langchain_anthropic import ChatAnthropic
         return ChatAnthropic(
             model=model,
             base_url=backend_url,
@@ -190,6 +194,21 @@ def create_llm_by_provider(provider: str, model: str, backend_url: str, temperat
         )
 
 
+@dataclass
+class GraphRunContext:
+    """一次 propagate 的运行状态
+
+    TradingAgentsGraph 构建后只读（LLM、工具节点、记忆、已编译的图），
+    每次运行的可变状态放在这里，同一实例可以被多个线程同时使用。
+    """
+
+    ticker: str
+    trade_date: Any
+    task_id: Optional[str] = None
+    curr_state: Optional[Dict[str, Any]] = None
+    log_states: Dict[str, Any] = field(default_factory=dict)
+
+
 class TradingAgentsGraph:
     """Main class that orchestrates the trading agents framework."""
 
@@ -206,8 +225,10 @@ class TradingAgentsGraph:
             debug: Whether to run in debug mode
             config: Configuration dictionary. If None, uses default config
         """
+        build_started = time.perf_counter()
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
+        self.selected_analysts = list(selected_analysts)
 
         # Update the interface's config
         set_config(self.config)
@@ -360,6 +381,7 @@ class TradingAgentsGraph:
             logger.info(f"🔧 [Anthropic-快速模型] max_tokens={quick_max_tokens}, temperature={quick_temperature}, timeout={quick_timeout}s")
             logger.info(f"🔧 [Anthropic-深度模型] max_tokens={deep_max_tokens}, temperature={deep_temperature}, timeout={deep_timeout}s")
 
+            from langchain_anthropic import ChatAnthropic
             self.deep_thinking_llm = ChatAnthropic(
                 model=self.config["deep_think_llm"],
                 base_url=self.config["backend_url"],
@@ -803,14 +825,40 @@ class TradingAgentsGraph:
         self.reflector = Reflector(self.quick_thinking_llm)
         self.signal_processor = SignalProcessor(self.quick_thinking_llm)
 
-        # State tracking
-        self.curr_state = None
-        self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        # State tracking：每个线程最近一次运行的 GraphRunContext
+        self._local = threading.local()
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
 
+        self.build_seconds = time.perf_counter() - build_started
+        logger.info(f"⏱️ TradingAgentsGraph 构建完成，耗时 {self.build_seconds:.2f}秒")
+
+    @property
+    def current_run(self) -> Optional[GraphRunContext]:
+        """当前线程最近一次 propagate 的运行状态"""
+        return getattr(self._local, "run", None)
+
+    @property
+    def curr_state(self):
+        run = self.current_run
+        return run.curr_state if run else None
+
+    @property
+    def ticker(self):
+        run = self.current_run
+        return run.ticker if run else None
+
+    @property
+    def log_states_dict(self) -> Dict[str, Any]:
+        run = self.current_run
+        return run.log_states if run else {}
+
+    @property
+    def _current_task_id(self):
+        run = self.current_run
+        return run.task_id if run else None
+
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources.
 
@@ -869,7 +917,8 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date, progress_callback=None, task_id=None):
+    def propagate(self, company_name, trade_date, progress_callback=None, task_id=None, engine_metrics=None,
+                  cancel_event=None):
         """Run the trading agents graph for a company on a specific date.
 
         Args:
@@ -877,6 +926,9 @@ class TradingAgentsGraph:
             trade_date: Date for analysis
             progress_callback: Optional callback function for progress updates
             task_id: Optional task ID for tracking performance data
+            engine_metrics: Optional graph pool info (build time, pool hit) for performance_metrics
+            cancel_event: Optional threading.Event; once set, the run stops before the next node
+                and raises GraphCancelledError
         """
 
         # 添加详细的接收日志
@@ -885,8 +937,19 @@ class TradingAgentsGraph:
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的trade_date: '{trade_date}' (类型: {type(trade_date)})")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的task_id: '{task_id}'")
 
-        self.ticker = company_name
-        logger.debug(f"🔍 [GRAPH DEBUG] 设置self.ticker: '{self.ticker}'")
+        raise_if_cancelled(cancel_event)
+
+        # 运行状态只放在本次运行的上下文中，实例本身不被修改；
+        # 同一线程连续分析同一股票（如回测）时沿用已记录的各日期状态
+        previous = self.current_run
+        run = GraphRunContext(ticker=company_name, trade_date=trade_date, task_id=task_id)
+        if previous is not None and previous.ticker == company_name:
+            run.log_states = previous.log_states
+        self._local.run = run
+        logger.debug(f"🔍 [GRAPH DEBUG] 设置运行上下文 ticker: '{run.ticker}'")
+
+        # 证券上下文统计只计入本次运行（并发或之前的运行不影响）
+        instrument_stats = begin_run_stats()
 
         # Initialize state
         logger.debug(f"🔍 [GRAPH DEBUG] 创建初始状态，传递参数: company_name='{company_name}', trade_date='{trade_date}'")
@@ -898,12 +961,9 @@ class TradingAgentsGraph:
 
         # 初始化计时器
         node_timings = {}  # 记录每个节点的执行时间
+        branch_timings = {}  # 并行分析师分支上报的耗时 {analyst_type: {node_name: seconds}}
         total_start_time = time.time()  # 总体开始时间
-        current_node_start = None  # 当前节点开始时间
-        current_node_name = None  # 当前节点名称
-
-        # 保存task_id用于后续保存性能数据
-        self._current_task_id = task_id
+        last_chunk_time = total_start_time  # 上一个节点完成的时间
 
         # 根据是否有进度回调选择不同的stream_mode
         args = self.propagator.get_graph_args(use_progress_callback=bool(progress_callback))
@@ -912,20 +972,12 @@ class TradingAgentsGraph:
             # Debug mode with tracing and progress updates
             trace = []
             final_state = None
-            for chunk in self.graph.stream(init_agent_state, **args):
-                # 记录节点计时
-                for node_name in chunk.keys():
-                    if not node_name.startswith('__'):
-                        # 如果有上一个节点，记录其结束时间
-                        if current_node_name and current_node_start:
-                            elapsed = time.time() - current_node_start
-                            node_timings[current_node_name] = elapsed
-                            logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
-
-                        # 开始新节点计时
-                        current_node_name = node_name
-                        current_node_start = time.time()
-                        break
+            for chunk in self._stream_graph(init_agent_state, args, cancel_event):
+                # 记录节点计时（并行分支由节点自行上报耗时；values 模式的 chunk 是完整状态，无法计时）
+                if args.get("stream_mode") == "updates":
+                    last_chunk_time = self._record_node_timings(
+                        chunk, node_timings, last_chunk_time, branch_timings
+                    )
 
                 # 在 updates 模式下，chunk 格式为 {node_name: state_update}
                 # 在 values 模式下，chunk 格式为完整的状态
@@ -956,22 +1008,11 @@ class TradingAgentsGraph:
                 # 使用 updates 模式以便获取节点级别的进度
                 trace = []
                 final_state = None
-                for chunk in self.graph.stream(init_agent_state, **args):
-                    # 记录节点计时
-                    for node_name in chunk.keys():
-                        if not node_name.startswith('__'):
-                            # 如果有上一个节点，记录其结束时间
-                            if current_node_name and current_node_start:
-                                elapsed = time.time() - current_node_start
-                                node_timings[current_node_name] = elapsed
-                                logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
-                                logger.info(f"🔍 [TIMING] 节点切换: {current_node_name} → {node_name}")
-
-                            # 开始新节点计时
-                            current_node_name = node_name
-                            current_node_start = time.time()
-                            logger.info(f"🔍 [TIMING] 开始计时: {node_name}")
-                            break
+                for chunk in self._stream_graph(init_agent_state, args, cancel_event):
+                    # 记录节点计时（并行分支由节点自行上报耗时）
+                    last_chunk_time = self._record_node_timings(
+                        chunk, node_timings, last_chunk_time, branch_timings
+                    )
 
                     self._send_progress_update(chunk, progress_callback)
                     # 累积状态更新
@@ -986,20 +1027,12 @@ class TradingAgentsGraph:
                 # 使用stream模式以便计时，但不发送进度更新
                 trace = []
                 final_state = None
-                for chunk in self.graph.stream(init_agent_state, **args):
-                    # 记录节点计时
-                    for node_name in chunk.keys():
-                        if not node_name.startswith('__'):
-                            # 如果有上一个节点，记录其结束时间
-                            if current_node_name and current_node_start:
-                                elapsed = time.time() - current_node_start
-                                node_timings[current_node_name] = elapsed
-                                logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
-
-                            # 开始新节点计时
-                            current_node_name = node_name
-                            current_node_start = time.time()
-                            break
+                for chunk in self._stream_graph(init_agent_state, args, cancel_event):
+                    # 记录节点计时（并行分支由节点自行上报耗时；values 模式的 chunk 是完整状态，无法计时）
+                    if args.get("stream_mode") == "updates":
+                        last_chunk_time = self._record_node_timings(
+                            chunk, node_timings, last_chunk_time, branch_timings
+                        )
 
                     # 累积状态更新
                     if final_state is None:
@@ -1008,12 +1041,6 @@ class TradingAgentsGraph:
                         if not node_name.startswith('__'):
                             final_state.update(node_update)
 
-        # 记录最后一个节点的时间
-        if current_node_name and current_node_start:
-            elapsed = time.time() - current_node_start
-            node_timings[current_node_name] = elapsed
-            logger.info(f"⏱️ [{current_node_name}] 耗时: {elapsed:.2f}秒")
-
         # 计算总时间
         total_elapsed = time.time() - total_start_time
 
@@ -1028,16 +1055,27 @@ class TradingAgentsGraph:
         logger.info("🔍 [TIMING DEBUG] _print_timing_summary 调用完成")
 
         # 构建性能数据
-        performance_data = self._build_performance_data(node_timings, total_elapsed)
+        performance_data = self._build_performance_data(node_timings, total_elapsed, branch_timings)
+        performance_data["graph_engine"] = dict(engine_metrics) if engine_metrics else {
+            "pool_hit": None,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+        instrument = init_agent_state.get("instrument_context") or {}
+        performance_data["instrument_context"] = {
+            "company_name": instrument.get("company_name"),
+            "market": instrument.get("market"),
+            "board": instrument.get("board"),
+            **get_instrument_stats(instrument_stats),
+        }
 
         # 将性能数据添加到状态中
         final_state['performance_metrics'] = performance_data
 
         # Store current state for reflection
-        self.curr_state = final_state
+        run.curr_state = final_state
 
         # Log state
-        self._log_state(trade_date, final_state)
+        self._log_state(trade_date, final_state, run)
 
         # 获取模型信息
         model_info = ""
@@ -1056,6 +1094,16 @@ class TradingAgentsGraph:
         # Return decision and processed signal
         return final_state, decision
 
+    def _stream_graph(self, init_agent_state, args, cancel_event=None):
+        """逐节点执行图：每个节点完成后检查 cancel_event，已取消则关闭 stream，不再启动后续节点"""
+        stream = self.graph.stream(init_agent_state, **args)
+        try:
+            for chunk in stream:
+                yield chunk
+                raise_if_cancelled(cancel_event)
+        finally:
+            stream.close()
+
     def _send_progress_update(self, chunk, progress_callback):
         """发送进度更新到回调函数
 
@@ -1108,6 +1156,8 @@ class TradingAgentsGraph:
                 'Msg Clear Fundamentals': None,
                 'Msg Clear News': None,
                 'Msg Clear Social': None,
+                # 并行分析师汇合节点（不发送进度更新）
+                'Analyst Join': None,
                 # 研究员节点
                 'Bull Researcher': "🐂 看涨研究员",
                 'Bear Researcher': "🐻 看跌研究员",
@@ -1141,12 +1191,59 @@ class TradingAgentsGraph:
         except Exception as e:
             logger.error(f"❌ 进度更新失败: {e}", exc_info=True)
 
-    def _build_performance_data(self, node_timings: Dict[str, float], total_elapsed: float) -> Dict[str, Any]:
+    def _record_node_timings(
+        self,
+        chunk: Dict[str, Any],
+        node_timings: Dict[str, float],
+        last_chunk_time: float,
+        branch_timings: Dict[str, Dict[str, float]],
+    ) -> float:
+        """根据 updates 模式的 chunk 记录节点耗时
+
+        顺序执行时，两次 chunk 之间的间隔就是本次完成节点的耗时；
+        并行分析师分支彼此重叠，间隔不代表任何单个节点，改用分支自己上报的
+        analyst_branch_timings。同一节点多次执行（如工具循环）时耗时累加。
+
+        Args:
+            chunk: {node_name: state_update}
+            node_timings: 节点耗时字典（原地更新）
+            last_chunk_time: 上一个 chunk 到达的时间
+            branch_timings: 并行分支耗时字典（原地更新）
+
+        Returns:
+            本次 chunk 到达的时间
+        """
+        now = time.time()
+        for node_name, node_update in chunk.items():
+            if node_name.startswith('__'):
+                continue
+
+            reported = node_update.get("analyst_branch_timings") if isinstance(node_update, dict) else None
+            if reported:
+                for analyst_type, timings in reported.items():
+                    branch_timings[analyst_type] = timings
+                    for inner_node, elapsed in timings.items():
+                        node_timings[inner_node] = node_timings.get(inner_node, 0.0) + elapsed
+                    logger.info(f"⏱️ [并行分支 {analyst_type}] 耗时: {sum(timings.values()):.2f}秒")
+                continue
+
+            elapsed = now - last_chunk_time
+            node_timings[node_name] = node_timings.get(node_name, 0.0) + elapsed
+            logger.info(f"⏱️ [{node_name}] 耗时: {elapsed:.2f}秒")
+        return now
+
+    def _build_performance_data(
+        self,
+        node_timings: Dict[str, float],
+        total_elapsed: float,
+        branch_timings: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> Dict[str, Any]:
         """构建性能数据结构
 
         Args:
             node_timings: 每个节点的执行时间字典
             total_elapsed: 总执行时间
+            branch_timings: 并行分析师分支耗时（仅并行模式）
 
         Returns:
             性能数据字典
@@ -1188,7 +1285,20 @@ class TradingAgentsGraph:
         fastest_node = min(node_timings.items(), key=lambda x: x[1]) if node_timings else (None, 0)
         avg_time = sum(node_timings.values()) / len(node_timings) if node_timings else 0
 
+        # 并行分析师：各分支同时开始，阶段墙钟时间取最慢分支
+        parallel_analysts = None
+        if branch_timings:
+            branch_totals = {k: sum(v.values()) for k, v in branch_timings.items()}
+            wall_time = max(branch_totals.values())
+            parallel_analysts = {
+                "branches": {k: round(v, 2) for k, v in branch_totals.items()},
+                "wall_time": round(wall_time, 2),
+                "saved_time": round(sum(branch_totals.values()) - wall_time, 2),
+            }
+
         return {
+            "analyst_execution_mode": self.config.get("analyst_execution_mode", "sequential"),
+            "parallel_analysts": parallel_analysts,
             "total_time": round(total_elapsed, 2),
             "total_time_minutes": round(total_elapsed / 60, 2),
             "node_count": len(node_timings),
@@ -1332,9 +1442,10 @@ class TradingAgentsGraph:
         logger.info(f"  • 快速思考模型: {self.config.get('quick_think_llm', 'unknown')}")
         logger.info("=" * 80)
 
-    def _log_state(self, trade_date, final_state):
+    def _log_state(self, trade_date, final_state, run: Optional[GraphRunContext] = None):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        run = run or self.current_run
+        run.log_states[str(trade_date)] = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -1365,14 +1476,14 @@ class TradingAgentsGraph:
         }
 
         # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        directory = Path(f"eval_results/{run.ticker}/TradingAgentsStrategy_logs/")
         directory.mkdir(parents=True, exist_ok=True)
 
         with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
+            f"eval_results/{run.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
             "w",
         ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+            json.dump(run.log_states, f, indent=4)
 
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
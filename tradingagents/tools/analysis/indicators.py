@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import copy
+import math
+import pickle
+import sys
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -215,7 +220,7 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
     if name == "rsi":
         _require_cols(df, ["close"])
         n = int(params.get("n", params.get("period", 14)))
-        out[f"rsi{n}"] = rsi(df["close"], n)
+        out[f"rsi{n}"] = rsi(df["close"], n, method=params.get("method", "ema"))
         return out
 
     if name == "boll":
@@ -246,25 +251,23 @@ def compute_indicator(df: pd.DataFrame, spec: IndicatorSpec) -> pd.DataFrame:
     raise ValueError(f"不支持的指标: {name}")
 
 
-def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
-    if not specs:
-        return df.copy()
+def _unique_specs(specs: List[IndicatorSpec]) -> List[IndicatorSpec]:
     # 粗略去重（按 name+sorted(params)）
-    def key(s: IndicatorSpec):
-        p = s.params or {}
-        items = tuple(sorted(p.items()))
-        return (s.name.lower(), items)
-
-    unique_specs: List[IndicatorSpec] = []
+    unique: List[IndicatorSpec] = []
     seen = set()
     for s in specs:
-        k = key(s)
+        k = (s.name.lower(), tuple(sorted((s.params or {}).items())))
         if k not in seen:
             seen.add(k)
-            unique_specs.append(s)
+            unique.append(s)
+    return unique
 
+
+def compute_many(df: pd.DataFrame, specs: List[IndicatorSpec]) -> pd.DataFrame:
+    if not specs:
+        return df.copy()
     out = df.copy()
-    for s in unique_specs:
+    for s in _unique_specs(specs):
         out = compute_indicator(out, s)
     return out
 
@@ -351,3 +354,444 @@ def add_all_indicators(df: pd.DataFrame, close_col: str = 'close',
 
     return df
 
+
+
+# ---------------------------------------------------------------------------
+# 增量指标引擎
+# ---------------------------------------------------------------------------
+# 批量函数每次调用都要重算全部历史。下面的状态对象按 bar 逐根更新，
+# 每个指标只保留滚动窗口与递推状态（O(1) 更新），并逐步复现 pandas
+# rolling/ewm 的内部算法（Kahan 求和、Welford 方差、单调队列极值、ewm 递推），
+# 因此结果与上面的批量函数逐位一致。
+
+_NAN = float("nan")
+_MAX_FLOAT = sys.float_info.max
+
+
+class _RollingMean:
+    """rolling(window=n, min_periods=minp).mean() 的增量版本"""
+
+    def __init__(self, n: int, min_periods: int):
+        self.n = int(n)
+        self.minp = int(min_periods)
+        self.window: Deque[float] = deque()
+        self._reset(_NAN)
+
+    def _reset(self, first_value: float):
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev_value = first_value
+
+    def _add(self, val: float):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.same_ct += 1
+            else:
+                self.same_ct = 1
+            self.prev_value = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, val: float) -> float:
+        first = not self.window
+        self.window.append(val)
+        removed = self.window.popleft() if len(self.window) > max(self.n, 1) else None
+        if first or self.n <= 1:
+            # 首个窗口（以及窗口为1时的每根 bar）pandas 会重新初始化累加器
+            self._reset(val)
+        elif removed is not None:
+            self._remove(removed)
+        self._add(val)
+
+        if self.nobs >= self.minp and self.nobs > 0:
+            result = self.sum_x / self.nobs
+            if self.same_ct >= self.nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == self.nobs and result > 0:
+                result = 0.0
+            return result
+        return _NAN
+
+
+class _RollingStd:
+    """rolling(window=n, min_periods=minp).std()（ddof=1）的增量版本"""
+
+    def __init__(self, n: int, min_periods: int, ddof: int = 1):
+        self.n = int(n)
+        self.minp = max(int(min_periods), 1)
+        self.ddof = ddof
+        self.window: Deque[float] = deque()
+        self._reset(_NAN)
+
+    def _reset(self, first_value: float):
+        self.nobs = 0
+        self.mean_x = 0.0
+        self.ssqdm_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev_value = first_value
+
+    def _add(self, val: float):
+        if val != val:
+            return
+        self.nobs += 1
+        if val == self.prev_value:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev_value = val
+        prev_mean = self.mean_x - self.comp_add
+        y = val - self.comp_add
+        t = y - self.mean_x
+        self.comp_add = t + self.mean_x - y
+        if self.nobs:
+            self.mean_x = self.mean_x + t / self.nobs
+        else:
+            self.mean_x = 0.0
+        self.ssqdm_x = self.ssqdm_x + (val - prev_mean) * (val - self.mean_x)
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            if self.nobs:
+                prev_mean = self.mean_x - self.comp_remove
+                y = val - self.comp_remove
+                t = y - self.mean_x
+                self.comp_remove = t + self.mean_x - y
+                self.mean_x = self.mean_x - t / self.nobs
+                self.ssqdm_x = self.ssqdm_x - (val - prev_mean) * (val - self.mean_x)
+            else:
+                self.mean_x = 0.0
+                self.ssqdm_x = 0.0
+
+    def update(self, val: float) -> float:
+        first = not self.window
+        self.window.append(val)
+        removed = self.window.popleft() if len(self.window) > max(self.n, 1) else None
+        if first or self.n <= 1:
+            # 首个窗口（以及窗口为1时的每根 bar）pandas 会重新初始化累加器
+            self._reset(val)
+        elif removed is not None:
+            self._remove(removed)
+        self._add(val)
+
+        if self.nobs >= self.minp and self.nobs > self.ddof:
+            if self.nobs == 1 or self.same_ct >= self.nobs:
+                var = 0.0
+            else:
+                var = self.ssqdm_x / (self.nobs - float(self.ddof))
+        else:
+            return _NAN
+        return 0.0 if var < 0 else math.sqrt(var)
+
+
+class _RollingExtreme:
+    """rolling(window=n, min_periods=minp).max()/.min() 的增量版本（单调队列）"""
+
+    def __init__(self, n: int, min_periods: int, is_max: bool):
+        self.n = int(n)
+        self.minp = int(min_periods)
+        self.is_max = is_max
+        self.index = 0
+        self.nobs = 0
+        self.queue: Deque[Tuple[int, float]] = deque()  # 候选极值，队首为当前极值
+        self.window: Deque[Tuple[int, float]] = deque()  # 整个窗口，用于统计 nobs
+
+    def update(self, val: float) -> float:
+        k = self.index
+        self.index += 1
+
+        if val == val:
+            self.nobs += 1
+            ai = val
+        else:
+            ai = -_MAX_FLOAT if self.is_max else _MAX_FLOAT
+
+        q = self.queue
+        if self.is_max:
+            while q and (ai >= q[-1][1] or q[-1][1] != q[-1][1]):
+                q.pop()
+        else:
+            while q and (ai <= q[-1][1] or q[-1][1] != q[-1][1]):
+                q.pop()
+        q.append((k, val))
+        self.window.append((k, val))
+
+        start = k - self.n + 1
+        while q and q[0][0] <= start - 1:
+            q.popleft()
+        while self.window and self.window[0][0] <= start - 1:
+            _, old = self.window.popleft()
+            if old == old:
+                self.nobs -= 1
+
+        if q:
+            return q[0][1] if self.nobs >= self.minp else _NAN
+        return _NAN
+
+
+class _EWMean:
+    """ewm(com=..., adjust=...).mean() 的增量版本"""
+
+    def __init__(self, com: float, adjust: bool, min_periods: int = 0):
+        alpha = 1.0 / (1.0 + float(com))
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.minp = max(int(min_periods), 1)
+        self.started = False
+        self.weighted = _NAN
+        self.nobs = 0
+        self.old_wt = 1.0
+
+    @classmethod
+    def from_span(cls, span: int) -> "_EWMean":
+        return cls(com=(span - 1) / 2, adjust=False)
+
+    @classmethod
+    def from_alpha(cls, alpha: float) -> "_EWMean":
+        return cls(com=(1 - alpha) / alpha, adjust=False)
+
+    def update(self, cur: float) -> float:
+        if not self.started:
+            self.started = True
+            self.weighted = cur
+            self.nobs = int(cur == cur)
+            self.old_wt = 1.0
+        else:
+            is_observation = cur == cur
+            self.nobs += is_observation
+            if self.weighted == self.weighted:
+                self.old_wt *= self.old_wt_factor
+                if is_observation:
+                    if self.weighted != cur:
+                        self.weighted = self.old_wt * self.weighted + self.new_wt * cur
+                        self.weighted /= (self.old_wt + self.new_wt)
+                    if self.adjust:
+                        self.old_wt += self.new_wt
+                    else:
+                        self.old_wt = 1.0
+            elif is_observation:
+                self.weighted = cur
+        return self.weighted if self.nobs >= self.minp else _NAN
+
+
+def _sub(a: float, b: Optional[float]) -> float:
+    return _NAN if b is None else a - b
+
+
+def _div(a: float, b: float) -> float:
+    """pandas 语义的除法：除零得到 inf/NaN 而不是抛异常"""
+    if b == 0:
+        if a != a or a == 0:
+            return _NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _MAState:
+    def __init__(self, n: int):
+        self.column = f"ma{n}"
+        self.mean = _RollingMean(n, 1)
+
+    def update(self, high, low, close, prev_close):
+        return {self.column: self.mean.update(close)}
+
+
+class _EMAState:
+    def __init__(self, n: int):
+        self.column = f"ema{n}"
+        self.ema = _EWMean.from_span(int(n))
+
+    def update(self, high, low, close, prev_close):
+        return {self.column: self.ema.update(close)}
+
+
+class _MACDState:
+    def __init__(self, fast: int, slow: int, signal: int):
+        self.fast = _EWMean.from_span(int(fast))
+        self.slow = _EWMean.from_span(int(slow))
+        self.signal = _EWMean.from_span(int(signal))
+
+    def update(self, high, low, close, prev_close):
+        dif = self.fast.update(close) - self.slow.update(close)
+        dea = self.signal.update(dif)
+        return {"dif": dif, "dea": dea, "macd_hist": dif - dea}
+
+
+class _RSIState:
+    def __init__(self, n: int, method: str = 'ema', column: Optional[str] = None):
+        self.column = column or f"rsi{n}"
+        if method == 'ema':
+            self.avg_gain, self.avg_loss = _EWMean.from_alpha(1 / float(n)), _EWMean.from_alpha(1 / float(n))
+        elif method == 'sma':
+            self.avg_gain, self.avg_loss = _RollingMean(n, 1), _RollingMean(n, 1)
+        elif method == 'china':
+            self.avg_gain = _EWMean(com=int(n) - 1, adjust=True)
+            self.avg_loss = _EWMean(com=int(n) - 1, adjust=True)
+        else:
+            raise ValueError(f"不支持的RSI计算方法: {method}，支持的方法: 'ema', 'sma', 'china'")
+
+    def update(self, high, low, close, prev_close):
+        delta = _sub(close, prev_close)
+        # 与 delta.where(delta > 0, 0) / -delta.where(delta < 0, 0) 一致（含 -0.0）
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = self.avg_gain.update(gain)
+        avg_loss = self.avg_loss.update(loss)
+        rs = _NAN if avg_loss == 0 else avg_gain / avg_loss
+        return {self.column: 100 - (100 / (1 + rs))}
+
+
+class _BOLLState:
+    def __init__(self, n: int, k: float):
+        self.k = k
+        self.mean = _RollingMean(n, 1)
+        self.std = _RollingStd(n, 1)
+
+    def update(self, high, low, close, prev_close):
+        mid = self.mean.update(close)
+        std = self.std.update(close)
+        return {"boll_mid": mid, "boll_upper": mid + self.k * std, "boll_lower": mid - self.k * std}
+
+
+class _ATRState:
+    def __init__(self, n: int):
+        self.column = f"atr{n}"
+        self.mean = _RollingMean(n, n)
+
+    def update(self, high, low, close, prev_close):
+        candidates = [abs(high - low), abs(_sub(high, prev_close)), abs(_sub(low, prev_close))]
+        candidates = [v for v in candidates if v == v]
+        tr = max(candidates) if candidates else _NAN
+        return {self.column: self.mean.update(tr)}
+
+
+class _KDJState:
+    def __init__(self, n: int, m1: int, m2: int):
+        self.lowest = _RollingExtreme(n, n, is_max=False)
+        self.highest = _RollingExtreme(n, n, is_max=True)
+        self.alpha_k = 1 / float(m1)
+        self.alpha_d = 1 / float(m2)
+        self.last_k = 50.0
+        self.last_d = 50.0
+
+    def update(self, high, low, close, prev_close):
+        lowest_low = self.lowest.update(low)
+        highest_high = self.highest.update(high)
+        rsv = _div(close - lowest_low, highest_high - lowest_low) * 100
+        if rsv != rsv or math.isinf(rsv):
+            return {"kdj_k": _NAN, "kdj_d": _NAN, "kdj_j": _NAN}
+        curr_k = (1 - self.alpha_k) * self.last_k + self.alpha_k * rsv
+        curr_d = (1 - self.alpha_d) * self.last_d + self.alpha_d * curr_k
+        self.last_k, self.last_d = curr_k, curr_d
+        return {"kdj_k": curr_k, "kdj_d": curr_d, "kdj_j": 3 * curr_k - 2 * curr_d}
+
+
+def _make_state(spec: IndicatorSpec):
+    name = spec.name.lower()
+    params = spec.params or {}
+    if name == "ma":
+        return _MAState(int(params.get("n", params.get("period", 20))))
+    if name == "ema":
+        return _EMAState(int(params.get("n", params.get("period", 20))))
+    if name == "macd":
+        return _MACDState(int(params.get("fast", 12)), int(params.get("slow", 26)), int(params.get("signal", 9)))
+    if name == "rsi":
+        return _RSIState(int(params.get("n", params.get("period", 14))), params.get("method", "ema"))
+    if name == "boll":
+        return _BOLLState(int(params.get("n", 20)), float(params.get("k", 2.0)))
+    if name == "atr":
+        return _ATRState(int(params.get("n", 14)))
+    if name == "kdj":
+        return _KDJState(int(params.get("n", 9)), int(params.get("m1", 3)), int(params.get("m2", 3)))
+    raise ValueError(f"不支持的指标: {name}")
+
+
+class IncrementalIndicators:
+    """
+    单只股票的增量指标状态
+
+    与 compute_many 使用相同的 IndicatorSpec 和输出列名；先用历史K线预热一次，
+    之后每来一根新 bar 调用 update()，所有指标 O(1) 更新，结果与对完整历史调用
+    compute_many 的最后一行逐位一致。状态只包含普通 Python 对象，可直接 pickle
+    持久化（按股票代码保存/恢复）。
+
+    示例：
+        >>> state = IncrementalIndicators.from_history(df, specs)
+        >>> latest = state.update(close=10.5, high=10.8, low=10.1)
+    """
+
+    def __init__(self, specs: List[IndicatorSpec]):
+        self.specs = _unique_specs(specs)
+        self._states = [_make_state(s) for s in self.specs]
+        self._prev_close: Optional[float] = None
+        self.bars = 0
+        self.last: Dict[str, float] = {}
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, specs: List[IndicatorSpec]) -> "IncrementalIndicators":
+        state = cls(specs)
+        state.update_many(df)
+        return state
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Dict[str, float]:
+        """推进一根新 bar，返回该 bar 上所有指标的值"""
+        close = float(close)
+        high = close if high is None else float(high)
+        low = close if low is None else float(low)
+
+        values: Dict[str, float] = {}
+        for s in self._states:
+            values.update(s.update(high, low, close, self._prev_close))
+        self._prev_close = close
+        self.bars += 1
+        self.last = values
+        return values
+
+    def update_many(self, df: pd.DataFrame) -> pd.DataFrame:
+        """按顺序推进多根 bar，返回与输入同索引的指标列"""
+        needs_hl = any(isinstance(s, (_ATRState, _KDJState)) for s in self._states)
+        if needs_hl:
+            _require_cols(df, ["high", "low", "close"])
+        else:
+            _require_cols(df, ["close"])
+
+        closes = df["close"].to_numpy(dtype=float)
+        highs = df["high"].to_numpy(dtype=float) if "high" in df.columns else closes
+        lows = df["low"].to_numpy(dtype=float) if "low" in df.columns else closes
+        rows = [self.update(c, h, l) for c, h, l in zip(closes, highs, lows)]
+        return pd.DataFrame(rows, index=df.index)
+
+    def preview(self, close: float, high: Optional[float] = None, low: Optional[float] = None) -> Dict[str, float]:
+        """计算一根未收盘 bar（如盘中实时价）的指标而不推进状态"""
+        return copy.deepcopy(self).update(close, high, low)
+
+    def dumps(self) -> bytes:
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def loads(data: bytes) -> "IncrementalIndicators":
+        return pickle.loads(data)
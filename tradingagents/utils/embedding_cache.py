@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+文本向量缓存
+
+按 命名空间（通常为模型名）+ 文本内容 的哈希缓存 embedding：
+- 内存 LRU：同一进程内重复文本直接命中
+- 可选 SQLite 持久化：重启或重复运行时跳过已计算过的文本；按最近使用时间淘汰，
+  行数不超过 max_disk_items（默认内存上限的 DISK_ITEMS_FACTOR 倍）
+- get_or_compute：只对未命中的文本（去重后）调用一次批量计算函数
+
+同一命名空间的缓存在进程内共享（get_embedding_cache），不同模型的向量互不混用。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from tradingagents.config.runtime_settings import get_bool, get_int
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+DB_FILENAME = "embeddings.sqlite3"
+# SQLite 单条语句的参数数量上限以内分批查询
+_SQL_BATCH = 500
+# 磁盘缓存行数上限默认为内存上限的倍数
+DISK_ITEMS_FACTOR = 5
+
+
+def default_cache_dir() -> str:
+    """持久化目录：EMBEDDING_CACHE_DIR，未设置时为 dataflows/data_cache/embeddings"""
+    configured = os.getenv("EMBEDDING_CACHE_DIR")
+    if configured:
+        return configured
+    base = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataflows", "data_cache")
+    return os.path.join(base, "embeddings")
+
+
+class EmbeddingCache:
+    """内容哈希 -> 向量 的两级缓存（内存 LRU + 可选 SQLite），线程安全"""
+
+    def __init__(self, namespace: str, max_items: int = 20000, path: Optional[str] = None,
+                 max_disk_items: Optional[int] = None):
+        """
+        Args:
+            namespace: 命名空间（模型名等），参与哈希，不同模型的向量不会互相命中
+            max_items: 内存中保留的向量数上限
+            path: SQLite 文件路径，None 表示只用内存
+            max_disk_items: SQLite 文件中保留的向量数上限（所有命名空间合计），
+                None 表示 max_items * DISK_ITEMS_FACTOR
+        """
+        self.namespace = namespace
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items if max_disk_items is not None else max_items * DISK_ITEMS_FACTOR
+        self.path = path
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "computed_batches": 0,
+                      "computed_texts": 0, "compute_seconds": 0.0, "max_compute_seconds": 0.0}
+        if path:
+            self._open(path)
+
+    def _open(self, path: str):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                         "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, used_at REAL NOT NULL DEFAULT 0)")
+            # 旧版本创建的表没有 used_at 列，补上后旧数据视为最久未使用、优先淘汰
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(embeddings)")}
+            if "used_at" not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_used_at ON embeddings (used_at)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 向量缓存文件不可用，仅使用内存缓存: {path} ({e})")
+
+    def key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """按顺序返回缓存的向量，未命中为 None"""
+        keys = [self.key(text) for text in texts]
+        result: List[Optional[np.ndarray]] = [None] * len(keys)
+        with self._lock:
+            pending: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    pending.setdefault(key, []).append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    result[i] = vector
+                    self.stats["hits"] += 1
+
+            for key, vector in self._load(list(pending)).items():
+                self._remember(key, vector)
+                for i in pending.pop(key):
+                    result[i] = vector
+                    self.stats["disk_hits"] += 1
+            self.stats["misses"] += sum(len(positions) for positions in pending.values())
+        return result
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[np.ndarray]):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes(), time.time()))
+            self._store(rows)
+
+    def get_or_compute(self, texts: Sequence[str], compute: Callable[[List[str]], Sequence[np.ndarray]]) -> np.ndarray:
+        """
+        取一批文本的向量，未命中的文本去重后调用一次 compute 批量计算并写入缓存
+
+        Args:
+            texts: 文本列表
+            compute: 批量计算函数，输入文本列表，返回等长的向量序列
+
+        Returns:
+            np.ndarray: (len(texts), dim) 的 float32 矩阵，行顺序与 texts 一致
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(self.get_or_compute_list(texts, compute))
+
+    def get_or_compute_list(
+        self,
+        texts: Sequence[str],
+        compute: Callable[[List[str]], Sequence[np.ndarray]],
+        should_cache: Optional[Callable[[np.ndarray], bool]] = None,
+    ) -> List[np.ndarray]:
+        """
+        同 get_or_compute，但按列表返回（各向量维度可以不同）
+
+        Args:
+            should_cache: 判断计算结果是否写入缓存（如失败时返回的零向量不缓存），None 表示全部缓存
+        """
+        cached = self.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if not missing:
+            return cached
+        started = time.perf_counter()
+        computed = [np.asarray(v, dtype=np.float32) for v in compute(missing)]
+        self._record_compute(len(missing), time.perf_counter() - started)
+        if len(computed) != len(missing):
+            raise ValueError(f"向量数量与文本数量不一致: {len(computed)} != {len(missing)}")
+        keep = [i for i, vector in enumerate(computed) if should_cache is None or should_cache(vector)]
+        self.put_many([missing[i] for i in keep], [computed[i] for i in keep])
+        by_text = dict(zip(missing, computed))
+        return [by_text[text] if vector is None else vector for text, vector in zip(texts, cached)]
+
+    def _record_compute(self, count: int, seconds: float):
+        with self._lock:
+            self.stats["computed_batches"] += 1
+            self.stats["computed_texts"] += count
+            self.stats["compute_seconds"] += seconds
+            self.stats["max_compute_seconds"] = max(self.stats["max_compute_seconds"], seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """命中率与计算耗时统计"""
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._memory)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        batches = stats["computed_batches"]
+        return {
+            **stats,
+            "namespace": self.namespace,
+            "size": size,
+            "persistent": self._conn is not None,
+            "hit_rate": round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            "avg_compute_seconds": round(stats["compute_seconds"] / batches, 4) if batches else 0.0,
+        }
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _load(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._conn is None or not keys:
+            return {}
+        found = {}
+        try:
+            for start in range(0, len(keys), _SQL_BATCH):
+                chunk = keys[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                # 刷新使用时间，淘汰时保留仍在被读取的向量
+                now = time.time()
+                self._conn.executemany("UPDATE embeddings SET used_at = ? WHERE key = ?", [(now, key) for key in found])
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 读取向量缓存失败: {e}")
+        return found
+
+    def _store(self, rows):
+        if self._conn is None or not rows:
+            return
+        try:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector, used_at) VALUES (?, ?, ?)", rows)
+            self._trim()
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 写入向量缓存失败: {e}")
+
+    def _trim(self):
+        """超过 max_disk_items 时按 used_at 删除最久未使用的行"""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_disk_items
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used_at LIMIT ?)", (excess,)
+        )
+        logger.debug(f"🧹 向量缓存文件淘汰 {excess} 条（上限 {self.max_disk_items}）")
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_CACHES: Dict[str, EmbeddingCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_embedding_cache(namespace: str, persist: Optional[bool] = None) -> EmbeddingCache:
+    """
+    获取命名空间的共享向量缓存
+
+    Args:
+        namespace: 命名空间（模型名等）
+        persist: 是否持久化到磁盘，None 时读取 EMBEDDING_CACHE_PERSIST（默认开启）。
+            只在第一次创建该命名空间的缓存时生效
+    """
+    with _CACHES_LOCK:
+        cache = _CACHES.get(namespace)
+        if cache is None:
+            if persist is None:
+                persist = get_bool("EMBEDDING_CACHE_PERSIST", None, True)
+            path = os.path.join(default_cache_dir(), DB_FILENAME) if persist else None
+            max_items = get_int("EMBEDDING_CACHE_MAX_ITEMS", None, 20000)
+            max_disk_items = get_int("EMBEDDING_CACHE_MAX_DISK_ITEMS", None, max_items * DISK_ITEMS_FACTOR)
+            cache = _CACHES[namespace] = EmbeddingCache(
+                namespace, max_items=max_items, path=path, max_disk_items=max_disk_items
+            )
+        return cache
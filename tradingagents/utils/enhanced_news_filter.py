@@ -12,11 +12,26 @@ import numpy as np
 
 # 导入基础过滤器
 from .news_filter import NewsRelevanceFilter, create_news_filter, get_company_name
+from .embedding_cache import get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
 class EnhancedNewsFilter(NewsRelevanceFilter):
     """增强新闻过滤器，集成本地模型和多种过滤策略"""
+
+    SEMANTIC_MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
+    CLASSIFICATION_MODEL_NAME = "uer/roberta-base-finetuned-chinanews-chinese"
+
+    # 综合评分权重
+    SCORE_WEIGHTS = {
+        'rule': 0.4,      # 规则过滤权重40%
+        'semantic': 0.35,  # 语义相似度权重35%
+        'classification': 0.25  # 分类模型权重25%
+    }
+
+    # 模型批量推理的批大小
+    ENCODE_BATCH_SIZE = 64
+    CLASSIFY_BATCH_SIZE = 16
     
     def __init__(self, stock_code: str, company_name: str, use_semantic: bool = True, use_local_model: bool = False):
         """
@@ -35,6 +50,8 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         # 语义模型相关
         self.sentence_model = None
         self.company_embedding = None
+        self._company_unit = None  # 归一化后的公司向量矩阵（按 company_embedding 缓存）
+        self._company_unit_source = None
         
         # 本地分类模型相关
         self.classification_model = None
@@ -56,7 +73,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
                 from sentence_transformers import SentenceTransformer
                 
                 # 使用轻量级中文模型
-                model_name = "paraphrase-multilingual-MiniLM-L12-v2"  # 支持中文的轻量级模型
+                model_name = self.SEMANTIC_MODEL_NAME
                 self.sentence_model = SentenceTransformer(model_name)
                 
                 # 预计算公司相关的embedding
@@ -69,7 +86,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
                     f"{self.company_name}财报"
                 ]
                 
-                self.company_embedding = self.sentence_model.encode(company_texts)
+                self.company_embedding = self._encode_texts(company_texts)
                 logger.info(f"[增强过滤器] ✅ 语义模型加载成功: {model_name}")
                 
             except ImportError:
@@ -91,7 +108,7 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
                 import torch
                 
                 # 使用轻量级中文文本分类模型
-                model_name = "uer/roberta-base-finetuned-chinanews-chinese"
+                model_name = self.CLASSIFICATION_MODEL_NAME
                 
                 self.tokenizer = AutoTokenizer.from_pretrained(model_name)
                 self.classification_model = AutoModelForSequenceClassification.from_pretrained(model_name)
@@ -106,6 +123,56 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             logger.error(f"[增强过滤器] 本地分类模型初始化失败: {e}")
             self.use_local_model = False
     
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """一次批量编码多条文本"""
+        return np.asarray(self.sentence_model.encode(
+            list(texts), batch_size=self.ENCODE_BATCH_SIZE, show_progress_bar=False
+        ), dtype=np.float32)
+
+    def _company_matrix(self) -> np.ndarray:
+        """归一化后的公司向量矩阵（每个实例只计算一次）"""
+        if self._company_unit is None or self._company_unit_source is not self.company_embedding:
+            matrix = np.atleast_2d(np.asarray(self.company_embedding, dtype=np.float32))
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._company_unit = matrix / np.where(norms == 0, 1, norms)
+            self._company_unit_source = self.company_embedding
+        return self._company_unit
+
+    def calculate_semantic_similarity_batch(self, titles: List[str], contents: List[str]) -> np.ndarray:
+        """
+        批量计算语义相似度评分
+
+        文章向量按内容哈希缓存（见 embedding_cache），未命中的文章一次批量编码，
+        余弦相似度通过一次矩阵乘法得到。
+
+        Args:
+            titles: 新闻标题列表
+            contents: 新闻内容列表
+
+        Returns:
+            np.ndarray: 每条新闻的语义相似度评分 (0-100)
+        """
+        if not self.use_semantic or self.sentence_model is None or not len(titles):
+            return np.zeros(len(titles))
+
+        try:
+            # 组合标题和内容的前200字符
+            texts = [f"{title} {content[:200]}" for title, content in zip(titles, contents)]
+
+            # 计算文本embedding（命中缓存的文章不再编码）
+            cache = get_embedding_cache(f"news_filter:{self.SEMANTIC_MODEL_NAME}")
+            embeddings = cache.get_or_compute(texts, self._encode_texts)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+
+            # 与公司相关文本的最高相似度，转换为0-100评分
+            similarities = embeddings @ self._company_matrix().T
+            return np.clip(similarities.max(axis=1) * 100, 0, 100)
+
+        except Exception as e:
+            logger.error(f"[增强过滤器] 语义相似度计算失败: {e}")
+            return np.zeros(len(titles))
+
     def calculate_semantic_similarity(self, title: str, content: str) -> float:
         """
         计算语义相似度评分
@@ -117,37 +184,60 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         Returns:
             float: 语义相似度评分 (0-100)
         """
-        if not self.use_semantic or self.sentence_model is None:
-            return 0
-        
+        semantic_score = float(self.calculate_semantic_similarity_batch([title], [content])[0])
+        logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
+        return semantic_score
+
+    def classify_news_relevance_batch(self, titles: List[str], contents: List[str]) -> np.ndarray:
+        """
+        使用本地模型批量分类新闻相关性（按 CLASSIFY_BATCH_SIZE 分批推理）
+
+        Args:
+            titles: 新闻标题列表
+            contents: 新闻内容列表
+
+        Returns:
+            np.ndarray: 每条新闻的分类相关性评分 (0-100)
+        """
+        if not self.use_local_model or self.classification_model is None or not len(titles):
+            return np.zeros(len(titles))
+
         try:
-            # 组合标题和内容的前200字符
-            text = f"{title} {content[:200]}"
-            
-            # 计算文本embedding
-            text_embedding = self.sentence_model.encode([text])
-            
-            # 计算与公司相关文本的相似度
-            similarities = []
-            for company_emb in self.company_embedding:
-                similarity = np.dot(text_embedding[0], company_emb) / (
-                    np.linalg.norm(text_embedding[0]) * np.linalg.norm(company_emb)
+            import torch
+
+            # 构建分类文本，添加公司信息作为上下文
+            context_texts = [
+                f"关于{self.company_name}({self.stock_code})的新闻: {title} {content[:300]}"
+                for title, content in zip(titles, contents)
+            ]
+
+            scores = []
+            for start in range(0, len(context_texts), self.CLASSIFY_BATCH_SIZE):
+                # 分词和编码（批内补齐，attention mask 屏蔽补齐部分）
+                inputs = self.tokenizer(
+                    context_texts[start:start + self.CLASSIFY_BATCH_SIZE],
+                    return_tensors="pt",
+                    truncation=True,
+                    padding=True,
+                    max_length=512
                 )
-                similarities.append(similarity)
-            
-            # 取最高相似度
-            max_similarity = max(similarities)
-            
+
+                # 模型推理
+                with torch.no_grad():
+                    logits = self.classification_model(**inputs).logits
+                    probabilities = torch.softmax(logits, dim=-1)
+
+                # 假设第一个类别是"相关"，第二个是"不相关"
+                # 这里需要根据具体模型调整
+                scores.append(probabilities[:, 0].cpu().numpy())
+
             # 转换为0-100评分
-            semantic_score = max(0, min(100, max_similarity * 100))
-            
-            logger.debug(f"[增强过滤器] 语义相似度评分: {semantic_score:.1f}")
-            return semantic_score
-            
+            return np.concatenate(scores) * 100
+
         except Exception as e:
-            logger.error(f"[增强过滤器] 语义相似度计算失败: {e}")
-            return 0
-    
+            logger.error(f"[增强过滤器] 本地模型分类失败: {e}")
+            return np.zeros(len(titles))
+
     def classify_news_relevance(self, title: str, content: str) -> float:
         """
         使用本地模型分类新闻相关性
@@ -159,49 +249,44 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         Returns:
             float: 分类相关性评分 (0-100)
         """
-        if not self.use_local_model or self.classification_model is None:
-            return 0
-        
-        try:
-            import torch
-            
-            # 构建分类文本
-            text = f"{title} {content[:300]}"
-            
-            # 添加公司信息作为上下文
-            context_text = f"关于{self.company_name}({self.stock_code})的新闻: {text}"
-            
-            # 分词和编码
-            inputs = self.tokenizer(
-                context_text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=512
-            )
-            
-            # 模型推理
-            with torch.no_grad():
-                outputs = self.classification_model(**inputs)
-                logits = outputs.logits
-                
-                # 使用softmax获取概率分布
-                probabilities = torch.softmax(logits, dim=-1)
-                
-                # 假设第一个类别是"相关"，第二个是"不相关"
-                # 这里需要根据具体模型调整
-                relevance_prob = probabilities[0][0].item()  # 相关性概率
-                
-                # 转换为0-100评分
-                classification_score = relevance_prob * 100
-                
-                logger.debug(f"[增强过滤器] 分类模型评分: {classification_score:.1f}")
-                return classification_score
-                
-        except Exception as e:
-            logger.error(f"[增强过滤器] 本地模型分类失败: {e}")
-            return 0
-    
+        classification_score = float(self.classify_news_relevance_batch([title], [content])[0])
+        logger.debug(f"[增强过滤器] 分类模型评分: {classification_score:.1f}")
+        return classification_score
+
+    def calculate_enhanced_relevance_scores(self, titles: List[str], contents: List[str]) -> pd.DataFrame:
+        """
+        批量计算增强相关性评分（综合多种方法）
+
+        Args:
+            titles: 新闻标题列表
+            contents: 新闻内容列表
+
+        Returns:
+            pd.DataFrame: rule_score / semantic_score / classification_score / final_score 四列，行顺序与输入一致
+        """
+        # 1. 基础规则评分（关键词匹配，逐条计算）
+        rule_score = super().calculate_relevance_score
+        rule_scores = np.array([rule_score(title, content) for title, content in zip(titles, contents)], dtype=float)
+
+        # 2. 语义相似度评分 / 3. 本地模型分类评分（整批推理）
+        semantic_scores = self.calculate_semantic_similarity_batch(titles, contents)
+        classification_scores = self.classify_news_relevance_batch(titles, contents)
+
+        # 4. 综合评分（加权平均）
+        weights = self.SCORE_WEIGHTS
+        final_scores = (
+            weights['rule'] * rule_scores +
+            weights['semantic'] * semantic_scores +
+            weights['classification'] * classification_scores
+        )
+
+        return pd.DataFrame({
+            'rule_score': rule_scores,
+            'semantic_score': semantic_scores,
+            'classification_score': classification_scores,
+            'final_score': final_scores,
+        })
+
     def calculate_enhanced_relevance_score(self, title: str, content: str) -> Dict[str, float]:
         """
         计算增强相关性评分（综合多种方法）
@@ -213,46 +298,24 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
         Returns:
             Dict: 包含各种评分的字典
         """
-        scores = {}
-        
-        # 1. 基础规则评分
-        rule_score = super().calculate_relevance_score(title, content)
-        scores['rule_score'] = rule_score
-        
-        # 2. 语义相似度评分
-        if self.use_semantic:
-            semantic_score = self.calculate_semantic_similarity(title, content)
-            scores['semantic_score'] = semantic_score
-        else:
-            scores['semantic_score'] = 0
-        
-        # 3. 本地模型分类评分
-        if self.use_local_model:
-            classification_score = self.classify_news_relevance(title, content)
-            scores['classification_score'] = classification_score
-        else:
-            scores['classification_score'] = 0
-        
-        # 4. 综合评分（加权平均）
-        weights = {
-            'rule': 0.4,      # 规则过滤权重40%
-            'semantic': 0.35,  # 语义相似度权重35%
-            'classification': 0.25  # 分类模型权重25%
+        scores = {
+            name: float(value)
+            for name, value in self.calculate_enhanced_relevance_scores([title], [content]).iloc[0].items()
         }
-        
-        final_score = (
-            weights['rule'] * rule_score +
-            weights['semantic'] * scores['semantic_score'] +
-            weights['classification'] * scores['classification_score']
-        )
-        
-        scores['final_score'] = final_score
-        
-        logger.debug(f"[增强过滤器] 综合评分 - 规则:{rule_score:.1f}, 语义:{scores['semantic_score']:.1f}, "
-                    f"分类:{scores['classification_score']:.1f}, 最终:{final_score:.1f}")
-        
+
+        logger.debug(f"[增强过滤器] 综合评分 - 规则:{scores['rule_score']:.1f}, 语义:{scores['semantic_score']:.1f}, "
+                    f"分类:{scores['classification_score']:.1f}, 最终:{scores['final_score']:.1f}")
+
         return scores
-    
+
+    @staticmethod
+    def _text_column(news_df: pd.DataFrame, name: str, fallback: str) -> List[str]:
+        """取文本列（优先 name，其次 fallback），缺失值按空字符串处理"""
+        for column in (name, fallback):
+            if column in news_df.columns:
+                return news_df[column].fillna('').astype(str).tolist()
+        return [''] * len(news_df)
+
     def filter_news_enhanced(self, news_df: pd.DataFrame, min_score: float = 40) -> pd.DataFrame:
         """
         增强新闻过滤
@@ -269,30 +332,27 @@ class EnhancedNewsFilter(NewsRelevanceFilter):
             return news_df
         
         logger.info(f"[增强过滤器] 开始增强过滤，原始数量: {len(news_df)}条，最低评分阈值: {min_score}")
-        
-        filtered_news = []
-        
-        for idx, row in news_df.iterrows():
-            title = row.get('新闻标题', row.get('标题', ''))
-            content = row.get('新闻内容', row.get('内容', ''))
-            
-            # 计算增强评分
-            scores = self.calculate_enhanced_relevance_score(title, content)
-            
-            if scores['final_score'] >= min_score:
-                row_dict = row.to_dict()
-                row_dict.update(scores)  # 添加所有评分信息
-                filtered_news.append(row_dict)
-                
-                logger.debug(f"[增强过滤器] 保留新闻 (综合评分: {scores['final_score']:.1f}): {title[:50]}...")
-            else:
-                logger.debug(f"[增强过滤器] 过滤新闻 (综合评分: {scores['final_score']:.1f}): {title[:50]}...")
-        
+
+        titles = self._text_column(news_df, '新闻标题', '标题')
+        contents = self._text_column(news_df, '新闻内容', '内容')
+
+        # 整批计算增强评分
+        scores = self.calculate_enhanced_relevance_scores(titles, contents)
+        keep = (scores['final_score'] >= min_score).to_numpy()
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for title, score, kept in zip(titles, scores['final_score'], keep):
+                action = "保留" if kept else "过滤"
+                logger.debug(f"[增强过滤器] {action}新闻 (综合评分: {score:.1f}): {title[:50]}...")
+
         # 创建过滤后的DataFrame
-        if filtered_news:
-            filtered_df = pd.DataFrame(filtered_news)
+        if keep.any():
+            filtered_df = pd.concat([
+                news_df.loc[keep].drop(columns=scores.columns, errors='ignore').reset_index(drop=True),
+                scores.loc[keep].reset_index(drop=True),
+            ], axis=1)
             # 按综合评分排序
-            filtered_df = filtered_df.sort_values('final_score', ascending=False)
+            filtered_df = filtered_df.sort_values('final_score', ascending=False, kind='stable')
             logger.info(f"[增强过滤器] 增强过滤完成，保留 {len(filtered_df)}条 新闻")
         else:
             filtered_df = pd.DataFrame()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+包级延迟导出
+
+包的 __init__ 通过 lazy_exports 声明对外导出的名称及其所在模块，
+在第一次访问该名称时才导入对应模块（PEP 562 模块级 __getattr__），
+避免 import 子模块时连带加载 yfinance、chromadb、各数据源 SDK 等重量级依赖。
+
+    lazy_exports(globals(), {
+        "YFinanceUtils": [".providers.us:YFinanceUtils", ".yfin_utils:YFinanceUtils"],
+        "get_YFin_data": ".interface:get_YFin_data",
+    }, optional=["YFinanceUtils"], availability={"YFINANCE_AVAILABLE": "YFinanceUtils"})
+"""
+
+import importlib
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from tradingagents.utils.logging_manager import get_logger
+
+logger = get_logger('agents')
+
+ExportSpec = str | Sequence[str]
+
+
+def _specs(spec: ExportSpec) -> list[str]:
+    return [spec] if isinstance(spec, str) else list(spec)
+
+
+def lazy_exports(
+    module_globals: dict[str, Any],
+    exports: dict[str, ExportSpec],
+    optional: Iterable[str] = (),
+    availability: dict[str, str] | None = None,
+):
+    """
+    为包安装延迟导出
+
+    Args:
+        module_globals: 包 __init__ 的 globals()
+        exports: 名称 -> "模块:属性"（模块可用相对路径，省略属性表示模块本身）；
+            给出列表时按顺序尝试，用于兼容新旧路径
+        optional: 可选依赖，全部路径导入失败时取值为 None（与原先 try/except ImportError 一致）
+        availability: 可用性标志名 -> 导出名，标志为对应导出是否成功导入
+    """
+    package = module_globals["__name__"]
+    optional = set(optional)
+    availability = dict(availability or {})
+
+    def _resolve(name: str):
+        error: Exception | None = None
+        for spec in _specs(exports[name]):
+            module_name, _, attr = spec.partition(":")
+            try:
+                module = importlib.import_module(module_name, package)
+                return getattr(module, attr) if attr else module
+            except (ImportError, AttributeError) as e:
+                # 与 from x import y 一致：模块中没有该名称也视为导入失败
+                error = e if isinstance(e, ImportError) else ImportError(str(e))
+        if name in optional:
+            logger.debug(f"⚠️ {package}.{name} 不可用: {error}")
+            return None
+        raise error
+
+    # PEP 562 要求模块级钩子名为 __getattr__ / __dir__
+    def __getattr__(name: str):  # noqa: N807
+        if name in exports:
+            value = _resolve(name)
+        elif name in availability:
+            value = __getattr__(availability[name]) is not None
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        # 写回模块命名空间，之后的访问不再经过 __getattr__
+        module_globals[name] = value
+        return value
+
+    def __dir__():  # noqa: N807
+        return sorted(set(module_globals) | set(exports) | set(availability))
+
+    module_globals["__getattr__"] = __getattr__
+    module_globals["__dir__"] = __dir__